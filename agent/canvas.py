@@ -838,6 +838,10 @@ class Canvas(Graph):
                     _extend_path(self.get_component(cpn["parent_id"])["downstream"])
                 elif cpn_obj.component_name.lower() in ["categorize", "switch"]:
                     _extend_path(cpn_obj.output("_next"))
+                elif cpn_obj.component_name.lower() == "iteration" and cpn_obj.end():
+                    # Parallel mode already ran the body for every item.
+                    yield _node_finished(cpn_obj)
+                    _extend_path(cpn["downstream"])
                 elif cpn_obj.component_name.lower() in ("iteration", "loop"):
                     _append_path(cpn_obj.get_start())
                 elif cpn_obj.component_name.lower() == "exitloop" and cpn_obj.get_parent().component_name.lower() == "loop":
@@ -1098,3 +1102,28 @@ class Canvas(Graph):
 
     def get_component_thoughts(self, cpn_id) -> str:
         return self.components.get(cpn_id)["obj"].thoughts()
+
+
+class IterationScope(Canvas):
+    """One item's view of the canvas inside a parallel Iteration.
+
+    The components of the iteration body are private copies, so items running at
+    the same time never see each other's inputs and outputs. Everything else,
+    including globals, components outside the body and the task id, is read from
+    and written to the parent canvas.
+    """
+
+    def __init__(self, canvas: Canvas, component_ids):
+        self._parent_canvas = canvas
+        self.components = dict(canvas.components)
+        for cid in component_ids:
+            cpn = dict(canvas.components[cid])
+            obj = cpn["obj"]
+            cpn["obj"] = type(obj)(self, cid, deepcopy(obj._param))
+            cpn["obj"].reset()
+            self.components[cid] = cpn
+
+    def __getattr__(self, name):
+        if name == "_parent_canvas":
+            raise AttributeError(name)
+        return getattr(self._parent_canvas, name)
@@ -31,7 +31,7 @@ from api.db.joint_services.tenant_model_service import resolve_model_config, res
 from api.db.services.llm_service import LLMBundle
 from api.db.services.mcp_server_service import MCPServerService
 from common.connection_utils import timeout
-from common.mcp_tool_call_conn import MCPToolBinding, MCPToolCallSession, mcp_tool_metadata_to_openai_tool
+from common.mcp_tool_call_conn import MCP_SESSION_POOL, MCPToolBinding, mcp_tool_metadata_to_openai_tool
 from rag.prompts.generator import citation_plus, citation_prompt, full_question, kb_prompt, message_fit_in, structured_output_prompt
 
 _logger = logging.getLogger(__name__)
@@ -104,7 +104,7 @@ class Agent(LLM, ToolBase):
         for mcp in self._param.mcp:
             _, mcp_server = MCPServerService.get_by_id(mcp["mcp_id"])
             custom_header = self._param.custom_header
-            tool_call_session = MCPToolCallSession(mcp_server, mcp_server.variables, custom_header)
+            tool_call_session = MCP_SESSION_POOL.session(mcp_server, mcp_server.variables, custom_header)
             for tnm, meta in mcp["tools"].items():
                 indexed_name = f"{tnm}_{tool_idx}"
                 tool_idx += 1
@@ -13,6 +13,8 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
+import asyncio
+import logging
 from abc import ABC
 from agent.component.base import ComponentBase, ComponentParamBase
 
@@ -34,16 +36,26 @@ class IterationParam(ComponentParamBase):
         super().__init__()
         self.items_ref = ""
         self.variable = {}
+        self.parallel = False
+        self.max_concurrency = 4
 
     def get_input_form(self) -> dict[str, dict]:
         return {"items": {"type": "json", "name": "Items"}}
 
     def check(self):
+        self.check_boolean(self.parallel, "[Iteration] Parallel")
+        self.check_positive_integer(self.max_concurrency, "[Iteration] Max concurrency")
         return True
 
 
 class Iteration(ComponentBase, ABC):
     component_name = "Iteration"
+    # The parallel mode runs the body itself; bodies with these components need the canvas loop.
+    SEQUENTIAL_ONLY = {"message", "userfillup", "iteration", "loop", "exitloop"}
+
+    def __init__(self, canvas, id, param: ComponentParamBase):
+        super().__init__(canvas, id, param)
+        self._done = False
 
     def get_start(self):
         for cid in self._canvas.components.keys():
@@ -60,5 +72,92 @@ class Iteration(ComponentBase, ABC):
         if not isinstance(arr, list):
             self.set_output("_ERROR", self._param.items_ref + " must be an array, but its type is " + str(type(arr)))
 
+    async def _invoke_async(self, **kwargs):
+        self._done = False
+        self._invoke(**kwargs)
+        if not self._param.parallel:
+            return
+        if self.error():
+            # Leave the error to the canvas's exception handling; the body must not run item by item.
+            self._done = True
+            return
+
+        body = [cid for cid, cpn in self._canvas.components.items() if cpn.get("parent_id") == self._id]
+        names = {self._canvas.get_component_obj(cid).component_name for cid in body}
+        unsupported = sorted(n for n in names if n.lower() in self.SEQUENTIAL_ONLY)
+        if unsupported:
+            logging.warning(f"Iteration {self._id} runs its items one by one: {', '.join(unsupported)} cannot run in parallel.")
+            return
+
+        from agent.canvas import IterationScope
+
+        arr = self._canvas.get_variable_value(self._param.items_ref)
+        scopes = [None] * len(arr)
+        sem = asyncio.Semaphore(self._param.max_concurrency)
+        failed = asyncio.Event()
+
+        async def run_item(idx):
+            async with sem:
+                if failed.is_set():
+                    return
+                scopes[idx] = IterationScope(self._canvas, body)
+                try:
+                    await self._run_item(scopes[idx], idx, arr[idx])
+                except Exception:
+                    # Set before the semaphore is released so no further item starts.
+                    failed.set()
+                    raise
+
+        tasks = [asyncio.create_task(run_item(idx)) for idx in range(len(arr))]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # The items have run, whether or not one failed: an error goes through the
+        # canvas's exception handling like any other component's, never a second run.
+        self._done = True
+        for idx, t in enumerate(tasks):
+            if not t.cancelled() and t.exception():
+                self.set_output("_ERROR", f"Item {idx}: {t.exception()}")
+                return
+
+        for k, o in self._param.outputs.items():
+            if "ref" not in o:
+                continue
+            cid, var = o["ref"].split("@", 1)
+            if cid in body:
+                self.set_output(k, [scope.get_component_obj(cid).output(var) for scope in scopes])
+
+    async def _run_item(self, scope, idx, item):
+        """Run the body for one item in its own scope, following the same edges as the canvas would."""
+        start = scope.get_component_obj(self.get_start())
+        start.set_output("item", item)
+        start.set_output("result", item)
+        start.set_output("index", idx)
+        path = list(scope.get_component(start._id)["downstream"])
+        i = 0
+        while i < len(path):
+            if self.is_canceled():
+                raise Exception("Task has been canceled")
+            cpn = scope.get_component(path[i])
+            obj = cpn["obj"]
+            i += 1
+            await obj.invoke_async(**obj.get_input())
+            next_ids = cpn["downstream"]
+            if obj.component_name.lower() in ["categorize", "switch"]:
+                next_ids = obj.output("_next") or []
+            if obj.error():
+                ex = obj.exception_handler()
+                if ex and ex["goto"]:
+                    next_ids = ex["goto"]
+                elif not (ex and ex["default_value"]):
+                    raise Exception(f"{scope.get_component_name(obj._id) or obj._id}: {obj.error()}")
+            path.extend(cid for cid in next_ids if cid not in path[i:])
+
+    def end(self):
+        """Whether the parallel mode has already run every item, so the canvas moves past the body."""
+        return self._done
+
     def thoughts(self) -> str:
         return "Need to process {} items.".format(len(self._canvas.get_variable_value(self._param.items_ref)))
@@ -66,33 +66,27 @@ class IterationItem(ComponentBase, ABC):
         self._idx += 1
 
     def output_collation(self):
-        pid = self.get_parent()._id
-        for cid in self._canvas.components.keys():
-            obj = self._canvas.get_component_obj(cid)
-            p = obj.get_parent()
-            if not p:
+        parent = self.get_parent()
+        # Only the components the parent's outputs refer to are read, instead of scanning the canvas.
+        for k, o in parent._param.outputs.items():
+            if "ref" not in o:
                 continue
-            if p._id != pid:
+            # Use maxsplit=1 so an `@` legitimately embedded in `var`
+            # (e.g. a user-defined output key that happens to contain
+            # '@') does not raise `ValueError: too many values to unpack`.
+            # `_cid` is system-generated and never contains '@'.
+            cid, var = o["ref"].split("@", 1)
+            if cid not in self._canvas.components:
                 continue
-
-            if p.component_name.lower() in ["categorize", "message", "switch", "userfillup", "iterationitem"]:
+            obj = self._canvas.get_component_obj(cid)
+            p = obj.get_parent()
+            if not p or p._id != parent._id:
                 continue
-
-            for k, o in p._param.outputs.items():
-                if "ref" not in o:
-                    continue
-                # Use maxsplit=1 so an `@` legitimately embedded in `var`
-                # (e.g. a user-defined output key that happens to contain
-                # '@') does not raise `ValueError: too many values to unpack`.
-                # `_cid` is system-generated and never contains '@'.
-                _cid, var = o["ref"].split("@", 1)
-                if _cid != cid:
-                    continue
-                res = p.output(k)
-                if not res:
-                    res = []
-                res.append(obj.output(var))
-                p.set_output(k, res)
+            res = parent.output(k)
+            if not res:
+                res = []
+            res.append(obj.output(var))
+            parent.set_output(k, res)
 
     def end(self):
         return self._idx == -1
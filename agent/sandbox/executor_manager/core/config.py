@@ -29,8 +29,10 @@ TIMEOUT = parse_timeout_duration(os.getenv("SANDBOX_TIMEOUT", "10s"))
 async def _lifespan(app: FastAPI):
     """Asynchronous lifecycle management"""
     size = int(os.getenv("SANDBOX_EXECUTOR_MANAGER_POOL_SIZE", 1))
+    max_size = int(os.getenv("SANDBOX_EXECUTOR_MANAGER_POOL_MAX_SIZE", size))
+    idle_timeout = parse_timeout_duration(os.getenv("SANDBOX_EXECUTOR_MANAGER_POOL_IDLE_TIMEOUT", "60s"), default_seconds=60)
 
-    success_count, total_task_count = await init_containers(size)
+    success_count, total_task_count = await init_containers(size, max_size, idle_timeout)
     logger.info(f"\n📊 Container pool initialization complete: {success_count}/{total_task_count} available")
 
     yield
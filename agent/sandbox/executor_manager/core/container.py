@@ -16,7 +16,8 @@
 import asyncio
 import contextlib
 import os
-from queue import Empty, Queue
+import time
+from queue import Empty, LifoQueue
 
 from models.enums import SupportLanguage
 from util import env_setting_enabled, is_valid_memory_limit
@@ -24,23 +25,33 @@ from utils.common import async_run_command
 
 from core.logger import logger
 
-_CONTAINER_QUEUES: dict[SupportLanguage, Queue] = {}
+# Idle containers, most recently released on top so that surplus containers go cold and can be removed.
+_CONTAINER_QUEUES: dict[SupportLanguage, LifoQueue] = {}
 _CONTAINER_LOCK: asyncio.Lock = asyncio.Lock()
 _CONTAINER_EXECUTION_SEMAPHORES: dict[SupportLanguage, asyncio.Semaphore] = {}
 
-
-async def init_containers(size: int) -> tuple[int, int]:
-    global _CONTAINER_QUEUES
-    _CONTAINER_QUEUES = {SupportLanguage.PYTHON: Queue(), SupportLanguage.NODEJS: Queue()}
-
-    async with _CONTAINER_LOCK:
-        while not _CONTAINER_QUEUES[SupportLanguage.PYTHON].empty():
-            _CONTAINER_QUEUES[SupportLanguage.PYTHON].get_nowait()
-        while not _CONTAINER_QUEUES[SupportLanguage.NODEJS].empty():
-            _CONTAINER_QUEUES[SupportLanguage.NODEJS].get_nowait()
+# Every container of the pool, idle or busy, including the ones being created.
+_CONTAINER_NAMES: dict[SupportLanguage, set[str]] = {}
+_CONTAINER_PENDING: dict[SupportLanguage, int] = {}
+_CONTAINER_WAITING: dict[SupportLanguage, int] = {}
+_CONTAINER_IDLE_SINCE: dict[str, float] = {}
+_POOL_LIMITS = {"min_size": 1, "max_size": 1, "idle_timeout": 60}
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+async def init_containers(size: int, max_size: int | None = None, idle_timeout: int = 60) -> tuple[int, int]:
+    """Create the minimum pool; with max_size above size, the pool grows under load and shrinks back when idle."""
+    global _CONTAINER_QUEUES, _CONTAINER_NAMES, _CONTAINER_PENDING, _CONTAINER_WAITING
+    max_size = max(size, max_size or size)
+    _POOL_LIMITS.update(min_size=size, max_size=max_size, idle_timeout=idle_timeout)
+    _CONTAINER_QUEUES = {language: LifoQueue() for language in SupportLanguage}
+    _CONTAINER_NAMES = {language: set() for language in SupportLanguage}
+    _CONTAINER_PENDING = {language: 0 for language in SupportLanguage}
+    _CONTAINER_WAITING = {language: 0 for language in SupportLanguage}
+    _CONTAINER_IDLE_SINCE.clear()
 
     for language in SupportLanguage:
-        _CONTAINER_EXECUTION_SEMAPHORES[language] = asyncio.Semaphore(size)
+        _CONTAINER_EXECUTION_SEMAPHORES[language] = asyncio.Semaphore(max_size)
 
     create_tasks = []
     for i in range(size):
@@ -55,16 +66,103 @@ async def init_containers(size: int) -> tuple[int, int]:
     results = await asyncio.gather(*create_tasks, return_exceptions=True)
     success_count = sum(1 for r in results if r is True)
     total_task_count = len(create_tasks)
+
+    if max_size > size:
+        logger.info(f"📐 Container pool scales between {size} and {max_size} per language, idle timeout {idle_timeout}s")
+        _spawn(_scale_down_loop())
     return success_count, total_task_count
 
 
 async def teardown_containers():
+    for task in list(_BACKGROUND_TASKS):
+        task.cancel()
     async with _CONTAINER_LOCK:
-        while not _CONTAINER_QUEUES[SupportLanguage.PYTHON].empty():
-            name = _CONTAINER_QUEUES[SupportLanguage.PYTHON].get_nowait()
-            await async_run_command("docker", "rm", "-f", name, timeout=5)
-        while not _CONTAINER_QUEUES[SupportLanguage.NODEJS].empty():
-            name = _CONTAINER_QUEUES[SupportLanguage.NODEJS].get_nowait()
+        for queue in _CONTAINER_QUEUES.values():
+            while not queue.empty():
+                name = queue.get_nowait()
+                await async_run_command("docker", "rm", "-f", name, timeout=5)
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
+
+
+def _put_idle(name: str, language: SupportLanguage):
+    _CONTAINER_IDLE_SINCE[name] = time.monotonic()
+    _CONTAINER_QUEUES[language].put(name)
+
+
+def _forget_container(name: str, language: SupportLanguage):
+    _CONTAINER_NAMES[language].discard(name)
+    _CONTAINER_IDLE_SINCE.pop(name, None)
+
+
+def _maybe_grow(language: SupportLanguage):
+    """Start one more container while callers outnumber the idle and starting containers."""
+    names = _CONTAINER_NAMES[language]
+    if len(names) >= _POOL_LIMITS["max_size"]:
+        return
+    if _CONTAINER_WAITING[language] <= _CONTAINER_QUEUES[language].qsize() + _CONTAINER_PENDING[language]:
+        return
+    i = 0
+    while f"sandbox_{language.value}_{i}" in names:
+        i += 1
+    name = f"sandbox_{language.value}_{i}"
+    names.add(name)
+    _CONTAINER_PENDING[language] += 1
+    logger.info(f"📈 {_CONTAINER_WAITING[language]} {language.value} executions waiting, adding container {name} ({len(names)}/{_POOL_LIMITS['max_size']})")
+    _spawn(_grow_pool(name, language))
+
+
+async def _grow_pool(name: str, language: SupportLanguage):
+    try:
+        if not await _prepare_container(name, language):
+            _forget_container(name, language)
+    finally:
+        _CONTAINER_PENDING[language] -= 1
+
+
+async def _scale_down_loop():
+    interval = max(1, _POOL_LIMITS["idle_timeout"] // 4)
+    while True:
+        await asyncio.sleep(interval)
+        for language in SupportLanguage:
+            try:
+                await _shrink_pool(language)
+            except Exception as e:
+                logger.error(f"❌ Shrinking the {language.value} pool failed: {str(e)}")
+
+
+async def _shrink_pool(language: SupportLanguage):
+    """Remove containers idle for longer than the idle timeout, keeping the minimum pool size."""
+    if _CONTAINER_WAITING[language]:
+        return
+    queue = _CONTAINER_QUEUES[language]
+    idle = []
+    while True:
+        try:
+            idle.append(queue.get_nowait())
+        except Empty:
+            break
+
+    # `idle` runs from the most recently released container to the longest idle one.
+    now = time.monotonic()
+    surplus = len(_CONTAINER_NAMES[language]) - _POOL_LIMITS["min_size"]
+    expired = []
+    while idle and surplus > 0 and now - _CONTAINER_IDLE_SINCE.get(idle[-1], now) >= _POOL_LIMITS["idle_timeout"]:
+        name = idle.pop()
+        _forget_container(name, language)
+        expired.append(name)
+        surplus -= 1
+    for name in reversed(idle):
+        queue.put(name)
+
+    for name in expired:
+        logger.info(f"📉 Removing idle container {name} ({len(_CONTAINER_NAMES[language])}/{_POOL_LIMITS['max_size']})")
+        with contextlib.suppress(Exception):
             await async_run_command("docker", "rm", "-f", name, timeout=5)
 
 
@@ -74,7 +172,8 @@ async def _prepare_container(name: str, language: SupportLanguage) -> bool:
         await async_run_command("docker", "rm", "-f", name, timeout=5)
 
     if await create_container(name, language):
-        _CONTAINER_QUEUES[language].put(name)
+        _CONTAINER_NAMES[language].add(name)
+        _put_idle(name, language)
         return True
     return False
 
@@ -154,30 +253,38 @@ async def recreate_container(name: str, language: SupportLanguage) -> bool:
 
 async def release_container(name: str, language: SupportLanguage):
     """Asynchronously release a container"""
-    async with _CONTAINER_LOCK:
-        if await container_is_running(name):
-            _CONTAINER_QUEUES[language].put(name)
-            logger.info(f"🟢 Released container: {name} (remaining available: {_CONTAINER_QUEUES[language].qsize()})")
+    if await container_is_running(name):
+        _put_idle(name, language)
+        logger.info(f"🟢 Released container: {name} (remaining available: {_CONTAINER_QUEUES[language].qsize()})")
+    else:
+        logger.warning(f"⚠️ Container {name} has crashed, attempting to recreate...")
+        if await recreate_container(name, language):
+            _put_idle(name, language)
+            logger.info(f"✅ Container {name} successfully recreated and returned to queue")
         else:
-            logger.warning(f"⚠️ Container {name} has crashed, attempting to recreate...")
-            if await recreate_container(name, language):
-                _CONTAINER_QUEUES[language].put(name)
-                logger.info(f"✅ Container {name} successfully recreated and returned to queue")
+            _forget_container(name, language)
 
 
 async def allocate_container_blocking(language: SupportLanguage, timeout=10) -> str:
-    """Asynchronously allocate an available container"""
+    """Asynchronously allocate an available container, growing the pool while callers are waiting"""
     start_time = asyncio.get_running_loop().time()
-    while asyncio.get_running_loop().time() - start_time < timeout:
-        try:
-            name = _CONTAINER_QUEUES[language].get_nowait()
-            async with _CONTAINER_LOCK:
-                if not await container_is_running(name) and not await recreate_container(name, language):
-                    continue
-
-                return name
-        except Empty:
-            await asyncio.sleep(0.1)
+    _CONTAINER_WAITING[language] += 1
+    try:
+        while asyncio.get_running_loop().time() - start_time < timeout:
+            try:
+                name = _CONTAINER_QUEUES[language].get_nowait()
+            except Empty:
+                _maybe_grow(language)
+                await asyncio.sleep(0.1)
+                continue
+
+            _CONTAINER_IDLE_SINCE.pop(name, None)
+            if not await container_is_running(name) and not await recreate_container(name, language):
+                _forget_container(name, language)
+                continue
+            return name
+    finally:
+        _CONTAINER_WAITING[language] -= 1
 
     return ""
 
@@ -16,11 +16,15 @@
 
 import base64
 import json
+import logging
 import mimetypes
 import os
+import selectors
 import shutil
 import signal
+import socket
 import subprocess
+import threading
 import time
 import uuid
 from pathlib import Path
@@ -41,6 +45,10 @@ ALLOWED_ARTIFACT_EXTENSIONS = {
     ".svg",
 }
 
+DEFAULT_PRELOAD_MODULES = "json,math,re,datetime,collections,numpy,pandas"
+
+FORKSERVER_PATH = Path(__file__).resolve().with_name("local_forkserver.py")
+
 LOCAL_PYTHON_THREAD_ENV_VARS = (
     "OPENBLAS_NUM_THREADS",
     "OMP_NUM_THREADS",
@@ -51,12 +59,116 @@ LOCAL_PYTHON_THREAD_ENV_VARS = (
 )
 
 
+class WarmInterpreter:
+    """
+    A Python fork server with the preload modules already imported.
+
+    Each execution is a child forked from it, so the imports are paid once and
+    every run starts from the same state; the server itself never runs user
+    code. One execution at a time.
+    """
+
+    def __init__(self, python_bin: str, preload_modules: str, work_dir: Path, env: dict[str, str], start_timeout: float = 60):
+        parent_sock, child_sock = socket.socketpair()
+        self.process = subprocess.Popen(
+            [python_bin, str(FORKSERVER_PATH), str(child_sock.fileno()), preload_modules],
+            cwd=work_dir,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            pass_fds=(child_sock.fileno(),),
+            start_new_session=os.name == "posix",
+        )
+        child_sock.close()
+        self._sock = parent_sock
+        self._replies = parent_sock.makefile("rb")
+        try:
+            parent_sock.settimeout(start_timeout)
+            self._reply()
+            parent_sock.settimeout(None)
+        except Exception as e:
+            self.close()
+            raise RuntimeError(f"Warm interpreter did not start: {e}") from e
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, script_path: Path, cwd: Path, env: dict[str, str], limits: dict[str, int], timeout: int) -> tuple[str, str, int]:
+        request = json.dumps({"script": str(script_path), "cwd": str(cwd), "env": env, "limits": limits}).encode("utf-8") + b"\n"
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        try:
+            try:
+                socket.send_fds(self._sock, [request], [stdout_w, stderr_w])
+            finally:
+                os.close(stdout_w)
+                os.close(stderr_w)
+            pid = self._reply()["pid"]
+            output = _read_until_closed([stdout_r, stderr_r], time.monotonic() + timeout)
+            if output is None:
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    os.kill(pid, signal.SIGKILL)
+            returncode = self._reply()["returncode"]
+        finally:
+            os.close(stdout_r)
+            os.close(stderr_r)
+
+        if output is None:
+            raise TimeoutError(f"Execution timed out after {timeout} seconds")
+        stdout, stderr = output
+        return stdout, stderr, returncode
+
+    def close(self) -> None:
+        self._replies.close()
+        self._sock.close()
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _reply(self) -> dict[str, Any]:
+        line = self._replies.readline()
+        if not line:
+            raise RuntimeError("Warm interpreter exited unexpectedly.")
+        return json.loads(line)
+
+
+def _read_until_closed(fds: list[int], deadline: float) -> Optional[list[str]]:
+    """Read the pipes until every writer closed them; None once the deadline passes."""
+    chunks: dict[int, list[bytes]] = {fd: [] for fd in fds}
+    with selectors.DefaultSelector() as selector:
+        for fd in fds:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            for key, _ in selector.select(remaining):
+                data = os.read(key.fd, 65536)
+                if data:
+                    chunks[key.fd].append(data)
+                else:
+                    selector.unregister(key.fd)
+    return [b"".join(chunks[fd]).decode("utf-8", errors="replace") for fd in fds]
+
+
 class LocalProvider(SandboxProvider):
     """
     Execute code as a local child process.
 
     This provider is intentionally gated by SANDBOX_LOCAL_ENABLED because it is
     not a sandbox boundary. Use a low-privilege runtime account.
+
+    Python runs on warm interpreters (see WarmInterpreter) unless `prewarm` is
+    off; JavaScript always starts a fresh process.
     """
 
     def __init__(self):
@@ -68,8 +180,13 @@ class LocalProvider(SandboxProvider):
         self.max_output_bytes = 1024 * 1024
         self.max_artifacts = 20
         self.max_artifact_bytes = 10 * 1024 * 1024
+        self.prewarm = True
+        self.preload_modules = DEFAULT_PRELOAD_MODULES
+        self.warm_workers = 2
         self._initialized = False
         self._instances: dict[str, Path] = {}
+        self._warm_lock = threading.Lock()
+        self._warm_idle: list[WarmInterpreter] = []
 
     def initialize(self, config: Dict[str, Any]) -> bool:
         self.python_bin = str(config.get("python_bin", "python3"))
@@ -80,9 +197,21 @@ class LocalProvider(SandboxProvider):
         self.max_output_bytes = int(config.get("max_output_bytes", 1024 * 1024))
         self.max_artifacts = int(config.get("max_artifacts", 20))
         self.max_artifact_bytes = int(config.get("max_artifact_bytes", 10 * 1024 * 1024))
+        self.prewarm = bool(config.get("prewarm", True)) and os.name == "posix"
+        self.preload_modules = str(config.get("preload_modules", DEFAULT_PRELOAD_MODULES))
+        self.warm_workers = int(config.get("warm_workers", 2))
 
         self._validate_limits()
         self.work_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self._close_warm_interpreters()
+        if self.prewarm:
+            try:
+                for _ in range(self.warm_workers):
+                    self._warm_idle.append(self._start_warm_interpreter())
+            except Exception as e:
+                logging.warning(f"LocalProvider: could not start warm interpreters, falling back to a new process per run: {e}")
+                self._close_warm_interpreters()
+                self.prewarm = False
         self._initialized = True
         return True
 
@@ -125,28 +254,11 @@ class LocalProvider(SandboxProvider):
         exec_timeout = min(requested_timeout, self.timeout)
 
         start_time = time.time()
-        process = subprocess.Popen(
-            command,
-            cwd=instance_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            env=self._build_child_env(instance_dir),
-            preexec_fn=self._limit_child_process if os.name == "posix" else None,
-            start_new_session=os.name == "posix",
-        )
-
-        try:
-            stdout, stderr = process.communicate(timeout=exec_timeout)
-        except subprocess.TimeoutExpired:
-            if os.name == "posix":
-                os.killpg(process.pid, signal.SIGKILL)
-            else:
-                process.kill()
-            process.communicate()
-            raise TimeoutError(f"Execution timed out after {exec_timeout} seconds")
+        warm = normalized_lang == "python" and self.prewarm
+        if warm:
+            stdout, stderr, returncode = self._run_warm(instance_dir, script_path, exec_timeout)
+        else:
+            stdout, stderr, returncode = self._run_cold(command, instance_dir, exec_timeout)
 
         execution_time = time.time() - start_time
         self._validate_output_size(stdout, stderr)
@@ -155,14 +267,15 @@ class LocalProvider(SandboxProvider):
         return ExecutionResult(
             stdout=stdout,
             stderr=stderr,
-            exit_code=process.returncode,
+            exit_code=returncode,
             execution_time=execution_time,
             metadata={
                 "instance_id": instance_id,
                 "language": normalized_lang,
                 "script_path": str(script_path),
-                "status": "ok" if process.returncode == 0 else "error",
+                "status": "ok" if returncode == 0 else "error",
                 "timeout": exec_timeout,
+                "warm_start": warm,
                 "artifacts": self._collect_artifacts(instance_dir / "artifacts"),
                 "result_present": structured_result.get("present", False),
                 "result_value": structured_result.get("value"),
@@ -253,8 +366,99 @@ class LocalProvider(SandboxProvider):
                 "min": 1024,
                 "max": 104857600,
             },
+            "prewarm": {
+                "type": "boolean",
+                "required": False,
+                "default": True,
+                "label": "Warm Python Interpreters",
+                "description": "Run Python code in children forked from interpreters that already imported the preload modules, instead of starting a new interpreter per run.",
+            },
+            "preload_modules": {
+                "type": "string",
+                "required": False,
+                "default": DEFAULT_PRELOAD_MODULES,
+                "label": "Preload Modules",
+                "description": "Comma-separated modules imported once by the warm interpreters. Modules that fail to import are skipped. Their memory does not count toward Max Memory.",
+            },
+            "warm_workers": {
+                "type": "integer",
+                "required": False,
+                "default": 2,
+                "label": "Warm Interpreters",
+                "description": "Warm Python interpreters kept ready. Concurrent runs beyond this start extra interpreters that are stopped afterwards.",
+                "min": 0,
+                "max": 32,
+            },
         }
 
+    def _run_cold(self, command: list[str], instance_dir: Path, exec_timeout: int) -> tuple[str, str, int]:
+        process = subprocess.Popen(
+            command,
+            cwd=instance_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env=self._build_child_env(instance_dir),
+            preexec_fn=self._limit_child_process if os.name == "posix" else None,
+            start_new_session=os.name == "posix",
+        )
+
+        try:
+            stdout, stderr = process.communicate(timeout=exec_timeout)
+        except subprocess.TimeoutExpired:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.communicate()
+            raise TimeoutError(f"Execution timed out after {exec_timeout} seconds")
+        return stdout, stderr, process.returncode
+
+    def _run_warm(self, instance_dir: Path, script_path: Path, exec_timeout: int) -> tuple[str, str, int]:
+        interpreter = self._acquire_warm_interpreter()
+        try:
+            result = interpreter.run(script_path, instance_dir, self._build_child_env(instance_dir), self._resource_limits(), exec_timeout)
+        except TimeoutError:
+            self._release_warm_interpreter(interpreter)
+            raise
+        except Exception:
+            interpreter.close()
+            raise
+        self._release_warm_interpreter(interpreter)
+        return result
+
+    def _start_warm_interpreter(self) -> WarmInterpreter:
+        env = self._build_child_env(self.work_dir)
+        # The fork server must stay single-threaded, so BLAS pools are not started before forking.
+        for name in LOCAL_PYTHON_THREAD_ENV_VARS:
+            env.setdefault(name, "1")
+        return WarmInterpreter(self.python_bin, self.preload_modules, self.work_dir, env)
+
+    def _acquire_warm_interpreter(self) -> WarmInterpreter:
+        with self._warm_lock:
+            while self._warm_idle:
+                interpreter = self._warm_idle.pop()
+                if interpreter.alive():
+                    return interpreter
+                interpreter.close()
+        # More concurrent runs than warm interpreters: start another one.
+        return self._start_warm_interpreter()
+
+    def _release_warm_interpreter(self, interpreter: WarmInterpreter) -> None:
+        with self._warm_lock:
+            if interpreter.alive() and len(self._warm_idle) < self.warm_workers:
+                self._warm_idle.append(interpreter)
+                return
+        interpreter.close()
+
+    def _close_warm_interpreters(self) -> None:
+        with self._warm_lock:
+            idle, self._warm_idle = self._warm_idle, []
+        for interpreter in idle:
+            interpreter.close()
+
     def _validate_limits(self) -> None:
         if self.timeout <= 0:
             raise SandboxProviderConfigError("SANDBOX_LOCAL_TIMEOUT must be greater than 0.")
@@ -266,6 +470,8 @@ class LocalProvider(SandboxProvider):
             raise SandboxProviderConfigError("SANDBOX_LOCAL_MAX_ARTIFACTS must be greater than or equal to 0.")
         if self.max_artifact_bytes <= 0:
             raise SandboxProviderConfigError("SANDBOX_LOCAL_MAX_ARTIFACT_BYTES must be greater than 0.")
+        if self.warm_workers < 0:
+            raise SandboxProviderConfigError("SANDBOX_LOCAL_WARM_WORKERS must be greater than or equal to 0.")
 
     def _prepare_script(self, instance_dir: Path, language: str, code: str, args_json: str) -> tuple[list[str], Path]:
         if language == "python":
@@ -292,13 +498,19 @@ class LocalProvider(SandboxProvider):
                 env[name] = value
         return env
 
+    def _resource_limits(self) -> dict[str, int]:
+        return {
+            "RLIMIT_CPU": self.timeout + 1,
+            "RLIMIT_AS": self.max_memory_mb * 1024 * 1024,
+            "RLIMIT_FSIZE": self.max_artifact_bytes,
+            "RLIMIT_NOFILE": 64,
+        }
+
     def _limit_child_process(self) -> None:
         import resource
 
-        self._set_resource_limit(resource.RLIMIT_CPU, self.timeout + 1)
-        self._set_resource_limit(resource.RLIMIT_AS, self.max_memory_mb * 1024 * 1024)
-        self._set_resource_limit(resource.RLIMIT_FSIZE, self.max_artifact_bytes)
-        self._set_resource_limit(resource.RLIMIT_NOFILE, 64)
+        for name, value in self._resource_limits().items():
+            self._set_resource_limit(getattr(resource, name), value)
 
     @staticmethod
     def _set_resource_limit(kind: int, value: int) -> None:
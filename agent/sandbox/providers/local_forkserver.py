@@ -0,0 +1,151 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""Fork server behind the warm interpreters of the local sandbox provider.
+
+Started by ``LocalProvider`` with the configured Python binary as
+``python local_forkserver.py <socket fd> <comma separated modules>``. It
+imports the modules once, then forks one child per request received on the
+socket. The child applies the resource limits, takes the stdout/stderr pipes
+passed along with the request and runs the script as ``__main__``; the server
+itself never runs user code, so every execution starts from the same freshly
+imported state. The child inherits the address space of the preloaded
+modules, so its RLIMIT_AS is raised by that much: scripts get the same memory
+budget as on a fresh interpreter.
+
+This file is run by an interpreter that may not have RAGFlow on its path and
+must only use the standard library.
+"""
+
+import importlib
+import json
+import os
+import resource
+import runpy
+import socket
+import sys
+import traceback
+
+
+def _send(sock, message):
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _receive(sock):
+    data, fds, _, _ = socket.recv_fds(sock, 1 << 16, 2)
+    while data and not data.endswith(b"\n"):
+        more = sock.recv(1 << 16)
+        if not more:
+            return None, fds
+        data += more
+    if not data:
+        return None, fds
+    return json.loads(data), fds
+
+
+def _vm_size():
+    """Virtual memory size of this process in bytes, 0 where /proc is not available."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _set_limit(name, value):
+    kind = getattr(resource, name)
+    _, hard = resource.getrlimit(kind)
+    limit = value if hard == resource.RLIM_INFINITY else min(value, hard)
+    resource.setrlimit(kind, (limit, limit))
+
+
+def _run_script(script):
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _run_child(request, preloaded_size, stdout_fd, stderr_fd):
+    code = 1
+    try:
+        os.setsid()
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        os.close(stdout_fd)
+        os.close(stderr_fd)
+        for name, value in request["limits"].items():
+            _set_limit(name, value + preloaded_size if name == "RLIMIT_AS" else value)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [request["script"]]
+        sys.path[0] = request["cwd"]
+        code = _run_script(request["script"])
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(code)
+
+
+def main():
+    sock = socket.socket(fileno=int(sys.argv[1]))
+    base_size = _vm_size()
+    for name in sys.argv[2].split(",") if len(sys.argv) > 2 else []:
+        if not name.strip():
+            continue
+        try:
+            importlib.import_module(name.strip())
+        except Exception:
+            pass
+    preloaded_size = max(0, _vm_size() - base_size)
+    _send(sock, {"ready": True, "pid": os.getpid()})
+
+    while True:
+        try:
+            request, fds = _receive(sock)
+        except OSError:
+            return
+        if request is None:
+            return
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            _run_child(request, preloaded_size, *fds)
+        for fd in fds:
+            os.close(fd)
+        _send(sock, {"pid": pid})
+        _, status = os.waitpid(pid, 0)
+        _send(sock, {"pid": pid, "returncode": os.waitstatus_to_exitcode(status)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+
+EXECUTOR_MANAGER_ROOT = Path(__file__).resolve().parents[1] / "executor_manager"
+if str(EXECUTOR_MANAGER_ROOT) not in sys.path:
+    sys.path.insert(0, str(EXECUTOR_MANAGER_ROOT))
+
+from core import container  # noqa: E402
+from models.enums import SupportLanguage  # noqa: E402
+
+
+@pytest.fixture
+def docker(monkeypatch):
+    removed = []
+
+    async def create_container(name, language):
+        await asyncio.sleep(0.05)
+        return True
+
+    async def container_is_running(name):
+        return True
+
+    async def async_run_command(*args, **kwargs):
+        if args[:3] == ("docker", "rm", "-f"):
+            removed.append(args[3])
+        return 0, "", ""
+
+    monkeypatch.setattr(container, "create_container", create_container)
+    monkeypatch.setattr(container, "container_is_running", container_is_running)
+    monkeypatch.setattr(container, "async_run_command", async_run_command)
+    return removed
+
+
+@pytest.mark.asyncio
+async def test_pool_grows_with_waiting_callers_and_shrinks_when_idle(docker):
+    assert await container.init_containers(1, max_size=3, idle_timeout=60) == (2, 2)
+    try:
+        names = await asyncio.gather(*(container.allocate_container_blocking(SupportLanguage.PYTHON, timeout=1) for _ in range(4)))
+        allocated = [name for name in names if name]
+        # The pool stops at max_size, so the fourth caller times out.
+        assert len(set(allocated)) == 3
+        assert container._CONTAINER_NAMES[SupportLanguage.PYTHON] == {"sandbox_python_0", "sandbox_python_1", "sandbox_python_2"}
+
+        docker.clear()
+        for name in allocated:
+            await container.release_container(name, SupportLanguage.PYTHON)
+        for name in allocated[:2]:
+            container._CONTAINER_IDLE_SINCE[name] -= 120
+        await container._shrink_pool(SupportLanguage.PYTHON)
+
+        assert sorted(docker) == sorted(allocated[:2])
+        assert container._CONTAINER_NAMES[SupportLanguage.PYTHON] == {allocated[2]}
+        assert await container.allocate_container_blocking(SupportLanguage.PYTHON, timeout=1) == allocated[2]
+    finally:
+        await container.teardown_containers()
+
+
+@pytest.mark.asyncio
+async def test_pool_does_not_shrink_below_min_size(docker):
+    await container.init_containers(2, max_size=4, idle_timeout=60)
+    try:
+        docker.clear()
+        for name in list(container._CONTAINER_IDLE_SINCE):
+            container._CONTAINER_IDLE_SINCE[name] -= 120
+        await container._shrink_pool(SupportLanguage.NODEJS)
+        assert docker == []
+        assert container._CONTAINER_QUEUES[SupportLanguage.NODEJS].qsize() == 2
+    finally:
+        await container.teardown_containers()
@@ -423,3 +423,16 @@ def _db_close(exception):
     if exception:
         logging.exception(f"Request failed: {exception}")
     close_connection()
+
+
+@app.before_serving
+async def _open_doc_store_async():
+    # The async search client lives on the server loop; other loops search on the thread pool.
+    if settings.docStoreConn:
+        await settings.docStoreConn.open_async()
+
+
+@app.after_serving
+async def _close_doc_store_async():
+    if settings.docStoreConn:
+        await settings.docStoreConn.close_async()
@@ -58,6 +58,7 @@ from common import settings
 from common.constants import LLMType, ParserType, RetCode, TaskStatus
 from common.doc_store.doc_store_base import OrderByExpr
 from common.metadata_utils import convert_conditions, filter_doc_ids_by_metadata
+from common.vector_quantization import QUANTIZATION_DOC_ENGINES, move_to_quantized_fields, quantization_method
 from common.misc_utils import thread_pool_exec
 from common.string_utils import is_content_empty, remove_redundant_spaces
 from common.tag_feature_utils import validate_tag_features
@@ -164,6 +165,14 @@ def _get_dataset_tenant_id(dataset_id):
     return kb.tenant_id
 
 
+def _quantize_chunk_vector(dataset_id, chunk):
+    # Datasets with vector quantization index the chunk vector in a quantized field.
+    if settings.DOC_ENGINE.lower() not in QUANTIZATION_DOC_ENGINES:
+        return
+    ok, kb = KnowledgebaseService.get_by_id(dataset_id)
+    move_to_quantized_fields([chunk], quantization_method(kb.parser_config if ok else None, settings.DOC_ENGINE))
+
+
 def _compilation_template_kind(kind) -> str:
     if not isinstance(kind, str):
         return ""
@@ -1040,6 +1049,7 @@ async def add_chunk(tenant_id, dataset_id, document_id):
     v, c = embd_mdl.encode([doc.name, req["content"] if not d["question_kwd"] else "\n".join(d["question_kwd"])])
     v = 0.1 * v[0] + 0.9 * v[1]
     d[f"q_{len(v)}_vec"] = v.tolist()
+    _quantize_chunk_vector(dataset_id, d)
     settings.docStoreConn.insert([d], search.index_name(dataset_tenant_id), dataset_id)
 
     DocumentService.increment_chunk_num(doc.id, doc.kb_id, c, 1, 0)
@@ -1199,6 +1209,7 @@ async def update_chunk(tenant_id, dataset_id, document_id, chunk_id):
     )
     v = 0.1 * v[0] + 0.9 * v[1] if doc.parser_id != ParserType.QA else v[1]
     d[f"q_{len(v)}_vec"] = v.tolist()
+    _quantize_chunk_vector(dataset_id, d)
     settings.docStoreConn.update({"id": chunk_id}, d, search.index_name(dataset_tenant_id), dataset_id)
     return get_result()
 
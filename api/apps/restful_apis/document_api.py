@@ -21,7 +21,7 @@ import os
 import re
 from pathlib import Path
 
-from quart import request, make_response, send_file
+from quart import Response, request, make_response, send_file
 from peewee import OperationalError
 from pydantic import ValidationError
 
@@ -75,10 +75,13 @@ from common.metadata_utils import convert_conditions, meta_filter, turn2jsonsche
 from common.misc_utils import get_uuid, thread_pool_exec, thread_pool_exec_long_time
 from api.utils.file_utils import filename_type, thumbnail
 from api.utils.file_response import apply_preview_file_response_headers
+from api.utils.multipart_utils import iter_multipart
 from api.utils.web_utils import CONTENT_TYPE_MAP, html2pdf, is_valid_url, apply_safe_file_response_headers
 from common.ssrf_guard import assert_url_is_safe
 from rag.nlp import search
 
+BULK_UPLOAD_BATCH_SIZE = int(os.environ.get("BULK_UPLOAD_BATCH_SIZE", 64))
+
 
 def _normalize_legacy_raptor_config(req: dict) -> None:
     """Drop RAPTOR fields removed from the current parser-config schema."""
@@ -655,6 +658,21 @@ async def _upload_empty_document(dataset_id, kb, tenant_id):
         return server_error_response(e)
 
 
+def _parse_parser_config_override(raw_parser_config):
+    # Parse optional parser_config overrides from form data
+    if not raw_parser_config:
+        return None
+    try:
+        parsed = json.loads(raw_parser_config)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not isinstance(parsed, dict):
+        return None
+    # Only allow known table column config keys to prevent arbitrary overrides
+    allowed_keys = {"table_column_mode", "table_column_roles"}
+    return {k: v for k, v in parsed.items() if k in allowed_keys} or None
+
+
 async def _upload_local_documents(kb, tenant_id):
     form = await request.form
     files = await request.files
@@ -672,20 +690,7 @@ async def _upload_local_documents(kb, tenant_id):
             logging.error(msg)
             return get_error_data_result(message=msg, code=RetCode.ARGUMENT_ERROR)
 
-    # Parse optional parser_config overrides from form data
-    parser_config_override = None
-    raw_parser_config = form.get("parser_config")
-    if raw_parser_config:
-        try:
-            parsed = json.loads(raw_parser_config)
-            if isinstance(parsed, dict):
-                # Only allow known table column config keys to prevent arbitrary overrides
-                allowed_keys = {"table_column_mode", "table_column_roles"}
-                parser_config_override = {k: v for k, v in parsed.items() if k in allowed_keys}
-                if not parser_config_override:
-                    parser_config_override = None
-        except (json.JSONDecodeError, TypeError):
-            parser_config_override = None
+    parser_config_override = _parse_parser_config_override(form.get("parser_config"))
 
     err, files = await thread_pool_exec(
         FileService.upload_document,
@@ -726,6 +731,131 @@ async def _upload_local_documents(kb, tenant_id):
     return get_result(data=doc_data)
 
 
+@manager.route("/datasets/<dataset_id>/documents/bulk", methods=["POST"])  # noqa: F821
+@login_required
+@add_tenant_id_to_kwargs
+async def bulk_upload_documents(dataset_id, tenant_id):
+    """
+    Upload many documents to a dataset in one streamed request.
+    ---
+    tags:
+      - Documents
+    security:
+      - ApiKeyAuth: []
+    description: |
+      Parts are stored as they arrive instead of after the whole body has been
+      received, and the database rows of each batch of files are written together.
+      Form fields apply to the files after them, so send them first.
+    parameters:
+      - in: path
+        name: dataset_id
+        type: string
+        required: true
+        description: ID of the dataset.
+      - in: header
+        name: Authorization
+        type: string
+        required: true
+        description: Bearer token for authentication.
+      - in: formData
+        name: parent_path
+        type: string
+        description: Optional nested path under the parent folder. Uses '/' separators.
+      - in: formData
+        name: parse
+        type: boolean
+        default: false
+        description: Whether to start parsing the uploaded documents.
+      - in: formData
+        name: file
+        type: file
+        required: true
+        description: Document files to upload.
+    responses:
+      200:
+        description: |
+          Newline-delimited JSON: one line per file with its `name`, `status`
+          (`uploaded`, `queued` or `failed`) and `document` or `error`, then a
+          final line with the `summary` counts per status.
+    """
+    e, kb = KnowledgebaseService.get_by_id(dataset_id)
+    if not e:
+        return get_error_data_result(message=f"Can't find the dataset with ID {dataset_id}!", code=RetCode.DATA_ERROR)
+    if not check_kb_team_permission(kb, tenant_id):
+        return get_error_data_result(message="no authorization", code=RetCode.AUTHENTICATION_ERROR)
+    boundary = request.mimetype_params.get("boundary")
+    if request.mimetype != "multipart/form-data" or not boundary:
+        return get_error_data_result(message="Expect a multipart/form-data body.", code=RetCode.ARGUMENT_ERROR)
+
+    kb_folder = await thread_pool_exec(FileService.prepare_kb_folder, kb, tenant_id)
+    body = request.body
+
+    async def stream():
+        options = {"parent_path": None, "parser_config": None, "parse": False}
+        summary = {"uploaded": 0, "queued": 0, "failed": 0}
+        taken_names, batch = set(), []
+
+        async def flush():
+            try:
+                results = await thread_pool_exec(
+                    FileService.upload_document_batch,
+                    kb,
+                    kb_folder["id"],
+                    batch,
+                    tenant_id,
+                    parent_path=options["parent_path"],
+                    parser_config={**(kb.parser_config or {}), **options["parser_config"]} if options["parser_config"] else None,
+                    parse=options["parse"],
+                    taken_names=taken_names,
+                )
+            finally:
+                for upload in batch:
+                    upload.close()
+                batch.clear()
+            lines = []
+            for result in results:
+                summary[result["status"]] += 1
+                doc = result.pop("doc", None)
+                if doc is not None:
+                    result["document"] = map_doc_keys_with_run_status(doc, run_status=doc.get("run", TaskStatus.UNSTART.value))
+                lines.append(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            return lines
+
+        try:
+            async for name, value in iter_multipart(body, boundary.encode()):
+                if isinstance(value, str):
+                    if name == "parent_path":
+                        options["parent_path"] = value
+                    elif name == "parser_config":
+                        options["parser_config"] = _parse_parser_config_override(value)
+                    elif name == "parse":
+                        options["parse"] = value.lower() in ("1", "true", "yes")
+                    continue
+                if name != "file" or not value.filename:
+                    value.close()
+                    continue
+                batch.append(value)
+                if len(batch) >= BULK_UPLOAD_BATCH_SIZE:
+                    for line in await flush():
+                        yield line
+            if batch:
+                for line in await flush():
+                    yield line
+        except Exception as e:
+            logging.exception("Bulk upload to dataset %s failed", dataset_id)
+            for upload in batch:
+                upload.close()
+            yield json.dumps({"status": "failed", "error": str(e)}, ensure_ascii=False) + "\n"
+        yield json.dumps({"summary": summary}) + "\n"
+
+    resp = Response(stream(), mimetype="application/x-ndjson")
+    # Large uploads outlast the default response timeout.
+    resp.timeout = None
+    resp.headers.add_header("Cache-control", "no-cache")
+    resp.headers.add_header("X-Accel-Buffering", "no")
+    return resp
+
+
 @manager.route("/datasets/<dataset_id>/documents", methods=["GET"])  # noqa: F821
 @login_required
 @add_tenant_id_to_kwargs
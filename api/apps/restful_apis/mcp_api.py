@@ -24,7 +24,7 @@ from api.utils.api_utils import get_data_error_result, get_json_result, get_mcp_
 from api.utils.pagination_utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, validate_rest_api_ids, validate_rest_api_page, validate_rest_api_page_size
 from api.utils.web_utils import get_float, safe_json_parse
 from common.constants import VALID_MCP_SERVER_TYPES
-from common.mcp_tool_call_conn import MCPToolCallSession, close_multiple_mcp_toolcall_sessions
+from common.mcp_tool_call_conn import MCP_SESSION_POOL, MCPToolCallSession, close_multiple_mcp_toolcall_sessions
 from common.misc_utils import get_uuid, thread_pool_exec
 from common.ssrf_guard import assert_url_is_safe, pin_dns_global
 
@@ -225,6 +225,7 @@ async def update(mcp_id: str) -> Response:
 
         if not MCPServerService.filter_update([MCPServer.id == mcp_id, MCPServer.tenant_id == current_user.id], req):
             return get_data_error_result(message="Failed to updated MCP server.")
+        MCP_SESSION_POOL.invalidate(mcp_id)
 
         e, updated_mcp = MCPServerService.get_by_id(req["id"])
         if not e:
@@ -244,6 +245,7 @@ async def rm(mcp_id: str) -> Response:
             return get_data_error_result(message=f"Cannot find MCP server {mcp_id} for user {current_user.id}")
         if not MCPServerService.delete_by_ids([mcp_id]):
             return get_data_error_result(message=f"Failed to delete MCP servers {[mcp_id]}")
+        MCP_SESSION_POOL.invalidate(mcp_id)
 
         return get_json_result(data=True)
     except Exception as e:
@@ -26,8 +26,9 @@ from api.utils.api_utils import get_json_result, get_data_error_result, server_e
 from api.utils.health_utils import run_health_checks, get_oceanbase_status, get_gaussdb_status
 from common.versions import get_ragflow_version
 from common.time_utils import current_timestamp, datetime_format
-from api.db.db_models import APIToken
+from api.db.db_models import DB, DB_QUERY_STATS, APIToken
 from api.db.services.api_service import APITokenService
+from api.db.services.config_cache import config_cache_stats
 from api.db.services.knowledgebase_service import KnowledgebaseService
 from api.db.services.user_service import UserTenantService
 from common.doc_store.gaussdb_conn_base import mask_gaussdb_text
@@ -94,7 +95,7 @@ def status():
               description: Storage status.
             database:
               type: object
-              description: Database status.
+              description: Database status, connection pool usage, per-statement latency histograms and configuration cache hit ratios.
       503:
         description: Service unavailable.
         schema:
@@ -140,7 +141,12 @@ def status():
             "database": settings.DATABASE_TYPE.lower(),
             "status": "green",
             "elapsed": "{:.1f}".format((timer() - st) * 1000.0),
+            "pool": DB.pool_status(),
+            "queries": DB_QUERY_STATS.snapshot(),
+            "config_cache": config_cache_stats(),
         }
+        if DB.replica is not None:
+            res["database"]["replica_pool"] = DB.replica.pool_status()
     except Exception as e:
         res["database"] = {
             "database": settings.DATABASE_TYPE.lower(),
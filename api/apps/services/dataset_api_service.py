@@ -525,6 +525,8 @@ async def get_knowledge_graph(dataset_id: str, tenant_id: str):
 
         obj[ty] = content_json
 
+    # Sharded graphs keep a display preview in the manifest next to the storage layout.
+    obj["graph"].pop("storage", None)
     if "nodes" in obj["graph"]:
         obj["graph"]["nodes"] = sorted(obj["graph"]["nodes"], key=lambda x: x.get("pagerank", 0), reverse=True)[:256]
         if "edges" in obj["graph"]:
@@ -548,7 +550,7 @@ def delete_knowledge_graph(dataset_id: str, tenant_id: str):
     from rag.graphrag.phase_markers import clear_phase_markers
     from rag.nlp import search
 
-    settings.docStoreConn.delete({"knowledge_graph_kwd": ["graph", "subgraph", "entity", "relation", "community_report"]}, search.index_name(kb.tenant_id), dataset_id)
+    settings.docStoreConn.delete({"knowledge_graph_kwd": ["graph", "graph_shard", "subgraph", "entity", "relation", "community_report"]}, search.index_name(kb.tenant_id), dataset_id)
     # Wiping the graph invalidates any phase-completion markers used to
     # short-circuit resolution / community detection on resume.
     clear_phase_markers(dataset_id)
@@ -937,7 +939,7 @@ def delete_index(dataset_id: str, tenant_id: str, index_type: str, wipe: bool =
         from rag.graphrag.phase_markers import clear_phase_markers
         from rag.nlp import search
 
-        settings.docStoreConn.delete({"knowledge_graph_kwd": ["graph", "subgraph", "entity", "relation", "community_report"]}, search.index_name(kb.tenant_id), dataset_id)
+        settings.docStoreConn.delete({"knowledge_graph_kwd": ["graph", "graph_shard", "subgraph", "entity", "relation", "community_report"]}, search.index_name(kb.tenant_id), dataset_id)
         # Wiping the graph invalidates any phase-completion markers used to
         # short-circuit resolution / community detection on resume.
         clear_phase_markers(dataset_id)
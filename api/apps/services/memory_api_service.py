@@ -21,7 +21,7 @@ from api.db.services.memory_service import MemoryService
 from api.db.services.user_service import UserTenantService
 from api.db.services.canvas_service import UserCanvasService
 from api.db.services.task_service import TaskService
-from api.db.joint_services.memory_message_service import get_memory_size_cache, judge_system_prompt_is_default, queue_save_to_memory_task, query_message
+from api.db.joint_services.memory_message_service import delete_memory_size_cache, get_memory_size_cache, judge_system_prompt_is_default, queue_save_to_memory_task, query_message
 from api.db.joint_services.tenant_model_service import get_composite_model_name_by_ids
 from api.utils.memory_utils import format_ret_data_from_memory, get_memory_type_human
 from api.constants import MEMORY_NAME_LIMIT, MEMORY_SIZE_LIMIT
@@ -245,6 +245,7 @@ async def delete_memory(memory_id):
     MemoryService.delete_memory(memory_id)
     if MessageService.has_index(memory.tenant_id, memory_id):
         MessageService.delete_message({"memory_id": memory_id}, memory.tenant_id, memory_id)
+    delete_memory_size_cache(memory_id)
     return True
 
 
@@ -13,12 +13,15 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
+import bisect
 import hashlib
 import inspect
 import logging
 import operator
 import os
+import re
 import sys
+import threading
 import time
 import typing
 from datetime import datetime, timezone
@@ -62,6 +65,7 @@ from api.utils.json_encode import json_dumps, json_loads
 from api.utils.configs import deserialize_b64, serialize_b64
 
 from common.time_utils import current_timestamp, timestamp_to_date, date_string_to_timestamp
+from common.config_utils import decrypt_database_password
 from common.decorator import singleton
 from common.constants import ParserType, MAXIMUM_TASK_PAGE_NUMBER
 from common import settings
@@ -343,7 +347,237 @@ class JsonSerializedField(SerializedField):
         super(JsonSerializedField, self).__init__(serialized_type=SerializedType.JSON, object_hook=object_hook, object_pairs_hook=object_pairs_hook, **kwargs)
 
 
-class RetryingPooledMySQLDatabase(PooledMySQLDatabase):
+# Upper bounds, in milliseconds, of the SQL latency histogram buckets.
+DB_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+_STATEMENT_KINDS = ("select", "insert", "update", "delete", "replace")
+_WRITE_TABLE_PATTERN = re.compile(r"^\s*(?:insert\s+(?:ignore\s+)?into|replace\s+into|update|delete\s+from)\s+[`\"]?(\w+)", re.IGNORECASE)
+_UPDATE_SET_PATTERN = re.compile(r"^\s*update\s+[`\"]?\w+[`\"]?\s+set\s+(.*?)(?:\s+where\s+.*)?$", re.IGNORECASE | re.DOTALL)
+_ASSIGNED_COLUMN_PATTERN = re.compile(r"(?:^|,)\s*[`\"]?(\w+)[`\"]?\s*=")
+_LOCKING_READ_PATTERN = re.compile(r"\bfor\s+(?:update|share)\b|\block\s+in\s+share\s+mode\b", re.IGNORECASE)
+
+
+def _statement_kind(sql) -> str:
+    if not isinstance(sql, str):
+        return "other"
+    head = sql.lstrip()[:7].lower()
+    for kind in _STATEMENT_KINDS:
+        if head.startswith(kind):
+            return kind
+    return "other"
+
+
+def _updated_columns(sql) -> frozenset | None:
+    """The columns an UPDATE assigns, or None for other writes and SET clauses too complex to read."""
+    m = _UPDATE_SET_PATTERN.match(sql)
+    if not m or re.search(r"\bselect\b", m.group(1), re.IGNORECASE):
+        return None
+    return frozenset(c.lower() for c in _ASSIGNED_COLUMN_PATTERN.findall(m.group(1))) or None
+
+
+class QueryStats:
+    """Round-trip counts and latency histograms of SQL statements.
+
+    Statements are grouped by target database (``primary`` or ``replica``)
+    and statement kind. One instance, ``DB_QUERY_STATS``, is shared by every
+    pooled database of the process.
+    """
+
+    def __init__(self, buckets_ms=DB_LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, target: str, kind: str, seconds: float):
+        elapsed_ms = seconds * 1000.0
+        bucket = bisect.bisect_left(self.buckets_ms, elapsed_ms)
+        with self._lock:
+            entry = self._stats.get((target, kind))
+            if entry is None:
+                entry = self._stats[(target, kind)] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * (len(self.buckets_ms) + 1)}
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["buckets"][bucket] += 1
+
+    def round_trips(self, target: str | None = None) -> int:
+        with self._lock:
+            return sum(entry["count"] for (t, _), entry in self._stats.items() if target is None or t == target)
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        res = {}
+        with self._lock:
+            for (target, kind), entry in sorted(self._stats.items()):
+                res.setdefault(target, {})[kind] = {
+                    "count": entry["count"],
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+                    "max_ms": round(entry["max_ms"], 3),
+                    "histogram": {label: n for label, n in zip(labels, entry["buckets"]) if n},
+                }
+        return res
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+DB_QUERY_STATS = QueryStats()
+
+
+class ReadReplicaContext:
+    """Send the current thread's SELECTs to the read replica, if one is configured.
+
+    Works as a context manager and as a decorator, like
+    ``DB.connection_context()``. Statements inside a transaction, locking reads
+    and reads shortly after this process wrote to the primary stay on the
+    primary. The replica connection returns to its pool when the outermost
+    context exits.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        route = self.db._replica_route
+        route.depth = getattr(route, "depth", 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        route = self.db._replica_route
+        route.depth -= 1
+        replica = self.db.replica
+        if route.depth == 0 and replica is not None and not replica.is_closed():
+            replica.close()
+
+    def __call__(self, fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with ReadReplicaContext(self.db):
+                return fn(*args, **kwargs)
+
+        return inner
+
+
+class PooledConnectionMixin:
+    """Metrics, health checks, replica routing and write notifications for the pooled databases.
+
+    Every statement is timed into ``DB_QUERY_STATS``. With ``pre_ping`` set, a
+    pooled connection is probed with ``SELECT 1`` when it is checked out;
+    MySQL-protocol pools already ping on checkout. ``replica`` is an optional
+    second pooled database that :meth:`read_replica` contexts send SELECTs to.
+    Callbacks registered with :meth:`on_table_write` run after each statement
+    that writes to their table, so caches of rows can drop stale entries, and
+    again when the transaction of the write ends. UPDATEs that only assign a
+    callback's ``ignore_columns`` skip it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.pre_ping = kwargs.pop("pre_ping", False)
+        self.replica_lag = kwargs.pop("replica_lag", 2.0)
+        self.replica = None
+        self.stats_target = "primary"
+        self._replica_route = threading.local()
+        self._last_write = 0.0
+        self._write_listeners = {}
+        self._pending_writes = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def read_replica(self):
+        return ReadReplicaContext(self)
+
+    def on_table_write(self, table: str, callback, ignore_columns=()):
+        self._write_listeners.setdefault(table, []).append((callback, frozenset(c.lower() for c in ignore_columns)))
+
+    def _use_replica(self, sql, kind) -> bool:
+        return (
+            self.replica is not None
+            and kind == "select"
+            and getattr(self._replica_route, "depth", 0) > 0
+            and time.monotonic() - self._last_write >= self.replica_lag
+            and not self.in_transaction()
+            and not _LOCKING_READ_PATTERN.search(sql)
+        )
+
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        kind = _statement_kind(sql)
+        if self._use_replica(sql, kind):
+            return self.replica.execute_sql(sql, params, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            cursor = super().execute_sql(sql, params, *args, **kwargs)
+        finally:
+            DB_QUERY_STATS.record(self.stats_target, kind, time.perf_counter() - start)
+        if kind not in ("select", "other"):
+            self._notify_write(sql)
+        return cursor
+
+    def _notify_write(self, sql):
+        self._last_write = time.monotonic()
+        m = _WRITE_TABLE_PATTERN.match(sql)
+        if not m:
+            return
+        table = m.group(1)
+        columns = _updated_columns(sql)
+        callbacks = [callback for callback, ignored in self._write_listeners.get(table, ()) if columns is None or not columns <= ignored]
+        if not callbacks:
+            return
+        if self.in_transaction():
+            # Until the commit, readers still see and may cache the old rows.
+            if not hasattr(self._pending_writes, "callbacks"):
+                self._pending_writes.callbacks = {}
+            self._pending_writes.callbacks.update(dict.fromkeys(callbacks, table))
+        for callback in callbacks:
+            self._run_write_listener(table, callback)
+
+    @staticmethod
+    def _run_write_listener(table, callback):
+        try:
+            callback()
+        except Exception:
+            logging.exception(f"Write listener of table {table} failed")
+
+    def _flush_pending_writes(self):
+        callbacks = getattr(self._pending_writes, "callbacks", None)
+        self._pending_writes.callbacks = {}
+        for callback, table in (callbacks or {}).items():
+            self._run_write_listener(table, callback)
+
+    def commit(self):
+        try:
+            return super().commit()
+        finally:
+            self._flush_pending_writes()
+
+    def rollback(self):
+        try:
+            return super().rollback()
+        finally:
+            self._flush_pending_writes()
+
+    def _is_closed(self, conn):
+        if super()._is_closed(conn):
+            return True
+        if not self.pre_ping or isinstance(self, PooledMySQLDatabase):
+            return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        except Exception as e:
+            logging.warning(f"Discarding pooled database connection that failed the health check: {e}")
+            return True
+        return False
+
+    def pool_status(self) -> dict:
+        return {
+            "max_connections": self._max_connections,
+            "in_use": len(self._in_use),
+            "idle": len(self._connections),
+        }
+
+
+class RetryingPooledMySQLDatabase(PooledConnectionMixin, PooledMySQLDatabase):
     def __init__(self, *args, **kwargs):
         self.max_retries = kwargs.pop("max_retries", 5)
         self.retry_delay = kwargs.pop("retry_delay", 1)
@@ -478,7 +712,7 @@ class GaussDBPsycopgRetryMixin:
         return None
 
 
-class RetryingPooledPostgresqlDatabase(PooledPostgresqlDatabase):
+class RetryingPooledPostgresqlDatabase(PooledConnectionMixin, PooledPostgresqlDatabase):
     def __init__(self, *args, **kwargs):
         self.max_retries = kwargs.pop("max_retries", 5)
         self.retry_delay = kwargs.pop("retry_delay", 1)
@@ -543,7 +777,7 @@ class RetryingPooledPostgresqlDatabase(PooledPostgresqlDatabase):
         return None
 
 
-class RetryingPooledGaussDBDatabase(GaussDBPsycopgRetryMixin, PooledPostgresqlDatabase):
+class RetryingPooledGaussDBDatabase(GaussDBPsycopgRetryMixin, PooledConnectionMixin, PooledPostgresqlDatabase):
     """Connection pool for the GaussDB business metadata database.
 
     GaussDB exposes a psycopg/libpq-compatible protocol, so Peewee can use
@@ -721,7 +955,7 @@ class RetryingPooledGaussDBDatabase(GaussDBPsycopgRetryMixin, PooledPostgresqlDa
         return [table for (table,) in cursor.fetchall()]
 
 
-class RetryingPooledOceanBaseDatabase(PooledMySQLDatabase):
+class RetryingPooledOceanBaseDatabase(PooledConnectionMixin, PooledMySQLDatabase):
     """Pooled OceanBase database with retry mechanism.
 
     OceanBase is compatible with MySQL protocol, so we inherit from PooledMySQLDatabase.
@@ -834,8 +1068,19 @@ class BaseDataBase:
         # not database configuration fields. GaussDBPsycopgRetryMixin uses
         # SQLSTATE to decide whether an operation is retryable.
         database_config.update(pool_config)
-        self.database_connection = PooledDatabase[settings.DATABASE_TYPE.upper()].value(db_name, **database_config)
-        # self.database_connection = PooledDatabase[settings.DATABASE_TYPE.upper()].value(db_name, **database_config)
+        # Optional read replica: a mapping of the connection fields that differ
+        # from the primary, typically host and port.
+        replica_config = database_config.pop("replica", None)
+        database_class = PooledDatabase[settings.DATABASE_TYPE.upper()].value
+        self.database_connection = database_class(db_name, **database_config)
+        if replica_config:
+            if "password" in replica_config:
+                replica_config["password"] = decrypt_database_password(replica_config["password"])
+            replica_config = {**database_config, **replica_config}
+            replica = database_class(replica_config.pop("name", db_name), **replica_config)
+            replica.stats_target = "replica"
+            self.database_connection.replica = replica
+            logging.info(f"init database read replica {replica_config.get('host')}:{replica_config.get('port')}")
         logging.info("init database on cluster mode successfully")
 
 
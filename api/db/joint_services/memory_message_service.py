@@ -232,7 +232,10 @@ async def embed_and_save(memory, message_list: list[dict], task_id: str = None):
                     TaskService.update_progress(task_id, {"progress": -1, "progress_msg": timestamp_to_date(current_timestamp()) + " " + error_msg})
                 return False, error_msg
 
-        new_msg_size = sum([MessageService.calculate_message_size(m) for m in message_list])
+        # size each message once here; it is stored with the message and summed by the doc store
+        for msg in message_list:
+            msg["size"] = MessageService.calculate_message_size(msg)
+        new_msg_size = sum(msg["size"] for msg in message_list)
         current_memory_size = get_memory_size_cache(memory.id, memory.tenant_id)
         if new_msg_size + current_memory_size > memory.memory_size:
             size_to_delete = current_memory_size + new_msg_size - memory.memory_size
@@ -336,6 +339,11 @@ def decrease_memory_size_cache(memory_id: str, size: int):
     return REDIS_CONN.decrby(redis_key, size)
 
 
+def delete_memory_size_cache(memory_id: str):
+    redis_key = f"memory_{memory_id}"
+    return REDIS_CONN.delete(redis_key)
+
+
 def init_memory_size_cache():
     memory_list = MemoryService.get_all_memory()
     if not memory_list:
@@ -364,6 +372,28 @@ def fix_missing_tokenized_memory():
         logging.info("Fix missing tokenized memory done.")
 
 
+def fix_missing_message_size():
+    memory_list = MemoryService.get_all_memory()
+    if not memory_list:
+        logging.info("No memory found, no need to fix missing message size.")
+        return
+    for m in memory_list:
+        fixed, seen = 0, set()
+        while True:
+            message_list = MessageService.get_missing_field_messages(m.id, m.tenant_id, "size", select_fields=["message_id", "content", "content_embed"])
+            message_list = [msg for msg in message_list if msg["message_id"] not in seen]
+            if not message_list:
+                # nothing new: either done, or the store has not made the last updates visible yet
+                break
+            for msg in message_list:
+                seen.add(msg["message_id"])
+                MessageService.update_message({"id": f"{m.id}_{msg['message_id']}"}, {"size": MessageService.calculate_message_size(msg)}, m.tenant_id, m.id)
+            fixed += len(message_list)
+        if fixed:
+            logging.info(f"Fixed {fixed} messages missing size in memory: {m.name}.")
+    logging.info("Fix missing message size done.")
+
+
 def judge_system_prompt_is_default(system_prompt: str, memory_type: int | list[str]):
     memory_type_list = memory_type if isinstance(memory_type, list) else get_memory_type_human(memory_type)
     return PromptAssembler.is_default_system_prompt(system_prompt, {"memory_type": memory_type_list})
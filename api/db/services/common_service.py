@@ -24,11 +24,15 @@ from peewee import InterfaceError, OperationalError
 
 from api.db.db_models import DB
 from api.db.gaussdb_error_utils import is_retryable_transaction_error
+from api.db.services.config_cache import bind_config_caches
 from common import settings
 from common.misc_utils import get_uuid
 from common.time_utils import current_timestamp, datetime_format
 
 
+bind_config_caches(DB)
+
+
 def _is_deadlock_error(exc: OperationalError) -> bool:
     if not isinstance(exc, OperationalError):
         return False
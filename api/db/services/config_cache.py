@@ -0,0 +1,311 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Short-lived caches of slow-changing configuration rows.
+
+Chat and retrieval requests look up the same tenant, dialog, knowledge base and
+model rows again and again. A :class:`ConfigCache` keeps the results of those
+lookups in a process-local LRU for ``CONFIG_CACHE_TTL`` seconds, in front of a
+Redis tier shared by all processes. Redis entries are keyed by a per-cache
+version that every write to one of the cache's ``tables`` bumps (see
+``bind_config_caches``); processes poll the version at most every
+``CONFIG_CACHE_VERSION_CHECK`` seconds and drop their local entries when it
+moved. Without Redis, stale reads of writes made by other processes are
+bounded by one TTL.
+"""
+
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import date, datetime
+from functools import wraps
+
+import xxhash
+from peewee import Model
+
+CONFIG_CACHE_TTL = float(os.environ.get("CONFIG_CACHE_TTL", 10))
+CONFIG_CACHE_MAXSIZE = int(os.environ.get("CONFIG_CACHE_MAXSIZE", 4096))
+CONFIG_CACHE_REDIS = os.environ.get("CONFIG_CACHE_REDIS", "1").lower() not in ("0", "false", "no")
+CONFIG_CACHE_REDIS_TTL = int(os.environ.get("CONFIG_CACHE_REDIS_TTL", 300))
+CONFIG_CACHE_VERSION_CHECK = float(os.environ.get("CONFIG_CACHE_VERSION_CHECK", 1))
+CONFIG_CACHE_PREFIX = "config_cache"
+
+_MISSING = object()
+_ROW_MODELS = {}
+
+
+def _shared_redis():
+    if not CONFIG_CACHE_REDIS:
+        return None
+    try:
+        from rag.utils.redis_conn import REDIS_CONN
+    except Exception:
+        return None
+    return REDIS_CONN if REDIS_CONN.is_alive() else None
+
+
+def _to_json(value):
+    # Tag the types JSON cannot tell apart, so cached rows come back from
+    # Redis as the same model instances, tuples and datetimes they went in as.
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, tuple):
+        return {"t": "tuple", "v": [_to_json(v) for v in value]}
+    if isinstance(value, dict):
+        return {"t": "dict", "v": [[_to_json(k), _to_json(v)] for k, v in value.items()]}
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, Model):
+        _ROW_MODELS.setdefault(type(value).__name__, type(value))
+        extra = {k: v for k, v in vars(value).items() if k not in ("__data__", "_dirty", "__rel__")}
+        return {"t": "row", "m": type(value).__name__, "v": _to_json(value.__data__), "x": _to_json(extra)}
+    raise TypeError(f"{type(value).__name__} is not cacheable in Redis")
+
+
+def _model_class(name):
+    if name not in _ROW_MODELS:
+        _ROW_MODELS[name] = getattr(importlib.import_module("api.db.db_models"), name)
+    return _ROW_MODELS[name]
+
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    kind, inner = value["t"], value["v"]
+    if kind == "tuple":
+        return tuple(_from_json(v) for v in inner)
+    if kind == "dict":
+        return {_from_json(k): _from_json(v) for k, v in inner}
+    if kind == "datetime":
+        return datetime.fromisoformat(inner)
+    if kind == "date":
+        return date.fromisoformat(inner)
+    row = _model_class(value["m"])(__no_default__=True)
+    row.__data__.update(_from_json(inner))
+    row._dirty.clear()
+    for k, v in _from_json(value["x"]).items():
+        setattr(row, k, v)
+    return row
+
+
+class ConfigCache:
+    """Local TTL + LRU cache of lookup results over a versioned Redis tier.
+
+    A ``ttl`` of 0 disables the cache. Values are deep-copied on the way out
+    so callers may modify the model instances they get back, like rows fresh
+    from the database. ``redis`` overrides the shared ``REDIS_CONN``; the
+    Redis tier is skipped while Redis is unavailable.
+    """
+
+    def __init__(self, name: str, tables: tuple[str, ...], ttl: float = CONFIG_CACHE_TTL, maxsize: int = CONFIG_CACHE_MAXSIZE):
+        self.name = name
+        self.tables = tables
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.redis_ttl = CONFIG_CACHE_REDIS_TTL
+        self.redis = None
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.load_seconds = 0.0
+        self.redis_seconds = 0.0
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._generation = 0
+        self._version = None
+        self._version_checked = float("-inf")
+
+    @property
+    def version_key(self) -> str:
+        return f"{CONFIG_CACHE_PREFIX}:{self.name}:version"
+
+    def _redis_conn(self):
+        return self.redis if self.redis is not None else _shared_redis()
+
+    def _current_version(self, redis, now):
+        with self._lock:
+            if now - self._version_checked < CONFIG_CACHE_VERSION_CHECK:
+                return self._version
+        raw = redis.get(self.version_key)
+        version = int(raw) if raw else 0
+        with self._lock:
+            if version != self._version:
+                # Another process wrote to our tables; local entries may predate it.
+                self._generation += 1
+                self._data.clear()
+                self._version = version
+            self._version_checked = now
+        return version
+
+    def _redis_key(self, version, key) -> str:
+        return f"{CONFIG_CACHE_PREFIX}:{self.name}:{version}:{xxhash.xxh64(repr(key).encode()).hexdigest()}"
+
+    def _redis_get(self, redis, version, key):
+        start = time.perf_counter()
+        try:
+            raw = redis.get(self._redis_key(version, key))
+            return _from_json(json.loads(raw)) if raw else _MISSING
+        except Exception as e:
+            logging.warning(f"Config cache {self.name}: dropping unreadable Redis entry: {e}")
+            return _MISSING
+        finally:
+            with self._lock:
+                self.redis_seconds += time.perf_counter() - start
+
+    def _redis_put(self, redis, version, key, value):
+        try:
+            payload = json.dumps(_to_json(value), ensure_ascii=False)
+        except TypeError as e:
+            logging.debug(f"Config cache {self.name}: keeping value local only: {e}")
+            return
+        redis.set(self._redis_key(version, key), payload, self.redis_ttl)
+
+    def _store(self, generation, key, value, now):
+        # Drop values loaded while a write cleared the cache; they may predate it.
+        if generation != self._generation:
+            return False
+        self._data[key] = (now + self.ttl, deepcopy(value))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return True
+
+    def get(self, key, loader, cacheable=None):
+        """Return the cached value of ``key``, or ``loader()``, kept if ``cacheable(value)`` allows."""
+        if self.ttl <= 0:
+            return loader()
+        redis = self._redis_conn()
+        now = time.monotonic()
+        version = self._current_version(redis, now) if redis is not None else None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return deepcopy(entry[1])
+            generation = self._generation
+        if redis is not None:
+            value = self._redis_get(redis, version, key)
+            if value is not _MISSING:
+                with self._lock:
+                    self.redis_hits += 1
+                    self._store(generation, key, value, now)
+                return value
+        start = time.perf_counter()
+        value = loader()
+        with self._lock:
+            self.misses += 1
+            self.load_seconds += time.perf_counter() - start
+            stored = (cacheable is None or cacheable(value)) and self._store(generation, key, value, now)
+        if stored and redis is not None:
+            self._redis_put(redis, version, key, value)
+        return value
+
+    def clear(self):
+        """Drop the local entries of this process."""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def invalidate(self):
+        """Drop the local entries and bump the Redis version, retiring the entries of all processes."""
+        self.clear()
+        redis = self._redis_conn()
+        if redis is None:
+            return
+        try:
+            version = int(redis.incrby(self.version_key, 1))
+        except Exception as e:
+            logging.warning(f"Config cache {self.name}: failed to bump the Redis version: {e}")
+            return
+        with self._lock:
+            self._version = version
+            self._version_checked = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.hits + self.redis_hits
+            total = served + self.misses
+            load_ms = self.load_seconds * 1000 / self.misses if self.misses else 0.0
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_ratio": round(served / total, 4) if total else 0.0,
+                "avg_load_ms": round(load_ms, 3),
+                "saved_query_ms": round(max(served * load_ms - self.redis_seconds * 1000, 0.0), 1),
+            }
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def cached_config(cache: ConfigCache, cacheable=None):
+    """Cache a service classmethod's result in ``cache``, keyed by its name and arguments.
+
+    Apply it below ``@classmethod`` and above ``@DB.connection_context()`` so
+    cache hits do not check out a connection. ``cacheable`` filters the
+    results worth keeping, e.g. to skip "not found" answers that may stem
+    from a swallowed database error.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(cls, *args, **kwargs):
+            key = (cls.__name__, func.__name__, _freeze(args), _freeze(kwargs))
+            return cache.get(key, lambda: func(cls, *args, **kwargs), cacheable)
+
+        return wrapper
+
+    return decorator
+
+
+TENANT_CONFIG_CACHE = ConfigCache("tenant", ("tenant", "tenant_langfuse"))
+KNOWLEDGEBASE_CONFIG_CACHE = ConfigCache("knowledgebase", ("knowledgebase",))
+DIALOG_CONFIG_CACHE = ConfigCache("dialog", ("dialog",))
+MODEL_CONFIG_CACHE = ConfigCache("model", ("tenant_model_provider", "tenant_model_instance", "tenant_model"))
+CONFIG_CACHES = (TENANT_CONFIG_CACHE, KNOWLEDGEBASE_CONFIG_CACHE, DIALOG_CONFIG_CACHE, MODEL_CONFIG_CACHE)
+# Columns whose updates leave the cached configuration as it was. Parsing bumps the
+# knowledge base counters for every chunk batch; cached rows may show old counts.
+COUNTER_COLUMNS = {"knowledgebase": ("doc_num", "chunk_num", "token_num", "update_time", "update_date")}
+
+
+def bind_config_caches(db):
+    """Invalidate each cache when ``db`` executes a write to one of its tables, other than a counter update."""
+    for cache in CONFIG_CACHES:
+        for table in cache.tables:
+            db.on_table_write(table, cache.invalidate, ignore_columns=COUNTER_COLUMNS.get(table, ()))
+
+
+def config_cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in CONFIG_CACHES}
@@ -32,6 +32,7 @@ from api.db.services.file_service import FileService
 from common.constants import LLMType, ParserType, StatusEnum
 from api.db.db_models import DB, Dialog
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import DIALOG_CONFIG_CACHE, cached_config
 from api.db.services.doc_metadata_service import DocMetadataService
 from api.db.services.knowledgebase_service import KnowledgebaseService, validate_dataset_embedding_models
 from api.db.services.langfuse_service import TenantLangfuseService
@@ -142,6 +143,11 @@ def _enrich_chunks_with_document_metadata(chunks, metadata_fields=None):
 class DialogService(CommonService):
     model = Dialog
 
+    @classmethod
+    @cached_config(DIALOG_CONFIG_CACHE, cacheable=lambda res: res[0])
+    def get_by_id(cls, pid):
+        return super().get_by_id(pid)
+
     @classmethod
     def save(cls, **kwargs):
         """Save a new record to database.
@@ -354,7 +360,7 @@ async def async_chat_solo(dialog, messages, stream=True, session_id=None):
 
 def get_models(dialog, trace_context=None, langfuse_session_id=None):
     embd_mdl, chat_mdl, rerank_mdl, tts_mdl = None, None, None, None
-    kbs = KnowledgebaseService.get_by_ids(dialog.kb_ids)
+    kbs = KnowledgebaseService.get_configs_by_ids(dialog.kb_ids)
     err = validate_dataset_embedding_models(kbs)
     if err:
         raise Exception(err)
@@ -143,13 +143,20 @@ class DocMetadataService:
         Args:
             results: Search results from ES/Infinity/OceanBase in any format
         """
-        # Handle tuple return from Infinity: (DataFrame, int)
-        # Check this FIRST because pandas DataFrames also have __getitem__
+        # Handle tuple return from Infinity: (Arrow table, int)
+        # Check this FIRST because tables and DataFrames also have __getitem__
         if isinstance(results, tuple) and len(results) == 2:
-            results = results[0]  # Extract DataFrame from tuple
+            results = results[0]  # Extract the table from tuple
 
-        # Check if results is a pandas DataFrame (from Infinity)
-        if hasattr(results, "iterrows"):
+        # Check if results is an Arrow table (from Infinity)
+        if hasattr(results, "to_pylist"):
+            for doc in results.to_pylist():
+                doc_id = cls._extract_doc_id(doc)
+                if doc_id:
+                    yield doc_id, doc
+
+        # Check if results is a pandas DataFrame
+        elif hasattr(results, "iterrows"):
             # Handle pandas DataFrame - use iterrows() to iterate over rows
             for _, row in results.iterrows():
                 doc = dict(row)  # Convert Series to dict
@@ -260,11 +267,13 @@ class DocMetadataService:
             page_docs = []
             total_count = None  # Used for Infinity to determine if more results exist
 
-            # Check for Infinity format first (DataFrame, total) tuple
+            # Check for Infinity format first (Arrow table, total) tuple
             if isinstance(results, tuple) and len(results) == 2:
                 df, total_count = results
-                if hasattr(df, "iterrows"):
-                    # Pandas DataFrame from Infinity
+                if hasattr(df, "to_pylist"):
+                    # Arrow table from Infinity
+                    page_docs = df.to_pylist()
+                elif hasattr(df, "iterrows"):
                     page_docs = df.to_dict("records")
                 else:
                     page_docs = list(df) if df else []
@@ -679,7 +688,7 @@ class DocMetadataService:
 
                 # Check if empty based on return type (fallback search only)
                 if isinstance(results, tuple) and len(results) == 2:
-                    # Infinity returns (DataFrame, int)
+                    # Infinity returns (Arrow table, int)
                     df, total = results
                     logging.debug(f"[DROP EMPTY TABLE] Infinity format - total: {total}, df length: {len(df) if hasattr(df, '__len__') else 'N/A'}")
                     is_empty = total == 0 or (hasattr(df, "__len__") and len(df) == 0)
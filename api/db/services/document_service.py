@@ -458,6 +458,28 @@ class DocumentService(CommonService):
             raise RuntimeError("Database error (Knowledgebase)!")
         return Document(**doc)
 
+    @classmethod
+    @DB.connection_context()
+    def insert_batch(cls, docs):
+        # Bulk counterpart of insert(): one statement for the rows and one
+        # document count update per dataset.
+        with DB.atomic():
+            cls.insert_many(docs)
+            kb_doc_num = {}
+            for doc in docs:
+                kb_doc_num[doc["kb_id"]] = kb_doc_num.get(doc["kb_id"], 0) + 1
+            for kb_id, count in kb_doc_num.items():
+                if not KnowledgebaseService.atomic_increase_doc_num_by_id(kb_id, count):
+                    raise RuntimeError("Database error (Knowledgebase)!")
+
+    @classmethod
+    @DB.connection_context()
+    def get_existing_names(cls, kb_id, names):
+        if not names:
+            return set()
+        query = cls.model.select(cls.model.name).where((cls.model.kb_id == kb_id) & (cls.model.name.in_(list(names))))
+        return set(query.scalars())
+
     @classmethod
     @DB.connection_context()
     def remove_document(cls, doc, tenant_id):
@@ -1011,6 +1033,15 @@ class DocumentService(CommonService):
             return None
         return doc_id[0]["id"]
 
+    @classmethod
+    @DB.read_replica()
+    @DB.connection_context()
+    def get_existing_ids(cls, doc_ids):
+        if not doc_ids:
+            return set()
+        query = cls.model.select(cls.model.id).where(cls.model.id.in_(doc_ids))
+        return set(query.scalars())
+
     @classmethod
     @DB.connection_context()
     def get_doc_ids_by_doc_names(cls, doc_names):
@@ -16,6 +16,7 @@
 import asyncio
 import base64
 import logging
+import os
 import re
 import sys
 import time
@@ -29,6 +30,7 @@ logger = logging.getLogger(__name__)
 import xxhash
 from peewee import fn
 
+from api.constants import FILE_NAME_LEN_LIMIT
 from api.db import KNOWLEDGEBASE_FOLDER_NAME, SKILLS_FOLDER_NAME, FileType
 from api.db.db_models import DB, Document, File, File2Document, Knowledgebase, Task
 from api.db.services import duplicate_name
@@ -638,6 +640,169 @@ class FileService(CommonService):
 
         return err, files
 
+    @classmethod
+    @DB.connection_context()
+    def prepare_kb_folder(cls, kb, user_id):
+        # Create the user's knowledge base folders if needed and return the folder of ``kb``.
+        root_folder = cls.get_root_folder(user_id)
+        cls.init_knowledgebase_docs(root_folder["id"], user_id)
+        kb_root_folder = cls.get_kb_folder(user_id)
+        return cls.new_a_file_from_kb(kb.tenant_id, kb.name, kb_root_folder["id"])
+
+    @classmethod
+    @DB.connection_context()
+    def upload_document_batch(
+        cls, kb, kb_folder_id, file_objs, user_id, src="local", parent_path: str | None = None, parser_config: dict | None = None, parse: bool = False, taken_names: set | None = None
+    ):
+        # Bulk counterpart of upload_document() for new files: objects are
+        # stored one by one, then the Document, File and File2Document rows of
+        # the whole batch are inserted in one transaction and, with ``parse``,
+        # the parse tasks are queued in one Redis pipeline.
+        # Args:
+        #     kb: Knowledge base the files are added to
+        #     kb_folder_id: Folder of the knowledge base, see prepare_kb_folder()
+        #     file_objs: Objects with ``filename`` and ``read()``
+        #     taken_names: Names reserved by earlier batches of the same upload
+        # Returns:
+        #     List of ``{"name", "status", "doc" | "error"}`` per file, in order
+        safe_parent_path = sanitize_path(parent_path)
+        parser_config = parser_config if parser_config is not None else (kb.parser_config or {})
+        taken_names = taken_names if taken_names is not None else set()
+        max_files = int(os.environ.get("MAX_FILE_NUM_PER_USER", 0))
+        remaining = max_files - DocumentService.get_doc_count(kb.tenant_id) if max_files > 0 else None
+        batch_names = {file.filename for file in file_objs}
+        existing_names = DocumentService.get_existing_names(kb.id, batch_names)
+
+        def name_exists(name, **_kwargs):
+            if name in taken_names:
+                return True
+            if name in batch_names:
+                return name in existing_names
+            return bool(DocumentService.query(name=name, kb_id=kb.id))
+
+        results, docs = [], []
+        for file in file_objs:
+            result = {"name": file.filename, "status": "failed"}
+            results.append(result)
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise RuntimeError("Exceed the maximum file number of a free user!")
+                if len(file.filename.encode("utf-8")) > FILE_NAME_LEN_LIMIT:
+                    raise RuntimeError("Exceed the maximum length of file name!")
+                filename = duplicate_name(name_exists, name=file.filename, kb_id=kb.id)
+                filetype = filename_type(filename)
+                if filetype == FileType.OTHER.value:
+                    raise RuntimeError("This type of file has not been supported yet!")
+
+                location = filename if not safe_parent_path else f"{safe_parent_path}/{filename}"
+                while settings.STORAGE_IMPL.obj_exist(kb.id, location):
+                    location += "_"
+
+                blob = file.read()
+                if filetype == FileType.PDF.value:
+                    blob = read_potential_broken_pdf(blob)
+                settings.STORAGE_IMPL.put(kb.id, location, blob)
+
+                doc_id = get_uuid()
+                img = thumbnail_img(filename, blob)
+                thumbnail_location = ""
+                if img is not None:
+                    thumbnail_location = f"thumbnail_{doc_id}.png"
+                    settings.STORAGE_IMPL.put(kb.id, thumbnail_location, img)
+
+                doc = {
+                    "id": doc_id,
+                    "kb_id": kb.id,
+                    "parser_id": cls.get_parser(filetype, filename, kb.parser_id),
+                    "pipeline_id": kb.pipeline_id,
+                    "parser_config": parser_config,
+                    "created_by": user_id,
+                    "type": filetype,
+                    "name": filename,
+                    "source_type": src,
+                    "suffix": Path(filename).suffix.lstrip("."),
+                    "location": location,
+                    "size": len(blob),
+                    "thumbnail": thumbnail_location,
+                    "content_hash": xxhash.xxh128(blob).hexdigest(),
+                }
+                taken_names.add(filename)
+                if remaining is not None:
+                    remaining -= 1
+                docs.append(doc)
+                result["doc"] = doc
+            except Exception as e:  # noqa: BLE001 - collect per-file errors and keep processing the rest
+                result["error"] = str(e)
+        if not docs:
+            return results
+
+        try:
+            with DB.atomic():
+                DocumentService.insert_batch(docs)
+                cls.add_files_from_kb(docs, kb_folder_id, kb.tenant_id)
+        except Exception as e:
+            logger.exception("Failed to insert the rows of %d uploaded documents", len(docs))
+            for doc in docs:
+                settings.STORAGE_IMPL.rm(kb.id, doc["location"])
+                if doc["thumbnail"]:
+                    settings.STORAGE_IMPL.rm(kb.id, doc["thumbnail"])
+            for result in results:
+                if result.pop("doc", None) is not None:
+                    result["error"] = f"Database error: {e}"
+            return results
+
+        for result in results:
+            if "doc" in result:
+                result["status"] = "uploaded"
+        if parse:
+            cls._queue_uploaded_docs(kb, docs, results)
+        return results
+
+    @classmethod
+    def _queue_uploaded_docs(cls, kb, docs, results):
+        from api.db.services.task_service import queue_dataflow, queue_tasks_many
+
+        status = {result["doc"]["id"]: result for result in results if "doc" in result}
+        try:
+            for doc in docs:
+                if doc["pipeline_id"]:
+                    queue_dataflow(kb.tenant_id, flow_id=doc["pipeline_id"], task_id=get_uuid(), doc_id=doc["id"])
+            # Pages and rows are counted from the stored objects, one file at a time, rather than keeping the batch's bytes.
+            queue_tasks_many([(doc, kb.id, doc["location"]) for doc in docs if not doc["pipeline_id"]])
+        except Exception as e:
+            logger.exception("Failed to queue the parse tasks of %d uploaded documents", len(docs))
+            for doc in docs:
+                status[doc["id"]]["error"] = f"Uploaded, but failed to start parsing: {e}"
+            return
+        for doc in docs:
+            doc["run"] = TaskStatus.RUNNING.value
+            status[doc["id"]]["status"] = "queued"
+
+    @classmethod
+    @DB.connection_context()
+    def add_files_from_kb(cls, docs, kb_folder_id, tenant_id):
+        # Bulk counterpart of add_file_from_kb() for documents that have no file yet.
+        files, links = [], []
+        for doc in docs:
+            file_id = get_uuid()
+            files.append(
+                {
+                    "id": file_id,
+                    "parent_id": kb_folder_id,
+                    "tenant_id": tenant_id,
+                    "created_by": tenant_id,
+                    "name": doc["name"],
+                    "type": doc["type"],
+                    "size": doc["size"],
+                    "location": doc["location"],
+                    "source_type": FileSource.KNOWLEDGEBASE,
+                }
+            )
+            links.append({"id": get_uuid(), "file_id": file_id, "document_id": doc["id"]})
+        with DB.atomic():
+            cls.insert_many(files)
+            File2DocumentService.insert_many(links)
+
     @classmethod
     @DB.connection_context()
     def list_all_files_by_parent_id(cls, parent_id):
@@ -23,6 +23,7 @@ from api.db.db_models import DB, Document, Knowledgebase, User, UserCanvas
 from api.db.joint_services.tenant_model_service import get_composite_model_name_by_ids
 from api.db.services import duplicate_name
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import KNOWLEDGEBASE_CONFIG_CACHE, cached_config
 from api.db.services.user_service import TenantService
 from api.utils.api_utils import get_data_error_result, get_parser_config
 from common.constants import StatusEnum
@@ -417,7 +418,20 @@ class KnowledgebaseService(CommonService):
         cls.update_by_id(id, {"parser_config": m.parser_config})
 
     @classmethod
+    @cached_config(KNOWLEDGEBASE_CONFIG_CACHE)
+    @DB.read_replica()
     @DB.connection_context()
+    def get_configs_by_ids(cls, ids):
+        # Get datasets to read their configuration (embedding model, parser
+        # settings) on request hot paths. Served from a short-lived cache, so
+        # document and chunk counts may lag behind other processes.
+        # Args:
+        #     ids: List of dataset IDs
+        # Returns:
+        #     List of dataset records
+        return list(cls.model.select().where(cls.model.id.in_(ids)))
+
+    @classmethod
     def get_field_map(cls, ids):
         # Get field mappings for knowledge bases
         # Args:
@@ -425,7 +439,7 @@ class KnowledgebaseService(CommonService):
         # Returns:
         #     Dictionary of field mappings
         conf = {}
-        for k in cls.get_by_ids(ids):
+        for k in cls.get_configs_by_ids(ids):
             if k.parser_config and "field_map" in k.parser_config:
                 conf.update(k.parser_config["field_map"])
         return conf
@@ -622,11 +636,11 @@ class KnowledgebaseService(CommonService):
 
     @classmethod
     @DB.connection_context()
-    def atomic_increase_doc_num_by_id(cls, kb_id):
+    def atomic_increase_doc_num_by_id(cls, kb_id, count=1):
         data = {}
         data["update_time"] = current_timestamp()
         data["update_date"] = datetime_format(datetime.now())
-        data["doc_num"] = cls.model.doc_num + 1
+        data["doc_num"] = cls.model.doc_num + count
         num = cls.model.update(data).where(cls.model.id == kb_id).execute()
         return num
 
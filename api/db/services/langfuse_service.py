@@ -20,6 +20,7 @@ import peewee
 
 from api.db.db_models import DB, TenantLangfuse
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import TENANT_CONFIG_CACHE, cached_config
 from common.time_utils import current_timestamp, datetime_format
 
 
@@ -32,6 +33,8 @@ class TenantLangfuseService(CommonService):
     model = TenantLangfuse
 
     @classmethod
+    @cached_config(TENANT_CONFIG_CACHE)
+    @DB.read_replica()
     @DB.connection_context()
     def filter_by_tenant(cls, tenant_id):
         fields = [cls.model.tenant_id, cls.model.host, cls.model.secret_key, cls.model.public_key]
@@ -16,6 +16,7 @@
 import logging
 import os
 import random
+import time
 import xxhash
 from datetime import datetime
 
@@ -38,6 +39,8 @@ from rag.nlp import search
 CANVAS_DEBUG_DOC_ID = "dataflow_x"
 GRAPH_RAPTOR_FAKE_DOC_ID = "graph_raptor_x"
 TASK_MAX_LOG_LENGTH = int(os.environ.get("TASK_MAX_LOG_LENGTH", 3000))  # TEXT MAX is 64 KiB bytes!
+CANCEL_CHECK_INTERVAL = float(os.environ.get("CANCEL_CHECK_INTERVAL", 1.0))
+_CANCEL_CHECKS = {}
 DOC_CHUNKING_COUNTER_TTL_SECONDS = 7 * 24 * 3600
 
 
@@ -456,6 +459,41 @@ def queue_tasks(doc: dict, bucket: str, name: str, priority: int):
         - Task digests are calculated for optimization and reuse
         - Previous task chunks may be reused if available
     """
+    parse_task_array, queue = _plan_parse_tasks(doc, bucket, name, priority)
+    bulk_insert_into_db(Task, parse_task_array, True)
+    unfinished_task_array = _begin_parse(doc["id"], parse_task_array)
+    try:
+        assert REDIS_CONN.queue_product_many({queue: unfinished_task_array}), "Can't access Redis. Please check the Redis' status."
+    except Exception:
+        abort_doc_chunking_counter(doc["id"])
+        raise
+
+
+def queue_tasks_many(docs: list[tuple[dict, str, str]], priority: int = 0):
+    """Create the processing tasks of several documents and queue them together.
+
+    Same as calling :func:`queue_tasks` for each ``(doc, bucket, name)``
+    entry, except that the tasks of all documents are inserted in one statement
+    and their queue messages are sent in one Redis pipeline.
+    """
+    planned = [(doc, *_plan_parse_tasks(doc, bucket, name, priority)) for doc, bucket, name in docs]
+    tasks = [task for _, parse_task_array, _ in planned for task in parse_task_array]
+    if tasks:
+        bulk_insert_into_db(Task, tasks, True)
+    messages = {}
+    for doc, parse_task_array, queue in planned:
+        messages.setdefault(queue, []).extend(_begin_parse(doc["id"], parse_task_array))
+    if not REDIS_CONN.queue_product_many(messages):
+        for doc, _, _ in planned:
+            abort_doc_chunking_counter(doc["id"])
+        raise RuntimeError("Can't access Redis. Please check the Redis' status.")
+
+
+def _plan_parse_tasks(doc: dict, bucket: str, name: str, priority: int):
+    """Split a document into parse tasks and reuse the chunks of its previous tasks.
+
+    Returns the tasks and the name of the queue they belong to.
+    """
 
     def new_task():
         return {
@@ -533,20 +571,18 @@ def queue_tasks(doc: dict, bucket: str, name: str, priority: int):
         if pre_chunk_ids:
             settings.docStoreConn.delete({"id": pre_chunk_ids}, search.index_name(chunking_config["tenant_id"]), chunking_config["kb_id"])
     DocumentService.update_by_id(doc["id"], {"chunk_num": ck_num})
+    return parse_task_array, settings.get_svr_queue_name(priority, suffix)
 
-    bulk_insert_into_db(Task, parse_task_array, True)
-    DocumentService.begin2parse(doc["id"])
+
+def _begin_parse(doc_id: str, parse_task_array: list[dict]) -> list[dict]:
+    """Mark the document as queued and seed its chunking counter; returns the tasks to queue."""
+    DocumentService.begin2parse(doc_id)
 
     unfinished_task_array = [task for task in parse_task_array if task["progress"] < 1.0]
     chunking_n = sum(1 for task in unfinished_task_array if not task.get("task_type"))
     if chunking_n > 0:
-        assert seed_doc_chunking_counter(doc["id"], chunking_n), "Can't access Redis. Please check the Redis' status."
-    try:
-        for unfinished_task in unfinished_task_array:
-            assert REDIS_CONN.queue_product(settings.get_svr_queue_name(priority, suffix), message=unfinished_task), "Can't access Redis. Please check the Redis' status."
-    except Exception:
-        abort_doc_chunking_counter(doc["id"])
-        raise
+        assert seed_doc_chunking_counter(doc_id, chunking_n), "Can't access Redis. Please check the Redis' status."
+    return unfinished_task_array
 
 
 def reuse_prev_task_chunks(task: dict, prev_tasks: list[dict], chunking_config: dict):
@@ -596,21 +632,36 @@ def reuse_prev_task_chunks(task: dict, prev_tasks: list[dict], chunking_config:
 
 def cancel_all_task_of(doc_id):
     abort_doc_chunking_counter(doc_id)
-    for t in TaskService.query(doc_id=doc_id):
-        try:
-            REDIS_CONN.set(f"{t.id}-cancel", "x")
-        except Exception as e:
-            logging.exception(e)
+    try:
+        with REDIS_CONN.pipeline() as pipe:
+            for t in TaskService.query(doc_id=doc_id):
+                pipe.set(f"{t.id}-cancel", "x", 3600)
+    except Exception as e:
+        logging.exception(e)
 
 
-def has_canceled(task_id):
+def has_canceled(task_id, max_age: float = 0):
+    """Whether the task has been asked to stop.
+
+    Loops that check once per chunk or per insert bulk pass ``max_age`` to reuse
+    an answer read from Redis less than that many seconds ago.
+    """
+    if max_age:
+        checked = _CANCEL_CHECKS.get(task_id)
+        if checked and time.monotonic() - checked[0] < max_age:
+            return checked[1]
+    canceled = False
     try:
         if REDIS_CONN.get(f"{task_id}-cancel"):
             logging.info(f"Task: {task_id} has been canceled")
-            return True
+            canceled = True
     except Exception as e:
         logging.exception(e)
-    return False
+    if max_age:
+        if len(_CANCEL_CHECKS) >= 4096:
+            _CANCEL_CHECKS.clear()
+        _CANCEL_CHECKS[task_id] = (time.monotonic(), canceled)
+    return canceled
 
 
 def queue_dataflow(tenant_id: str, flow_id: str, task_id: str, doc_id: str = CANVAS_DEBUG_DOC_ID, file: dict = None, priority: int = 0, rerun: bool = False) -> tuple[bool, str]:
@@ -16,6 +16,7 @@
 from common.misc_utils import get_uuid
 from api.db.db_models import DB, TenantModelInstance
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import MODEL_CONFIG_CACHE, cached_config
 from api.db.services import duplicate_name
 
 
@@ -29,6 +30,13 @@ class TenantModelInstanceService(CommonService):
         return cls.insert(id=get_uuid(), provider_id=provider_id, instance_name=unique_instance_name, api_key=api_key, extra=extra)
 
     @classmethod
+    @cached_config(MODEL_CONFIG_CACHE, cacheable=lambda res: res[0])
+    def get_by_id(cls, pid):
+        return super().get_by_id(pid)
+
+    @classmethod
+    @cached_config(MODEL_CONFIG_CACHE)
+    @DB.read_replica()
     @DB.connection_context()
     def get_all_by_provider_id(cls, provider_id):
         return list(cls.model.select().where(cls.model.provider_id == provider_id))
@@ -39,6 +47,8 @@ class TenantModelInstanceService(CommonService):
         return list(cls.model.select().where(cls.model.provider_id.in_(provider_ids)))
 
     @classmethod
+    @cached_config(MODEL_CONFIG_CACHE)
+    @DB.read_replica()
     @DB.connection_context()
     def get_by_provider_id_and_instance_name(cls, provider_id, instance_name):
         return cls.model.get_or_none(
@@ -15,12 +15,20 @@
 #
 from api.db.db_models import DB, TenantModelProvider
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import MODEL_CONFIG_CACHE, cached_config
 
 
 class TenantModelProviderService(CommonService):
     model = TenantModelProvider
 
     @classmethod
+    @cached_config(MODEL_CONFIG_CACHE, cacheable=lambda res: res[0])
+    def get_by_id(cls, pid):
+        return super().get_by_id(pid)
+
+    @classmethod
+    @cached_config(MODEL_CONFIG_CACHE)
+    @DB.read_replica()
     @DB.connection_context()
     def get_by_tenant_id_and_provider_name(cls, tenant_id, provider_name):
         return cls.model.get_or_none(
@@ -15,18 +15,26 @@
 #
 from api.db.db_models import DB, TenantModel
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import MODEL_CONFIG_CACHE, cached_config
 from api.utils.model_utils import calculate_model_type
 
 
 class TenantModelService(CommonService):
     model = TenantModel
 
+    @classmethod
+    @cached_config(MODEL_CONFIG_CACHE, cacheable=lambda res: res[0])
+    def get_by_id(cls, pid):
+        return super().get_by_id(pid)
+
     @classmethod
     @DB.connection_context()
     def get_by_provider_id_and_instance_id_and_model_name(cls, provider_id, instance_id, model_name):
         return cls.model.get_or_none(cls.model.provider_id == provider_id, cls.model.instance_id == instance_id, cls.model.model_name == model_name)
 
     @classmethod
+    @cached_config(MODEL_CONFIG_CACHE)
+    @DB.read_replica()
     @DB.connection_context()
     def get_by_provider_id_and_instance_id_and_model_type_and_model_name(cls, provider_id, instance_id, model_type, model_name):
         if isinstance(model_type, str):
@@ -24,6 +24,7 @@ from api.db import UserTenantRole
 from api.db.db_models import DB, UserTenant
 from api.db.db_models import User, Tenant
 from api.db.services.common_service import CommonService
+from api.db.services.config_cache import TENANT_CONFIG_CACHE, cached_config
 from common.misc_utils import get_uuid
 from common.time_utils import current_timestamp, datetime_format
 from common.constants import StatusEnum
@@ -171,6 +172,11 @@ class TenantService(CommonService):
 
     model = Tenant
 
+    @classmethod
+    @cached_config(TENANT_CONFIG_CACHE, cacheable=lambda res: res[0])
+    def get_by_id(cls, pid):
+        return super().get_by_id(pid)
+
     @classmethod
     @DB.connection_context()
     def get_info_by(cls, user_id):
@@ -42,7 +42,7 @@ from peewee import OperationalError
 
 from common.constants import ActiveEnum, LLMType
 from api.utils.json_encode import CustomJSONEncoder
-from common.mcp_tool_call_conn import MCPToolCallSession, close_multiple_mcp_toolcall_sessions
+from common.mcp_tool_call_conn import MCP_SESSION_POOL
 from api.db.services.tenant_llm_service import LLMFactoriesService
 from common.connection_utils import timeout
 from common.constants import RetCode
@@ -691,18 +691,14 @@ def group_by(list_of_dict, key):
 
 def get_mcp_tools(mcp_servers: list, timeout: float | int = 10) -> tuple[dict, str]:
     results = {}
-    tool_call_sessions = []
     try:
         for mcp_server in mcp_servers:
             server_key = mcp_server.id
 
             cached_tools = mcp_server.variables.get("tools", {})
 
-            tool_call_session = MCPToolCallSession(mcp_server, mcp_server.variables)
-            tool_call_sessions.append(tool_call_session)
-
             try:
-                tools = tool_call_session.get_tools(timeout)
+                tools = MCP_SESSION_POOL.list_tools(mcp_server, mcp_server.variables, timeout)
             except Exception:
                 tools = []
 
@@ -717,9 +713,6 @@ def get_mcp_tools(mcp_servers: list, timeout: float | int = 10) -> tuple[dict, s
         return results, ""
     except Exception as e:
         return {}, str(e)
-    finally:
-        # PERF: blocking call to close sessions — consider moving to background thread or task queue
-        close_multiple_mcp_toolcall_sessions(tool_call_sessions)
 
 
 async def is_strong_enough(chat_model, embedding_model):
@@ -0,0 +1,91 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Incremental multipart/form-data parsing for large uploads.
+
+``request.files`` parses the whole body before the handler runs. ``iter_multipart``
+instead yields each part as soon as it is complete, so a handler can store and
+release files while the rest of the body is still arriving.
+"""
+
+import tempfile
+from collections.abc import AsyncIterable, AsyncIterator
+
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+MULTIPART_SPOOL_SIZE = 1024 * 1024
+MULTIPART_MAX_FIELD_SIZE = 1024 * 1024
+
+
+class SpooledUpload:
+    """A file part, kept in memory up to ``max_size`` bytes and on disk beyond."""
+
+    def __init__(self, name: str, filename: str, content_type: str | None = None, max_size: int = MULTIPART_SPOOL_SIZE):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self._stream = tempfile.SpooledTemporaryFile(max_size=max_size)
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+        self.size += len(data)
+
+    def read(self) -> bytes:
+        self._stream.seek(0)
+        return self._stream.read()
+
+    def close(self):
+        self._stream.close()
+
+
+async def iter_multipart(
+    body: AsyncIterable[bytes], boundary: bytes, spool_size: int = MULTIPART_SPOOL_SIZE, max_field_size: int = MULTIPART_MAX_FIELD_SIZE
+) -> AsyncIterator[tuple[str, str | SpooledUpload]]:
+    """Yield ``(name, value)`` per part of a multipart body, in body order.
+
+    Form fields come as ``str`` values and files as :class:`SpooledUpload`,
+    which the caller owns and must close.
+    """
+    decoder = MultipartDecoder(boundary)
+    part = None
+    container = None
+    async for chunk in body:
+        decoder.receive_data(chunk)
+        event = decoder.next_event()
+        while not isinstance(event, (Epilogue, NeedData)):
+            if isinstance(event, File):
+                part = event
+                container = SpooledUpload(event.name, event.filename, event.headers.get("content-type"), spool_size)
+            elif isinstance(event, Field):
+                part = event
+                container = bytearray()
+            elif isinstance(event, Data):
+                if isinstance(container, SpooledUpload):
+                    container.write(event.data)
+                else:
+                    container += event.data
+                    if len(container) > max_field_size:
+                        raise ValueError(f"Form field {part.name} is larger than {max_field_size} bytes.")
+                if not event.more_data:
+                    if isinstance(container, SpooledUpload):
+                        yield part.name, container
+                    else:
+                        yield part.name, container.decode("utf-8", "replace")
+                    container = None
+            event = decoder.next_event()
+    if isinstance(container, SpooledUpload):
+        container.close()
@@ -457,6 +457,7 @@ class ParserConfig(Base):
     graphrag: Annotated[GraphragConfig, Field(default_factory=lambda: GraphragConfig(use_graphrag=False))]
     html4excel: Annotated[bool, Field(default=False)]
     layout_recognize: Annotated[str, Field(default="DeepDOC")]
+    text_layer_fast_path: Annotated[bool, Field(default=False)]
     parent_child: Annotated[ParentChildConfig, Field(default_factory=lambda: ParentChildConfig(use_parent_child=False))]
     enable_children: Annotated[bool, Field(default=False)]
     children_delimiter: Annotated[str, Field(default="", min_length=0)]
@@ -464,6 +465,8 @@ class ParserConfig(Base):
     tag_kb_ids: Annotated[list[str], Field(default_factory=list)]
     topn_tags: Annotated[int, Field(default=1, ge=1, le=10)]
     filename_embd_weight: Annotated[float | None, Field(default=0.1, ge=0.0, le=1.0)]
+    # Index chunk vectors with int8 or binary quantized HNSW (Elasticsearch 8.12+ / 8.18+ only); takes effect on re-parse.
+    vector_quantization: Annotated[Literal["int8", "binary"] | None, Field(default=None)]
     task_page_size: Annotated[int | None, Field(default=None, ge=1)]
     pages: Annotated[list[list[int]] | None, Field(default=None)]
     compilation_template_group_id: Annotated[list[str], Field(default_factory=list)]
@@ -13,10 +13,13 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import numpy as np
 
+from common.misc_utils import thread_pool_exec
+
 DEFAULT_MATCH_VECTOR_TOPN = 10
 DEFAULT_MATCH_SPARSE_TOPN = 10
 VEC = list | np.ndarray
@@ -145,6 +148,40 @@ class OrderByExpr:
         return self.fields
 
 
+@dataclass
+class SearchRequest:
+    """
+    The arguments of one `DocStoreConnection.search` call, for batching independent searches with `multi_search`.
+    """
+
+    select_fields: list[str]
+    highlight_fields: list[str]
+    condition: dict
+    match_expressions: list[MatchExpr]
+    order_by: OrderByExpr
+    offset: int
+    limit: int
+    index_names: str | list[str]
+    dataset_ids: list[str]
+    agg_fields: list[str] | None = None
+    rank_feature: dict | None = None
+
+    def args(self) -> tuple:
+        return (
+            self.select_fields,
+            self.highlight_fields,
+            self.condition,
+            self.match_expressions,
+            self.order_by,
+            self.offset,
+            self.limit,
+            self.index_names,
+            self.dataset_ids,
+            self.agg_fields,
+            self.rank_feature,
+        )
+
+
 class DocStoreConnection(ABC):
     """
     Database operations
@@ -213,6 +250,13 @@ class DocStoreConnection(ABC):
         """
         raise NotImplementedError("Not implemented")
 
+    def multi_search(self, requests: list[SearchRequest]) -> list:
+        """
+        Run several independent searches and return their results in order.
+        Backends that support it send them to the engine in one round trip.
+        """
+        return [self.search(*req.args()) for req in requests]
+
     @abstractmethod
     def get(self, data_id: str, index_name: str, dataset_ids: list[str]) -> dict | None:
         """
@@ -241,6 +285,33 @@ class DocStoreConnection(ABC):
         """
         raise NotImplementedError("Not implemented")
 
+    """
+    Async operations
+    """
+
+    async def open_async(self):
+        """
+        Open the async client on the running event loop, the server's long-lived one.
+        Searches on any other loop, and all searches before this call, use the thread pool.
+        """
+
+    async def close_async(self):
+        """
+        Close the async client opened by `open_async`.
+        """
+
+    async def search_async(self, *args, **kwargs):
+        """
+        Async `search`. Backends with an async client override it; the default runs `search` on the thread pool.
+        """
+        return await thread_pool_exec(self.search, *args, **kwargs)
+
+    async def multi_search_async(self, requests: list[SearchRequest]) -> list:
+        """
+        Async `multi_search`. The default runs the searches concurrently with `search_async`.
+        """
+        return list(await asyncio.gather(*(self.search_async(*req.args()) for req in requests)))
+
     """
     Helper functions for search result
     """
@@ -0,0 +1,445 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""Index structures behind the embedded doc store (``rag/utils/embedded_conn.py``).
+
+``HNSWIndex`` is an approximate nearest neighbour graph over one vector column
+whose vectors and links live in memory-mapped files, so it is shared by every
+process on the box and survives restarts without a rebuild. ``InvertedIndex``
+keeps BM25 postings for the tokenized ``*_tks`` fields in the SQLite database
+that also holds the rows. ``parse_query_string`` reads the subset of the
+Elasticsearch ``query_string`` syntax that ``rag/nlp/query.py`` produces.
+
+Nodes are the integer row slots handed out by SQLite, which start at 1, so 0
+doubles as the "no neighbour" marker in the link files.
+"""
+
+import heapq
+import math
+import os
+import random
+import re
+from collections import Counter
+
+import numpy as np
+
+MAX_LEVEL = 8
+BRUTE_FORCE_LIMIT = 10000
+
+_HEADER_CAPACITY, _HEADER_DIM, _HEADER_M, _HEADER_ENTRY, _HEADER_MAX_LEVEL, _HEADER_COUNT = range(6)
+
+
+class HNSWIndex:
+    """HNSW graph (cosine similarity) over one vector column, stored under ``path``.
+
+    The raw vectors are kept next to their norms, so the stored values can be
+    read back unchanged. Removal tombstones a node: it keeps routing searches
+    but is never returned. Writers must be serialized by the caller; readers
+    need no lock and pick up a grown capacity on their next search.
+    """
+
+    def __init__(self, path: str, dim: int, m: int = 16, ef_construction: int = 100, ef_search: int = 64, seed: int | None = None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._rng = random.Random(seed)
+        header_file = os.path.join(path, "header.i64")
+        if not os.path.exists(header_file):
+            header = np.zeros(8, dtype=np.int64)
+            header[_HEADER_CAPACITY], header[_HEADER_DIM], header[_HEADER_M] = 1024, dim, m
+            header.tofile(header_file)
+        self._header = np.memmap(header_file, dtype=np.int64, mode="r+", shape=(8,))
+        if int(self._header[_HEADER_DIM]) != dim:
+            raise ValueError(f"HNSW index at {path} holds {int(self._header[_HEADER_DIM])}-d vectors, got {dim}-d")
+        self.dim = dim
+        self.m = int(self._header[_HEADER_M])
+        self._level_mult = 1 / math.log(self.m)
+        self._capacity = 0
+        self._maps = {}
+        self._map()
+
+    def _map(self):
+        capacity = int(self._header[_HEADER_CAPACITY])
+        files = {
+            "_vectors": ("vectors.f32", np.float32, (capacity, self.dim)),
+            "_norms": ("norms.f32", np.float32, (capacity,)),
+            "_levels": ("levels.i8", np.int8, (capacity,)),
+            "_deleted": ("deleted.u8", np.uint8, (capacity,)),
+            "_links0": ("links0.i32", np.int32, (capacity, 2 * self.m)),
+            "_links": ("links.i32", np.int32, (capacity, MAX_LEVEL, self.m)),
+        }
+        for attr, (name, dtype, shape) in files.items():
+            file = os.path.join(self.path, name)
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(file, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            self._maps[attr] = np.memmap(file, dtype=dtype, mode="r+", shape=shape)
+            # Plain ndarray views over the same pages skip np.memmap's per-indexing overhead.
+            setattr(self, attr, self._maps[attr].view(np.ndarray))
+        self._capacity = capacity
+
+    def _refresh(self):
+        if int(self._header[_HEADER_CAPACITY]) != self._capacity:
+            self._map()
+
+    def _reserve(self, node: int):
+        self._refresh()
+        if node < self._capacity:
+            return
+        self._header[_HEADER_CAPACITY] = max(node + 1, self._capacity * 2)
+        self._map()
+
+    def __len__(self):
+        return int(self._header[_HEADER_COUNT])
+
+    def __contains__(self, node: int):
+        self._refresh()
+        return 0 < node < self._capacity and self._levels[node] > 0 and not self._deleted[node]
+
+    def vector(self, node: int) -> list[float] | None:
+        if node not in self:
+            return None
+        return self._vectors[node].tolist()
+
+    def flush(self):
+        for arr in (*self._maps.values(), self._header):
+            arr.flush()
+
+    def _neighbors(self, node: int, level: int) -> np.ndarray:
+        row = self._links0[node] if level == 0 else self._links[node, level - 1]
+        return row[row > 0]
+
+    def _set_neighbors(self, node: int, level: int, neighbors: list[int]):
+        row = self._links0[node] if level == 0 else self._links[node, level - 1]
+        row[:] = 0
+        row[: len(neighbors)] = neighbors
+
+    def _similarity(self, query: np.ndarray, nodes) -> np.ndarray:
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return (self._vectors[nodes] @ query) / np.maximum(self._norms[nodes], 1e-12)
+
+    def _search_layer(self, query: np.ndarray, entry_points: list[int], ef: int, level: int) -> list[tuple[float, int]]:
+        visited = set(entry_points)
+        sims = self._similarity(query, entry_points).tolist()
+        candidates = [(-s, n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        best = [(s, n) for s, n in zip(sims, entry_points)]
+        heapq.heapify(best)
+        while len(best) > ef:
+            heapq.heappop(best)
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if len(best) >= ef and -neg_sim < best[0][0]:
+                break
+            neighbors = [n for n in self._neighbors(node, level).tolist() if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            for n, s in zip(neighbors, self._similarity(query, neighbors).tolist()):
+                if len(best) < ef or s > best[0][0]:
+                    heapq.heappush(candidates, (-s, n))
+                    heapq.heappush(best, (s, n))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return sorted(best, reverse=True)
+
+    def _select(self, found: list[tuple[float, int]], m: int) -> list[int]:
+        """Neighbour selection heuristic: skip candidates closer to an already selected neighbour than to the query."""
+        if len(found) <= m:
+            return [n for _, n in found]
+        nodes = np.array([n for _, n in found], dtype=np.int64)
+        vecs = self._vectors[nodes] / np.maximum(self._norms[nodes], 1e-12)[:, None]
+        pairwise = vecs @ vecs.T
+        sims = np.array([s for s, _ in found])
+        closest = np.full(len(found), -np.inf)
+        selected = []
+        for i in range(len(found)):
+            if len(selected) >= m:
+                break
+            if closest[i] > sims[i]:
+                continue
+            selected.append(i)
+            closest = np.maximum(closest, pairwise[i])
+        chosen = set(selected)
+        selected += [i for i in range(len(found)) if i not in chosen][: m - len(selected)]
+        return [int(nodes[i]) for i in selected]
+
+    def _connect(self, node: int, neighbor: int, level: int):
+        current = self._neighbors(neighbor, level).tolist()
+        if node in current:
+            return
+        m_max = 2 * self.m if level == 0 else self.m
+        if len(current) < m_max:
+            self._set_neighbors(neighbor, level, current + [node])
+            return
+        base = self._vectors[neighbor] / max(float(self._norms[neighbor]), 1e-12)
+        candidates = current + [node]
+        found = sorted(zip(self._similarity(base, candidates).tolist(), candidates), reverse=True)
+        self._set_neighbors(neighbor, level, self._select(found, m_max))
+
+    def _entry_point(self, query: np.ndarray, level: int) -> list[int]:
+        entry = [int(self._header[_HEADER_ENTRY])]
+        for lc in range(int(self._header[_HEADER_MAX_LEVEL]), level, -1):
+            entry = [self._search_layer(query, entry, 1, lc)[0][1]]
+        return entry
+
+    def add(self, node: int, vector):
+        """Insert ``vector`` as ``node``; a node id is only ever inserted once."""
+        self._reserve(node)
+        vec = np.asarray(vector, dtype=np.float32)
+        if vec.shape != (self.dim,):
+            raise ValueError(f"Expected a {self.dim}-d vector, got shape {vec.shape}")
+        norm = float(np.linalg.norm(vec))
+        self._vectors[node] = vec
+        self._norms[node] = norm
+        self._deleted[node] = 0
+        level = min(int(-math.log(1.0 - self._rng.random()) * self._level_mult), MAX_LEVEL)
+        self._levels[node] = level + 1
+        if self._header[_HEADER_ENTRY] == 0:
+            self._header[_HEADER_ENTRY], self._header[_HEADER_MAX_LEVEL] = node, level
+            self._header[_HEADER_COUNT] += 1
+            return
+        query = vec / max(norm, 1e-12)
+        max_level = int(self._header[_HEADER_MAX_LEVEL])
+        entry = self._entry_point(query, level)
+        for lc in range(min(level, max_level), -1, -1):
+            found = self._search_layer(query, entry, self.ef_construction, lc)
+            neighbors = self._select(found, self.m)
+            self._set_neighbors(node, lc, neighbors)
+            for n in neighbors:
+                self._connect(node, n, lc)
+            entry = [n for _, n in found]
+        if level > max_level:
+            self._header[_HEADER_ENTRY], self._header[_HEADER_MAX_LEVEL] = node, level
+        self._header[_HEADER_COUNT] += 1
+
+    def remove(self, node: int):
+        self._refresh()
+        if 0 < node < self._capacity and self._levels[node] > 0:
+            self._deleted[node] = 1
+
+    def search(self, vector, k: int, allowed: np.ndarray | None = None, ef: int | None = None) -> list[tuple[int, float]]:
+        """Return up to ``k`` ``(node, cosine)`` pairs, best first, optionally restricted to the ``allowed`` nodes.
+
+        A small ``allowed`` set is scored exactly; otherwise the graph is searched
+        with a growing ``ef`` until enough allowed nodes come back.
+        """
+        self._refresh()
+        if k <= 0 or self._header[_HEADER_ENTRY] == 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        if allowed is not None and len(allowed) <= BRUTE_FORCE_LIMIT:
+            return self._exact(query, k, allowed)
+        mask = None
+        if allowed is not None:
+            mask = np.zeros(self._capacity, dtype=bool)
+            allowed = allowed[allowed < self._capacity]
+            mask[allowed] = True
+        total = len(self)
+        ef = max(ef or self.ef_search, k)
+        while True:
+            found = self._search_layer(query, self._entry_point(query, 0), ef, 0)
+            hits = [(n, s) for s, n in found if not self._deleted[n] and (mask is None or mask[n])]
+            if len(hits) >= k or ef >= total:
+                return hits[:k]
+            ef = min(ef * 4, total)
+
+    def _exact(self, query: np.ndarray, k: int, nodes: np.ndarray) -> list[tuple[int, float]]:
+        nodes = np.asarray(nodes, dtype=np.int64)
+        nodes = nodes[(nodes > 0) & (nodes < self._capacity)]
+        nodes = nodes[(self._levels[nodes] > 0) & (self._deleted[nodes] == 0)]
+        if not len(nodes):
+            return []
+        sims = self._similarity(query, nodes)
+        top = np.argsort(-sims, kind="stable")[:k]
+        return [(int(nodes[i]), float(sims[i])) for i in top]
+
+
+"""
+Full text
+"""
+
+_QUERY_TOKEN = re.compile(r'\s*(\(|\)|"[^"]*"(?:~\d+)?|\^[0-9.]+|(?:\\.|[^\s()"^\\])+)')
+_OPERATORS = {"OR", "AND", "||", "&&", "NOT", "+", "-"}
+
+
+def _analyze(text: str) -> list[str]:
+    return [t for t in text.lower().split() if t]
+
+
+def parse_query_string(query: str) -> list[dict[str, float]]:
+    """Split an Elasticsearch ``query_string`` into its top-level clauses.
+
+    Each clause maps its analyzed terms to the product of the boosts around
+    them. Phrases and proximity queries count as their separate terms, and
+    boolean operators are read as the default ``OR``.
+    """
+    tokens = [t for t in _QUERY_TOKEN.findall(query or "") if t]
+    pos = 0
+
+    def group():
+        nonlocal pos
+        nodes = []
+        while pos < len(tokens):
+            tok = tokens[pos]
+            pos += 1
+            if tok == ")":
+                break
+            if tok.startswith("^"):
+                if nodes:
+                    terms, boost = nodes[-1]
+                    nodes[-1] = (terms, boost * float(tok[1:] or 1))
+                continue
+            if tok == "(":
+                nodes.append((group(), 1.0))
+            elif tok.startswith('"'):
+                nodes.append((_analyze(tok[1 : tok.rindex('"')]), 1.0))
+            elif tok not in _OPERATORS:
+                nodes.append((_analyze(re.sub(r"\\(.)", r"\1", tok)), 1.0))
+        return nodes
+
+    def flatten(node, weight, out):
+        items, boost = node
+        for item in items:
+            if isinstance(item, str):
+                out[item] = max(out.get(item, 0.0), weight * boost)
+            else:
+                flatten(item, weight * boost, out)
+        return out
+
+    clauses = [flatten(node, 1.0, {}) for node in group()]
+    return [c for c in clauses if c]
+
+
+def parse_field_boosts(fields: list[str]) -> list[tuple[str, float]]:
+    out = []
+    for f in fields:
+        name, _, boost = f.partition("^")
+        out.append((name, float(boost) if boost else 1.0))
+    return out
+
+
+class InvertedIndex:
+    """BM25 postings kept in the ``postings`` and ``field_stats`` tables of the caller's SQLite database.
+
+    Scoring follows Elasticsearch's ``query_string`` with ``best_fields``: each
+    term takes its best boosted field score, terms add up within a clause and
+    ``minimum_should_match`` counts matching top-level clauses.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, field TEXT NOT NULL, slot INTEGER NOT NULL, tf INTEGER NOT NULL, dl INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS postings_term ON postings(term, field)",
+        "CREATE INDEX IF NOT EXISTS postings_slot ON postings(slot)",
+        "CREATE TABLE IF NOT EXISTS field_stats (field TEXT PRIMARY KEY, docs INTEGER NOT NULL, total_len INTEGER NOT NULL)",
+    )
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    @staticmethod
+    def terms(value) -> list[str]:
+        if isinstance(value, str):
+            return _analyze(value)
+        if isinstance(value, list):
+            # Keyword lists match whole values, like an ES keyword field.
+            return [str(v).strip().lower() for v in value if str(v).strip()]
+        return []
+
+    def add(self, db, slot: int, fields: dict):
+        for field, value in fields.items():
+            terms = self.terms(value)
+            if not terms:
+                continue
+            dl = len(terms)
+            db.executemany("INSERT INTO postings (term, field, slot, tf, dl) VALUES (?, ?, ?, ?, ?)", [(t, field, slot, tf, dl) for t, tf in Counter(terms).items()])
+            db.execute(
+                "INSERT INTO field_stats (field, docs, total_len) VALUES (?, 1, ?) ON CONFLICT(field) DO UPDATE SET docs = docs + 1, total_len = total_len + excluded.total_len",
+                (field, dl),
+            )
+
+    def remove(self, db, slot: int):
+        for field, dl in db.execute("SELECT field, MAX(dl) FROM postings WHERE slot = ? GROUP BY field", (slot,)).fetchall():
+            db.execute("UPDATE field_stats SET docs = docs - 1, total_len = total_len - ? WHERE field = ?", (dl, field))
+        db.execute("DELETE FROM postings WHERE slot = ?", (slot,))
+
+    def score(self, db, clauses: list[dict[str, float]], fields: list[tuple[str, float]], minimum_should_match=0, allowed: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return the matching slots and their scores."""
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        vocab = sorted({t for c in clauses for t in c})
+        if not vocab:
+            return empty
+        term_idx = {t: i for i, t in enumerate(vocab)}
+        keys, values = [], []
+        placeholders = ",".join("?" * len(vocab))
+        for field, boost in fields:
+            stats = db.execute("SELECT docs, total_len FROM field_stats WHERE field = ?", (field,)).fetchone()
+            if not stats or stats[0] <= 0:
+                continue
+            n_docs, avgdl = stats[0], max(stats[1] / stats[0], 1e-9)
+            rows = db.execute(f"SELECT term, slot, tf, dl FROM postings WHERE field = ? AND term IN ({placeholders})", [field, *vocab]).fetchall()
+            if not rows:
+                continue
+            terms = np.array([term_idx[r[0]] for r in rows], dtype=np.int64)
+            slots = np.array([r[1] for r in rows], dtype=np.int64)
+            tf = np.array([r[2] for r in rows], dtype=np.float64)
+            dl = np.array([r[3] for r in rows], dtype=np.float64)
+            df = np.bincount(terms, minlength=len(vocab))
+            idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            s = boost * idf[terms] * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avgdl))
+            if allowed is not None:
+                keep = np.isin(slots, allowed)
+                slots, terms, s = slots[keep], terms[keep], s[keep]
+            keys.append(slots * len(vocab) + terms)
+            values.append(s)
+        if not keys:
+            return empty
+        keys, values = np.concatenate(keys), np.concatenate(values)
+        # Best field per (slot, term).
+        order = np.argsort(keys, kind="stable")
+        keys, values = keys[order], values[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        keys, values = keys[starts], np.maximum.reduceat(values, starts)
+        slots, terms = keys // len(vocab), keys % len(vocab)
+        uniq, inv = np.unique(slots, return_inverse=True)
+        scores = np.zeros(len(uniq))
+        matched = np.zeros(len(uniq), dtype=np.int64)
+        for clause in clauses:
+            weights = np.zeros(len(vocab))
+            for t, w in clause.items():
+                weights[term_idx[t]] = w
+            w = weights[terms]
+            scores += np.bincount(inv, weights=values * w, minlength=len(uniq))
+            matched += np.bincount(inv, weights=(w > 0).astype(np.float64), minlength=len(uniq)) > 0
+        required = self._required(minimum_should_match, len(clauses))
+        keep = matched >= required
+        return uniq[keep], scores[keep]
+
+    @staticmethod
+    def _required(minimum_should_match, n_clauses: int) -> int:
+        msm = minimum_should_match or 0
+        if isinstance(msm, str):
+            msm = msm.strip()
+            msm = float(msm[:-1]) / 100 if msm.endswith("%") else int(msm)
+        if isinstance(msm, float):
+            msm = int(msm * n_clauses) if msm >= 0 else n_clauses - int(-msm * n_clauses)
+        elif msm < 0:
+            msm = n_clauses + msm
+        return max(msm, 1)
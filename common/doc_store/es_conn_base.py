@@ -28,6 +28,15 @@ from elasticsearch.client import IndicesClient
 from common.file_utils import get_project_base_directory
 from common.misc_utils import convert_bytes
 from common.doc_store.doc_store_base import DocStoreConnection, OrderByExpr, MatchExpr
+from common.vector_quantization import (
+    RESCORE_VECTOR_ES_VERSION,
+    es_version,
+    float_vector_field,
+    fold_quantized_vectors,
+    quantized_dynamic_templates,
+    quantized_field_method,
+    supported_quantization_methods,
+)
 from rag.nlp import is_english, rag_tokenizer
 from common import settings
 
@@ -35,6 +44,10 @@ ATTEMPT_TIME = 2
 
 
 class ESConnectionBase(DocStoreConnection):
+    # Vector quantizations the cluster can index, and whether its knn takes rescore_vector.
+    quantization_methods: tuple[str, ...] = ()
+    rescore_vector = False
+
     def __init__(self, mapping_file_name: str = "mapping.json", logger_name: str = "ragflow.es_conn"):
         from common.doc_store.es_conn_pool import ES_CONN
 
@@ -50,6 +63,13 @@ class ESConnectionBase(DocStoreConnection):
             raise Exception(msg)
         with open(fp_mapping, "r") as f:
             self.mapping = json.load(f)
+        version = es_version(ES_CONN.info.get("version", {}).get("number", ""))
+        self.rescore_vector = version >= RESCORE_VECTOR_ES_VERSION
+        if "dynamic_templates" in self.mapping.get("mappings", {}):
+            # Quantized HNSW index options are rejected by older clusters, so their templates are only added when supported.
+            self.quantization_methods = supported_quantization_methods(version)
+            self.mapping["mappings"]["dynamic_templates"] += quantized_dynamic_templates(self.quantization_methods)
+        self._synced_templates = set()
         self.logger.info(f"Elasticsearch {settings.ES['hosts']} is healthy.")
 
     def _connect(self):
@@ -60,6 +80,24 @@ class ESConnectionBase(DocStoreConnection):
         self.es = ES_CONN.refresh_conn()
         return True
 
+    def _async_conn(self):
+        """
+        AsyncElasticsearch client when running on the loop it was opened on, else None.
+        """
+        from common.doc_store.es_conn_pool import ES_CONN
+
+        return ES_CONN.get_async_conn()
+
+    async def open_async(self):
+        from common.doc_store.es_conn_pool import ES_CONN
+
+        ES_CONN.open_async_conn()
+
+    async def close_async(self):
+        from common.doc_store.es_conn_pool import ES_CONN
+
+        await ES_CONN.close_async_conn()
+
     """
     Database operations
     """
@@ -120,12 +158,26 @@ class ESConnectionBase(DocStoreConnection):
     def create_idx(self, index_name: str, dataset_id: str, vector_size: int, parser_id: str = None):
         # parser_id is used by Infinity but not needed for ES (kept for interface compatibility)
         if self.index_exist(index_name, dataset_id):
+            self._sync_dynamic_templates(index_name)
             return True
         try:
             return IndicesClient(self.es).create(index=index_name, settings=self.mapping["settings"], mappings=self.mapping["mappings"])
         except Exception:
             self.logger.exception("ESConnection.createIndex error %s" % index_name)
 
+    def _sync_dynamic_templates(self, index_name: str):
+        """
+        Give an existing index the dynamic templates added since it was created
+        (e.g. the quantized vector fields), once per process.
+        """
+        if index_name in self._synced_templates or "dynamic_templates" not in self.mapping.get("mappings", {}):
+            return
+        try:
+            IndicesClient(self.es).put_mapping(index=index_name, dynamic_templates=self.mapping["mappings"]["dynamic_templates"])
+            self._synced_templates.add(index_name)
+        except Exception:
+            self.logger.exception("ESConnection.put_mapping error %s" % index_name)
+
     def create_doc_meta_idx(self, index_name: str):
         """
         Create a document metadata index.
@@ -232,6 +284,12 @@ class ESConnectionBase(DocStoreConnection):
     CRUD operations
     """
 
+    def _unquantize_unsupported(self, doc: dict) -> dict:
+        # A vector quantization the cluster cannot index is stored as the plain q_<dim>_vec.
+        for k in [k for k in doc if quantized_field_method(k) and quantized_field_method(k) not in self.quantization_methods]:
+            doc[float_vector_field(k)] = doc.pop(k)
+        return doc
+
     def get(self, doc_id: str, index_name: str, dataset_ids: list[str]) -> dict | None:
         for i in range(ATTEMPT_TIME):
             try:
@@ -242,7 +300,7 @@ class ESConnectionBase(DocStoreConnection):
                 )
                 if str(res.get("timed_out", "")).lower() == "true":
                     raise Exception("Es Timeout.")
-                doc = res["_source"]
+                doc = fold_quantized_vectors(res["_source"])
                 doc["id"] = doc_id
                 return doc
             except NotFoundError:
@@ -13,9 +13,10 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
+import asyncio
 import logging
 import time
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 
 from common import settings
 from common.decorator import singleton
@@ -28,6 +29,9 @@ HEALTH_CHECK_BASE_DELAY_SECONDS = 5
 @singleton
 class ElasticSearchConnectionPool:
     def __init__(self):
+        # One AsyncElasticsearch client, bound to the server's long-lived event loop by open_async_conn().
+        self.async_conn = None
+        self.async_loop = None
         if hasattr(settings, "ES"):
             self.ES_CONFIG = settings.ES
         else:
@@ -68,13 +72,16 @@ class ElasticSearchConnectionPool:
             logging.error(msg)
             raise Exception(msg)
 
+    def _client_kwargs(self):
+        return {
+            "hosts": self.ES_CONFIG["hosts"].split(","),
+            "basic_auth": (self.ES_CONFIG["username"], self.ES_CONFIG["password"]) if "username" in self.ES_CONFIG and "password" in self.ES_CONFIG else None,
+            "verify_certs": self.ES_CONFIG.get("verify_certs", False),
+            "timeout": 600,
+        }
+
     def _connect(self):
-        self.es_conn = Elasticsearch(
-            self.ES_CONFIG["hosts"].split(","),
-            basic_auth=(self.ES_CONFIG["username"], self.ES_CONFIG["password"]) if "username" in self.ES_CONFIG and "password" in self.ES_CONFIG else None,
-            verify_certs=self.ES_CONFIG.get("verify_certs", False),
-            timeout=600,
-        )
+        self.es_conn = Elasticsearch(**self._client_kwargs())
         if self.es_conn:
             self.info = self.es_conn.info()
             return True
@@ -83,6 +90,39 @@ class ElasticSearchConnectionPool:
     def get_conn(self):
         return self.es_conn
 
+    def open_async_conn(self):
+        """
+        Create the AsyncElasticsearch client on the running event loop, which
+        must live as long as the server; close_async_conn() closes it on shutdown.
+        """
+        if self.async_conn is not None:
+            return
+        try:
+            self.async_conn = AsyncElasticsearch(**self._client_kwargs())
+        except (ImportError, ValueError) as e:
+            logging.warning("AsyncElasticsearch is unavailable, searching on the thread pool instead: %s", e)
+            return
+        self.async_loop = asyncio.get_running_loop()
+
+    async def close_async_conn(self):
+        conn, self.async_conn, self.async_loop = self.async_conn, None, None
+        if conn is not None:
+            await conn.close()
+
+    def get_async_conn(self):
+        """
+        Return the AsyncElasticsearch client when called on the loop it was
+        opened on, otherwise None. Short-lived loops (asyncio.run) search on the
+        thread pool: a client per loop would keep its loop and connections alive.
+        """
+        if self.async_conn is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return self.async_conn if loop is self.async_loop else None
+
     def refresh_conn(self):
         if self.es_conn.ping():
             return self.es_conn
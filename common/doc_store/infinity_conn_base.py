@@ -25,9 +25,12 @@ from typing import Callable, TypeVar
 
 import infinity
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from infinity.common import ConflictType
 from infinity.errors import ErrorCode
 from infinity.index import IndexInfo, IndexType
+from infinity.remote_thrift.infinity_thrift_rpc.ttypes import LogicType
 
 from common import settings
 from common.doc_store.doc_store_base import DocStoreConnection, MatchExpr, OrderByExpr
@@ -58,6 +61,22 @@ _T = TypeVar("_T")
 # not in the SDK's ErrorCode enum yet, so we keep the literal here.
 _INFINITY_RESOURCE_BUSY_CODE = 9003
 
+# Arrow types for the scalar Infinity column types. Embedding and the other
+# nested types are left to Arrow's inference (lists of floats).
+_ARROW_TYPES = {
+    LogicType.Boolean: pa.bool_(),
+    LogicType.TinyInt: pa.int8(),
+    LogicType.SmallInt: pa.int16(),
+    LogicType.Integer: pa.int32(),
+    LogicType.BigInt: pa.int64(),
+    LogicType.Float: pa.float32(),
+    LogicType.Double: pa.float64(),
+    LogicType.Float16: pa.float32(),
+    LogicType.BFloat16: pa.float32(),
+    LogicType.Varchar: pa.string(),
+    LogicType.Json: pa.string(),
+}
+
 
 def _int_env(name: str, default: int) -> int:
     """Read an int from the environment without crashing on bad input.
@@ -440,11 +459,7 @@ class InfinityConnectionBase(DocStoreConnection):
         return " AND ".join(cond) if cond else "1=1"
 
     @staticmethod
-    def concat_dataframes(df_list: list[pd.DataFrame], select_fields: list[str]) -> pd.DataFrame:
-        df_list2 = [df for df in df_list if not df.empty]
-        if df_list2:
-            return pd.concat(df_list2, axis=0).reset_index(drop=True)
-
+    def result_columns(select_fields: list[str]) -> list[str]:
         schema = []
         for field_name in select_fields:
             if field_name == "score()":  # Workaround: fix schema is changed to score()
@@ -455,7 +470,31 @@ class InfinityConnectionBase(DocStoreConnection):
                 schema.append("row_id")
             else:
                 schema.append(field_name)
-        return pd.DataFrame(columns=schema)
+        return schema
+
+    @staticmethod
+    def concat_dataframes(df_list: list[pd.DataFrame], select_fields: list[str]) -> pd.DataFrame:
+        df_list2 = [df for df in df_list if not df.empty]
+        if df_list2:
+            return pd.concat(df_list2, axis=0).reset_index(drop=True)
+        return pd.DataFrame(columns=InfinityConnectionBase.result_columns(select_fields))
+
+    @staticmethod
+    def query_to_arrow(builder) -> tuple[pa.Table, dict | None]:
+        """
+        Run a query builder and return its rows as an Arrow table, skipping the
+        pandas DataFrame the SDK's to_df()/to_arrow() build on the way.
+        """
+        data, data_types, extra_result = builder.to_result()
+        columns = {name: pa.array(values, type=_ARROW_TYPES.get(data_types[name].logic_type), from_pandas=True) for name, values in data.items()}
+        return pa.table(columns), extra_result
+
+    @staticmethod
+    def concat_tables(tables: list[pa.Table], select_fields: list[str]) -> pa.Table:
+        tables = [table for table in tables if table.num_rows]
+        if tables:
+            return pa.concat_tables(tables, promote_options="permissive")
+        return pa.table({name: pa.array([], type=pa.null()) for name in InfinityConnectionBase.result_columns(select_fields)})
 
     """
     Database operations
@@ -720,7 +759,7 @@ class InfinityConnectionBase(DocStoreConnection):
         dataset_ids: list[str],
         agg_fields: list[str] | None = None,
         rank_feature: dict | None = None,
-    ) -> tuple[pd.DataFrame, int]:
+    ) -> tuple[pa.Table | pd.DataFrame, int]:
         raise NotImplementedError("Not implemented")
 
     @abstractmethod
@@ -763,46 +802,51 @@ class InfinityConnectionBase(DocStoreConnection):
     Helper functions for search result
     """
 
-    def get_total(self, res: tuple[pd.DataFrame, int] | pd.DataFrame) -> int:
+    @staticmethod
+    def result_table(res: tuple[pa.Table, int] | pa.Table | pd.DataFrame) -> pa.Table:
+        """
+        Unwrap a search result to its Arrow table. DataFrames, as still returned
+        by the memory connector, are converted once.
+        """
+        if isinstance(res, tuple):
+            res = res[0]
+        if isinstance(res, pd.DataFrame):
+            return pa.Table.from_pandas(res, preserve_index=False)
+        return res
+
+    def result_column(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame, field_name: str) -> pa.ChunkedArray | None:
+        """
+        Zero-copy accessor for one column of a search result, None if the column was not selected.
+        """
+        table = self.result_table(res)
+        if field_name not in table.column_names:
+            return None
+        return table.column(field_name)
+
+    def get_total(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame) -> int:
         if isinstance(res, tuple):
             return res[1]
         return len(res)
 
-    def get_doc_ids(self, res: tuple[pd.DataFrame, int] | pd.DataFrame) -> list[str]:
-        # Extract DataFrame from result
-        if isinstance(res, tuple):
-            df, count = res
-            if count == 0:
-                return []
-        else:
-            df = res
-        return list(df["id"])
+    def get_doc_ids(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame) -> list[str]:
+        if isinstance(res, tuple) and res[1] == 0:
+            return []
+        column = self.result_column(res, "id")
+        return column.to_pylist() if column is not None else []
 
     @abstractmethod
-    def get_fields(self, res: tuple[pd.DataFrame, int] | pd.DataFrame, fields: list[str]) -> dict[str, dict]:
+    def get_fields(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame, fields: list[str]) -> dict[str, dict]:
         raise NotImplementedError("Not implemented")
 
-    def get_highlight(self, res: tuple[pd.DataFrame, int] | pd.DataFrame, keywords: list[str], field_name: str):
-        # Extract DataFrame from result
-        if isinstance(res, tuple):
-            df, _ = res
-        else:
-            df = res
-
-        if df.empty or field_name not in df.columns:
+    def get_highlight(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame, keywords: list[str], field_name: str):
+        table = self.result_table(res)
+        if table.num_rows == 0 or field_name not in table.column_names:
             return {}
 
         ans = {}
-        num_rows = len(res)
-        column_id = res["id"]
-        if field_name not in res:
-            if field_name == "content_with_weight" and "content" in res:
-                field_name = "content"
-            else:
-                return {}
-        for i in range(num_rows):
-            id = column_id[i]
-            txt = res[field_name][i]
+        for id, txt in zip(table.column("id").to_pylist(), table.column(field_name).to_pylist()):
+            if not txt:
+                continue
             if re.search(r"<em>[^<>]+</em>", txt, flags=re.IGNORECASE | re.MULTILINE):
                 ans[id] = txt
                 continue
@@ -834,48 +878,39 @@ class InfinityConnectionBase(DocStoreConnection):
                 ans[id] = txt
         return ans
 
-    def get_aggregation(self, res: tuple[pd.DataFrame, int] | pd.DataFrame, field_name: str):
+    def get_aggregation(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame, field_name: str):
         """
-        Manual aggregation for tag fields since Infinity doesn't provide native aggregation
+        Manual aggregation for tag fields since Infinity doesn't provide native aggregation.
+        The counting runs on the Arrow column, without materializing rows.
         """
-        from collections import Counter
+        column = self.result_column(res, field_name)
+        if column is None or len(column) == 0:
+            return []
 
-        # Extract DataFrame from result
-        if isinstance(res, tuple):
-            df, _ = res
+        if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+            tags = pc.list_flatten(column)
+            if not pa.types.is_string(tags.type):
+                return []
+        elif pa.types.is_string(column.type):
+            values = pc.drop_null(column)
+            # Split by ### for tag_kwd field or comma for other formats
+            tags = pc.split_pattern(values, ",")
+            if field_name == "tag_kwd":
+                tags = pc.if_else(pc.match_substring(values, "###"), pc.split_pattern(values, "###"), tags)
+            tags = pc.list_flatten(tags)
         else:
-            df = res
-
-        if df.empty or field_name not in df.columns:
             return []
 
-        # Aggregate tag counts
-        tag_counter = Counter()
-
-        for value in df[field_name]:
-            if pd.isna(value) or not value:
-                continue
-
-            # Handle different tag formats
-            if isinstance(value, str):
-                # Split by ### for tag_kwd field or comma for other formats
-                if field_name == "tag_kwd" and "###" in value:
-                    tags = [tag.strip() for tag in value.split("###") if tag.strip()]
-                else:
-                    # Try comma separation as fallback
-                    tags = [tag.strip() for tag in value.split(",") if tag.strip()]
-
-                for tag in tags:
-                    if tag:  # Only count non-empty tags
-                        tag_counter[tag] += 1
-            elif isinstance(value, list):
-                # Handle list format
-                for tag in value:
-                    if tag and isinstance(tag, str):
-                        tag_counter[tag.strip()] += 1
-
+        tags = pc.utf8_trim_whitespace(pc.drop_null(tags))
+        tags = pc.filter(tags, pc.not_equal(tags, ""))
+        if len(tags) == 0:
+            return []
+        counts = pc.value_counts(tags)
+        # Sorting is stable, so ties keep their first-seen order like Counter.most_common().
+        order = pc.array_sort_indices(counts.field("counts"), order="descending")
+        counts = counts.take(order)
         # Return as list of [tag, count] pairs, sorted by count descending
-        return [[tag, count] for tag, count in tag_counter.most_common()]
+        return [[tag, count] for tag, count in zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist())]
 
     """
     SQL
@@ -15,8 +15,11 @@
 #
 
 import asyncio
+import json
 import logging
+import os
 import threading
+import time
 import weakref
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError as FuturesTimeoutError
@@ -32,9 +35,18 @@ from mcp.client.sse import sse_client
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.types import CallToolResult, ListToolsResult, TextContent, Tool
 
-MCPTaskType = Literal["list_tools", "tool_call"]
+MCPTaskType = Literal["list_tools", "tool_call", "ping"]
 MCPTask = tuple[MCPTaskType, dict[str, Any], asyncio.Queue[Any]]
 
+# Requests a session runs against its server at the same time.
+MCP_SESSION_MAX_CONCURRENCY = int(os.environ.get("MCP_SESSION_MAX_CONCURRENCY", 4))
+# Pooled sessions unused for this long are closed.
+MCP_SESSION_IDLE_TTL = float(os.environ.get("MCP_SESSION_IDLE_TTL", 600))
+# Pooled sessions unused for this long are pinged before being handed out again.
+MCP_SESSION_HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_SESSION_HEALTH_CHECK_INTERVAL", 30))
+# How long a server's tool list is served from cache.
+MCP_TOOLS_CACHE_TTL = float(os.environ.get("MCP_TOOLS_CACHE_TTL", 60))
+
 
 class ToolCallSession(Protocol):
     def tool_call(self, name: str, arguments: dict[str, Any], timeout: float | int = 10) -> str: ...
@@ -49,7 +61,7 @@ class MCPToolBinding:
 class MCPToolCallSession(ToolCallSession):
     _ALL_INSTANCES: weakref.WeakSet["MCPToolCallSession"] = weakref.WeakSet()
 
-    def __init__(self, mcp_server: Any, server_variables: dict[str, Any] | None = None, custom_header=None) -> None:
+    def __init__(self, mcp_server: Any, server_variables: dict[str, Any] | None = None, custom_header=None, max_concurrency: int = MCP_SESSION_MAX_CONCURRENCY) -> None:
         self.__class__._ALL_INSTANCES.add(self)
 
         self._custom_header = custom_header
@@ -57,12 +69,36 @@ class MCPToolCallSession(ToolCallSession):
         self._server_variables = server_variables or {}
         self._queue = asyncio.Queue()
         self._close = False
+        self._error: str | None = None
+        self._max_concurrency = max(1, max_concurrency)
+
+        self._usage_lock = threading.Lock()
+        self._inflight = 0
+        self._last_used = time.monotonic()
 
         self._event_loop = asyncio.new_event_loop()
         self._thread_pool = ThreadPoolExecutor(max_workers=1)
         self._thread_pool.submit(self._event_loop.run_forever)
 
-        asyncio.run_coroutine_threadsafe(self._mcp_server_loop(), self._event_loop)
+        self._server_loop = asyncio.run_coroutine_threadsafe(self._mcp_server_loop(), self._event_loop)
+
+    def healthy(self) -> bool:
+        """Whether the session can still serve requests: open, connected without error and its loop running."""
+        return not self._close and self._error is None and not self._server_loop.done() and self._event_loop.is_running()
+
+    def idle_seconds(self) -> float:
+        with self._usage_lock:
+            return 0.0 if self._inflight else time.monotonic() - self._last_used
+
+    def _begin_use(self) -> None:
+        with self._usage_lock:
+            self._inflight += 1
+            self._last_used = time.monotonic()
+
+    def _end_use(self) -> None:
+        with self._usage_lock:
+            self._inflight -= 1
+            self._last_used = time.monotonic()
 
     async def _mcp_server_loop(self) -> None:
         url = self._mcp_server.url.strip()
@@ -126,6 +162,11 @@ class MCPToolCallSession(ToolCallSession):
             await self._process_mcp_tasks(None, f"Unsupported MCP server type: {self._mcp_server.server_type}, id: {self._mcp_server.id}")
 
     async def _process_mcp_tasks(self, client_session: ClientSession | None, error_message: str | None = None) -> None:
+        if error_message:
+            self._error = error_message
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        running: set[asyncio.Task] = set()
+
         while not self._close:
             try:
                 mcp_task, arguments, result_queue = await asyncio.wait_for(self._queue.get(), timeout=1)
@@ -136,8 +177,6 @@ class MCPToolCallSession(ToolCallSession):
 
             logging.debug(f"Got MCP task {mcp_task} arguments {arguments}")
 
-            r: Any = None
-
             if not client_session or error_message:
                 r = ValueError(error_message)
                 try:
@@ -146,22 +185,31 @@ class MCPToolCallSession(ToolCallSession):
                     break
                 continue
 
+            try:
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                break
+            task = asyncio.create_task(self._run_mcp_task(client_session, mcp_task, arguments, result_queue, semaphore))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+    async def _run_mcp_task(self, client_session: ClientSession, mcp_task: MCPTaskType, arguments: dict[str, Any], result_queue: asyncio.Queue, semaphore: asyncio.Semaphore) -> None:
+        r: Any = None
+        try:
             try:
                 if mcp_task == "list_tools":
                     r = await client_session.list_tools()
                 elif mcp_task == "tool_call":
                     r = await client_session.call_tool(**arguments)
+                elif mcp_task == "ping":
+                    r = await client_session.send_ping()
                 else:
                     r = ValueError(f"Unknown MCP task {mcp_task}")
             except Exception as e:
                 r = e
-            except asyncio.CancelledError:
-                break
-
-            try:
-                await result_queue.put(r)
-            except asyncio.CancelledError:
-                break
+            await result_queue.put(r)
+        finally:
+            semaphore.release()
 
     async def _call_mcp_server(self, task_type: MCPTaskType, request_timeout: float | int = 8, **kwargs) -> Any:
         if self._close:
@@ -205,6 +253,7 @@ class MCPToolCallSession(ToolCallSession):
         if self._close:
             raise ValueError("Session is closed")
 
+        self._begin_use()
         future = asyncio.run_coroutine_threadsafe(self._get_tools_from_mcp_server(request_timeout=timeout), self._event_loop)
         try:
             return future.result(timeout=timeout)
@@ -215,12 +264,27 @@ class MCPToolCallSession(ToolCallSession):
         except Exception:
             logging.exception(f"Error fetching tools from MCP server: {self._mcp_server.id}")
             raise
+        finally:
+            self._end_use()
+
+    def ping(self, timeout: float | int = 3) -> bool:
+        if not self.healthy():
+            return False
+
+        future = asyncio.run_coroutine_threadsafe(self._call_mcp_server("ping", request_timeout=timeout), self._event_loop)
+        try:
+            future.result(timeout=timeout)
+            return True
+        except Exception as e:
+            logging.warning(f"Ping to MCP server {self._mcp_server.id} failed: {e}")
+            return False
 
     @override
     def tool_call(self, name: str, arguments: dict[str, Any], timeout: float | int = 10) -> str:
         if self._close:
             return "Error: Session is closed"
 
+        self._begin_use()
         future = asyncio.run_coroutine_threadsafe(
             self._call_mcp_tool(name, arguments, request_timeout=timeout),
             self._event_loop,
@@ -233,6 +297,8 @@ class MCPToolCallSession(ToolCallSession):
         except Exception as e:
             logging.exception(f"Error calling tool '{name}' on MCP server: {self._mcp_server.id}")
             return f"Error calling tool '{name}': {e}."
+        finally:
+            self._end_use()
 
     async def close(self) -> None:
         if self._close:
@@ -261,9 +327,22 @@ class MCPToolCallSession(ToolCallSession):
             self._thread_pool.shutdown(wait=True)
         except Exception:
             pass
+        self._close_event_loop()
 
         self.__class__._ALL_INSTANCES.discard(self)
 
+    def _close_event_loop(self) -> None:
+        # Only possible once run_forever returned, i.e. not from inside the loop itself.
+        loop = self._event_loop
+        if loop.is_running() or loop.is_closed():
+            return
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending, timeout=2))
+        loop.close()
+
     def close_sync(self, timeout: float | int = 5) -> None:
         if not self._event_loop.is_running():
             logging.warning(f"Event loop already stopped for {self._mcp_server.id}")
@@ -273,6 +352,8 @@ class MCPToolCallSession(ToolCallSession):
             future = asyncio.run_coroutine_threadsafe(self.close(), self._event_loop)
             try:
                 future.result(timeout=timeout)
+                self._thread_pool.shutdown(wait=True)
+                self._close_event_loop()
             except FuturesTimeoutError:
                 logging.error(f"Timeout while closing session for server {self._mcp_server.id} (timeout={timeout})")
             except Exception:
@@ -308,8 +389,165 @@ def close_multiple_mcp_toolcall_sessions(sessions: list[MCPToolCallSession]) ->
     logging.info(f"{len(sessions)} MCP sessions has been cleaned up. {len(list(MCPToolCallSession._ALL_INSTANCES))} in global context.")
 
 
+class MCPSessionPool:
+    """
+    Process-wide pool of MCPToolCallSession, so that agent turns and tool
+    listings reuse an initialized session instead of paying the thread, event
+    loop and MCP handshake every time.
+
+    Sessions are keyed by server, url, transport, headers, variables and custom
+    headers; the tool catalog cached in the server variables is not part of the
+    key. A session is replaced when it is found unhealthy, pinged before reuse
+    once it has been idle for `health_check_interval`, and closed by a reaper
+    thread after `idle_ttl` without use. `list_tools` results are cached for
+    `tools_ttl`.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = MCP_SESSION_IDLE_TTL,
+        tools_ttl: float = MCP_TOOLS_CACHE_TTL,
+        health_check_interval: float = MCP_SESSION_HEALTH_CHECK_INTERVAL,
+        max_concurrency: int = MCP_SESSION_MAX_CONCURRENCY,
+    ) -> None:
+        self.idle_ttl = idle_ttl
+        self.tools_ttl = tools_ttl
+        self.health_check_interval = health_check_interval
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._sessions: dict[tuple, MCPToolCallSession] = {}
+        self._tools: dict[tuple, tuple[float, list[Tool]]] = {}
+        self._reaper: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def session_key(mcp_server: Any, server_variables: dict[str, Any] | None = None, custom_header=None) -> tuple:
+        variables = {k: v for k, v in (server_variables or {}).items() if k != "tools"}
+        return (
+            mcp_server.id,
+            (mcp_server.url or "").strip(),
+            str(mcp_server.server_type),
+            json.dumps(mcp_server.headers or {}, sort_keys=True, default=str),
+            json.dumps(variables, sort_keys=True, default=str),
+            json.dumps(custom_header or {}, sort_keys=True, default=str),
+        )
+
+    def session(self, mcp_server: Any, server_variables: dict[str, Any] | None = None, custom_header=None) -> "PooledMCPToolCallSession":
+        return PooledMCPToolCallSession(self, mcp_server, server_variables, custom_header)
+
+    def get(self, mcp_server: Any, server_variables: dict[str, Any] | None = None, custom_header=None) -> MCPToolCallSession:
+        key = self.session_key(mcp_server, server_variables, custom_header)
+        stale = []
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and not session.healthy():
+                stale.append(self._sessions.pop(key))
+                session = None
+            if session is None:
+                session = self._open(key, mcp_server, server_variables, custom_header)
+                check = False
+            else:
+                check = session.idle_seconds() > self.health_check_interval
+
+        if check and not session.ping():
+            with self._lock:
+                if self._sessions.get(key) is session:
+                    stale.append(self._sessions.pop(key))
+                session = self._sessions.get(key) or self._open(key, mcp_server, server_variables, custom_header)
+        self._close_sessions(stale)
+        return session
+
+    def list_tools(self, mcp_server: Any, server_variables: dict[str, Any] | None = None, timeout: float | int = 10) -> list[Tool]:
+        key = self.session_key(mcp_server, server_variables)
+        with self._lock:
+            cached = self._tools.get(key)
+        if cached and time.monotonic() - cached[0] < self.tools_ttl:
+            return list(cached[1])
+
+        tools = self.get(mcp_server, server_variables).get_tools(timeout)
+        with self._lock:
+            self._tools[key] = (time.monotonic(), list(tools))
+        return tools
+
+    def invalidate(self, server_id: str) -> None:
+        """Drop the sessions and cached tools of a server, e.g. after it was edited or deleted. Does not block on closing."""
+        with self._lock:
+            stale = [self._sessions.pop(key) for key in [k for k in self._sessions if k[0] == server_id]]
+            for key in [k for k in self._tools if k[0] == server_id]:
+                self._tools.pop(key)
+        if stale:
+            threading.Thread(target=self._close_sessions, args=(stale,), name="mcp-session-close", daemon=True).start()
+
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            keys = [k for k, session in self._sessions.items() if not session.healthy() or session.idle_seconds() > self.idle_ttl]
+            stale = [self._sessions.pop(key) for key in keys]
+            self._tools = {k: v for k, v in self._tools.items() if now - v[0] < self.tools_ttl}
+        self._close_sessions(stale)
+        return len(stale)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        with self._lock:
+            stale = list(self._sessions.values())
+            self._sessions.clear()
+            self._tools.clear()
+        self._close_sessions(stale)
+
+    def _open(self, key: tuple, mcp_server: Any, server_variables: dict[str, Any] | None, custom_header) -> MCPToolCallSession:
+        session = MCPToolCallSession(mcp_server, server_variables, custom_header, max_concurrency=self.max_concurrency)
+        self._sessions[key] = session
+        if self._reaper is None or not self._reaper.is_alive():
+            self._stop.clear()
+            self._reaper = threading.Thread(target=self._reap, name="mcp-session-reaper", daemon=True)
+            self._reaper.start()
+        return session
+
+    def _reap(self) -> None:
+        while not self._stop.wait(max(1.0, min(self.idle_ttl, self.tools_ttl) / 2)):
+            try:
+                evicted = self.evict_idle()
+                if evicted:
+                    logging.info(f"Closed {evicted} idle MCP sessions, {len(self._sessions)} pooled.")
+            except Exception:
+                logging.exception("Error evicting idle MCP sessions")
+
+    @staticmethod
+    def _close_sessions(sessions: list[MCPToolCallSession]) -> None:
+        for session in sessions:
+            try:
+                session.close_sync(timeout=3)
+            except Exception:
+                logging.exception("Error closing MCP session for server %s", session._mcp_server.id)
+
+
+class PooledMCPToolCallSession(ToolCallSession):
+    """
+    What agents bind their MCP tools to: every call goes through the pool, so
+    a session evicted or broken between two calls is replaced transparently.
+    Closing it is a no-op; the pool owns the underlying sessions.
+    """
+
+    def __init__(self, pool: MCPSessionPool, mcp_server: Any, server_variables: dict[str, Any] | None = None, custom_header=None) -> None:
+        self._pool = pool
+        self._mcp_server = mcp_server
+        self._server_variables = server_variables or {}
+        self._custom_header = custom_header
+
+    def tool_call(self, name: str, arguments: dict[str, Any], timeout: float | int = 10) -> str:
+        return self._pool.get(self._mcp_server, self._server_variables, self._custom_header).tool_call(name, arguments, timeout)
+
+    def get_tools(self, timeout: float | int = 10) -> list[Tool]:
+        return self._pool.get(self._mcp_server, self._server_variables, self._custom_header).get_tools(timeout)
+
+
+MCP_SESSION_POOL = MCPSessionPool()
+
+
 def shutdown_all_mcp_sessions():
     """Gracefully shutdown all active MCPToolCallSession instances."""
+    MCP_SESSION_POOL.shutdown()
     sessions = list(MCPToolCallSession._ALL_INSTANCES)
     if not sessions:
         logging.info("No MCPToolCallSession instances to close.")
@@ -420,6 +420,10 @@ def init_settings():
         from rag.utils import serenedb_conn
 
         docStoreConn = serenedb_conn.SereneDBConnection()
+    elif lower_case_doc_engine == "embedded":
+        from rag.utils import embedded_conn
+
+        docStoreConn = embedded_conn.EmbeddedConnection()
     else:
         raise Exception(f"Not supported doc engine: {DOC_ENGINE}")
 
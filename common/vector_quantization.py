@@ -0,0 +1,167 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Natively quantized vector fields for knowledge bases that opt in through
+``parser_config["vector_quantization"]`` (Elasticsearch only).
+
+Chunks of such knowledge bases keep their embedding in ``q_<dim>_int8_vec``
+(``int8_hnsw``) or ``q_<dim>_bbq_vec`` (``bbq_hnsw``) instead of
+``q_<dim>_vec``. The HNSW graph of these fields holds one byte or one bit per
+dimension; Elasticsearch keeps the float vectors beside the graph and rescores
+the oversampled ANN candidates against them. The ES connector reads the fields
+back as ``q_<dim>_vec`` and searches them together with it.
+"""
+
+import os
+import re
+
+import numpy as np
+
+VECTOR_QUANTIZATION_METHODS = ("int8", "binary")
+# Field suffix, ES index_options type and the first ES version that supports it.
+_QUANTIZED_INDEX = {"int8": ("int8", "int8_hnsw", (8, 12)), "binary": ("bbq", "bbq_hnsw", (8, 18))}
+_QUANTIZED_FIELD = re.compile(r"^q_(\d+)_(int8|bbq)_vec$")
+# Doc engines that can store the quantized vector fields.
+QUANTIZATION_DOC_ENGINES = ("elasticsearch",)
+# Vector sizes with a dynamic template, as for the float q_<dim>_vec fields in conf/mapping.json.
+QUANTIZED_VECTOR_DIMS = (512, 768, 1024, 1536)
+# ANN candidates per requested hit that Elasticsearch rescores with the float vectors.
+QUANTIZATION_OVERSAMPLE = max(1, int(os.environ.get("VECTOR_QUANTIZATION_OVERSAMPLE", 4)))
+RESCORE_VECTOR_ES_VERSION = (8, 18)
+
+
+def quantization_method(parser_config: dict | None, doc_engine: str) -> str | None:
+    """The quantization a knowledge base asks for, or None when the doc engine cannot store it."""
+    if doc_engine.lower() not in QUANTIZATION_DOC_ENGINES:
+        return None
+    method = (parser_config or {}).get("vector_quantization")
+    return method if method in VECTOR_QUANTIZATION_METHODS else None
+
+
+def es_version(number: str) -> tuple[int, int]:
+    """(major, minor) of an Elasticsearch version string, (0, 0) if unparsable."""
+    m = re.match(r"(\d+)\.(\d+)", number or "")
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
+
+def supported_quantization_methods(version: tuple[int, int]) -> tuple[str, ...]:
+    return tuple(method for method, (_, _, since) in _QUANTIZED_INDEX.items() if version >= since)
+
+
+def quantized_vector_field(dim: int, method: str) -> str:
+    return f"q_{dim}_{_QUANTIZED_INDEX[method][0]}_vec"
+
+
+def quantized_vector_fields(field: str, methods=VECTOR_QUANTIZATION_METHODS) -> list[str]:
+    """The quantized variants of a ``q_<dim>_vec`` field, [] for any other field."""
+    m = re.match(r"^q_(\d+)_vec$", field)
+    return [quantized_vector_field(int(m.group(1)), method) for method in methods] if m else []
+
+
+def float_vector_field(field: str) -> str | None:
+    """``q_<dim>_vec`` for a quantized vector field, None for any other field."""
+    m = _QUANTIZED_FIELD.match(field)
+    return f"q_{m.group(1)}_vec" if m else None
+
+
+def quantized_field_method(field: str) -> str | None:
+    """The quantization stored in a quantized vector field, None for any other field."""
+    m = _QUANTIZED_FIELD.match(field)
+    return next(method for method, (suffix, _, _) in _QUANTIZED_INDEX.items() if suffix == m.group(2)) if m else None
+
+
+def vector_field_variants(field: str) -> list[str]:
+    """The other vector fields of the same size as a plain or quantized vector field."""
+    base = float_vector_field(field) or field
+    return [f for f in [base] + quantized_vector_fields(base) if f != field] if re.match(r"^q_\d+_vec$", base) else []
+
+
+def fold_quantized_vectors(doc: dict) -> dict:
+    """Rename the quantized vector fields of a stored chunk back to ``q_<dim>_vec`` in place."""
+    for k in [k for k in doc if _QUANTIZED_FIELD.match(k)]:
+        doc.setdefault(float_vector_field(k), doc.pop(k))
+    return doc
+
+
+def quantized_dynamic_templates(methods) -> list[dict]:
+    """Dynamic templates mapping the quantized fields as float dense_vectors with a quantized HNSW index."""
+    templates = []
+    for method in methods:
+        suffix, index_type, _ = _QUANTIZED_INDEX[method]
+        for dim in QUANTIZED_VECTOR_DIMS:
+            templates.append(
+                {
+                    "dense_vector": {
+                        "match": f"*_{dim}_{suffix}_vec",
+                        "mapping": {"type": "dense_vector", "index": True, "similarity": "cosine", "dims": dim, "index_options": {"type": index_type}},
+                    }
+                }
+            )
+    return templates
+
+
+def move_to_quantized_fields(docs: list[dict], method: str | None) -> None:
+    """Move each chunk's ``q_<dim>_vec`` to its quantized field in place."""
+    if not method:
+        return
+    for d in docs:
+        for k in [k for k in d if re.match(r"^q_\d+_vec$", k)]:
+            vector = d.pop(k)
+            d[quantized_vector_field(len(vector), method)] = vector
+
+
+def quantize_vectors(vectors, method: str) -> np.ndarray:
+    """
+    Approximate the codes of the quantized index, one int8 row per vector.
+
+    int8 scales each unit-normalized vector to [-127, 127]; binary keeps the
+    sign of each dimension as +1/-1. Both codes are compared with cosine.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if method == "binary":
+        return np.where(vectors >= 0, 1, -1).astype(np.int8)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.clip(np.rint(vectors / norms * 127), -127, 127).astype(np.int8)
+
+
+def quantized_recall(vectors, queries, method: str, k: int = 10, oversample: int = QUANTIZATION_OVERSAMPLE) -> float:
+    """
+    Recall@k of the quantized path (top ``k * oversample`` by code cosine,
+    rescored with the float vectors) against the exact float search, by brute
+    force. Run it on a sample of a knowledge base's vectors and queries to see
+    what a quantization setting costs before enabling it.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    k = min(k, len(vectors))
+    if not k or not len(queries):
+        return 1.0
+
+    def unit(x):
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return x / norms
+
+    exact = unit(queries) @ unit(vectors).T
+    approx = unit(quantize_vectors(queries, method).astype(np.float32)) @ unit(quantize_vectors(vectors, method).astype(np.float32)).T
+    hits = 0
+    for row in range(len(queries)):
+        truth = np.argsort(-exact[row], kind="stable")[:k]
+        candidates = np.argsort(-approx[row], kind="stable")[: k * oversample]
+        rescored = candidates[np.argsort(-exact[row][candidates], kind="stable")[:k]]
+        hits += len(np.intersect1d(truth, rescored))
+    return hits / (k * len(queries))
@@ -12,12 +12,15 @@
 #
 
 import logging
+import os
 import re
 import sys
+from bisect import bisect_right
 from io import BytesIO
 
 import pandas as pd
 from openpyxl import Workbook, load_workbook
+from openpyxl.worksheet.cell_range import CellRange
 
 from rag.nlp import find_codec
 from rag.utils.lazy_image import LazyImage
@@ -25,6 +28,101 @@ from rag.utils.lazy_image import LazyImage
 # copied from `/openpyxl/cell/cell.py`
 ILLEGAL_CHARACTERS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
 
+# Workbooks with a sheet taller than this are read row by row (openpyxl
+# read-only mode) instead of being loaded into memory as a whole.
+EXCEL_STREAMING_MIN_ROWS = int(os.environ.get("EXCEL_STREAMING_MIN_ROWS", "10000"))
+_MERGE_CELLS_RE = re.compile(rb"<(?:\w+:)?mergeCells[\s>]")
+_MERGE_CELL_REF_RE = re.compile(rb"<(?:\w+:)?mergeCell\s[^>]*?\bref=\"([^\"]+)\"")
+
+
+class _CellValue:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _MergedCells:
+    __slots__ = ("ranges",)
+
+    def __init__(self, ranges):
+        self.ranges = ranges
+
+
+class StreamingSheet:
+    """Row-by-row view of a read-only worksheet.
+
+    Exposes the small part of the Worksheet API the header heuristics use
+    (``title``, ``merged_cells.ranges`` and ``cell(row, column).value``).
+    Only the rows seen so far and the top-left cells of merged ranges are
+    kept, so memory does not grow with the sheet size.
+    """
+
+    def __init__(self, ws):
+        self._ws = ws
+        self.title = ws.title
+        self.merged_cells = _MergedCells(RAGFlowExcelParser._read_merged_ranges(ws))
+        self._anchors = {(rng.min_row, rng.min_col): None for rng in self.merged_cells.ranges}
+        self._band_rows, self._bands = self._row_bands(self.merged_cells.ranges)
+        self._seen = {}
+
+    @staticmethod
+    def _row_bands(ranges):
+        """Index merged ranges by row: the first rows of the bands of rows
+        covered by the same ranges, and per band the start columns and the
+        ranges sorted by them (merged ranges never overlap)."""
+        events = {}
+        for rng in ranges:
+            events.setdefault(rng.min_row, ([], []))[0].append(rng)
+            events.setdefault(rng.max_row + 1, ([], []))[1].append(rng)
+        active = {}
+        band_rows, bands = [], []
+        for row in sorted(events):
+            opened, closed = events[row]
+            for rng in closed:
+                active.pop((rng.min_row, rng.min_col), None)
+            for rng in opened:
+                active[(rng.min_row, rng.min_col)] = rng
+            band = sorted(active.values(), key=lambda r: r.min_col)
+            band_rows.append(row)
+            bands.append(([rng.min_col for rng in band], band))
+        return band_rows, bands
+
+    def iter_rows(self, keep_rows=0):
+        """Yield (row_number, values) pairs; the first *keep_rows* rows stay addressable via cell()."""
+        for row_num, values in enumerate(self._ws.iter_rows(values_only=True), 1):
+            if row_num <= keep_rows:
+                self._seen[row_num] = values
+            if self._anchors:
+                for col_num, v in enumerate(values, 1):
+                    if (row_num, col_num) in self._anchors:
+                        self._anchors[(row_num, col_num)] = v
+            yield row_num, values
+
+    @staticmethod
+    def as_cells(values):
+        """Wrap a row of values as cell-like objects for code written against Worksheet rows."""
+        return tuple(_CellValue(v) for v in values)
+
+    def cell(self, row, column):
+        if (row, column) in self._anchors:
+            return _CellValue(self._anchors[(row, column)])
+        values = self._seen.get(row)
+        if values is not None and column <= len(values):
+            return _CellValue(values[column - 1])
+        return _CellValue(None)
+
+    def merged_value(self, row, col):
+        """Value of the merged range covering (row, col), or None."""
+        b = bisect_right(self._band_rows, row) - 1
+        if b < 0:
+            return None
+        cols, band = self._bands[b]
+        i = bisect_right(cols, col) - 1
+        if i < 0 or col > band[i].max_col:
+            return None
+        return self._anchors.get((band[i].min_row, band[i].min_col))
+
 
 class RAGFlowExcelParser:
     @staticmethod
@@ -65,6 +163,79 @@ class RAGFlowExcelParser:
             except Exception as e_pandas:
                 raise Exception(f"pandas.read_excel error: {e_pandas}, original openpyxl error: {e}")
 
+    @staticmethod
+    def _load_streaming_workbook(file_like_object, min_rows=None):
+        """Open an .xlsx workbook in read-only mode when it is large enough to stream.
+
+        Returns None when the file is not an .xlsx (zip) workbook, cannot be
+        read in read-only mode, or every sheet has at most *min_rows* rows;
+        callers then fall back to _load_excel_to_workbook.
+        """
+        min_rows = EXCEL_STREAMING_MIN_ROWS if min_rows is None else min_rows
+        if isinstance(file_like_object, bytes):
+            file_like_object = BytesIO(file_like_object)
+        if isinstance(file_like_object, str):
+            with open(file_like_object, "rb") as f:
+                file_head = f.read(4)
+        else:
+            file_like_object.seek(0)
+            file_head = file_like_object.read(4)
+            file_like_object.seek(0)
+        if not file_head.startswith(b"PK\x03\x04"):
+            return None
+
+        try:
+            wb = load_workbook(file_like_object, read_only=True, data_only=True)
+        except Exception as e:
+            logging.info(f"openpyxl read-only load error: {e}, load the whole workbook instead")
+            if not isinstance(file_like_object, str):
+                file_like_object.seek(0)
+            return None
+
+        # Sheets without a <dimension> record report max_row None: their size is unknown, so stream them.
+        if any(ws.max_row is None or ws.max_row > min_rows for ws in wb.worksheets):
+            return wb
+        wb.close()
+        if not isinstance(file_like_object, str):
+            file_like_object.seek(0)
+        return None
+
+    @staticmethod
+    def _read_merged_ranges(ws):
+        """Merged ranges of a read-only worksheet.
+
+        <mergeCells> follows <sheetData> in the sheet XML, so the cell data is
+        skipped with a byte search instead of being parsed; cell text is XML
+        escaped and cannot contain the tag.
+        """
+        src = ws._get_source()
+        try:
+            tail = b""
+            while True:
+                block = src.read(1 << 20)
+                if not block:
+                    return []
+                tail = tail[-32:] + block
+                m = _MERGE_CELLS_RE.search(tail)
+                if m:
+                    tail = tail[m.start() :] + src.read()
+                    break
+        finally:
+            src.close()
+        return [CellRange(ref.decode()) for ref in _MERGE_CELL_REF_RE.findall(tail)]
+
+    @staticmethod
+    def _streaming_row_count(wb):
+        """Row count up to the last non-empty row, summed over sheets, without loading them."""
+        total = 0
+        for ws in wb.worksheets:
+            last_data_row = 0
+            for row_num, values in enumerate(ws.iter_rows(values_only=True), 1):
+                if any(v is not None and str(v).strip() for v in values):
+                    last_data_row = row_num
+            total += last_data_row
+        return total
+
     @staticmethod
     def _clean_dataframe(df: pd.DataFrame):
         def clean_string(s):
@@ -299,6 +470,13 @@ class RAGFlowExcelParser:
     @staticmethod
     def row_number(fnm, binary):
         if fnm.split(".")[-1].lower().find("xls") >= 0:
+            stream_wb = RAGFlowExcelParser._load_streaming_workbook(BytesIO(binary))
+            if stream_wb is not None:
+                try:
+                    return RAGFlowExcelParser._streaming_row_count(stream_wb)
+                finally:
+                    stream_wb.close()
+
             wb = RAGFlowExcelParser._load_excel_to_workbook(BytesIO(binary))
             total = 0
 
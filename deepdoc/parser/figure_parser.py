@@ -15,7 +15,10 @@
 #
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import os
 
+import numpy as np
+import xxhash
 from PIL import Image
 
 from common.constants import LLMType
@@ -26,6 +29,126 @@ from rag.app.picture import vision_llm_chunk as picture_vision_llm_chunk
 from rag.prompts.generator import vision_llm_figure_describe_prompt, vision_llm_figure_describe_prompt_with_context
 from rag.nlp import append_context2table_image4pdf
 from rag.utils.lazy_image import ensure_pil_image, open_image_for_processing, is_image_like
+from rag.utils.redis_conn import REDIS_CONN
+
+# Figures smaller than this on either side, or whose grayscale entropy (bits) is
+# below the threshold (blank areas, rules, solid fills), are not sent to the vision model.
+FIGURE_MIN_SIDE = int(os.environ.get("VISION_FIGURE_MIN_SIDE", "32"))
+FIGURE_MIN_ENTROPY = float(os.environ.get("VISION_FIGURE_MIN_ENTROPY", "1.0"))
+FIGURE_DESCRIPTION_CACHE_TTL = 7 * 24 * 3600
+
+_HASH_SIZE = 32
+_DCT_MATRIX = np.sqrt(2 / _HASH_SIZE) * np.cos(np.pi * np.outer(np.arange(_HASH_SIZE), 2 * np.arange(_HASH_SIZE) + 1) / (2 * _HASH_SIZE))
+
+
+def figure_signature(img):
+    """Return ``(perceptual_hash, worth_describing)`` for a PIL image.
+
+    The hash is the 64-bit DCT hash (pHash) as hex, so re-encoded or rescaled
+    copies of a logo or stamp share it. ``(None, True)`` means the image could
+    not be read and is described without deduplication or caching.
+    """
+    try:
+        width, height = img.size
+        pixels = np.asarray(img.convert("L").resize((_HASH_SIZE, _HASH_SIZE)), dtype=np.float64)
+    except Exception:
+        return None, True
+    if min(width, height) < FIGURE_MIN_SIDE:
+        return None, False
+
+    counts = np.bincount(pixels.astype(np.uint8).ravel(), minlength=256)
+    probs = counts[counts > 0] / pixels.size
+    if -(probs * np.log2(probs)).sum() < FIGURE_MIN_ENTROPY:
+        return None, False
+
+    low = (_DCT_MATRIX @ pixels @ _DCT_MATRIX.T)[:8, :8].ravel()
+    bits = low > np.median(low[1:])
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}", True
+
+
+class FigureDescriber:
+    """Run vision descriptions once per distinct figure.
+
+    Figures not worth describing are skipped, figures with the same perceptual
+    hash and prompt share one vision call, and, given a tenant, descriptions are
+    cached in Redis per tenant, vision model, prompt and hash.
+    """
+
+    def __init__(self, vision_model, tenant_id=None):
+        self.model_name = getattr(vision_model, "llm_name", "") or ""
+        self.tenant_id = tenant_id
+        self.stats = {"figures": 0, "skipped": 0, "duplicates": 0, "cache_hits": 0, "vision_calls": 0}
+
+    def _cache_key(self, phash, prompt):
+        hasher = xxhash.xxh64()
+        hasher.update((self.model_name + "\n" + str(prompt) + "\n" + phash).encode("utf-8"))
+        return f"figure_description:{self.tenant_id}:{hasher.hexdigest()}"
+
+    def _get_cache(self, phash, prompt):
+        if not self.tenant_id or not phash:
+            return None
+        return REDIS_CONN.get(self._cache_key(phash, prompt))
+
+    def _set_cache(self, phash, prompt, description):
+        if not self.tenant_id or not phash or not description:
+            return
+        REDIS_CONN.set(self._cache_key(phash, prompt), description, FIGURE_DESCRIPTION_CACHE_TTL)
+
+    def describe(self, figures, describe_fn, executor):
+        """Describe ``figures``, a list of ``(idx, signature, prompt)``.
+
+        ``describe_fn(idx, prompt)`` returns ``(idx, description)`` and runs on
+        ``executor``. Returns ``{idx: description}``; skipped figures map to "".
+        """
+        results = {}
+        groups = {}
+        prompts = {}
+        for idx, (phash, worth_describing), prompt in figures:
+            self.stats["figures"] += 1
+            prompts[idx] = prompt
+            if not worth_describing:
+                self.stats["skipped"] += 1
+                results[idx] = ""
+                continue
+            key = (phash, prompt) if phash else (None, idx)
+            if key in groups:
+                self.stats["duplicates"] += 1
+                groups[key].append(idx)
+            else:
+                groups[key] = [idx]
+
+        futures = {}
+        for (phash, _), idxs in groups.items():
+            prompt = prompts[idxs[0]]
+            cached = self._get_cache(phash, prompt)
+            if cached:
+                self.stats["cache_hits"] += 1
+                for i in idxs:
+                    results[i] = cached
+                continue
+            self.stats["vision_calls"] += 1
+            futures[executor.submit(describe_fn, idxs[0], prompt)] = (phash, prompt, idxs)
+
+        for future in as_completed(futures):
+            phash, prompt, idxs = futures[future]
+            _, description = future.result()
+            self._set_cache(phash, prompt, description)
+            for i in idxs:
+                results[i] = description
+        return results
+
+    def report(self, callback):
+        stats = self.stats
+        if not callback or stats["figures"] <= 1 and not (stats["skipped"] or stats["cache_hits"]):
+            return
+        reused = stats["duplicates"] + stats["cache_hits"]
+        described = stats["figures"] - stats["skipped"]
+        callback(
+            None,
+            f"Figure descriptions: {stats['vision_calls']} vision calls for {stats['figures']} figures, "
+            f"{stats['duplicates']} duplicates, {stats['cache_hits']} cache hits ({reused / max(described, 1):.0%} reused), "
+            f"{stats['skipped']} skipped as too small or blank.",
+        )
 
 
 def vision_figure_parser_figure_data_wrapper(figures_data_without_positions):
@@ -170,11 +293,7 @@ def vision_figure_parser_docx_wrapper_naive(chunks, idx_lst, callback=None, lang
         vision_model = None
     if vision_model:
 
-        @timeout(30, 3)
-        def worker(idx, ck):
-            img, close_after = open_image_for_processing(ck.get("image"), allow_bytes=True)
-            if not isinstance(img, Image.Image):
-                return idx, ""
+        def build_prompt(idx, ck):
             context_above = ck.get("context_above", "")
             context_below = ck.get("context_below", "")
             if context_above or context_below:
@@ -188,7 +307,26 @@ def vision_figure_parser_docx_wrapper_naive(chunks, idx_lst, callback=None, lang
             else:
                 prompt = vision_llm_figure_describe_prompt(language=lang)
                 logging.info(f"[VisionFigureParser] figure={idx} context_len=0 prompt=default")
+            return prompt
 
+        def signature(ck):
+            img, close_after = open_image_for_processing(ck.get("image"), allow_bytes=True)
+            if not isinstance(img, Image.Image):
+                return None, False
+            try:
+                return figure_signature(img)
+            finally:
+                if close_after:
+                    try:
+                        img.close()
+                    except Exception:
+                        pass
+
+        @timeout(30, 3)
+        def worker(idx, prompt):
+            img, close_after = open_image_for_processing(chunks[idx].get("image"), allow_bytes=True)
+            if not isinstance(img, Image.Image):
+                return idx, ""
             try:
                 description_text = picture_vision_llm_chunk(
                     binary=img,
@@ -204,12 +342,13 @@ def vision_figure_parser_docx_wrapper_naive(chunks, idx_lst, callback=None, lang
                     except Exception:
                         pass
 
+        describer = FigureDescriber(vision_model, kwargs.get("tenant_id"))
+        figures = [(idx, signature(chunks[idx]), build_prompt(idx, chunks[idx])) for idx in idx_lst]
         with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(worker, idx, chunks[idx]) for idx in idx_lst]
-
-            for future in as_completed(futures):
-                idx, description = future.result()
-                chunks[idx]["text"] += description
+            descriptions = describer.describe(figures, worker, executor)
+        for idx, description in descriptions.items():
+            chunks[idx]["text"] += description
+        describer.report(callback)
 
 
 shared_executor = ThreadPoolExecutor(max_workers=10)
@@ -221,6 +360,7 @@ class VisionFigureParser:
         self.language = kwargs.get("lang") or "English"
         self.figure_contexts = kwargs.get("figure_contexts") or []
         self.context_size = max(0, int(kwargs.get("context_size", 0) or 0))
+        self.tenant_id = kwargs.get("tenant_id")
         self._extract_figures_info(figures_data)
         assert len(self.figures) == len(self.descriptions)
         assert not self.positions or (len(self.figures) == len(self.positions))
@@ -266,43 +406,42 @@ class VisionFigureParser:
 
         return self.assembled
 
+    def _prompt(self, figure_idx):
+        context_above = ""
+        context_below = ""
+        if figure_idx < len(self.figure_contexts):
+            context_above, context_below = self.figure_contexts[figure_idx]
+        if context_above or context_below:
+            prompt = vision_llm_figure_describe_prompt_with_context(
+                context_above=context_above,
+                context_below=context_below,
+                language=self.language,
+            )
+            logging.info(f"[VisionFigureParser] figure={figure_idx} context_size={self.context_size} context_above_len={len(context_above)} context_below_len={len(context_below)} prompt=with_context")
+        else:
+            prompt = vision_llm_figure_describe_prompt(language=self.language)
+            logging.info(f"[VisionFigureParser] figure={figure_idx} context_size={self.context_size} context_len=0 prompt=default")
+        return prompt
+
     def __call__(self, **kwargs):
-        callback = kwargs.get("callback", lambda prog, msg: None)
+        callback = kwargs.get("callback") or (lambda prog, msg: None)
 
         @timeout(30, 3)
-        def process(figure_idx, figure_binary):
-            context_above = ""
-            context_below = ""
-            if figure_idx < len(self.figure_contexts):
-                context_above, context_below = self.figure_contexts[figure_idx]
-            if context_above or context_below:
-                prompt = vision_llm_figure_describe_prompt_with_context(
-                    context_above=context_above,
-                    context_below=context_below,
-                    language=self.language,
-                )
-                logging.info(
-                    f"[VisionFigureParser] figure={figure_idx} context_size={self.context_size} context_above_len={len(context_above)} context_below_len={len(context_below)} prompt=with_context"
-                )
-            else:
-                prompt = vision_llm_figure_describe_prompt(language=self.language)
-                logging.info(f"[VisionFigureParser] figure={figure_idx} context_size={self.context_size} context_len=0 prompt=default")
+        def process(figure_idx, prompt):
             description_text = picture_vision_llm_chunk(
-                binary=figure_binary,
+                binary=self.figures[figure_idx],
                 vision_model=self.vision_model,
                 prompt=prompt,
                 callback=callback,
             )
             return figure_idx, description_text
 
-        futures = []
-        for idx, img_binary in enumerate(self.figures or []):
-            futures.append(shared_executor.submit(process, idx, img_binary))
-
-        for future in as_completed(futures):
-            figure_num, txt = future.result()
+        describer = FigureDescriber(self.vision_model, self.tenant_id)
+        figures = [(idx, figure_signature(figure), self._prompt(idx)) for idx, figure in enumerate(self.figures or [])]
+        for figure_num, txt in describer.describe(figures, process, shared_executor).items():
             if txt:
                 self.descriptions[figure_num] = txt + "\n".join(self.descriptions[figure_num])
+        describer.report(callback)
 
         self._assemble()
 
@@ -39,7 +39,7 @@ from sklearn.metrics import silhouette_score
 
 from common.constants import MAXIMUM_PAGE_NUMBER
 from common.file_utils import get_project_base_directory
-from deepdoc.vision import OCR, AscendLayoutRecognizer, LayoutRecognizer, Recognizer, TableStructureRecognizer
+from deepdoc.vision import OCR, AscendLayoutRecognizer, LayoutRecognizer, RecognitionScheduler, Recognizer, TableStructureRecognizer
 from rag.nlp import rag_tokenizer
 from rag.prompts.generator import vision_llm_describe_prompt
 from deepdoc.parser.utils import extract_pdf_outlines
@@ -54,6 +54,12 @@ if LOCK_KEY_pdfplumber not in sys.modules:
 
 
 class RAGFlowPdfParser:
+    # Build text boxes straight from a clean pdfplumber text layer and skip OCR
+    # detection/recognition for such pages. Toggled by parser_config["text_layer_fast_path"].
+    text_layer_fast_path = False
+    # Pool OCR recognition crops from all in-flight pages into shared batches.
+    cross_page_rec_batch = os.getenv("OCR_REC_CROSS_PAGE_BATCH", "true").lower() in ("true", "1", "yes")
+
     def __init__(self, **kwargs):
         """
         If you have trouble downloading HuggingFace models, -_^ this might help!!
@@ -364,6 +370,86 @@ class RAGFlowPdfParser:
 
         return False
 
+    @staticmethod
+    def _is_trustworthy_text_layer(page_chars, page_width, page_height, image_area=0, min_chars=50, max_image_coverage=0.3):
+        """Check if a page's text layer can replace OCR detection and recognition.
+
+        A born-digital page carries a complete, cleanly encoded character layer
+        and little raster content. Pages that are sparse (likely scanned with a
+        partial layer), contain any garbled characters, or are dominated by
+        embedded images (text may be baked into the bitmap) are rejected so that
+        they keep going through OCR.
+        """
+        if not page_chars or page_width <= 0 or page_height <= 0:
+            return False
+        text = "".join(c.get("text", "") for c in page_chars)
+        if sum(1 for ch in text if not ch.isspace()) < min_chars:
+            return False
+        if RAGFlowPdfParser._is_garbled_text(text, threshold=0.01):
+            return False
+        if RAGFlowPdfParser._is_garbled_by_font_encoding(page_chars):
+            return False
+        if image_area / (page_width * page_height) > max_image_coverage:
+            return False
+        return True
+
+    @staticmethod
+    def _text_layer_lines(chars, gap_ratio=2.5):
+        """Group pdfplumber chars into text-line boxes shaped like OCR detections.
+
+        Chars are banded into lines by vertical overlap, and each line is split
+        wherever the horizontal gap exceeds ``gap_ratio`` times the line's median
+        char width, which separates columns and table cells the way DB-net does.
+        Whitespace chars only contribute text, never geometry.
+        """
+        glyphs = sorted((c for c in chars if c.get("text")), key=lambda c: (c["top"], c["x0"]))
+        lines = []
+        for c in glyphs:
+            for ln in reversed(lines[-3:]):
+                overlap = min(ln["bottom"], c["bottom"]) - max(ln["top"], c["top"])
+                if overlap >= 0.5 * min(ln["bottom"] - ln["top"], c["bottom"] - c["top"]):
+                    ln["chars"].append(c)
+                    ln["top"] = min(ln["top"], c["top"])
+                    ln["bottom"] = max(ln["bottom"], c["bottom"])
+                    break
+            else:
+                lines.append({"top": c["top"], "bottom": c["bottom"], "chars": [c]})
+
+        segments = []
+        for ln in lines:
+            line_chars = sorted(ln["chars"], key=lambda c: c["x0"])
+            widths = sorted(c["x1"] - c["x0"] for c in line_chars if c["text"].strip())
+            if not widths:
+                continue
+            max_gap = max(widths[len(widths) // 2], 1) * gap_ratio
+            seg, prev = [], None
+            for c in line_chars:
+                if not c["text"].strip():
+                    seg.append(c)
+                    continue
+                if prev is not None and c["x0"] - prev["x1"] > max_gap:
+                    segments.append(seg)
+                    seg = []
+                seg.append(c)
+                prev = c
+            segments.append(seg)
+
+        boxes = []
+        for seg in segments:
+            glyphs = [c for c in seg if c["text"].strip()]
+            if not glyphs:
+                continue
+            boxes.append(
+                {
+                    "x0": min(c["x0"] for c in glyphs),
+                    "x1": max(c["x1"] for c in glyphs),
+                    "top": min(c["top"] for c in glyphs),
+                    "bottom": max(c["bottom"] for c in glyphs),
+                    "text": re.sub(r"\s+", " ", "".join(c["text"] for c in seg)).strip(),
+                }
+            )
+        return boxes
+
     def _evaluate_table_orientation(self, table_img, sample_ratio=0.3):
         """
         Evaluate the best rotation orientation for a table image.
@@ -769,14 +855,19 @@ class RAGFlowPdfParser:
             logging.info(f"Added {added} OCR results from rotated table {table_index}")
 
     def __ocr(self, pagenum, img, chars, ZM=3, device_id: int | None = None):
+        bxs, boxes_to_reg = self.__ocr_detect(pagenum, img, chars, ZM, device_id)
+        texts = self.ocr.recognize_batch([b["box_image"] for b in boxes_to_reg], device_id) if boxes_to_reg else []
+        return self.__ocr_finalize(pagenum, bxs, boxes_to_reg, texts)
+
+    def __ocr_detect(self, pagenum, img, chars, ZM=3, device_id: int | None = None):
+        """Detect text lines, fill them from the text layer and crop the rest for recognition."""
         # start = timer()
         bxs = self.ocr.detect(np.array(img), device_id)
         # logging.info(f"__ocr detecting boxes of an image cost ({timer() - start}s)")
 
         # start = timer()
         if not bxs:
-            self.boxes.append([])
-            return
+            return [], []
         bxs = [(line[0], line[1][0]) for line in bxs]
         bxs = Recognizer.sort_Y_firstly(
             [
@@ -788,8 +879,7 @@ class RAGFlowPdfParser:
         )
 
         # merge chars in the same rect
-        for c in chars:
-            ii = Recognizer.find_overlapped(c, bxs)
+        for c, ii in zip(chars, Recognizer.find_overlapped_many(chars, bxs)):
             if ii is None:
                 self.lefted_chars.append(c)
                 continue
@@ -864,15 +954,25 @@ class RAGFlowPdfParser:
                 b["box_image"] = self.ocr.get_rotate_crop_image(img_np, np.array([[left, top], [right, top], [right, bott], [left, bott]], dtype=np.float32))
                 boxes_to_reg.append(b)
             del b["txt"]
-        texts = self.ocr.recognize_batch([b["box_image"] for b in boxes_to_reg], device_id)
+        return bxs, boxes_to_reg
+
+    def __ocr_finalize(self, pagenum, bxs, boxes_to_reg, texts):
         for i in range(len(boxes_to_reg)):
             boxes_to_reg[i]["text"] = texts[i]
             del boxes_to_reg[i]["box_image"]
         # logging.info(f"__ocr recognize {len(bxs)} boxes cost {timer() - start}s")
         bxs = [b for b in bxs if b["text"]]
-        if self.mean_height[pagenum - 1] == 0:
+        if self.mean_height[pagenum - 1] == 0 and bxs:
+            self.mean_height[pagenum - 1] = np.median([b["bottom"] - b["top"] for b in bxs])
+        return bxs
+
+    def __text_layer_ocr(self, pagenum, img, chars, ZM=3, device_id: int | None = None):
+        """Build the page's text boxes from its trusted text layer, skipping OCR models."""
+        bxs = [dict(b, page_number=pagenum) for b in self._text_layer_lines(chars)]
+        bxs = [b for b in bxs if b["text"]]
+        if self.mean_height[pagenum - 1] == 0 and bxs:
             self.mean_height[pagenum - 1] = np.median([b["bottom"] - b["top"] for b in bxs])
-        self.boxes.append(bxs)
+        return Recognizer.sort_Y_firstly(bxs, self.mean_height[pagenum - 1] / 3)
 
     def _layouts_rec(self, ZM, drop=True):
         assert len(self.page_images) == len(self.boxes)
@@ -1614,6 +1714,7 @@ class RAGFlowPdfParser:
         self.page_cum_height = [0]
         self.page_layout = []
         self.page_from = page_from
+        self.text_layer_pages = []
         start = timer()
         try:
             with sys.modules[LOCK_KEY_pdfplumber]:
@@ -1654,6 +1755,15 @@ class RAGFlowPdfParser:
                             )
                             self.page_chars[pi] = []
 
+                    self.text_layer_pages = [False] * len(self.page_chars)
+                    if self.text_layer_fast_path:
+                        for pi, page in enumerate(self.pdf.pages[page_from:page_to]):
+                            if pi >= len(self.page_chars):
+                                break
+                            image_area = sum(max(0, img["x1"] - img["x0"]) * max(0, img["bottom"] - img["top"]) for img in page.images)
+                            self.text_layer_pages[pi] = self._is_trustworthy_text_layer(self.page_chars[pi], page.width, page.height, image_area)
+                        logging.info("Text-layer fast path: %d/%d pages skip OCR.", sum(self.text_layer_pages), len(self.text_layer_pages))
+
                     self.total_page = len(self.pdf.pages)
 
         except Exception as e:
@@ -1670,21 +1780,56 @@ class RAGFlowPdfParser:
         else:
             self.is_english = False
 
+        page_boxes = [[] for _ in self.page_images]
+        rec_scheduler = RecognitionScheduler(self.ocr, len(self.page_images)) if self.cross_page_rec_batch else None
+
         async def __img_ocr(i, id, img, chars, limiter):
             self._insert_word_spaces(chars)
-
-            if limiter:
-                async with limiter:
-                    await thread_pool_exec(self.__ocr, i + 1, img, chars, zoomin, id)
+            if i < len(self.text_layer_pages) and self.text_layer_pages[i]:
+                ocr = self.__text_layer_ocr
+            elif rec_scheduler:
+                ocr = self.__ocr_detect
             else:
-                self.__ocr(i + 1, img, chars, zoomin, id)
+                ocr = self.__ocr
+
+            try:
+                if limiter:
+                    async with limiter:
+                        res = await thread_pool_exec(ocr, i + 1, img, chars, zoomin, id)
+                else:
+                    res = ocr(i + 1, img, chars, zoomin, id)
+            except Exception:
+                if rec_scheduler:
+                    await rec_scheduler.recognize([], id)
+                raise
+
+            # Recognition runs outside the device limiter so the next page can
+            # start detecting while crops wait for a full cross-page batch.
+            if rec_scheduler:
+                if ocr == self.__ocr_detect:
+                    bxs, boxes_to_reg = res
+                    texts = await rec_scheduler.recognize([b["box_image"] for b in boxes_to_reg], id)
+                    res = self.__ocr_finalize(i + 1, bxs, boxes_to_reg, texts)
+                else:
+                    await rec_scheduler.recognize([], id)
+            page_boxes[i] = res
 
             if callback and i % 6 == 5:
                 callback((i + 1) * 0.6 / len(self.page_images))
 
+        async def __gather(tasks):
+            try:
+                await asyncio.gather(*tasks, return_exceptions=False)
+            except Exception as e:
+                logging.error(f"Error in OCR: {e}")
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
         async def __img_ocr_launcher():
             def __ocr_preprocess():
-                chars = self.page_chars[i] if not self.is_english else []
+                chars = self.page_chars[i] if not self.is_english or (i < len(self.text_layer_pages) and self.text_layer_pages[i]) else []
                 self.mean_height.append(np.median(sorted([c["height"] for c in chars])) if chars else 0)
                 self.mean_width.append(np.median(sorted([c["width"] for c in chars])) if chars else 8)
                 self.page_cum_height.append(img.size[1] / zoomin)
@@ -1710,14 +1855,15 @@ class RAGFlowPdfParser:
                     tasks.append(asyncio.create_task(wrapper()))
                     await asyncio.sleep(0)
 
-                try:
-                    await asyncio.gather(*tasks, return_exceptions=False)
-                except Exception as e:
-                    logging.error(f"Error in OCR: {e}")
-                    for t in tasks:
-                        t.cancel()
-                    await asyncio.gather(*tasks, return_exceptions=True)
-                    raise
+                await __gather(tasks)
+
+            elif rec_scheduler:
+                # Pages must be in flight together for their crops to share batches.
+                tasks = []
+                for i, img in enumerate(self.page_images):
+                    chars = __ocr_preprocess()
+                    tasks.append(asyncio.create_task(__img_ocr(i, 0, img, chars, None)))
+                await __gather(tasks)
 
             else:
                 for i, img in enumerate(self.page_images):
@@ -1727,6 +1873,9 @@ class RAGFlowPdfParser:
         start = timer()
 
         asyncio.run(__img_ocr_launcher())
+        self.boxes = page_boxes
+        if rec_scheduler and rec_scheduler.batches:
+            logging.info(f"__images__ recognized {rec_scheduler.crops} text lines in {rec_scheduler.batches} cross-page batches")
 
         logging.info(f"__images__ {len(self.page_images)} pages cost {timer() - start}s")
 
@@ -49,15 +49,29 @@ class DLAAdapter:
         Returns:
             List of [x0, y0, x1, y1, score, class_id] for each detected layout region.
         """
+        return self.predict_batch([image_data])[0]
+
+    def predict_batch(self, images: List[bytes]) -> List[List[List[float]]]:
+        """Run layout analysis on several pages in one forward() call.
+
+        Args:
+            images: JPEG image bytes, one per request.
+
+        Returns:
+            One bbox list per input, in input order (see __call__).
+        """
         if self._layouter is None:
             raise RuntimeError("DLAAdapter.load() must be called before inference")
 
-        img = Image.open(io.BytesIO(image_data)).convert("RGB")
-        width, height = img.size
+        imgs = [Image.open(io.BytesIO(data)).convert("RGB") for data in images]
 
         # forward() returns raw Recognizer output (no OCR integration)
-        raw_bboxes = self._layouter.forward([img], thr=self.thr, batch_size=1)[0]
+        raw_pages = self._layouter.forward(imgs, thr=self.thr, batch_size=len(imgs))
+
+        return [self._to_wire(raw_bboxes, *img.size) for img, raw_bboxes in zip(imgs, raw_pages)]
 
+    @staticmethod
+    def _to_wire(raw_bboxes, width, height) -> List[List[float]]:
         result = []
         for b in raw_bboxes:
             label = b["type"].lower()
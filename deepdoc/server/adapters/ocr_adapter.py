@@ -3,10 +3,13 @@
 Two modes:
 - detect: 5-level nested JSON matching Go [][][][][]float64
 - rec:    4-level nested JSON matching Go [][][][]any
+
+predict_batch() serves a dynamically batched mix of both: detection runs per
+image, all recognition crops of the batch share one recognizer call.
 """
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 import cv2
 import numpy as np
@@ -49,11 +52,48 @@ class OCRAdapter:
         Returns:
             {"output": 5-level nested list} matching Go [][][][][]float64.
         """
+        return self.predict_batch([("det", image_data)])[0]
+
+    def recognize(self, image_data: bytes) -> Dict[str, Any]:
+        """Run text recognition on a cropped text region.
+
+        Returns:
+            {"output": 4-level nested list} matching Go [][][][]any.
+        """
+        return self.predict_batch([("rec", image_data)])[0]
+
+    def predict_batch(self, requests: List[Tuple[str, bytes]]) -> List[Dict[str, Any]]:
+        """Serve a batch of (operator, image bytes) requests.
+
+        Returns:
+            One response dict per request, in request order (see detect/recognize).
+        """
         if self._ocr is None:
             raise RuntimeError("OCRAdapter.load() must be called before inference")
 
-        img = self._decode_bgr(image_data)
-
+        outputs: List[Dict[str, Any] | None] = [None] * len(requests)
+        rec_idx, rec_imgs = [], []
+        for i, (operator, image_data) in enumerate(requests):
+            img = self._decode_bgr(image_data)
+            if operator == "det":
+                outputs[i] = self._detect_one(img)
+            else:
+                rec_idx.append(i)
+                rec_imgs.append(img)
+
+        if rec_imgs:
+            # OCR.recognize_batch_with_score() returns List[(text, score)] so the
+            # client can do score-based layer-2 rotation selection. The score is
+            # the real recognition confidence (previously a constant 1.0 fill).
+            scored = self._ocr.recognize_batch_with_score(rec_imgs)
+            for i, (text, score) in zip(rec_idx, scored):
+                # 4-level nesting matching Go [][][][]any:
+                # batch → page → items list → pair [text, confidence]
+                outputs[i] = {"output": [[[[text, score]]]]}
+
+        return outputs
+
+    def _detect_one(self, img: np.ndarray) -> Dict[str, Any]:
         # OCR.detect() → [(quad_ndarray, ("", 0)), ...]
         det_result = self._ocr.detect(img)
 
@@ -66,31 +106,7 @@ class OCRAdapter:
 
         # 5-level nesting matching Go [][][][][]float64:
         # batch → page → quad → point → coord
-        output = [[quads]]
-        return {"output": output}
-
-    def recognize(self, image_data: bytes) -> Dict[str, Any]:
-        """Run text recognition on a cropped text region.
-
-        Returns:
-            {"output": 4-level nested list} matching Go [][][][]any.
-        """
-        if self._ocr is None:
-            raise RuntimeError("OCRAdapter.load() must be called before inference")
-
-        img = self._decode_bgr(image_data)
-
-        # OCR.recognize_batch_with_score() returns List[(text, score)] so the
-        # client can do score-based layer-2 rotation selection. The score is
-        # the real recognition confidence (previously a constant 1.0 fill).
-        scored = self._ocr.recognize_batch_with_score([img])
-
-        items = [[text, score] for text, score in scored]
-
-        # 4-level nesting matching Go [][][][]any:
-        # batch → page → items list → pair [text, confidence]
-        output = [[items]]
-        return {"output": output}
+        return {"output": [[quads]]}
 
     @staticmethod
     def _decode_bgr(data: bytes) -> np.ndarray:
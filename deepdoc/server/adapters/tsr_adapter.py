@@ -47,29 +47,42 @@ class TSRAdapter:
         Returns:
             List of [x0, y0, x1, y1, score, class_id] for each structural element.
         """
+        return self.predict_batch([image_data])[0]
+
+    def predict_batch(self, images: List[bytes]) -> List[List[List[float]]]:
+        """Recognize the structure of several table crops in one call.
+
+        Args:
+            images: JPEG image bytes, one per request.
+
+        Returns:
+            One element list per input, in input order (see __call__).
+        """
         if self._tsr is None:
             raise RuntimeError("TSRAdapter.load() must be called before inference")
 
-        img = Image.open(io.BytesIO(image_data)).convert("RGB")
-        width, height = img.size
+        imgs = [Image.open(io.BytesIO(data)).convert("RGB") for data in images]
+
+        tables = self._tsr(imgs, thr=self.thr)
 
-        tables = self._tsr([img], thr=self.thr)
+        return [self._to_wire(tbl_elements, *img.size) for img, tbl_elements in zip(imgs, tables)]
 
+    @staticmethod
+    def _to_wire(tbl_elements, width, height) -> List[List[float]]:
         result = []
-        for tbl_elements in tables:
-            for elem in tbl_elements:
-                label = elem["label"]
-                class_id = TSR_CLASS_MAP.get(label)
-                if class_id is None:
-                    logger.warning("TSR: unknown label '%s', skipping", label)
-                    continue
-
-                x0 = max(0.0, min(float(elem["x0"]), width))
-                y0 = max(0.0, min(float(elem["top"]), height))
-                x1 = max(0.0, min(float(elem["x1"]), width))
-                y1 = max(0.0, min(float(elem["bottom"]), height))
-                score = float(elem["score"])
-
-                result.append([x0, y0, x1, y1, score, float(class_id)])
+        for elem in tbl_elements:
+            label = elem["label"]
+            class_id = TSR_CLASS_MAP.get(label)
+            if class_id is None:
+                logger.warning("TSR: unknown label '%s', skipping", label)
+                continue
+
+            x0 = max(0.0, min(float(elem["x0"]), width))
+            y0 = max(0.0, min(float(elem["top"]), height))
+            x1 = max(0.0, min(float(elem["x1"]), width))
+            y1 = max(0.0, min(float(elem["bottom"]), height))
+            score = float(elem["score"])
+
+            result.append([x0, y0, x1, y1, score, float(class_id)])
 
         return result
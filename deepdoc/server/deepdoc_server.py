@@ -8,6 +8,11 @@ Endpoints:
     POST /predict/ocr    — OCR (detect via ?operator=det, recognize via ?operator=rec)
     POST /predict/tsr    — Table Structure Recognition
     GET  /health         — Health check
+
+Each endpoint batches concurrent requests dynamically: a worker waits up to
+--<ep>-batch-timeout seconds for at most --<ep>-max-batch-size requests and
+serves them with one predict() call. --<ep>-workers sets the number of worker
+processes per device for that endpoint.
 """
 
 import argparse
@@ -44,6 +49,21 @@ def parse_args():
     parser.add_argument("--disable-ocr", action="store_true", dest="disable_ocr", default=False, help="Disable OCR endpoint")
     parser.add_argument("--disable-tsr", action="store_true", dest="disable_tsr", default=False, help="Disable TSR endpoint")
     parser.add_argument("--log-level", type=str, default="INFO", help="Logging level")
+    for ep, max_batch_size, workers in (("dla", 8, 1), ("ocr", 32, 1), ("tsr", 8, 1)):
+        name = ep.upper()
+        parser.add_argument(
+            f"--{ep}-max-batch-size",
+            type=int,
+            default=max_batch_size,
+            help=f"Max requests per {name} batch, 1 disables batching (default: {max_batch_size})",
+        )
+        parser.add_argument(
+            f"--{ep}-batch-timeout",
+            type=float,
+            default=0.01,
+            help=f"Seconds a {name} worker waits to fill a batch (default: 0.01)",
+        )
+        parser.add_argument(f"--{ep}-workers", type=int, default=workers, help=f"{name} worker processes per device (default: {workers})")
     return parser.parse_args()
 
 
@@ -55,15 +75,25 @@ def main():
     logger.info("Model directory: %s", model_dir)
 
     apis = []
-    if not args.disable_dla:
-        apis.append(DLAEndpoint(model_dir=model_dir))
-        logger.info("DLA endpoint enabled")
-    if not args.disable_ocr:
-        apis.append(OCREndpoint(model_dir=model_dir))
-        logger.info("OCR endpoint enabled")
-    if not args.disable_tsr:
-        apis.append(TSREndpoint(model_dir=model_dir))
-        logger.info("TSR endpoint enabled")
+    workers_per_device = {}
+    for ep, endpoint_cls in (("dla", DLAEndpoint), ("ocr", OCREndpoint), ("tsr", TSREndpoint)):
+        if getattr(args, f"disable_{ep}"):
+            continue
+        max_batch_size = getattr(args, f"{ep}_max_batch_size")
+        batch_timeout = getattr(args, f"{ep}_batch_timeout")
+        if batch_timeout >= args.timeout:
+            logger.error("--%s-batch-timeout (%s) must be smaller than --timeout (%s)", ep, batch_timeout, args.timeout)
+            return
+        api = endpoint_cls(model_dir=model_dir, max_batch_size=max_batch_size, batch_timeout=batch_timeout)
+        apis.append(api)
+        workers_per_device[api.api_path] = getattr(args, f"{ep}_workers")
+        logger.info(
+            "%s endpoint enabled (max_batch_size=%d, batch_timeout=%.3fs, workers_per_device=%d)",
+            ep.upper(),
+            max_batch_size,
+            batch_timeout,
+            workers_per_device[api.api_path],
+        )
 
     if not apis:
         logger.error("No endpoints enabled")
@@ -72,7 +102,7 @@ def main():
     server = ls.LitServer(
         lit_api=apis,
         accelerator="cpu",
-        workers_per_device=1,
+        workers_per_device=workers_per_device,
         timeout=args.timeout,
         restart_workers=True,
     )
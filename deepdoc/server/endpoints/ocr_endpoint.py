@@ -16,9 +16,8 @@ class OCREndpoint(ls.LitAPI):
     Form field 'request' carries the JPEG image bytes.
     """
 
-    def __init__(self, model_dir: str):
-        super().__init__()
-        self.api_path = "/predict/ocr"
+    def __init__(self, model_dir: str, max_batch_size: int = 1, batch_timeout: float = 0.0):
+        super().__init__(max_batch_size=max_batch_size, batch_timeout=batch_timeout, api_path="/predict/ocr")
         self.model_dir = model_dir
         self.adapter: OCRAdapter | None = None
 
@@ -54,7 +53,11 @@ class OCREndpoint(ls.LitAPI):
 
         return operator, data
 
-    def predict(self, inputs: tuple):
+    def predict(self, inputs):
+        # With max_batch_size > 1 LitServe hands over a list of (operator, data)
+        # tuples; det and rec requests may share a batch.
+        if isinstance(inputs, list):
+            return self.adapter.predict_batch(inputs)
         operator, image_data = inputs
         if operator == "det":
             return self.adapter.detect(image_data)
@@ -12,9 +12,8 @@ logger = logging.getLogger(__name__)
 class TSREndpoint(ls.LitAPI):
     """Table Structure Recognition endpoint at /predict/tsr."""
 
-    def __init__(self, model_dir: str, thr: float = 0.2):
-        super().__init__()
-        self.api_path = "/predict/tsr"
+    def __init__(self, model_dir: str, thr: float = 0.2, max_batch_size: int = 1, batch_timeout: float = 0.0):
+        super().__init__(max_batch_size=max_batch_size, batch_timeout=batch_timeout, api_path="/predict/tsr")
         self.model_dir = model_dir
         self.thr = thr
         self.adapter: TSRAdapter | None = None
@@ -36,7 +35,11 @@ class TSREndpoint(ls.LitAPI):
             raise ValueError("Image too large")
         return data
 
-    def predict(self, image_data: bytes):
+    def predict(self, image_data):
+        # With max_batch_size > 1 LitServe hands over a list of decoded requests
+        # and expects one output per request.
+        if isinstance(image_data, list):
+            return self.adapter.predict_batch(image_data)
         return self.adapter(image_data)
 
     def encode_response(self, output):
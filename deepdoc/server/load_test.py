@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Load test for the DeepDoc model server.
+
+Sends the same image to one endpoint from an increasing number of concurrent
+clients and reports throughput and p50/p99 latency per concurrency level, e.g.:
+
+    python deepdoc/server/load_test.py --endpoint dla --image page.jpg --concurrency 1 4 16 32
+    python deepdoc/server/load_test.py --endpoint ocr --operator rec --image crop.jpg
+"""
+
+import argparse
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from timeit import default_timer as timer
+
+import numpy as np
+import requests
+
+
+def _worker(url, image, operator, deadline, latencies, errors, lock):
+    session = requests.Session()
+    data = {"operator": operator} if operator else None
+    while timer() < deadline:
+        start = timer()
+        try:
+            resp = session.post(url, files={"request": ("image.jpg", image, "image/jpeg")}, data=data, timeout=120)
+            ok = resp.status_code == 200
+        except requests.RequestException:
+            ok = False
+        cost = timer() - start
+        with lock:
+            if ok:
+                latencies.append(cost)
+            else:
+                errors.append(cost)
+
+
+def run_level(url, image, operator, concurrency, duration):
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = timer() + duration
+    start = timer()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(_worker, url, image, operator, deadline, latencies, errors, lock)
+    elapsed = timer() - start
+
+    if not latencies:
+        return {"concurrency": concurrency, "requests": 0, "errors": len(errors), "rps": 0.0, "p50": float("nan"), "p99": float("nan")}
+    lat_ms = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50": float(np.percentile(lat_ms, 50)),
+        "p99": float(np.percentile(lat_ms, 99)),
+    }
+
+
+def main(args):
+    with open(args.image, "rb") as f:
+        image = f.read()
+    url = f"{args.url.rstrip('/')}/predict/{args.endpoint}"
+    operator = args.operator if args.endpoint == "ocr" else None
+
+    # Warm up so model loading and first-batch costs are not measured.
+    resp = requests.post(url, files={"request": ("image.jpg", image, "image/jpeg")}, data={"operator": operator} if operator else None, timeout=300)
+    if resp.status_code != 200:
+        print(f"Warm-up request failed: {resp.status_code} {resp.text[:200]}")
+        sys.exit(1)
+
+    print(f"{url} ({args.duration:.0f}s per level)")
+    print(f"{'concurrency':>11} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for concurrency in args.concurrency:
+        r = run_level(url, image, operator, concurrency, args.duration)
+        print(f"{r['concurrency']:>11} {r['requests']:>8} {r['errors']:>6} {r['rps']:>8.2f} {r['p50']:>9.1f} {r['p99']:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and p50/p99 latency of a DeepDoc server endpoint at several concurrency levels.")
+    parser.add_argument("--url", default="http://localhost:9390", help="Server base URL (default: http://localhost:9390)")
+    parser.add_argument("--endpoint", choices=("dla", "ocr", "tsr"), default="dla", help="Endpoint to load (default: dla)")
+    parser.add_argument("--operator", choices=("det", "rec"), default="det", help="OCR operator (default: det)")
+    parser.add_argument("--image", required=True, help="JPEG image sent with every request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32], help="Concurrent clients per level (default: 1 4 16 32)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level (default: 20)")
+    main(parser.parse_args())
@@ -14,15 +14,19 @@
 #  limitations under the License.
 #
 import gc
+import asyncio
 import logging
 import copy
 import time
 import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from huggingface_hub import snapshot_download
 
 from common.file_utils import get_project_base_directory
-from common.misc_utils import pip_install_torch
+from common.misc_utils import pip_install_torch, thread_pool_exec
 from common import settings
 from .operators import *  # noqa: F403
 from . import operators
@@ -35,6 +39,24 @@ from .postprocess import build_post_process
 
 loaded_models = {}
 
+# Crop resize/normalization is cv2/numpy work that releases the GIL, so a few
+# threads keep it off the critical path between recognition batches.
+_norm_pool = None
+_norm_pool_lock = threading.Lock()
+
+
+def _get_norm_pool():
+    global _norm_pool
+    workers = int(os.environ.get("OCR_REC_NORM_WORKERS", "4"))
+    if workers <= 1:
+        return None
+    if _norm_pool is None:
+        # OCR instances recognize on several threads; only one may create the pool.
+        with _norm_pool_lock:
+            if _norm_pool is None:
+                _norm_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr_rec_norm")
+    return _norm_pool
+
 
 def transform(data, ops=None):
     """transform"""
@@ -129,7 +151,7 @@ def load_model(model_dir, nm, device_id: int | None = None):
 class TextRecognizer:
     def __init__(self, model_dir, device_id: int | None = None):
         self.rec_image_shape = [int(v) for v in "3, 48, 320".split(",")]
-        self.rec_batch_num = 16
+        self.rec_batch_num = int(os.environ.get("OCR_REC_BATCH_NUM", "16"))
         postprocess_params = {"name": "CTCLabelDecode", "character_dict_path": os.path.join(model_dir, "ocr.res"), "use_space_char": True}
         self.postprocess_op = build_post_process(postprocess_params)
         self.predictor, self.run_options = load_model(model_dir, "rec", device_id)
@@ -348,11 +370,12 @@ class TextRecognizer:
                 h, w = img_list[indices[ino]].shape[0:2]
                 wh_ratio = w * 1.0 / h
                 max_wh_ratio = max(max_wh_ratio, wh_ratio)
-            for ino in range(beg_img_no, end_img_no):
-                norm_img = self.resize_norm_img(img_list[indices[ino]], max_wh_ratio)
-                norm_img = norm_img[np.newaxis, :]
-                norm_img_batch.append(norm_img)
-            norm_img_batch = np.concatenate(norm_img_batch)
+            pool = _get_norm_pool() if end_img_no - beg_img_no > 1 else None
+            if pool:
+                norm_img_batch = list(pool.map(lambda ino: self.resize_norm_img(img_list[indices[ino]], max_wh_ratio), range(beg_img_no, end_img_no)))
+            else:
+                norm_img_batch = [self.resize_norm_img(img_list[indices[ino]], max_wh_ratio) for ino in range(beg_img_no, end_img_no)]
+            norm_img_batch = np.stack(norm_img_batch)
             norm_img_batch = norm_img_batch.copy()
 
             input_dict = {}
@@ -376,6 +399,61 @@ class TextRecognizer:
         self.close()
 
 
+class RecognitionScheduler:
+    """Batch text-line recognition across all pages of a document.
+
+    Every page calls :meth:`recognize` exactly once, after its detection stage,
+    with the crops it needs recognized (possibly none). Crops are pooled per
+    device and recognized once ``flush_size`` of them are pending or no page is
+    still detecting. ``TextRecognizer`` sorts each pooled list by aspect ratio,
+    so pages share full-size, width-bucketed batches instead of each running a
+    few ragged ones; results are routed back to the submitting page.
+    """
+
+    def __init__(self, ocr, pages, flush_size=None):
+        self.ocr = ocr
+        self.flush_size = flush_size or int(os.environ.get("OCR_REC_FLUSH_SIZE", "256"))
+        self._detecting = pages
+        self._pending = defaultdict(list)
+        self._locks = defaultdict(asyncio.Lock)
+        self.batches = 0
+        self.crops = 0
+
+    async def recognize(self, crops, device_id=0):
+        device_id = device_id or 0
+        self._detecting -= 1
+        fut = None
+        if crops:
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[device_id].append((crops, fut))
+        if self._detecting <= 0:
+            await asyncio.gather(*[self._flush(d) for d in list(self._pending)])
+        elif crops and sum(len(c) for c, _ in self._pending[device_id]) >= self.flush_size:
+            await self._flush(device_id)
+        return await fut if fut else []
+
+    async def _flush(self, device_id):
+        async with self._locks[device_id]:
+            jobs, self._pending[device_id] = self._pending[device_id], []
+            if not jobs:
+                return
+            crops = [c for job, _ in jobs for c in job]
+            try:
+                texts = await thread_pool_exec(self.ocr.recognize_batch, crops, device_id)
+            except Exception as e:
+                for _, fut in jobs:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+            self.batches += 1
+            self.crops += len(crops)
+            st = 0
+            for job, fut in jobs:
+                if not fut.done():
+                    fut.set_result(texts[st : st + len(job)])
+                st += len(job)
+
+
 class TextDetector:
     def __init__(self, model_dir, device_id: int | None = None):
         pre_process_list = [
@@ -28,6 +28,44 @@ from .operators import preprocess
 from . import operators
 from .ocr import load_model
 
+# Boxes compared per block in find_overlapped_many, to bound the overlap matrix.
+_OVERLAP_BATCH = 512
+
+
+def _box_array(boxes):
+    """(n, 4) array of x0, top, x1, bottom."""
+    if not boxes:
+        return np.zeros((0, 4))
+    return np.array([(b["x0"], b["top"], b["x1"], b["bottom"]) for b in boxes], dtype=np.float64)
+
+
+def _overlapped_areas(a, b, ratio=True):
+    """``Recognizer.overlapped_area`` of every box in ``a`` against every box in ``b``, as an (len(a), len(b)) matrix."""
+    x0, tp, x1, btm = (a[:, i, None] for i in range(4))
+    w = np.minimum(b[None, :, 2], x1) - np.maximum(b[None, :, 0], x0)
+    h = np.minimum(b[None, :, 3], btm) - np.maximum(b[None, :, 1], tp)
+    ov = np.where((w >= 0) & (h >= 0) & (x1 - x0 != 0) & (btm - tp != 0), h * w, 0.0)
+    if ratio:
+        ov = np.divide(ov, (x1 - x0) * (btm - tp), out=ov, where=ov > 0)
+    return ov
+
+
+def _sort_runs(arr, key, tiebreak):
+    """Stable-sort each maximal run of boxes that carry ``key`` by (key, tiebreak); other boxes keep their place."""
+    i = 0
+    while i < len(arr):
+        if key not in arr[i]:
+            i += 1
+            continue
+        j = i
+        while j < len(arr) and key in arr[j]:
+            j += 1
+        run = arr[i:j]
+        order = np.lexsort(([b[tiebreak] for b in run], [b[key] for b in run]))
+        arr[i:j] = [run[k] for k in order]
+        i = j
+    return arr
+
 
 class Recognizer:
     def __init__(self, label_list, task_name, model_dir=None):
@@ -52,6 +90,10 @@ class Recognizer:
 
     @staticmethod
     def sort_Y_firstly(arr, threshold):
+        if not threshold > 0:
+            # Without a band the comparator is a plain sort on top.
+            return sorted(arr, key=lambda c: c["top"])
+
         def cmp(c1, c2):
             diff = c1["top"] - c2["top"]
             if abs(diff) < threshold:
@@ -63,6 +105,9 @@ class Recognizer:
 
     @staticmethod
     def sort_X_firstly(arr, threshold):
+        if not threshold > 0:
+            return sorted(arr, key=lambda c: c["x0"])
+
         def cmp(c1, c2):
             diff = c1["x0"] - c2["x0"]
             if abs(diff) < threshold:
@@ -74,34 +119,16 @@ class Recognizer:
 
     @staticmethod
     def sort_C_firstly(arr, thr=0):
-        # sort using y1 first and then x1
-        # sorted(arr, key=lambda r: (r["x0"], r["top"]))
+        # sort using x1 first, then restore the column order:
+        # each run of boxes carrying "C" is sorted by (C, top); boxes without it stay in place.
         arr = Recognizer.sort_X_firstly(arr, thr)
-        for i in range(len(arr) - 1):
-            for j in range(i, -1, -1):
-                # restore the order using th
-                if "C" not in arr[j] or "C" not in arr[j + 1]:
-                    continue
-                if arr[j + 1]["C"] < arr[j]["C"] or (arr[j + 1]["C"] == arr[j]["C"] and arr[j + 1]["top"] < arr[j]["top"]):
-                    tmp = arr[j]
-                    arr[j] = arr[j + 1]
-                    arr[j + 1] = tmp
-        return arr
+        return _sort_runs(arr, "C", "top")
 
     @staticmethod
     def sort_R_firstly(arr, thr=0):
-        # sort using y1 first and then x1
-        # sorted(arr, key=lambda r: (r["top"], r["x0"]))
+        # sort using y1 first, then each run of boxes carrying "R" by (R, x0)
         arr = Recognizer.sort_Y_firstly(arr, thr)
-        for i in range(len(arr) - 1):
-            for j in range(i, -1, -1):
-                if "R" not in arr[j] or "R" not in arr[j + 1]:
-                    continue
-                if arr[j + 1]["R"] < arr[j]["R"] or (arr[j + 1]["R"] == arr[j]["R"] and arr[j + 1]["x0"] < arr[j]["x0"]):
-                    tmp = arr[j]
-                    arr[j] = arr[j + 1]
-                    arr[j + 1] = tmp
-        return arr
+        return _sort_runs(arr, "R", "x0")
 
     @staticmethod
     def overlapped_area(a, b, ratio=True):
@@ -126,6 +153,14 @@ class Recognizer:
         def not_overlapped(a, b):
             return any([a["x1"] < b["x0"], a["x0"] > b["x1"], a["bottom"] < b["top"], a["top"] > b["bottom"]])
 
+        bxs = _box_array(boxes)
+
+        def covered_area(layout):
+            if not len(bxs):
+                return 0
+            # Accumulated in order, as the per-box sum always was.
+            return np.cumsum(_overlapped_areas(bxs, _box_array([layout]), ratio=False)[:, 0])[-1]
+
         i = 0
         while i + 1 < len(layouts):
             j = i + 1
@@ -145,14 +180,7 @@ class Recognizer:
                     layouts.pop(i)
                 continue
 
-            area_i, area_i_1 = 0, 0
-            for b in boxes:
-                if not not_overlapped(b, layouts[i]):
-                    area_i += Recognizer.overlapped_area(b, layouts[i], False)
-                if not not_overlapped(b, layouts[j]):
-                    area_i_1 += Recognizer.overlapped_area(b, layouts[j], False)
-
-            if area_i > area_i_1:
+            if covered_area(layouts[i]) > covered_area(layouts[j]):
                 layouts.pop(j)
             else:
                 layouts.pop(i)
@@ -199,36 +227,54 @@ class Recognizer:
     def find_overlapped(box, boxes_sorted_by_y, naive=False):
         if not boxes_sorted_by_y:
             return
-        bxs = boxes_sorted_by_y
-        s, e, ii = 0, len(bxs), 0
-        while s < e and not naive:
-            ii = (e + s) // 2
-            pv = bxs[ii]
-            if box["bottom"] < pv["top"]:
-                e = ii
-                continue
-            if box["top"] > pv["bottom"]:
-                s = ii + 1
-                continue
-            break
-        while s < ii:
-            if box["top"] > bxs[s]["bottom"]:
-                s += 1
-            break
-        while e - 1 > ii:
-            if box["bottom"] < bxs[e - 1]["top"]:
-                e -= 1
-            break
-
-        max_overlapped_i, max_overlapped = None, 0
-        for i in range(s, e):
-            ov = Recognizer.overlapped_area(bxs[i], box)
-            if ov <= max_overlapped:
-                continue
-            max_overlapped_i = i
-            max_overlapped = ov
+        return Recognizer.find_overlapped_many([box], boxes_sorted_by_y, naive)[0]
 
-        return max_overlapped_i
+    @staticmethod
+    def find_overlapped_many(boxes, boxes_sorted_by_y, naive=False):
+        """
+        ``find_overlapped`` for each of ``boxes`` against the same sorted list:
+        the index of the box in ``boxes_sorted_by_y`` that overlaps it the most
+        (relative to that box's own area), or None.
+        """
+        if not boxes_sorted_by_y:
+            return [None] * len(boxes)
+        if not boxes:
+            return []
+        bxs = _box_array(boxes_sorted_by_y)
+        qs = _box_array(boxes)
+        n, m = len(bxs), len(qs)
+        top, bottom = bxs[:, 1], bxs[:, 3]
+        q_top, q_bottom = qs[:, 1], qs[:, 3]
+
+        # Narrow each box to a window [s, e) with the same binary search, run for all boxes at once.
+        s, e, ii = np.zeros(m, dtype=int), np.full(m, n), np.zeros(m, dtype=int)
+        active = np.full(m, not naive)
+        while active.any():
+            idx = np.flatnonzero(active)
+            mid = (s[idx] + e[idx]) // 2
+            ii[idx] = mid
+            above = q_bottom[idx] < top[mid]
+            below = ~above & (q_top[idx] > bottom[mid])
+            e[idx[above]] = mid[above]
+            s[idx[below]] = mid[below] + 1
+            active[idx[~(above | below)]] = False
+            active &= s < e
+        step = s < ii
+        step[step] = q_top[step] > bottom[s[step]]
+        s[step] += 1
+        step = e - 1 > ii
+        step[step] = q_bottom[step] < top[e[step] - 1]
+        e[step] -= 1
+
+        res = []
+        cols = np.arange(n)
+        for st in range(0, m, _OVERLAP_BATCH):
+            sl = slice(st, st + _OVERLAP_BATCH)
+            ov = _overlapped_areas(bxs, qs[sl]).T
+            ov[(cols < s[sl, None]) | (cols >= e[sl, None])] = 0
+            best = np.argmax(ov, axis=1)
+            res.extend(int(i) if v > 0 else None for i, v in zip(best, ov[np.arange(len(best)), best]))
+        return res
 
     @staticmethod
     def find_horizontally_tightest_fit(box, boxes):
@@ -255,18 +301,16 @@ class Recognizer:
     def find_overlapped_with_threshold(box, boxes, thr=0.3):
         if not boxes:
             return
-        max_overlapped_i, max_overlapped, _max_overlapped = None, thr, 0
-        s, e = 0, len(boxes)
-        for i in range(s, e):
-            ov = Recognizer.overlapped_area(box, boxes[i])
-            _ov = Recognizer.overlapped_area(boxes[i], box)
-            if (ov, _ov) < (max_overlapped, _max_overlapped):
-                continue
-            max_overlapped_i = i
-            max_overlapped = ov
-            _max_overlapped = _ov
-
-        return max_overlapped_i
+        bxs, b = _box_array(boxes), _box_array([box])
+        ov = _overlapped_areas(b, bxs)[0]
+        _ov = _overlapped_areas(bxs, b)[:, 0]
+        # The last box with the greatest (ov, _ov), if that reaches (thr, 0).
+        cand = np.flatnonzero(ov >= thr)
+        if not len(cand):
+            return
+        cand = cand[ov[cand] == ov[cand].max()]
+        cand = cand[_ov[cand] == _ov[cand].max()]
+        return int(cand[-1])
 
     def preprocess(self, image_list):
         inputs = []
@@ -0,0 +1,64 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import argparse
+import os
+import sys
+from timeit import default_timer as timer
+
+# CPU-only ONNX Runtime: hide GPUs before any model is loaded.
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from deepdoc.parser.pdf_parser import RAGFlowPdfParser
+
+
+def main(args):
+    if os.path.isdir(args.inputs):
+        pdfs = sorted(os.path.join(args.inputs, f) for f in os.listdir(args.inputs) if f.lower().endswith(".pdf"))
+    else:
+        pdfs = [args.inputs]
+
+    parser = RAGFlowPdfParser()
+    # Measure OCR only; pages that could skip it would blur the comparison.
+    parser.text_layer_fast_path = False
+
+    # Warm up model sessions so the first mode does not pay for loading.
+    parser.__images__(pdfs[0], 3, 0, 1)
+
+    results = {}
+    for cross_page in (False, True):
+        parser.cross_page_rec_batch = cross_page
+        pages, cost = 0, 0.0
+        for _ in range(args.repeat):
+            for fnm in pdfs:
+                start = timer()
+                parser.__images__(fnm, 3)
+                cost += timer() - start
+                pages += len(parser.page_images)
+        results[cross_page] = pages / max(cost, 1e-6)
+        print(f"{'cross-page' if cross_page else 'per-page':10} batching: {pages} pages in {cost:.2f}s, {results[cross_page]:.2f} pages/s")
+
+    print(f"Speedup: {results[True] / max(results[False], 1e-6):.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pages-per-second of per-page vs cross-page OCR recognition batching on CPU.")
+    parser.add_argument("--inputs", help="Directory of PDFs, or a file path to a single PDF", required=True)
+    parser.add_argument("--repeat", help="Number of passes over the inputs. Default: 1", type=int, default=1)
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,72 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import argparse
+import os
+import re
+import sys
+from difflib import SequenceMatcher
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from deepdoc.parser.pdf_parser import RAGFlowPdfParser
+
+
+def _page_texts(parser):
+    texts = {}
+    for bxs in parser.boxes:
+        for b in bxs:
+            texts.setdefault(b["page_number"], []).append(b["text"])
+    return {pn: re.sub(r"\s+", "", "".join(t)) for pn, t in texts.items()}
+
+
+def _run(parser, fnm, fast_path):
+    parser.text_layer_fast_path = fast_path
+    start = timer()
+    parser.__images__(fnm, 3)
+    elapsed = timer() - start
+    return elapsed, _page_texts(parser), list(parser.text_layer_pages)
+
+
+def main(args):
+    if os.path.isdir(args.inputs):
+        pdfs = sorted(os.path.join(args.inputs, f) for f in os.listdir(args.inputs) if f.lower().endswith(".pdf"))
+    else:
+        pdfs = [args.inputs]
+
+    parser = RAGFlowPdfParser()
+    print(f"{'file':40} {'pages':>5} {'fast':>5} {'ocr(s)':>8} {'fast(s)':>8} {'speedup':>8} {'similarity':>10}")
+    total_ocr, total_fast = 0.0, 0.0
+    for fnm in pdfs:
+        ocr_cost, ocr_texts, _ = _run(parser, fnm, False)
+        fast_cost, fast_texts, fast_pages = _run(parser, fnm, True)
+        total_ocr += ocr_cost
+        total_fast += fast_cost
+
+        # Quality is measured on the pages that actually took the fast path.
+        ratios = [SequenceMatcher(None, ocr_texts.get(i + 1, ""), fast_texts.get(i + 1, "")).ratio() for i, fast in enumerate(fast_pages) if fast]
+        similarity = sum(ratios) / len(ratios) if ratios else float("nan")
+        print(f"{os.path.basename(fnm)[:40]:40} {len(fast_pages):>5} {sum(fast_pages):>5} {ocr_cost:>8.2f} {fast_cost:>8.2f} {ocr_cost / max(fast_cost, 1e-6):>7.2f}x {similarity:>10.3f}")
+
+    print(f"Total: OCR {total_ocr:.2f}s, text-layer fast path {total_fast:.2f}s, speedup {total_ocr / max(total_fast, 1e-6):.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the text-layer fast path with full OCR on a set of PDFs.")
+    parser.add_argument("--inputs", help="Directory of PDFs, or a file path to a single PDF", required=True)
+    args = parser.parse_args()
+    main(args)
@@ -726,6 +726,8 @@ func (h *DatasetsHandler) GetKnowledgeGraph(c *gin.Context) {
 		graphType = "graph"
 	}
 	if graphType == "graph" {
+		// The storage layout of a sharded graph is internal, as in the Python endpoint.
+		delete(graphData, "storage")
 		sortKnowledgeGraph(graphData)
 		result["graph"] = graphData
 	} else {
@@ -845,7 +847,7 @@ func (h *DatasetsHandler) DeleteKnowledgeGraph(c *gin.Context) {
 
 	indexName := fmt.Sprintf("ragflow_%s", tenantID)
 	if _, err := docEngine.DeleteChunks(c.Request.Context(), map[string]interface{}{
-		"knowledge_graph_kwd": []interface{}{"graph", "subgraph", "entity", "relation", "community_report"},
+		"knowledge_graph_kwd": []interface{}{"graph", "graph_shard", "subgraph", "entity", "relation", "community_report"},
 		"kb_id":               datasetID,
 	}, indexName, datasetID); err != nil {
 		jsonInternalError(c, err)
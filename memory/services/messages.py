@@ -182,82 +182,93 @@ class MessageService:
         embed_size = sys.getsizeof(content_embed[0]) * len(content_embed) if content_embed is not None and len(content_embed) > 0 else 0
         return sys.getsizeof(message.get("content", "")) + embed_size
 
+    @staticmethod
+    def get_stored_message_size(message: dict):
+        # Messages saved before size accounting have no stored size (Infinity fills in -1).
+        try:
+            size = int(message.get("size"))
+        except (TypeError, ValueError):
+            return None
+        return size if size >= 0 else None
+
     @classmethod
     def calculate_memory_size(cls, memory_ids: List[str], uid_list: List[str]):
         index_names = [index_name(uid) for uid in uid_list]
-        order_by = OrderByExpr()
-        order_by.desc("valid_at")
+        return settings.msgStoreConn.get_message_size_sum(index_names, memory_ids)
 
-        res, count = settings.msgStoreConn.search(
-            select_fields=["memory_id", "content", "content_embed"],
-            highlight_fields=[],
-            condition={},
-            match_expressions=[],
-            order_by=order_by,
-            offset=0,
-            limit=2048 * len(memory_ids),
-            index_names=index_names,
-            memory_ids=memory_ids,
-            agg_fields=[],
-            hide_forgotten=False,
-        )
-
-        if count == 0:
-            return {}
-
-        docs = settings.msgStoreConn.get_fields(res, ["memory_id", "content", "content_embed"])
-        size_dict = {}
-        for doc in docs.values():
-            if size_dict.get(doc["memory_id"]):
-                size_dict[doc["memory_id"]] += cls.calculate_message_size(doc)
-            else:
-                size_dict[doc["memory_id"]] = cls.calculate_message_size(doc)
-        return size_dict
+    @classmethod
+    def _get_message_sizes(cls, messages: List[dict], uid: str, memory_id: str):
+        sizes = {m["message_id"]: cls.get_stored_message_size(m) for m in messages}
+        unsized_ids = [message_id for message_id, size in sizes.items() if size is None]
+        if unsized_ids:
+            # only messages not yet backfilled need their bodies to be sized
+            select_fields = ["message_id", "content", "content_embed"]
+            res, _ = settings.msgStoreConn.search(
+                select_fields=select_fields,
+                highlight_fields=[],
+                condition={"message_id": unsized_ids},
+                match_expressions=[],
+                order_by=OrderByExpr(),
+                offset=0,
+                limit=len(unsized_ids),
+                index_names=[index_name(uid)],
+                memory_ids=[memory_id],
+                agg_fields=[],
+                hide_forgotten=False,
+            )
+            for doc in settings.msgStoreConn.get_fields(res, select_fields).values():
+                sizes[doc["message_id"]] = cls.calculate_message_size(doc)
+        return [(m["message_id"], sizes.get(m["message_id"]) or 0) for m in messages]
 
     @classmethod
-    def pick_messages_to_delete_by_fifo(cls, memory_id: str, uid: str, size_to_delete: int):
-        select_fields = ["message_id", "content", "content_embed"]
+    def pick_messages_to_delete_by_fifo(cls, memory_id: str, uid: str, size_to_delete: int, page_size: int = 512):
+        select_fields = ["message_id", "size"]
         _index_name = index_name(uid)
-        res = settings.msgStoreConn.get_forgotten_messages(select_fields, _index_name, memory_id)
         current_size = 0
         ids_to_remove = []
+        res = settings.msgStoreConn.get_forgotten_messages(select_fields, _index_name, memory_id)
         if res:
-            message_list = settings.msgStoreConn.get_fields(res, select_fields)
-            for message in message_list.values():
-                if current_size < size_to_delete:
-                    current_size += cls.calculate_message_size(message)
-                    ids_to_remove.append(message["message_id"])
-                else:
+            message_list = list(settings.msgStoreConn.get_fields(res, select_fields).values())
+            for message_id, size in cls._get_message_sizes(message_list, uid, memory_id):
+                if current_size >= size_to_delete:
                     return ids_to_remove, current_size
+                current_size += size
+                ids_to_remove.append(message_id)
             if current_size >= size_to_delete:
                 return ids_to_remove, current_size
 
         order_by = OrderByExpr()
         order_by.asc("valid_at")
-        res, total_count = settings.msgStoreConn.search(
-            select_fields=select_fields,
-            highlight_fields=[],
-            condition={},
-            match_expressions=[],
-            order_by=order_by,
-            offset=0,
-            limit=512,
-            index_names=[_index_name],
-            memory_ids=[memory_id],
-            agg_fields=[],
-        )
-        docs = settings.msgStoreConn.get_fields(res, select_fields)
-        for doc in docs.values():
-            if current_size < size_to_delete:
-                current_size += cls.calculate_message_size(doc)
-                ids_to_remove.append(doc["message_id"])
-            else:
-                return ids_to_remove, current_size
+        offset = 0
+        while current_size < size_to_delete:
+            res, _ = settings.msgStoreConn.search(
+                select_fields=select_fields,
+                highlight_fields=[],
+                condition={},
+                match_expressions=[],
+                order_by=order_by,
+                offset=offset,
+                limit=page_size,
+                index_names=[_index_name],
+                memory_ids=[memory_id],
+                agg_fields=[],
+            )
+            docs = list(settings.msgStoreConn.get_fields(res, select_fields).values()) if res is not None else []
+            if not docs:
+                break
+            for message_id, size in cls._get_message_sizes(docs, uid, memory_id):
+                if current_size >= size_to_delete:
+                    break
+                current_size += size
+                ids_to_remove.append(message_id)
+            if len(docs) < page_size:
+                break
+            offset += page_size
         return ids_to_remove, current_size
 
     @classmethod
-    def get_missing_field_messages(cls, memory_id: str, uid: str, field_name: str):
-        select_fields = ["message_id", "content"]
+    def get_missing_field_messages(cls, memory_id: str, uid: str, field_name: str, select_fields: List[str] = None):
+        select_fields = select_fields or ["message_id", "content"]
         _index_name = index_name(uid)
         res = settings.msgStoreConn.get_missing_field_message(select_fields=select_fields, index_name=_index_name, memory_id=memory_id, field_name=field_name)
         if not res:
@@ -41,6 +41,8 @@ class ESConnection(ESConnectionBase):
                 return "message_type_kwd"
             case "status":
                 return "status_int"
+            case "size":
+                return "size_long"
             case "content":
                 if use_tokenized_content:
                     return "tokenized_content_ltks"
@@ -74,6 +76,8 @@ class ESConnection(ESConnectionBase):
             "tokenized_content_ltks": fine_grained_tokenize(tokenize(message["content"])),
             f"q_{len(message['content_embed'])}_vec": message["content_embed"],
         }
+        if message.get("size") is not None:
+            storage_doc["size_long"] = int(message["size"])
         return storage_doc
 
     @staticmethod
@@ -100,6 +104,7 @@ class ESConnection(ESConnectionBase):
             "status": bool(int(doc["status_int"])),
             "content": doc.get("content_ltks", ""),
             "content_embed": doc.get(embd_field_name, []) if embd_field_name else [],
+            "size": doc.get("size_long"),
         }
         if doc.get("id"):
             message["id"] = doc["id"]
@@ -308,7 +313,7 @@ class ESConnection(ESConnectionBase):
             return None
         bool_query = Q("bool", must=[])
         bool_query.must.append(Q("term", memory_id=memory_id))
-        bool_query.must_not.append(Q("exists", field=field_name))
+        bool_query.must_not.append(Q("exists", field=self.convert_field_name(field_name)))
         # from old to new
         order_by = OrderByExpr()
         order_by.asc("valid_at")
@@ -369,6 +374,39 @@ class ESConnection(ESConnectionBase):
         self.logger.error(f"ESConnection.get timeout for {ATTEMPT_TIME} times!")
         raise Exception("ESConnection.get timeout.")
 
+    def get_message_size_sum(self, index_names: str | list[str], memory_ids: list[str]) -> dict[str, int]:
+        """
+        Sum the stored size of messages per memory with a terms/sum aggregation, forgotten messages included.
+        """
+        if isinstance(index_names, str):
+            index_names = index_names.split(",")
+        exist_index_list = [idx for idx in index_names if self.index_exist(idx)]
+        if not exist_index_list or not memory_ids:
+            return {}
+        s = Search().query(Q("bool", filter=[Q("terms", memory_id=memory_ids)])).extra(size=0)
+        s.aggs.bucket("aggs_memory_id", "terms", field="memory_id", size=len(memory_ids)).metric("size_sum", "sum", field="size_long")
+        q = s.to_dict()
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = self.es.search(index=exist_index_list, body=q, timeout="600s", track_total_hits=False)
+                if str(res.get("timed_out", "")).lower() == "true":
+                    raise Exception("Es Timeout.")
+                buckets = res.get("aggregations", {}).get("aggs_memory_id", {}).get("buckets", [])
+                return {b["key"]: int(b["size_sum"]["value"] or 0) for b in buckets}
+            except ConnectionTimeout:
+                self.logger.exception("ES request timeout")
+                self._connect()
+                continue
+            except NotFoundError as e:
+                self.logger.debug(f"ESConnection.get_message_size_sum {str(index_names)} query: " + str(q) + str(e))
+                return {}
+            except Exception as e:
+                self.logger.exception(f"ESConnection.get_message_size_sum {str(index_names)} query: " + str(q) + str(e))
+                raise e
+
+        self.logger.error(f"ESConnection.get_message_size_sum timeout for {ATTEMPT_TIME} times!")
+        raise Exception("ESConnection.get_message_size_sum timeout.")
+
     def insert(self, documents: list[dict], index_name: str, memory_id: str = None) -> list[str]:
         # Refers to https://www.elastic.co/guide/en/elasticsearch/reference/current/docs-bulk.html
         operations = []
@@ -558,7 +596,7 @@ class ESConnection(ESConnectionBase):
                 if isinstance(v, list):
                     m[n] = v
                     continue
-                if n in ["message_id", "source_id", "valid_at", "invalid_at", "forget_at", "status"] and isinstance(v, (int, float, bool)):
+                if n in ["message_id", "source_id", "valid_at", "invalid_at", "forget_at", "status", "size"] and isinstance(v, (int, float, bool)):
                     m[n] = v
                     continue
                 if not isinstance(v, str):
@@ -74,11 +74,12 @@ BASE_COLUMNS = (
     "status_int",
     "content_ltks",
     "tokenized_content_ltks",
+    "size_long",
 )
 BASE_COLUMN_SET = set(BASE_COLUMNS)
 
 TIME_COLUMNS = {"valid_at", "invalid_at", "forget_at"}
-NUMERIC_COLUMNS = {"message_id", "source_id", "zone_id", "status_int"}
+NUMERIC_COLUMNS = {"message_id", "source_id", "zone_id", "status_int", "size_long"}
 # MemoryService uses backend-neutral field names. GaussDB physical tables use
 # suffixed names to avoid conflicts with full-text, vector, and status columns.
 # Map every field before constructing SQL.
@@ -86,11 +87,13 @@ MEMORY_FIELD_MAP = {
     "message_type": "message_type_kwd",
     "status": "status_int",
     "content": "content_ltks",
+    "size": "size_long",
 }
 REVERSE_MEMORY_FIELD_MAP = {
     "message_type_kwd": "message_type",
     "status_int": "status",
     "content_ltks": "content",
+    "size_long": "size",
 }
 RESULT_FIELD_DEFAULTS = {
     "source_id": None,
@@ -179,9 +182,16 @@ class GaussDBMemoryDDLBuilder(GaussDBDDLBuilder):
   status_int NUMBER(10) DEFAULT 1 NOT NULL,
   content_ltks TEXT,
   tokenized_content_ltks TEXT,
+  size_long NUMBER(19),
   CONSTRAINT {pk} PRIMARY KEY (id)
 ) WITH (storage_type=USTORE)"""
 
+    def build_size_column_ddl(self, table: str) -> str:
+        # size_long was added after the first release of the message table.
+        # Tables created earlier get it here; their rows stay NULL until the
+        # startup backfill fills them in.
+        return f"ALTER TABLE {self.qualified_name(table)} ADD COLUMN IF NOT EXISTS size_long NUMBER(19)"
+
     def build_regular_index_ddls(self, table: str) -> list[str]:
         name = self.qualified_name(table)
         return [f"CREATE INDEX IF NOT EXISTS {self.index_name(table, suffix)} ON {name} ({', '.join(columns)})" for suffix, columns in self.REGULAR_INDEXES]
@@ -256,6 +266,7 @@ class GaussDBMemoryConnection(GaussDBConnectionBase):
         statements: list[str | tuple[str, list[Any]]] = [
             self.ddl.build_advisory_lock_sql(f"gaussdb_memory_create_table:{table}"),
             self.ddl.build_memory_table_ddl(table),
+            self.ddl.build_size_column_ddl(table),
             self.ddl.build_advisory_lock_sql(f"gaussdb_memory_base_index:{table}"),
             *self.ddl.build_regular_index_ddls(table),
             self.ddl.build_advisory_lock_sql(f"gaussdb_memory_fulltext_index:{table}"),
@@ -328,6 +339,7 @@ class GaussDBMemoryConnection(GaussDBConnectionBase):
             # dropping older dimensions so historical rows remain readable via
             # their *_empty markers.
             self._ensure_vector_column_exists(table, dim)
+            self._ensure_size_column_exists(table)
 
         existing_dims = self._vector_dimensions(table)
         sql, params = self._build_merge_sql(table, dim, existing_dims, rows)
@@ -490,6 +502,8 @@ class GaussDBMemoryConnection(GaussDBConnectionBase):
             return None
         db_field = self.convert_field_name(field_name)
         self._validate_column(db_field)
+        if db_field == "size_long":
+            self._ensure_size_column_exists(table)
         columns = self._select_columns(table, select_fields)
         sql = (
             f"SELECT {', '.join(columns)} "
@@ -502,6 +516,26 @@ class GaussDBMemoryConnection(GaussDBConnectionBase):
         _total, messages = self._rows_to_messages(rows, description)
         return SearchResult(total=len(messages), messages=messages)
 
+    def get_message_size_sum(self, index_names: str | list[str], memory_ids: list[str]) -> dict[str, int]:
+        # Sum stored message sizes in the database so size accounting never
+        # reads message bodies or vectors. Forgotten messages still occupy
+        # space and are included.
+        size_dict: dict[str, int] = {}
+        memory_ids = clean_list_values(memory_ids)
+        if not memory_ids:
+            return size_dict
+        for index_name in normalize_index_names(index_names):
+            table = self.physical_table(index_name)
+            if not self._table_exists(table):
+                continue
+            self._ensure_size_column_exists(table)
+            placeholders = ", ".join(["%s"] * len(memory_ids))
+            sql = f"SELECT memory_id, SUM(size_long) AS size_sum FROM {self.ddl.qualified_name(table)} WHERE memory_id IN ({placeholders}) AND size_long IS NOT NULL GROUP BY memory_id"
+            for row in self._fetch_all(sql, list(memory_ids)) or []:
+                memory_id = row_value(row, "memory_id", 0)
+                size_dict[memory_id] = size_dict.get(memory_id, 0) + int(row_value(row, "size_sum", 1) or 0)
+        return size_dict
+
     def get_total(self, res) -> int:
         if isinstance(res, tuple):
             return int(res[1] or 0)
@@ -596,6 +630,7 @@ class GaussDBMemoryConnection(GaussDBConnectionBase):
             "status_int": 1 if bool(message.get("status")) else 0,
             "content_ltks": message.get("content") or "",
             "tokenized_content_ltks": fine_grained_tokenize(tokenize(message.get("content") or "")),
+            "size_long": to_int_or_none(message.get("size")),
             self.ddl.vector_column_name(dim): vector_literal(content_embed, dim),
             self.ddl.vector_empty_column_name(dim): False,
         }
@@ -621,6 +656,7 @@ class GaussDBMemoryConnection(GaussDBConnectionBase):
             "status": bool(int(row.get("status_int") or 0)),
             "content": row.get("content_ltks") or "",
             "content_embed": self._content_embed_from_row(row),
+            "size": to_int_or_original(row.get("size_long")) if row.get("size_long") is not None else None,
         }
         if row.get("_score") is not None:
             message["_score"] = float(row.get("_score") or 0.0)
@@ -686,6 +722,7 @@ USING (
     %s AS status_int,
     %s AS content_ltks,
     %s AS tokenized_content_ltks,
+    %s AS size_long,
     %s::floatvector({dim}) AS {vector_col}
   FROM dual
 ) s
@@ -705,16 +742,17 @@ WHEN MATCHED THEN UPDATE SET
   status_int = s.status_int,
   content_ltks = s.content_ltks,
   tokenized_content_ltks = s.tokenized_content_ltks,
+  size_long = s.size_long,
   {vector_col} = s.{vector_col},
   {empty_col} = FALSE{reset_clause}
 WHEN NOT MATCHED THEN INSERT (
   id, message_id, message_type_kwd, source_id, memory_id, user_id, agent_id,
   session_id, zone_id, valid_at, invalid_at, forget_at, status_int,
-  content_ltks, tokenized_content_ltks, {vector_col}, {empty_col}
+  content_ltks, tokenized_content_ltks, size_long, {vector_col}, {empty_col}
 ) VALUES (
   s.id, s.message_id, s.message_type_kwd, s.source_id, s.memory_id, s.user_id,
   s.agent_id, s.session_id, s.zone_id, s.valid_at, s.invalid_at, s.forget_at,
-  s.status_int, s.content_ltks, s.tokenized_content_ltks, s.{vector_col}, FALSE
+  s.status_int, s.content_ltks, s.tokenized_content_ltks, s.size_long, s.{vector_col}, FALSE
 )"""
         params = [
             [
@@ -733,6 +771,7 @@ WHEN NOT MATCHED THEN INSERT (
                 row.get("status_int"),
                 row.get("content_ltks"),
                 row.get("tokenized_content_ltks"),
+                row.get("size_long"),
                 row.get(vector_col),
             ]
             for row in rows
@@ -1152,6 +1191,16 @@ WHEN NOT MATCHED THEN INSERT (
             # changing work_mem on every write.
             self._create_diskann_index_with_retry(table, dim)
 
+    def _ensure_size_column_exists(self, table: str) -> None:
+        if self._column_exists(table, "size_long"):
+            return
+        self._execute_statements(
+            [
+                self.ddl.build_advisory_lock_sql(f"gaussdb_memory_size_column:{table}"),
+                self.ddl.build_size_column_ddl(table),
+            ]
+        )
+
     def _create_diskann_index_with_retry(self, table: str, dim: int) -> None:
         ddl = self.ddl.build_diskann_index_ddl(table, dim)
         lock = self.ddl.build_advisory_lock_sql(f"gaussdb_memory_vector_index:{table}:{dim}")
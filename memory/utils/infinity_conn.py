@@ -48,6 +48,8 @@ class InfinityConnection(InfinityConnectionBase):
                 return "message_type_kwd"
             case "status":
                 return "status_int"
+            case "size":
+                return "size_long"
             case "content_embed":
                 if not table_fields:
                     raise Exception("Can't convert 'content_embed' to vector field name with empty table fields.")
@@ -64,6 +66,8 @@ class InfinityConnection(InfinityConnectionBase):
             return "message_type"
         if field_name.startswith("status"):
             return "status"
+        if field_name == "size_long":
+            return "size"
         if re.match(r"q_\d+_vec", field_name):
             return "content_embed"
         return field_name
@@ -93,6 +97,8 @@ class InfinityConnection(InfinityConnectionBase):
                 return "invalid_at_flt"
             case "forget_at":
                 return "forget_at_flt"
+            case "size":
+                return "size_long"
             case _:
                 return field_name
 
@@ -310,7 +316,12 @@ class InfinityConnection(InfinityConnectionBase):
         return res
 
     def get_missing_field_message(self, select_fields: list[str], index_name: str, memory_id: str, field_name: str, limit: int = 512):
-        condition = {"memory_id": memory_id, "must_not": {"exists": field_name}}
+        field_name = self.convert_condition_and_order_field(field_name)
+        if field_name == "size_long":
+            # Rows written before size accounting carry the mapping default (-1).
+            condition = {"memory_id": memory_id}
+        else:
+            condition = {"memory_id": memory_id, "must_not": {"exists": field_name}}
         order_by = OrderByExpr()
         order_by.asc("valid_at_flt")
         # query
@@ -323,6 +334,8 @@ class InfinityConnection(InfinityConnectionBase):
             output_fields = [self.convert_message_field_to_infinity(f, column_name_list) for f in select_fields]
             builder = table_instance.output(output_fields)
             filter_cond = self.equivalent_condition_to_str(condition, db_instance.get_table(table_name))
+            if field_name == "size_long":
+                filter_cond = f"{filter_cond} AND size_long < 0"
             builder.filter(filter_cond)
             order_by_expr_list = list()
             if order_by.fields:
@@ -341,6 +354,32 @@ class InfinityConnection(InfinityConnectionBase):
             self.connPool.release_conn(inf_conn)
         return res
 
+    def get_message_size_sum(self, index_names: str | list[str], memory_ids: list[str]) -> dict[str, int]:
+        """
+        Sum the stored size of messages per memory, forgotten messages included.
+        Each memory has its own table, so one sum() per table is enough.
+        """
+        if isinstance(index_names, str):
+            index_names = index_names.split(",")
+        size_dict = {}
+        inf_conn = self.connPool.get_conn()
+        try:
+            db_instance = inf_conn.get_database(self.dbName)
+            for index_name in index_names:
+                for memory_id in memory_ids:
+                    table_name = f"{index_name}_{memory_id}"
+                    try:
+                        table_instance = db_instance.get_table(table_name)
+                    except Exception:
+                        continue
+                    mem_res, _ = table_instance.output(["sum(size_long)"]).filter("size_long >= 0").to_df()
+                    if mem_res.empty or pd.isna(mem_res.iloc[0, 0]):
+                        continue
+                    size_dict[memory_id] = size_dict.get(memory_id, 0) + int(mem_res.iloc[0, 0])
+        finally:
+            self.connPool.release_conn(inf_conn)
+        return size_dict
+
     def get(self, message_id: str, index_name: str, memory_ids: list[str]) -> dict | None:
         inf_conn = self.connPool.get_conn()
         try:
@@ -20,7 +20,7 @@ from typing import Optional
 import numpy as np
 from pydantic import BaseModel
 from pymysql.converters import escape_string
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import BigInteger, Column, String, Integer
 from sqlalchemy.dialects.mysql import LONGTEXT
 
 from common.decorator import singleton
@@ -32,6 +32,8 @@ from common.float_utils import get_float
 from rag.nlp import is_english
 from rag.nlp.rag_tokenizer import tokenize, fine_grained_tokenize
 
+column_size = Column("size_long", BigInteger, nullable=True, comment="message size in bytes")
+
 # Column definitions for memory message table
 COLUMN_DEFINITIONS: list[Column] = [
     Column("id", String(256), primary_key=True, comment="unique record id"),
@@ -49,10 +51,16 @@ COLUMN_DEFINITIONS: list[Column] = [
     Column("status_int", Integer, nullable=False, server_default="1", comment="status: 1 for active, 0 for inactive"),
     Column("content_ltks", LONGTEXT, nullable=True, comment="content with tokenization"),
     Column("tokenized_content_ltks", LONGTEXT, nullable=True, comment="fine-grained tokenized content"),
+    column_size,
 ]
 
 COLUMN_NAMES: list[str] = [col.name for col in COLUMN_DEFINITIONS]
 
+# Columns added after the first release; created on tables from older versions
+EXTRA_COLUMNS: list[Column] = [
+    column_size,
+]
+
 # Index columns for creating indexes
 INDEX_COLUMNS: list[str] = [
     "message_id",
@@ -92,6 +100,9 @@ class OBConnection(OBConnectionBase):
     def get_column_definitions(self) -> list[Column]:
         return COLUMN_DEFINITIONS
 
+    def get_extra_columns(self) -> list[Column]:
+        return EXTRA_COLUMNS
+
     def get_lock_prefix(self) -> str:
         return "ob_memory_"
 
@@ -127,6 +138,8 @@ class OBConnection(OBConnectionBase):
                 return "message_type_kwd"
             case "status":
                 return "status_int"
+            case "size":
+                return "size_long"
             case "content":
                 if use_tokenized_content:
                     return "tokenized_content_ltks"
@@ -153,6 +166,7 @@ class OBConnection(OBConnectionBase):
             "zone_id": message.get("zone_id", 0),
             "content_ltks": message["content"],
             "tokenized_content_ltks": fine_grained_tokenize(tokenize(message["content"])),
+            "size_long": message.get("size"),
         }
         # Handle vector embedding
         content_embed = message.get("content_embed", [])
@@ -182,6 +196,7 @@ class OBConnection(OBConnectionBase):
             "status": bool(int(doc.get("status_int", 0))),
             "content": doc.get("content_ltks", ""),
             "content_embed": content_embed,
+            "size": doc.get("size_long"),
         }
         if doc.get("id"):
             message["id"] = doc["id"]
@@ -409,7 +424,7 @@ class OBConnection(OBConnectionBase):
 
     def get_missing_field_message(self, select_fields: list[str], index_name: str, memory_id: str, field_name: str, limit: int = 512):
         """Get messages missing a specific field."""
-        if not self._check_table_exists_cached(index_name):
+        if not self._ensure_extra_columns(index_name):
             return None
 
         db_field_name = self.convert_field_name(field_name)
@@ -428,6 +443,35 @@ class OBConnection(OBConnectionBase):
 
         return result
 
+    def get_message_size_sum(self, index_names: str | list[str], memory_ids: list[str]) -> dict[str, int]:
+        """Sum the stored size of messages per memory, forgotten messages included."""
+        if isinstance(index_names, str):
+            index_names = index_names.split(",")
+        size_dict: dict[str, int] = {}
+        if not memory_ids:
+            return size_dict
+        memory_ids_expr = ", ".join(get_value_str(memory_id) for memory_id in memory_ids)
+        for index_name in index_names:
+            if not self._ensure_extra_columns(index_name):
+                continue
+            sql = f"SELECT memory_id, SUM(size_long)  FROM {index_name}  WHERE memory_id IN ({memory_ids_expr}) AND size_long IS NOT NULL  GROUP BY memory_id"
+            self.logger.debug("OBConnection.get_message_size_sum sql: %s", sql)
+            for memory_id, size_sum in self.client.perform_raw_text_sql(sql).fetchall():
+                size_dict[memory_id] = size_dict.get(memory_id, 0) + int(size_sum or 0)
+        return size_dict
+
+    def _ensure_extra_columns(self, table_name: str) -> bool:
+        """Add extra columns missing from a table created by an older version; False if there is no table."""
+        if self._check_table_exists_cached(table_name):
+            return True
+        if not self.client.check_table_exists(table_name):
+            return False
+        for column in self.get_extra_columns():
+            if not self._column_exist(table_name, column.name):
+                self._add_column(table_name, column)
+        self.client.refresh_metadata([table_name])
+        return True
+
     def get(self, doc_id: str, index_name: str, memory_ids: list[str]) -> dict | None:
         """Get single message by id."""
         doc = super().get(doc_id, index_name, memory_ids)
@@ -553,7 +597,7 @@ class OBConnection(OBConnectionBase):
                 if isinstance(v, list):
                     m[n] = v
                     continue
-                if n in ["message_id", "source_id", "valid_at", "invalid_at", "forget_at", "status"] and isinstance(v, (int, float, bool)):
+                if n in ["message_id", "source_id", "valid_at", "invalid_at", "forget_at", "status", "size"] and isinstance(v, (int, float, bool)):
                     m[n] = v
                     continue
                 if not isinstance(v, str):
@@ -14,26 +14,45 @@
 #  limitations under the License.
 #
 import asyncio
+import json
 import logging
+import os
 import re
 
 import numpy as np
+import xxhash
 
 from api.db.services.task_service import has_canceled
+from common import settings
+from common.asyncio_utils import LoopLocalSemaphore
 from common.connection_utils import timeout
 from common.exceptions import TaskCanceledException
 from common.token_utils import truncate
 from rag.graphrag.utils import (
     chat_limiter,
     get_embed_cache,
+    get_embed_cache_batch,
     get_llm_cache,
     set_embed_cache,
+    set_embed_cache_batch,
     set_llm_cache,
 )
+from rag.utils.redis_conn import REDIS_CONN
 from common.misc_utils import thread_pool_exec
 
 from ._common import knowledge_compile_gen_conf
 
+# Cluster summaries one tenant may have in flight, within the process-wide chat_limiter.
+RAPTOR_TENANT_CONCURRENCY = max(1, int(os.environ.get("RAPTOR_TENANT_CONCURRENCY", 5)))
+# How long a finished cluster summary is kept for an interrupted task to resume from.
+RAPTOR_CHECKPOINT_TTL = int(os.environ.get("RAPTOR_CHECKPOINT_TTL", 7 * 24 * 3600))
+
+_tenant_limiters: dict[str, LoopLocalSemaphore] = {}
+
+
+def _tenant_limiter(tenant_id) -> LoopLocalSemaphore:
+    return _tenant_limiters.setdefault(str(tenant_id or ""), LoopLocalSemaphore(RAPTOR_TENANT_CONCURRENCY))
+
 
 class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
     """Build RAPTOR summary layers with the classic or Psi tree strategy."""
@@ -117,6 +136,66 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
         await thread_pool_exec(set_embed_cache, self._embd_model.llm_name, txt, embds)
         return embds
 
+    @timeout(60)
+    async def _embedding_encode_batch(self, txts):
+        """Encode a batch of texts at once; every text must get a vector."""
+        embds, _ = await thread_pool_exec(self._embd_model.encode, txts)
+        if len(embds) != len(txts) or any(len(e) < 1 for e in embds):
+            raise Exception("Embedding error: %d embeddings returned for %d texts" % (len(embds), len(txts)))
+        await thread_pool_exec(set_embed_cache_batch, self._embd_model.llm_name, txts, embds)
+        return list(embds)
+
+    async def _embed_summaries(self, txts, cluster_sizes, callback=None, task_id: str = ""):
+        """Embed the summaries of one layer in full batches; a summary that fails to embed gets None."""
+        vecs = await thread_pool_exec(get_embed_cache_batch, self._embd_model.llm_name, txts)
+        missing = [i for i, v in enumerate(vecs) if v is None]
+        for b in range(0, len(missing), settings.EMBEDDING_BATCH_SIZE):
+            self._check_task_canceled(task_id, "before embedding")
+            batch = missing[b : b + settings.EMBEDDING_BATCH_SIZE]
+            try:
+                for i, v in zip(batch, await self._embedding_encode_batch([txts[i] for i in batch])):
+                    vecs[i] = v
+                continue
+            except Exception as exc:
+                logging.warning("RAPTOR batch embedding of %d summaries failed, embedding them one by one: %s", len(batch), exc)
+            for i in batch:
+                try:
+                    vecs[i] = await self._embedding_encode(txts[i])
+                except Exception as exc:
+                    self._skip_cluster(cluster_sizes[i], exc, callback)
+        return vecs
+
+    def _skip_cluster(self, size, exc, callback=None):
+        """Count a failed cluster; too many of them abort the task."""
+        self._error_count += 1
+        warn_msg = f"[RAPTOR] Skip cluster ({size} chunks) due to error: {exc}"
+        logging.warning(warn_msg)
+        if callback:
+            callback(msg=warn_msg)
+        if self._error_count >= self._max_errors:
+            raise RuntimeError(f"RAPTOR aborted after {self._error_count} errors. Last error: {exc}") from exc
+
+    def _cluster_content(self, texts):
+        len_per_chunk = int((self._llm_model.max_length - self._max_token) / len(texts))
+        return "\n".join([truncate(t, max(1, len_per_chunk)) for t in texts])
+
+    def _checkpoint_key(self, cluster_content):
+        hasher = xxhash.xxh64()
+        for part in (self._llm_model.llm_name, self._prompt, self._max_token, cluster_content):
+            hasher.update(str(part).encode("utf-8"))
+        return "raptor_summary:" + hasher.hexdigest()
+
+    async def _load_checkpoints(self, keys):
+        """(title, summary) of the clusters summarized before, by checkpoint key; None for the others."""
+        values = await thread_pool_exec(REDIS_CONN.mget, keys)
+        res = []
+        for v in values:
+            try:
+                res.append(tuple(json.loads(v)) if v else None)
+            except Exception:
+                res.append(None)
+        return res
+
     def _get_clusters_ahc(self, embeddings: np.ndarray, task_id: str = "") -> np.ndarray:
         """1D-watershed segmentation over adjacent cosine similarities.
 
@@ -208,14 +287,14 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
         return len(unique_labels), [label_map[label] for label in normalized_labels]
 
     @timeout(60 * 20)
-    async def _summarize_texts(self, texts: list[str], callback=None, task_id: str = ""):
-        """Summarize a cluster and return text plus embedding when successful."""
+    async def _summarize_text(self, texts: list[str], callback=None, task_id: str = "", cluster_content: str | None = None):
+        """Summarize a cluster and return (title, summary), or None when it had to be skipped."""
         self._check_task_canceled(task_id, "summarization")
 
-        len_per_chunk = int((self._llm_model.max_length - self._max_token) / len(texts))
-        cluster_content = "\n".join([truncate(t, max(1, len_per_chunk)) for t in texts])
+        if cluster_content is None:
+            cluster_content = self._cluster_content(texts)
         try:
-            async with chat_limiter:
+            async with _tenant_limiter(getattr(self._llm_model, "tenant_id", "")), chat_limiter:
                 self._check_task_canceled(task_id, "before LLM call")
 
                 cnt = await self._chat(
@@ -236,31 +315,75 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
                     # consume the node-size setting and truncate the summary.
                     knowledge_compile_gen_conf(self._llm_model),
                 )
-                cnt = re.sub(
-                    "(······\n由于长度的原因，回答被截断了，要继续吗？|For the content length reason, it stopped, continue?)",
-                    "",
-                    cnt,
-                )
-                cnt = str(cnt or "").strip()
-                logging.debug(f"SUM: {cnt}")
-
-                self._check_task_canceled(task_id, "before embedding")
-
-                embds = await self._embedding_encode(cnt)
-                title = cnt.splitlines()[0].strip() if cnt else ""
-                return title, cnt, embds
+            cnt = re.sub(
+                "(······\n由于长度的原因，回答被截断了，要继续吗？|For the content length reason, it stopped, continue?)",
+                "",
+                cnt,
+            )
+            cnt = str(cnt or "").strip()
+            logging.debug(f"SUM: {cnt}")
+            title = cnt.splitlines()[0].strip() if cnt else ""
+            return title, cnt
         except TaskCanceledException:
             raise
         except Exception as exc:
-            self._error_count += 1
-            warn_msg = f"[RAPTOR] Skip cluster ({len(texts)} chunks) due to error: {exc}"
-            logging.warning(warn_msg)
-            if callback:
-                callback(msg=warn_msg)
-            if self._error_count >= self._max_errors:
-                raise RuntimeError(f"RAPTOR aborted after {self._error_count} errors. Last error: {exc}") from exc
+            self._skip_cluster(len(texts), exc, callback)
             return None
 
+    async def _summarize_texts(self, texts: list[str], callback=None, task_id: str = ""):
+        """Summarize a cluster and return text plus embedding when successful."""
+        result = await self._summarize_text(texts, callback, task_id)
+        if result is None:
+            return None
+        self._check_task_canceled(task_id, "before embedding")
+        try:
+            embds = await self._embedding_encode(result[1])
+        except Exception as exc:
+            self._skip_cluster(len(texts), exc, callback)
+            return None
+        return result[0], result[1], embds
+
+    async def _summarize_layer(self, clusters: list[list[str]], callback=None, task_id: str = ""):
+        """
+        Summarize every cluster of a layer concurrently, then embed the
+        summaries in batches. Each finished summary is checkpointed, so a rerun
+        of an interrupted task only summarizes the clusters that were left.
+        Returns (title, summary, vector) per cluster, in cluster order, with
+        None for skipped clusters, and how many came from checkpoints.
+        """
+        contents = [self._cluster_content(texts) for texts in clusters]
+        keys = [self._checkpoint_key(content) for content in contents]
+        summaries = await self._load_checkpoints(keys)
+        resumed = sum(1 for r in summaries if r)
+
+        async def summarize(i):
+            result = await self._summarize_text(clusters[i], callback, task_id, contents[i])
+            if result is not None:
+                await thread_pool_exec(REDIS_CONN.set, keys[i], json.dumps(result, ensure_ascii=False), RAPTOR_CHECKPOINT_TTL)
+            summaries[i] = result
+
+        tasks = []
+        for i, result in enumerate(summaries):
+            if result is None:
+                self._check_task_canceled(task_id, "before cluster processing")
+                tasks.append(asyncio.create_task(summarize(i)))
+        try:
+            await asyncio.gather(*tasks, return_exceptions=False)
+        except Exception as e:
+            logging.error(f"Error in RAPTOR cluster processing: {e}")
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        done = [i for i, r in enumerate(summaries) if r is not None]
+        vecs = await self._embed_summaries([summaries[i][1] for i in done], [len(clusters[i]) for i in done], callback, task_id)
+        results = [None] * len(clusters)
+        for i, vec in zip(done, vecs):
+            if vec is not None:
+                results[i] = (summaries[i][0], summaries[i][1], vec)
+        return results, resumed
+
     async def __call__(
         self,
         chunks,
@@ -327,23 +450,22 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
         layers = [(0, len(chunks))]
         start, end = 0, len(chunks)
 
-        @timeout(60 * 20)
-        async def summarize(ck_idx: list[int]):
-            """Summarize one classic RAPTOR cluster into the chunk list.
-
-            On success appends ``(summary_text, summary_vec, src_ids)``
-            where ``src_ids`` is the order-preserving deduped union of
-            the ``source_chunk_ids`` of every chunk indexed in
-            ``ck_idx`` — i.e. the full leaf set that contributed to
-            the cluster, even through nested summaries.
+        async def summarize(clusters: list[list[int]]) -> int:
+            """Summarize the clusters of one layer into the chunk list.
+
+            Appends ``(summary_text, summary_vec, src_ids, summary_title)``
+            per successful cluster, in cluster order, where ``src_ids`` is
+            the order-preserving deduped union of the ``source_chunk_ids``
+            of every chunk in the cluster — i.e. the full leaf set that
+            contributed to it, even through nested summaries. The order
+            keeps the next layer's adjacency clustering (and so its
+            checkpoints) the same when an interrupted task is rerun.
+            Returns how many summaries came from checkpoints.
             """
-            nonlocal chunks
-
-            texts = [chunks[i][0] for i in ck_idx]
-            result = await self._summarize_texts(texts, callback, task_id)
-            if result is not None:
-                # ``dict.fromkeys`` is the cheapest way to de-dup a
-                # list of strings while preserving first-seen order.
+            results, resumed = await self._summarize_layer([[chunks[i][0] for i in ck_idx] for ck_idx in clusters], callback, task_id)
+            for ck_idx, result in zip(clusters, results):
+                if result is None:
+                    continue
                 merged_ids: list[str] = []
                 seen: set[str] = set()
                 for i in ck_idx:
@@ -356,6 +478,7 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
                 # Index of the just-appended summary; map it to its
                 # immediate children for the tree materializer below.
                 parent_child_map[len(chunks) - 1] = list(ck_idx)
+            return resumed
 
         while end - start > 1:
             self._check_task_canceled(task_id, "layer processing")
@@ -372,7 +495,7 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
                 # into one parent, so the upper tree doesn't descend one
                 # node per layer (N -> N-1 -> N-2 -> ... each a full
                 # clustering + summarize pass).
-                await summarize(list(range(start, end)))
+                await summarize([list(range(start, end))])
                 produced = len(chunks) - end
                 if produced == 0:
                     logging.warning("RAPTOR layer produced no summaries; stopping materialization")
@@ -417,20 +540,11 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
                 n_clusters = 1
                 lbls = [0] * len(embeddings)
 
-            tasks = []
-            for c in range(n_clusters):
-                ck_idx = [i + start for i in range(len(lbls)) if lbls[i] == c]
-                assert len(ck_idx) > 0
-                self._check_task_canceled(task_id, "before cluster processing")
-                tasks.append(asyncio.create_task(summarize(ck_idx)))
-            try:
-                await asyncio.gather(*tasks, return_exceptions=False)
-            except Exception as e:
-                logging.error(f"Error in RAPTOR cluster processing: {e}")
-                for t in tasks:
-                    t.cancel()
-                await asyncio.gather(*tasks, return_exceptions=True)
-                raise
+            clusters = [[] for _ in range(n_clusters)]
+            for i, c in enumerate(lbls):
+                clusters[c].append(i + start)
+            assert all(clusters)
+            resumed = await summarize(clusters)
 
             produced = len(chunks) - end
             assert produced <= n_clusters, "{} vs. {}".format(produced, n_clusters)
@@ -446,7 +560,7 @@ class RecursiveAbstractiveProcessing4TreeOrganizedRetrieval:
                 break
             layers.append((end, len(chunks)))
             if callback:
-                callback(msg="Cluster one layer: {} -> {}".format(end - start, produced))
+                callback(msg="Cluster one layer: {} -> {}{}".format(end - start, produced, f" ({resumed} resumed)" if resumed else ""))
             start = end
             end = len(chunks)
 
@@ -117,6 +117,7 @@ def by_deepdoc(filename, binary=None, from_page=0, to_page=MAXIMUM_PAGE_NUMBER,
     callback = callback
     binary = binary
     pdf_parser = pdf_cls() if pdf_cls else Pdf()
+    pdf_parser.text_layer_fast_path = bool((kwargs.get("parser_config") or {}).get("text_layer_fast_path", False))
     sections, tables = pdf_parser(filename if not binary else binary, from_page=from_page, to_page=to_page, callback=callback)
 
     tables = vision_figure_parser_pdf_wrapper(
@@ -17,6 +17,7 @@
 import copy
 import csv
 import io
+import itertools
 import logging
 import re
 from datetime import datetime
@@ -35,6 +36,7 @@ from common.constants import MAXIMUM_TASK_PAGE_NUMBER
 from deepdoc.parser.utils import get_text
 from rag.nlp import rag_tokenizer, tokenize, tokenize_table
 from deepdoc.parser import ExcelParser
+from deepdoc.parser.excel_parser import StreamingSheet
 from common import settings
 
 logger = logging.getLogger(__name__)
@@ -74,10 +76,15 @@ class Excel(ExcelParser):
         lang="English",
         **kwargs,
     ):
-        if not binary:
-            wb = Excel._load_excel_to_workbook(fnm)
-        else:
-            wb = Excel._load_excel_to_workbook(BytesIO(binary))
+        file_like_object = BytesIO(binary) if binary else fnm
+        stream_wb = Excel._load_streaming_workbook(file_like_object)
+        if stream_wb is not None:
+            try:
+                return self._call_streaming(stream_wb, from_page, to_page, callback)
+            finally:
+                stream_wb.close()
+
+        wb = Excel._load_excel_to_workbook(file_like_object)
         total = 0
         for sheet_name in wb.sheetnames:
             total += Excel._get_actual_row_count(wb[sheet_name])
@@ -168,6 +175,63 @@ class Excel(ExcelParser):
         callback(0.3, ("Extract records: {}~{}".format(from_page + 1, min(to_page, from_page + rn)) + (f"{len(fails)} failure, line: %s..." % (",".join(fails[:3])) if fails else "")))
         return res, tables
 
+    # Rows handed to the header heuristics in streaming mode; _detect_header_rows looks at no more than 5.
+    HEADER_PREFIX_ROWS = 5
+
+    def _call_streaming(self, wb, from_page, to_page, callback):
+        """Row-by-row variant of __call__ for large .xlsx workbooks.
+
+        Headers are detected on the first HEADER_PREFIX_ROWS rows of each sheet
+        with the same heuristics as __call__; only rows in [from_page, to_page)
+        are materialized and reading stops once to_page is reached, so memory
+        is bounded by the task's row range rather than the sheet size.
+        Embedded images are not available in read-only mode and are skipped.
+        """
+        res = []
+        rn = 0
+        for sheet_name in wb.sheetnames:
+            if rn >= to_page:
+                break
+            try:
+                ws = StreamingSheet(wb[sheet_name])
+                rows = ws.iter_rows(keep_rows=self.HEADER_PREFIX_ROWS)
+                prefix = [values for _, values in itertools.islice(rows, self.HEADER_PREFIX_ROWS)]
+            except Exception as e:
+                logging.warning(f"Skip sheet '{sheet_name}' due to rows access error: {e}")
+                continue
+            if not prefix:
+                continue
+            headers, header_rows = self._parse_headers(ws, [StreamingSheet.as_cells(values) for values in prefix])
+            if not headers:
+                continue
+            data = []
+            for row_num, values in itertools.chain(enumerate(prefix[header_rows:], header_rows + 1), rows):
+                rn += 1
+                if rn - 1 < from_page:
+                    continue
+                if rn - 1 >= to_page:
+                    break
+                row_data = self._extract_streaming_row(ws, values, row_num, len(headers))
+                if self._is_empty_row(row_data):
+                    continue
+                data.append(row_data)
+            if len(data) == 0:
+                continue
+            df = pd.DataFrame(data, columns=headers)
+            df.columns = _deduplicate_column_names(df.columns)
+            res.append(df)
+        callback(0.3, "Extract records: {}~{}".format(from_page + 1, min(to_page, from_page + rn)))
+        return res, []
+
+    def _extract_streaming_row(self, ws, values, row_num, expected_cols):
+        row_data = []
+        for col_idx in range(expected_cols):
+            cell_value = values[col_idx] if col_idx < len(values) else None
+            if cell_value is None and ws.merged_cells.ranges:
+                cell_value = ws.merged_value(row_num, col_idx + 1)
+            row_data.append(cell_value)
+        return row_data
+
     def _parse_headers(self, ws, rows):
         if len(rows) == 0:
             return [], 0
@@ -490,16 +554,16 @@ def chunk(filename, binary=None, from_page=0, to_page=MAXIMUM_TASK_PAGE_NUMBER,
         txt = get_text(filename, binary)
         delimiter = kwargs.get("delimiter", ",")
 
+        # Only the task's [from_page, to_page) rows are materialized.
         reader = csv.reader(io.StringIO(txt), delimiter=delimiter)
-        all_rows = list(reader)
-        if not all_rows:
+        headers = next(reader, None)
+        if headers is None:
             raise ValueError("Empty CSV file")
 
-        headers = all_rows[0]
         fails = []
         rows = []
 
-        for i, row in enumerate(all_rows[1 + from_page : 1 + to_page]):
+        for i, row in enumerate(itertools.islice(reader, from_page, to_page)):
             if len(row) != len(headers):
                 fails.append(str(i + from_page))
                 continue
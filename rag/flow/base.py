@@ -46,15 +46,93 @@ class ProcessBase(ComponentBase):
             await asyncio.wait_for(self._invoke(**kwargs), timeout=self._param.timeout)
             self.callback(1, "Done")
         except Exception as e:
-            if self.get_exception_default_value():
-                self.set_exception_default_value()
-            else:
-                self.set_output("_ERROR", str(e))
-            logging.exception(e)
-            self.callback(-1, str(e))
+            self._set_error(e)
         self.set_output("_elapsed_time", time.perf_counter() - self.output("_created_time"))
         return self.output()
 
+    def _set_error(self, e: Exception):
+        if self.get_exception_default_value():
+            self.set_exception_default_value()
+        else:
+            self.set_output("_ERROR", str(e))
+        logging.exception(e)
+        self.callback(-1, str(e))
+
     @timeout(int(os.environ.get("COMPONENT_EXEC_TIMEOUT", 10 * 60)))
     async def _invoke(self, **kwargs):
         raise NotImplementedError()
+
+    def can_stream(self, upstream_id: str) -> bool:
+        """
+        Whether this component can take the chunks of ``upstream_id`` batch by
+        batch (``open_stream`` + ``stream``) instead of through ``invoke``.
+        Only components that process every chunk on its own should say yes.
+        """
+        return False
+
+    async def open_stream(self, upstream_id: str, total: int, **kwargs) -> bool:
+        """Set up a streamed run over ``total`` upstream chunks; ``kwargs`` is the upstream output without its chunks."""
+        self.set_output("_created_time", time.perf_counter())
+        for k, v in kwargs.items():
+            self.set_output(k, v)
+        try:
+            await self._open_stream(upstream_id, total, **kwargs)
+        except Exception as e:
+            self._set_error(e)
+        return not self.error()
+
+    async def stream(self, batches: asyncio.Queue, out: asyncio.Queue):
+        """
+        Process the chunk batches from ``batches`` in order, putting each result
+        batch to ``out``. None ends a stream. The reassembled chunks become the
+        "chunks" output, as ``invoke`` would have set it.
+        """
+        chunks = []
+        try:
+            while (batch := await batches.get()) is not None:
+                async with asyncio.timeout(self._param.timeout):
+                    batch = await self._invoke_batch(batch)
+                chunks.extend(batch)
+                await out.put(batch)
+            self.set_output("chunks", chunks)
+            self.callback(1, "Done")
+        except Exception as e:
+            self._set_error(e)
+        await out.put(None)
+        self.set_output("_elapsed_time", time.perf_counter() - self.output("_created_time"))
+
+    async def _open_stream(self, upstream_id: str, total: int, **kwargs):
+        raise NotImplementedError()
+
+    async def _invoke_batch(self, chunks: list[dict]) -> list[dict]:
+        raise NotImplementedError()
+
+
+async def run_stream(chunks: list[dict], stages: list[ProcessBase], batch_size: int, queue_size: int):
+    """
+    Run opened streaming ``stages`` as a chain over ``chunks``: batches of
+    ``batch_size`` flow between the stages through queues holding at most
+    ``queue_size`` batches, so a stage works on one batch while the next stage
+    handles the previous one, and a slow stage holds back those before it.
+    Stops every stage as soon as one of them fails.
+    """
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+    async def feed():
+        for i in range(0, len(chunks), batch_size):
+            await queues[0].put(chunks[i : i + batch_size])
+        await queues[0].put(None)
+
+    async def drain():
+        while await queues[-1].get() is not None:
+            pass
+
+    pending = {asyncio.create_task(feed()), asyncio.create_task(drain())}
+    pending.update(asyncio.create_task(stage.stream(queues[i], queues[i + 1])) for i, stage in enumerate(stages))
+    while pending:
+        _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if any(stage.error() for stage in stages):
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            break
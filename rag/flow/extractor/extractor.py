@@ -74,6 +74,35 @@ class Extractor(ProcessBase, LLM):
             return d
         return None
 
+    async def _extract(self, ck, args, chunks_key):
+        args[chunks_key] = ck["text"]
+        msg, sys_prompt = self._sys_prompt_and_msg([], args)
+        msg.insert(0, {"role": "system", "content": sys_prompt})
+        ck[self._param.field_name] = await self._generate_async(msg)
+
+    def can_stream(self, upstream_id: str) -> bool:
+        # Per-chunk extraction over the upstream chunks; a TOC needs all of them at once.
+        if self._param.field_name == "toc":
+            return False
+        inputs = self.get_input_elements()
+        chunks_key = f"{upstream_id}@chunks"
+        return chunks_key in inputs and not any(isinstance(v["value"], list) for k, v in inputs.items() if k != chunks_key)
+
+    async def _open_stream(self, upstream_id: str, total: int, **kwargs):
+        self.set_output("output_format", "chunks")
+        self.callback(random.randint(1, 5) / 100.0, "Start to generate.")
+        self._stream_args = {k: v["value"] for k, v in self.get_input_elements().items()}
+        self._stream_key = f"{upstream_id}@chunks"
+        self._stream_total, self._stream_done = total, 0
+
+    async def _invoke_batch(self, chunks):
+        chunks = deepcopy(chunks)
+        for ck in chunks:
+            await self._extract(ck, self._stream_args, self._stream_key)
+        self._stream_done += len(chunks)
+        self.callback(self._stream_done / max(self._stream_total, 1), f"{self._stream_done} / {self._stream_total}")
+        return chunks
+
     async def _invoke(self, **kwargs):
         self.set_output("output_format", "chunks")
         self.callback(random.randint(1, 5) / 100.0, "Start to generate.")
@@ -99,10 +128,7 @@ class Extractor(ProcessBase, LLM):
 
             prog = 0
             for i, ck in enumerate(chunks):
-                args[chunks_key] = ck["text"]
-                msg, sys_prompt = self._sys_prompt_and_msg([], args)
-                msg.insert(0, {"role": "system", "content": sys_prompt})
-                ck[self._param.field_name] = await self._generate_async(msg)
+                await self._extract(ck, args, chunks_key)
                 prog += 1.0 / len(chunks)
                 if i % (len(chunks) // 100 + 1) == 1:
                     self.callback(prog, f"{i + 1} / {len(chunks)}")
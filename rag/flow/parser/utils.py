@@ -193,6 +193,7 @@ def enhance_media_sections_with_vision(
                 figures_data=[((item["image"], [""]), [(0, 0, 0, 0, 0)])],
                 context_size=0,
                 lang=lang,
+                tenant_id=tenant_id,
             )(callback=callback)
         except Exception:
             continue
@@ -17,13 +17,20 @@ import asyncio
 import datetime
 import json
 import logging
+import os
 import random
 from timeit import default_timer as timer
 from agent.canvas import Graph
 from api.db.services.document_service import DocumentService
 from api.db.services.task_service import has_canceled, TaskService, CANVAS_DEBUG_DOC_ID
+from rag.flow.base import run_stream
 from rag.utils.redis_conn import REDIS_CONN
 
+# Chunks per batch when consecutive components stream chunks to each other; 0 turns streaming off.
+PIPELINE_STREAM_BATCH_SIZE = int(os.environ.get("PIPELINE_STREAM_BATCH_SIZE", 64))
+# Batches a stage may run ahead of the next one.
+PIPELINE_STREAM_QUEUE_SIZE = int(os.environ.get("PIPELINE_STREAM_QUEUE_SIZE", 2))
+
 
 class Pipeline(Graph):
     def __init__(self, dsl: str | dict, tenant_id=None, doc_id=None, task_id=None, flow_id=None, language=None):
@@ -45,8 +52,13 @@ class Pipeline(Graph):
         from common.exceptions import TaskCanceledException
 
         log_key = f"{self._flow_id}-{self.task_id}-logs"
+        cancel_key = f"{self.task_id}-cancel"
         timestamp = timer()
-        if has_canceled(self.task_id):
+        # The cancel flag and the log are read, and the log written back with the
+        # flag read again, in one round trip each.
+        canceled, bin = REDIS_CONN.mget([cancel_key, log_key])
+        if canceled:
+            logging.info(f"Task: {self.task_id} has been canceled")
             progress = -1
             message += "[CANCEL]"
         # Progress-only callbacks are used for fine-grained updates during
@@ -54,8 +66,8 @@ class Pipeline(Graph):
         # entry; otherwise the task log is filled with timestamp-only lines.
         if not str(message or "").strip():
             return
+        canceled = None
         try:
-            bin = REDIS_CONN.get(log_key)
             obj = json.loads(bin.encode("utf-8")) if bin else []
             if obj:
                 if obj[-1]["component_id"] == component_name:
@@ -102,12 +114,18 @@ class Pipeline(Graph):
                 TaskService.update_progress(self.task_id, {"progress": finished, "progress_msg": msg})
             elif component_name == "END" and not self._doc_id:
                 obj[-1]["trace"][-1]["dsl"] = json.loads(str(self))
-            REDIS_CONN.set_obj(log_key, obj, 60 * 30)
+            with REDIS_CONN.pipeline() as pipe:
+                pipe.set(log_key, json.dumps(obj, ensure_ascii=False), 60 * 30)
+                pipe.get(cancel_key)
+            if pipe.results is not None:
+                canceled = bool(pipe.results[1])
 
         except Exception as e:
             logging.exception(e)
 
-        if has_canceled(self.task_id):
+        if canceled is None:
+            canceled = has_canceled(self.task_id)
+        if canceled:
             raise TaskCanceledException(message)
 
     def fetch_logs(self):
@@ -120,6 +138,38 @@ class Pipeline(Graph):
             logging.exception(e)
         return []
 
+    def _streaming_stages(self, idx):
+        """
+        The chain of components from ``path[idx]`` that can stream the chunks of
+        the one before it. Returned only when at least two stages would overlap.
+        """
+        upstream = self.get_component_obj(self.path[idx - 1])
+        chunks = upstream.output("chunks")
+        if PIPELINE_STREAM_BATCH_SIZE <= 0 or idx != len(self.path) - 1 or upstream.output("output_format") != "chunks" or not chunks or not isinstance(chunks, list):
+            return []
+        stages, cpn_id = [], self.path[idx]
+        while True:
+            cpn_obj = self.get_component_obj(cpn_id)
+            if not cpn_obj.can_stream(upstream._id):
+                break
+            stages.append(cpn_obj)
+            downstream = cpn_obj.get_downstream()
+            if len(downstream) != 1:
+                break
+            upstream, cpn_id = cpn_obj, downstream[0]
+        return stages if len(stages) > 1 else []
+
+    async def _run_stream(self, upstream, stages):
+        chunks = upstream.output("chunks")
+        upstream_id = upstream._id
+        kwargs = {k: v for k, v in upstream.output().items() if k != "chunks"}
+        for stage in stages:
+            if not await stage.open_stream(upstream_id, len(chunks), **kwargs):
+                return
+            upstream_id = stage._id
+            kwargs = {k: v for k, v in stage.output().items() if k != "chunks"}
+        await run_stream(chunks, stages, PIPELINE_STREAM_BATCH_SIZE, PIPELINE_STREAM_QUEUE_SIZE)
+
     async def run(self, **kwargs):
         log_key = f"{self._flow_id}-{self.task_id}-logs"
         try:
@@ -147,6 +197,19 @@ class Pipeline(Graph):
 
         while idx < len(self.path) and not self.error:
             last_cpn = self.get_component_obj(self.path[idx - 1])
+            stages = self._streaming_stages(idx)
+            if stages:
+                await self._run_stream(last_cpn, stages)
+                failed = next((stage for stage in stages if stage.error()), None)
+                if failed:
+                    self.error = "[ERROR]" + failed.error()
+                    self.callback(failed._id, -1, self.error)
+                    break
+                idx += len(stages)
+                for stage in stages:
+                    self.path.extend(stage.get_downstream())
+                continue
+
             cpn_obj = self.get_component_obj(self.path[idx])
 
             async def invoke():
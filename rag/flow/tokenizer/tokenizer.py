@@ -52,13 +52,10 @@ class TokenizerParam(ProcessParamBase):
 class Tokenizer(ProcessBase):
     component_name = "Tokenizer"
 
-    async def _embedding(self, name, chunks):
-        # Tokenization may legitimately produce zero chunks; embedding should be a no-op.
-        if not chunks:
-            return [], 0
-
-        parts = sum(["full_text" in self._param.search_method, "embedding" in self._param.search_method])
-        token_count = 0
+    async def _embedding_model(self, name):
+        # Resolved once per run: a streamed run embeds many batches with the same model and title.
+        if getattr(self, "_embd_title", None) is not None and self._embd_title[0] == name:
+            return self._embd_mdl, self._embd_title[1], 0
         if self._canvas._kb_id:
             e, kb = KnowledgebaseService.get_by_id(self._canvas._kb_id)
             if kb.tenant_embd_id:
@@ -70,7 +67,18 @@ class Tokenizer(ProcessBase):
                 embd_model_config = resolve_model_config(self._canvas._tenant_id, LLMType.EMBEDDING, kb.embd_id)
         else:
             embd_model_config = get_tenant_default_model_by_type(self._canvas._tenant_id, LLMType.EMBEDDING)
-        embedding_model = LLMBundle(self._canvas._tenant_id, embd_model_config)
+        self._embd_mdl = LLMBundle(self._canvas._tenant_id, embd_model_config)
+        vts, c = self._embd_mdl.encode([name])
+        self._embd_title = (name, vts[0])
+        return self._embd_mdl, vts[0], c
+
+    async def _embedding(self, name, chunks):
+        # Tokenization may legitimately produce zero chunks; embedding should be a no-op.
+        if not chunks:
+            return [], 0
+
+        parts = sum(["full_text" in self._param.search_method, "embedding" in self._param.search_method])
+        token_count = 0
         texts = []
         valid_pairs = []
         for i, c in enumerate(chunks):
@@ -92,9 +100,9 @@ class Tokenizer(ProcessBase):
         if not texts:
             return chunks, token_count
 
-        vts, c = embedding_model.encode([name])
+        embedding_model, title_vec, c = await self._embedding_model(name)
         token_count += c
-        tts = np.tile(vts[0], (len(texts), 1))
+        tts = np.tile(title_vec, (len(texts), 1))
 
         @timeout(60)
         def batch_encode(txts):
@@ -124,6 +132,55 @@ class Tokenizer(ProcessBase):
             ck["q_%d_vec" % len(v)] = v
         return chunks, token_count
 
+    @staticmethod
+    def _tokenize_chunk(ck, order, name):
+        ck["chunk_order_int"] = order
+        ck["title_tks"] = rag_tokenizer.tokenize(re.sub(r"\.[a-zA-Z]+$", "", name))
+        ck["title_sm_tks"] = rag_tokenizer.fine_grained_tokenize(ck["title_tks"])
+        if ck.get("questions"):
+            ck["question_kwd"] = ck["questions"].split("\n")
+            ck["question_tks"] = rag_tokenizer.tokenize(str(ck["questions"]))
+        if ck.get("keywords"):
+            ck["important_kwd"] = ck["keywords"].split(",")
+            ck["important_tks"] = rag_tokenizer.tokenize(str(ck["keywords"]))
+        if ck.get("summary"):
+            ck["content_ltks"] = rag_tokenizer.tokenize(str(ck["summary"]))
+            ck["content_sm_ltks"] = rag_tokenizer.fine_grained_tokenize(ck["content_ltks"])
+        elif ck.get("text"):
+            ck["content_ltks"] = rag_tokenizer.tokenize(ck["text"])
+            ck["content_sm_ltks"] = rag_tokenizer.fine_grained_tokenize(ck["content_ltks"])
+
+    def can_stream(self, upstream_id: str) -> bool:
+        return True
+
+    async def _open_stream(self, upstream_id: str, total: int, **kwargs):
+        self._from_upstream = TokenizerFromUpstream.model_validate({**kwargs, "chunks": []})
+        if self._from_upstream.output_format != "chunks":
+            raise ValueError(f"Tokenizer can only stream chunks, got {self._from_upstream.output_format}.")
+        if "embedding" in self._param.search_method and self._from_upstream.name.strip() == "":
+            logging.warning("Tokenizer: empty name provided from upstream, embedding may be not accurate.")
+        self._stream_total, self._stream_done, self._stream_tokens = total, 0, 0
+        self.set_output("output_format", "chunks")
+        self.callback(random.randint(1, 5) / 100.0, "Start to tokenize and embed.")
+
+    async def _invoke_batch(self, chunks):
+        chunks = [c for c in chunks if c is not None]
+        if "full_text" in self._param.search_method:
+
+            def tokenize():
+                for i, ck in enumerate(chunks):
+                    self._tokenize_chunk(ck, self._stream_done + i, self._from_upstream.name)
+
+            # Off the event loop, so the stages before and after keep going meanwhile.
+            await thread_pool_exec(tokenize)
+        if "embedding" in self._param.search_method:
+            chunks, token_count = await self._embedding(self._from_upstream.name, chunks)
+            self._stream_tokens += token_count
+            self.set_output("embedding_token_consumption", self._stream_tokens)
+        self._stream_done += len(chunks)
+        self.callback(self._stream_done / max(self._stream_total, 1))
+        return [finalize_pdf_chunk(ck) for ck in chunks]
+
     async def _invoke(self, **kwargs):
         try:
             chunks = kwargs.get("chunks")
@@ -143,21 +200,7 @@ class Tokenizer(ProcessBase):
             if from_upstream.output_format == "chunks":
                 chunks = from_upstream.chunks or []
                 for i, ck in enumerate(chunks):
-                    ck["chunk_order_int"] = i
-                    ck["title_tks"] = rag_tokenizer.tokenize(re.sub(r"\.[a-zA-Z]+$", "", from_upstream.name))
-                    ck["title_sm_tks"] = rag_tokenizer.fine_grained_tokenize(ck["title_tks"])
-                    if ck.get("questions"):
-                        ck["question_kwd"] = ck["questions"].split("\n")
-                        ck["question_tks"] = rag_tokenizer.tokenize(str(ck["questions"]))
-                    if ck.get("keywords"):
-                        ck["important_kwd"] = ck["keywords"].split(",")
-                        ck["important_tks"] = rag_tokenizer.tokenize(str(ck["keywords"]))
-                    if ck.get("summary"):
-                        ck["content_ltks"] = rag_tokenizer.tokenize(str(ck["summary"]))
-                        ck["content_sm_ltks"] = rag_tokenizer.fine_grained_tokenize(ck["content_ltks"])
-                    elif ck.get("text"):
-                        ck["content_ltks"] = rag_tokenizer.tokenize(ck["text"])
-                        ck["content_sm_ltks"] = rag_tokenizer.fine_grained_tokenize(ck["content_ltks"])
+                    self._tokenize_chunk(ck, i, from_upstream.name)
                     if i % 100 == 99:
                         self.callback(i * 1.0 / len(chunks) / parts)
 
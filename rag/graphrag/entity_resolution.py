@@ -29,6 +29,7 @@ from rag.graphrag.general.extractor import Extractor
 from rag.nlp import is_english
 from rag.graphrag.entity_resolution_prompt import ENTITY_RESOLUTION_PROMPT
 from rag.graphrag.checkpoints import resolution_checkpoint_key
+from rag.graphrag.graph_engine import pagerank
 from rag.llm.chat_model import Base as CompletionLLM
 from rag.graphrag.utils import perform_variable_replacements, chat_limiter, GraphChange
 from api.db.services.task_service import has_canceled
@@ -187,9 +188,9 @@ class EntityResolution(Extractor):
             raise
 
         # Update pagerank
-        pr = nx.pagerank(graph)
-        for node_name, pagerank in pr.items():
-            graph.nodes[node_name]["pagerank"] = pagerank
+        pr = pagerank(graph)
+        for node_name, score in pr.items():
+            graph.nodes[node_name]["pagerank"] = score
 
         return EntityResolutionResult(
             graph=graph,
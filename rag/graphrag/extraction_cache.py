@@ -0,0 +1,112 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Per-chunk cache of entity and relation extraction results.
+
+A graph rebuild re-runs extraction over every chunk of every document, though
+most chunks are unchanged since the last build. :class:`ExtractionCache` keeps
+the nodes and edges extracted from each chunk in object storage, in the
+knowledge base's bucket, under a key derived from the chunk content and the
+extractor namespace (extractor class, prompts and settings, LLM). A chunk whose
+key is found skips the LLM round trips, including gleaning, entirely.
+"""
+
+import json
+import logging
+import os
+
+import xxhash
+
+from common import settings
+from common.misc_utils import thread_pool_exec
+
+# Bump when the cached record layout or the extraction output changes.
+EXTRACTION_CACHE_VERSION = 1
+EXTRACTION_CACHE_PREFIX = "graphrag_extraction"
+EXTRACTION_CACHE_ENABLED = os.environ.get("GRAPHRAG_EXTRACTION_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def extraction_namespace(extractor_cls: type, llm_name: str, settings_: dict) -> str:
+    """Hash everything besides the chunk that determines an extractor's output."""
+    hasher = xxhash.xxh64()
+    hasher.update(f"{EXTRACTION_CACHE_VERSION}\0{extractor_cls.__module__}.{extractor_cls.__qualname__}\0{llm_name}\0".encode("utf-8"))
+    hasher.update(json.dumps(settings_, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class ExtractionCache:
+    """Extraction results of single chunks, stored in the ``kb_id`` bucket.
+
+    ``hits``, ``misses`` and ``stored`` count lookups and writes since the
+    cache was created; :meth:`summary` formats them for the progress log.
+    Storage errors are logged and treated as misses, never raised.
+    """
+
+    def __init__(self, kb_id: str, namespace: str):
+        self.kb_id = kb_id
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    def _object_name(self, content: str) -> str:
+        hasher = xxhash.xxh128()
+        hasher.update(self.namespace.encode("utf-8"))
+        hasher.update(content.encode("utf-8"))
+        return f"{EXTRACTION_CACHE_PREFIX}/{hasher.hexdigest()}.json"
+
+    async def get(self, content: str, chunk_key: str) -> tuple[dict, dict] | None:
+        """Return ``(nodes, edges)`` extracted from ``content`` before, attributed to ``chunk_key``."""
+        name = self._object_name(content)
+        try:
+            binary = None
+            # A missing object makes some storage backends log and back off, so check first.
+            if await thread_pool_exec(settings.STORAGE_IMPL.obj_exist, self.kb_id, name):
+                binary = await thread_pool_exec(settings.STORAGE_IMPL.get, self.kb_id, name)
+            if not binary:
+                self.misses += 1
+                return None
+            cached = json.loads(binary)
+        except Exception as e:
+            logging.warning(f"Extraction cache lookup {self.kb_id}/{name} failed: {e}")
+            self.misses += 1
+            return None
+
+        nodes = {}
+        for name_, records in cached["nodes"].items():
+            nodes[name_] = [{**r, "source_id": chunk_key} for r in records]
+        edges = {}
+        for src, tgt, records in cached["edges"]:
+            edges[(src, tgt)] = [{**r, "source_id": chunk_key} for r in records]
+        self.hits += 1
+        return nodes, edges
+
+    async def put(self, content: str, nodes: dict, edges: dict):
+        name = self._object_name(content)
+        cached = {
+            "nodes": nodes,
+            "edges": [[src, tgt, records] for (src, tgt), records in edges.items()],
+        }
+        try:
+            binary = json.dumps(cached, ensure_ascii=False).encode("utf-8")
+            await thread_pool_exec(settings.STORAGE_IMPL.put, self.kb_id, name, binary)
+            self.stored += 1
+        except Exception as e:
+            logging.warning(f"Extraction cache write {self.kb_id}/{name} failed: {e}")
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return f"Extraction cache: {self.hits} hits, {self.misses} misses of {total} chunks, {self.stored} stored."
@@ -14,6 +14,7 @@
 #  limitations under the License.
 #
 import asyncio
+import json
 import logging
 import os
 import re
@@ -25,6 +26,7 @@ import networkx as nx
 
 from api.db.services.task_service import has_canceled
 from common.token_utils import truncate
+from rag.graphrag.extraction_cache import EXTRACTION_CACHE_ENABLED, ExtractionCache, extraction_namespace
 from rag.graphrag.general.graph_prompt import SUMMARIZE_DESCRIPTIONS_PROMPT
 from rag.graphrag.utils import (
     GraphChange,
@@ -50,6 +52,8 @@ MAX_CONCURRENT_PROCESS_AND_EXTRACT_CHUNK = int(os.environ.get("MAX_CONCURRENT_PR
 
 class Extractor:
     _llm: CompletionLLM
+    # Whether per-chunk results are worth persisting in the extraction cache.
+    _cache_extraction = True
 
     def __init__(
         self,
@@ -111,6 +115,39 @@ class Extractor:
 
         return response
 
+    def _extraction_cache_settings(self) -> dict:
+        """JSON-serializable attributes, i.e. the prompts and settings that shape extraction output."""
+        res = {}
+        for k, v in vars(self).items():
+            if k in ("_llm", "callback"):
+                continue
+            try:
+                json.dumps(v)
+            except (TypeError, ValueError):
+                continue
+            res[k] = v
+        return res
+
+    def _extraction_cache(self, kb_id: str) -> ExtractionCache | None:
+        if not kb_id or not self._cache_extraction or not EXTRACTION_CACHE_ENABLED:
+            return None
+        return ExtractionCache(kb_id, extraction_namespace(type(self), self._llm.llm_name, self._extraction_cache_settings()))
+
+    async def _load_cached_extraction(self, cache: ExtractionCache | None, chunk_key_dp: tuple[str, str], chunk_seq: int, num_chunks: int, out_results) -> bool:
+        if cache is None:
+            return False
+        cached = await cache.get(chunk_key_dp[1], chunk_key_dp[0])
+        if cached is None:
+            return False
+        maybe_nodes, maybe_edges = cached
+        out_results.append((maybe_nodes, maybe_edges, 0))
+        if self.callback:
+            self.callback(
+                0.5 + 0.1 * len(out_results) / num_chunks,
+                msg=f"Entities extraction of chunk {chunk_seq + 1} {len(out_results)}/{num_chunks} loaded from cache, {len(maybe_nodes)} nodes, {len(maybe_edges)} edges.",
+            )
+        return True
+
     def _entities_and_relations(self, chunk_key: str, records: list, tuple_delimiter: str):
         maybe_nodes = defaultdict(list)
         maybe_edges = defaultdict(list)
@@ -128,9 +165,10 @@ class Extractor:
                 maybe_edges[(if_relation["src_id"], if_relation["tgt_id"])].append(if_relation)
         return dict(maybe_nodes), dict(maybe_edges)
 
-    async def __call__(self, doc_id: str, chunks: list[str], callback: Callable | None = None, task_id: str = ""):
+    async def __call__(self, doc_id: str, chunks: list[str], callback: Callable | None = None, task_id: str = "", kb_id: str = ""):
         self.callback = callback
         start_ts = asyncio.get_running_loop().time()
+        cache = self._extraction_cache(kb_id)
 
         async def extract_all(doc_id, chunks, max_concurrency=MAX_CONCURRENT_PROCESS_AND_EXTRACT_CHUNK, task_id=""):
             out_results = []
@@ -146,7 +184,12 @@ class Extractor:
                         raise TaskCanceledException(f"Task {task_id} was cancelled during entity extraction")
 
                     try:
-                        await self._process_single_content(chunk_key_dp, idx, total, out_results, task_id)
+                        if not await self._load_cached_extraction(cache, chunk_key_dp, idx, total, out_results):
+                            await self._process_single_content(chunk_key_dp, idx, total, out_results, task_id)
+                            if cache:
+                                # _process_single_content appends this chunk's result last and returns without awaiting.
+                                maybe_nodes, maybe_edges, _ = out_results[-1]
+                                await cache.put(chunk_key_dp[1], maybe_nodes, maybe_edges)
                     except Exception as e:
                         error_count += 1
                         error_msg = f"Error processing chunk {idx + 1}/{total}: {str(e)}"
@@ -196,6 +239,8 @@ class Extractor:
         now = asyncio.get_running_loop().time()
         if self.callback:
             self.callback(msg=f"Entities and relationships extraction done, {len(maybe_nodes)} nodes, {len(maybe_edges)} edges, {sum_token_count} tokens, {now - start_ts:.2f}s.")
+            if cache:
+                self.callback(msg=cache.summary())
         start_ts = now
         logging.info("Entities merging...")
         all_entities_data = []
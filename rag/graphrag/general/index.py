@@ -34,6 +34,7 @@ from rag.graphrag.checkpoints import (
 from rag.graphrag.general.community_reports_extractor import CommunityReportsExtractor
 from rag.graphrag.general.extractor import Extractor
 from rag.graphrag.general.graph_extractor import GraphExtractor as GeneralKGExt
+from rag.graphrag.graph_engine import pagerank
 from rag.graphrag.light.graph_extractor import GraphExtractor as LightKGExt
 from rag.graphrag.ner.graph_extractor import GraphExtractor as NerKGExt
 from rag.graphrag.phase_markers import (
@@ -486,10 +487,10 @@ async def run_graphrag_for_kb(
             try:
 
                 async def merge_subgraph_attempt():
-                    current_graph = await get_graph(tenant_id, kb_id)
-                    if current_graph and doc_id in current_graph.graph.get("source_id", []):
+                    # Check the manifest only; the full graph is loaded by merge_subgraph.
+                    if await does_graph_contains(tenant_id, kb_id, doc_id):
                         callback(msg=f"[GraphRAG] merge_subgraph doc:{doc_id} already merged, skipping retry.")
-                        return current_graph
+                        return await get_graph(tenant_id, kb_id)
                     return await merge_subgraph(
                         tenant_id,
                         kb_id,
@@ -754,7 +755,7 @@ async def generate_subgraph(
         language=language,
         entity_types=entity_types,
     )
-    ents, rels = await ext(doc_id, chunks, callback, task_id=task_id)
+    ents, rels = await ext(doc_id, chunks, callback, task_id=task_id, kb_id=kb_id)
     subgraph = nx.Graph()
 
     for ent in ents:
@@ -837,9 +838,9 @@ async def merge_subgraph(
         new_graph = subgraph
         change.added_updated_nodes = set(new_graph.nodes())
         change.added_updated_edges = set(new_graph.edges())
-    pr = nx.pagerank(new_graph)
-    for node_name, pagerank in pr.items():
-        new_graph.nodes[node_name]["pagerank"] = pagerank
+    pr = pagerank(new_graph)
+    for node_name, score in pr.items():
+        new_graph.nodes[node_name]["pagerank"] = score
 
     await set_graph(tenant_id, kb_id, embedding_model, new_graph, change, callback)
     now = asyncio.get_running_loop().time()
@@ -7,12 +7,21 @@ Reference:
 
 import logging
 import html
-from typing import Any, cast
+import threading
+from collections import OrderedDict
+from typing import Any
 from graspologic.partition import hierarchical_leiden
-from graspologic.utils import largest_connected_component
 import networkx as nx
+import xxhash
 from networkx import is_empty
 
+from rag.graphrag.graph_engine import connected_components, largest_connected_component
+
+# Leiden results of recently clustered (sub)graphs, keyed by graph signature.
+_LEIDEN_CACHE_SIZE = 64
+_leiden_cache: OrderedDict[str, dict[int, dict[str, int]]] = OrderedDict()
+_leiden_cache_lock = threading.Lock()
+
 
 def _stabilize_graph(graph: nx.Graph) -> nx.Graph:
     """Ensure an undirected graph with the same relationships will always be read the same way."""
@@ -63,30 +72,68 @@ def normalize_node_names(graph: nx.Graph | nx.DiGraph) -> nx.Graph | nx.DiGraph:
 
 def stable_largest_connected_component(graph: nx.Graph) -> nx.Graph:
     """Return the largest connected component of the graph, with nodes and edges sorted in a stable way."""
-    graph = graph.copy()
-    graph = cast(nx.Graph, largest_connected_component(graph))
+    graph = graph.subgraph(largest_connected_component(graph)).copy()
     graph = normalize_node_names(graph)
     return _stabilize_graph(graph)
 
 
+def _graph_signature(graph: nx.Graph, max_cluster_size: int, seed) -> str:
+    h = xxhash.xxh64(f"{max_cluster_size}:{seed}:".encode("utf-8"))
+    for node in graph.nodes:
+        h.update(f"{node}\x00".encode("utf-8"))
+    h.update(b"\x01")
+    for source, target, data in graph.edges(data=True):
+        h.update(f"{source}\x00{target}\x00{data.get('weight', 1)}\x00".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _hierarchical_leiden(graph: nx.Graph, max_cluster_size: int, seed) -> dict[int, dict[str, int]]:
+    """Cluster a stabilized graph, reusing the result for a graph clustered before."""
+    key = _graph_signature(graph, max_cluster_size, seed)
+    with _leiden_cache_lock:
+        if key in _leiden_cache:
+            _leiden_cache.move_to_end(key)
+            return _leiden_cache[key]
+
+    results: dict[int, dict[str, int]] = {}
+    for partition in hierarchical_leiden(graph, max_cluster_size=max_cluster_size, random_seed=seed):
+        results.setdefault(partition.level, {})[partition.node] = partition.cluster
+
+    with _leiden_cache_lock:
+        _leiden_cache[key] = results
+        while len(_leiden_cache) > _LEIDEN_CACHE_SIZE:
+            _leiden_cache.popitem(last=False)
+    return results
+
+
 def _compute_leiden_communities(
     graph: nx.Graph | nx.DiGraph,
     max_cluster_size: int,
     use_lcc: bool,
     seed=0xDEADBEEF,
 ) -> dict[int, dict[str, int]]:
-    """Return Leiden root communities."""
+    """Return Leiden root communities.
+
+    Without ``use_lcc`` every connected component is clustered on its own, as
+    communities never span components, so only the components changed since an
+    earlier run are clustered again.
+    """
     results: dict[int, dict[str, int]] = {}
     if is_empty(graph):
         return results
     if use_lcc:
-        graph = stable_largest_connected_component(graph)
-
-    community_mapping = hierarchical_leiden(graph, max_cluster_size=max_cluster_size, random_seed=seed)
-    for partition in community_mapping:
-        results[partition.level] = results.get(partition.level, {})
-        results[partition.level][partition.node] = partition.cluster
+        return _hierarchical_leiden(stable_largest_connected_component(graph), max_cluster_size, seed)
 
+    for nodes in connected_components(graph):
+        if len(nodes) < 2:
+            continue
+        component = _hierarchical_leiden(_stabilize_graph(graph.subgraph(nodes)), max_cluster_size, seed)
+        # Cluster ids restart in every component; shift them past the ids used so far.
+        for level, mapping in component.items():
+            level_results = results.setdefault(level, {})
+            offset = max(level_results.values(), default=-1) + 1
+            for node, cluster in mapping.items():
+                level_results[node] = cluster + offset
     return results
 
 
@@ -0,0 +1,163 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Array-backed graph algorithms for the knowledge graph.
+
+:class:`CSRGraph` stores an undirected graph as CSR adjacency over integer node
+ids, so PageRank, n-hop path enumeration and connected components run over
+NumPy arrays instead of networkx dict-of-dicts. The module-level functions are
+the networkx adapter: they take an ``nx.Graph`` and return results keyed by
+node name, so existing call sites keep working.
+"""
+
+import networkx as nx
+import numpy as np
+
+
+class CSRGraph:
+    """Undirected graph as CSR adjacency with integer node ids.
+
+    ``nodes[i]`` is the name of node ``i``; the neighbours of ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]`` with edge weights ``weights`` at the
+    same positions. Every edge is stored in both directions, a self-loop once.
+    ``weighted`` marks entries whose edge carries the weight attribute.
+    """
+
+    def __init__(self, nodes: list, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, weighted: np.ndarray):
+        self.nodes = nodes
+        self.index = {n: i for i, n in enumerate(nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.weighted = weighted
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph, weight: str = "weight") -> "CSRGraph":
+        nodes = list(graph)
+        index = {n: i for i, n in enumerate(nodes)}
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        indices, weights, weighted = [], [], []
+        for i, n in enumerate(nodes):
+            for nbr, attrs in graph.adj[n].items():
+                indices.append(index[nbr])
+                w = attrs.get(weight)
+                weighted.append(w is not None)
+                weights.append(0 if w is None else w)
+            indptr[i + 1] = len(indices)
+        return cls(nodes, indptr, np.asarray(indices, dtype=np.int64), np.asarray(weights) if weights else np.zeros(0), np.asarray(weighted, dtype=bool))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def pagerank(self, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6) -> np.ndarray:
+        """Power-iteration PageRank with networkx's defaults.
+
+        Edges without a weight count as 1 and dangling nodes spread their rank
+        uniformly, as in ``nx.pagerank``.
+        """
+        n = len(self.nodes)
+        if n == 0:
+            return np.zeros(0)
+        w = np.where(self.weighted, self.weights, 1).astype(np.float64)
+        rows = np.repeat(np.arange(n), self.degree())
+        out_weight = np.bincount(rows, weights=w, minlength=n)
+        dangling = out_weight == 0
+        # Transition weight of every stored entry, from its row to its column.
+        transition = w / np.where(dangling, 1, out_weight)[rows]
+        x = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            x_last = x
+            x = alpha * (np.bincount(self.indices, weights=x[rows] * transition, minlength=n) + x[dangling].sum() / n) + (1 - alpha) / n
+            if np.abs(x - x_last).sum() < n * tol:
+                return x
+        raise nx.PowerIterationFailedConvergence(max_iter)
+
+    def n_hop_paths(self, sources, n_hop: int = 2) -> dict:
+        """Enumerate paths of up to ``n_hop`` edges from each of ``sources``.
+
+        Same paths, order and weights as :func:`rag.graphrag.utils.n_neighbor`:
+        a path is extended by every neighbour except the node it came from,
+        stops when it revisits a node, and is kept as-is when it cannot grow.
+        Missing edge weights read as 0.
+        """
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        weights = np.where(self.weighted, self.weights, 0).tolist()
+        res = {}
+        for source in sources:
+            i = self.index[source]
+            paths = [((i, indices[k]), (weights[k],)) for k in range(indptr[i], indptr[i + 1])]
+            for _ in range(n_hop - 1):
+                grown = []
+                for path, wts in paths:
+                    last = path[-1]
+                    if last in path[:-1]:
+                        grown.append((path, wts))
+                        continue
+                    before = len(grown)
+                    for k in range(indptr[last], indptr[last + 1]):
+                        if indices[k] != path[-2]:
+                            grown.append((path + (indices[k],), wts + (weights[k],)))
+                    if len(grown) == before:
+                        grown.append((path, wts))
+                paths = grown
+            res[source] = [{"path": tuple(self.nodes[j] for j in path), "weights": list(wts)} for path, wts in paths]
+        return res
+
+    def connected_components(self) -> np.ndarray:
+        """Component label of every node, numbered in order of each component's first node."""
+        from scipy.sparse import csr_array
+        from scipy.sparse.csgraph import connected_components
+
+        n = len(self.nodes)
+        adjacency = csr_array((np.ones(len(self.indices)), self.indices, self.indptr), shape=(n, n))
+        _, labels = connected_components(adjacency, directed=False)
+        return labels
+
+
+def pagerank(graph: nx.Graph, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6, weight: str = "weight") -> dict:
+    """Drop-in replacement for ``nx.pagerank`` on undirected graphs."""
+    csr = CSRGraph.from_networkx(graph, weight)
+    return dict(zip(csr.nodes, csr.pagerank(alpha, max_iter, tol).tolist()))
+
+
+def n_hop_neighbors(graph: nx.Graph, nodes, n_hop: int = 2) -> dict:
+    """Return ``n_neighbor`` results for all of ``nodes`` with one pass over the graph."""
+    return CSRGraph.from_networkx(graph).n_hop_paths(nodes, n_hop)
+
+
+def largest_connected_component(graph: nx.Graph) -> list:
+    """Nodes of the largest connected component; ties go to the component met first."""
+    if graph.number_of_nodes() == 0:
+        return []
+    csr = CSRGraph.from_networkx(graph)
+    labels = csr.connected_components()
+    largest = int(np.bincount(labels).argmax())
+    return [csr.nodes[i] for i in np.flatnonzero(labels == largest)]
+
+
+def connected_components(graph: nx.Graph) -> list[list]:
+    """Node lists of every connected component, in order of each component's first node."""
+    if graph.number_of_nodes() == 0:
+        return []
+    csr = CSRGraph.from_networkx(graph)
+    labels = csr.connected_components()
+    order = np.argsort(labels, kind="stable")
+    bounds = np.cumsum(np.bincount(labels))[:-1]
+    return [[csr.nodes[i] for i in part] for part in np.split(order, bounds)]
@@ -370,6 +370,9 @@ class GraphExtractor(Extractor):
         edge weights instead of the fixed ``relationship_strength``.
     """
 
+    # spaCy extraction is cheaper than an object storage round trip.
+    _cache_extraction = False
+
     def __init__(
         self,
         llm_invoker: CompletionLLM,
@@ -21,15 +21,17 @@ from copy import deepcopy
 import json_repair
 import pandas as pd
 
+from timeit import default_timer as timer
+
 from common.misc_utils import get_uuid
 from rag.graphrag.query_analyze_prompt import PROMPTS
-from rag.graphrag.utils import get_entity_type2samples, get_llm_cache, set_llm_cache, get_relation
+from rag.graphrag.utils import get_entity_type2samples, get_llm_cache, set_llm_cache
 from common.token_utils import num_tokens_from_string
 
 from rag.nlp.search import Dealer, index_name
 from common.float_utils import get_float
 from common import settings
-from common.doc_store.doc_store_base import OrderByExpr
+from common.doc_store.doc_store_base import OrderByExpr, SearchRequest
 
 
 class KGSearch(Dealer):
@@ -107,35 +109,121 @@ class KGSearch(Dealer):
             res[(f, t)] = {"sim": get_float(ent.get("_score", 0)), "pagerank": get_float(ent.get("weight_int", 0)), "description": ent["content_with_weight"]}
         return res
 
-    def get_relevant_ents_by_keywords(self, keywords, filters, idxnms, kb_ids, emb_mdl, sim_thr=0.3, N=56):
-        if not keywords:
-            return {}
+    @staticmethod
+    def _ents_by_keywords_request(filters, idxnms, kb_ids, matchDense, N=56):
         filters = deepcopy(filters)
         filters["knowledge_graph_kwd"] = "entity"
-        matchDense = self.get_vector(", ".join(keywords), emb_mdl, 1024, sim_thr)
-        es_res = self.dataStore.search(["content_with_weight", "entity_kwd", "rank_flt", "n_hop_with_weight"], [], filters, [matchDense], OrderByExpr(), 0, N, idxnms, kb_ids)
+        return SearchRequest(["content_with_weight", "entity_kwd", "rank_flt", "n_hop_with_weight"], [], filters, [matchDense], OrderByExpr(), 0, N, idxnms, kb_ids)
+
+    @staticmethod
+    def _relations_by_txt_request(filters, idxnms, kb_ids, matchDense, N=56):
+        filters = deepcopy(filters)
+        filters["knowledge_graph_kwd"] = "relation"
+        return SearchRequest(["content_with_weight", "_score", "from_entity_kwd", "to_entity_kwd", "weight_int"], [], filters, [matchDense], OrderByExpr(), 0, N, idxnms, kb_ids)
+
+    async def get_relevant_ents_by_keywords(self, keywords, filters, idxnms, kb_ids, emb_mdl, sim_thr=0.3, N=56):
+        if not keywords:
+            return {}
+        matchDense = await self.get_vector(", ".join(keywords), emb_mdl, 1024, sim_thr)
+        es_res = await self.dataStore.search_async(*self._ents_by_keywords_request(filters, idxnms, kb_ids, matchDense, N).args())
         return self._ent_info_from_(es_res, sim_thr)
 
-    def get_relevant_relations_by_txt(self, txt, filters, idxnms, kb_ids, emb_mdl, sim_thr=0.3, N=56):
+    async def get_relevant_relations_by_txt(self, txt, filters, idxnms, kb_ids, emb_mdl, sim_thr=0.3, N=56):
         if not txt:
             return {}
-        filters = deepcopy(filters)
-        filters["knowledge_graph_kwd"] = "relation"
-        matchDense = self.get_vector(txt, emb_mdl, 1024, sim_thr)
-        es_res = self.dataStore.search(["content_with_weight", "_score", "from_entity_kwd", "to_entity_kwd", "weight_int"], [], filters, [matchDense], OrderByExpr(), 0, N, idxnms, kb_ids)
+        matchDense = await self.get_vector(txt, emb_mdl, 1024, sim_thr)
+        es_res = await self.dataStore.search_async(*self._relations_by_txt_request(filters, idxnms, kb_ids, matchDense, N).args())
         return self._relation_info_from_(es_res, sim_thr)
 
-    def get_relevant_ents_by_types(self, types, filters, idxnms, kb_ids, N=56):
+    async def get_relevant_ents_and_relations(self, keywords, txt, filters, idxnms, kb_ids, emb_mdl, ent_sim_thr=0.3, rel_sim_thr=0.3, N=56):
+        """Entities by *keywords* and relations by *txt*, searched in one doc store round trip."""
+
+        async def no_vector():
+            return None
+
+        ent_vector, rel_vector = await asyncio.gather(
+            self.get_vector(", ".join(keywords), emb_mdl, 1024, ent_sim_thr) if keywords else no_vector(),
+            self.get_vector(txt, emb_mdl, 1024, rel_sim_thr) if txt else no_vector(),
+        )
+        requests = []
+        if ent_vector is not None:
+            requests.append(self._ents_by_keywords_request(filters, idxnms, kb_ids, ent_vector, N))
+        if rel_vector is not None:
+            requests.append(self._relations_by_txt_request(filters, idxnms, kb_ids, rel_vector, N))
+        results = await self.dataStore.multi_search_async(requests) if requests else []
+        ents = self._ent_info_from_(results.pop(0), ent_sim_thr) if ent_vector is not None else {}
+        rels = self._relation_info_from_(results.pop(0), rel_sim_thr) if rel_vector is not None else {}
+        return ents, rels
+
+    async def get_relevant_ents_by_types(self, types, filters, idxnms, kb_ids, N=56, entities=None):
+        """Return the top-*N* entities of *types* by pagerank.
+
+        With *entities*, only those names are checked, so the result answers
+        "which candidates have one of these types" without scanning every
+        entity of the types.
+        """
         if not types:
             return {}
         filters = deepcopy(filters)
         filters["knowledge_graph_kwd"] = "entity"
         filters["entity_type_kwd"] = types
+        if entities is not None:
+            if not entities:
+                return {}
+            filters["entity_kwd"] = list(entities)
+            # The same entity name can exist once per knowledge base.
+            N = len(filters["entity_kwd"]) * max(1, len(kb_ids))
         ordr = OrderByExpr()
         ordr.desc("rank_flt")
-        es_res = self.dataStore.search(["entity_kwd", "rank_flt"], [], filters, [], ordr, 0, N, idxnms, kb_ids)
+        es_res = await self.dataStore.search_async(["entity_kwd", "rank_flt"], [], filters, [], ordr, 0, N, idxnms, kb_ids)
         return self._ent_info_from_(es_res, 0)
 
+    _RELATION_DESCRIPTION_FIELDS = ["content_with_weight", "from_entity_kwd", "to_entity_kwd"]
+
+    def _relation_descriptions_request(self, wanted, filters, idxnms, kb_ids):
+        names = sorted({n for p in wanted for n in p})
+        filters = deepcopy(filters)
+        filters["knowledge_graph_kwd"] = "relation"
+        filters["from_entity_kwd"] = names
+        filters["to_entity_kwd"] = names
+        return SearchRequest(self._RELATION_DESCRIPTION_FIELDS, [], filters, [], OrderByExpr(), 0, len(names) * len(names) * max(1, len(kb_ids)), idxnms, kb_ids)
+
+    def _relation_descriptions_from_(self, es_res, wanted):
+        res = {}
+        for _, rel in self.dataStore.get_fields(es_res, self._RELATION_DESCRIPTION_FIELDS).items():
+            f, t = rel.get("from_entity_kwd"), rel.get("to_entity_kwd")
+            f = f[0] if isinstance(f, list) else f
+            t = t[0] if isinstance(t, list) else t
+            pair = tuple(sorted([f, t]))
+            if pair not in wanted or pair in res:
+                continue
+            try:
+                res[pair] = json.loads(rel["content_with_weight"])["description"]
+            except Exception:
+                continue
+        return res
+
+    async def get_relation_descriptions(self, pairs, filters, idxnms, kb_ids):
+        """Look up the descriptions of several relations with one search.
+
+        Returns a dict from the sorted ``(from, to)`` pair to its description.
+        """
+        wanted = {tuple(sorted(p)) for p in pairs}
+        if not wanted:
+            return {}
+        es_res = await self.dataStore.search_async(*self._relation_descriptions_request(wanted, filters, idxnms, kb_ids).args())
+        return self._relation_descriptions_from_(es_res, wanted)
+
+    async def get_relation_descriptions_and_communities(self, pairs, entities, filters, idxnms, kb_ids, topn, max_token):
+        """Relation descriptions and community reports, searched in one doc store round trip."""
+        wanted = {tuple(sorted(p)) for p in pairs}
+        requests = [self._community_request(entities, filters, kb_ids, idxnms, topn)]
+        if wanted:
+            requests.append(self._relation_descriptions_request(wanted, filters, idxnms, kb_ids))
+        results = await self.dataStore.multi_search_async(requests)
+        community = self._community_from_(results[0], max_token)
+        return (self._relation_descriptions_from_(results[1], wanted) if wanted else {}), community
+
     async def retrieval(
         self,
         question: str,
@@ -157,6 +245,8 @@ class KGSearch(Dealer):
             tenant_ids = tenant_ids.split(",")
         idxnms = [index_name(tid) for tid in tenant_ids]
         ty_kwds = []
+        timings = {}
+        stage_start = timer()
         try:
             ty_kwds, ents = await self.query_rewrite(llm, qst, [index_name(tid) for tid in tenant_ids], kb_ids)
             logging.info(f"Q: {qst}, Types: {ty_kwds}, Entities: {ents}")
@@ -164,10 +254,11 @@ class KGSearch(Dealer):
             logging.exception(e)
             ents = [qst]
             pass
+        timings["query_rewrite"] = timer() - stage_start
 
-        ents_from_query = self.get_relevant_ents_by_keywords(ents, filters, idxnms, kb_ids, emb_mdl, ent_sim_threshold)
-        ents_from_types = self.get_relevant_ents_by_types(ty_kwds, filters, idxnms, kb_ids, 10000)
-        rels_from_txt = self.get_relevant_relations_by_txt(qst, filters, idxnms, kb_ids, emb_mdl, rel_sim_threshold)
+        stage_start = timer()
+        ents_from_query, rels_from_txt = await self.get_relevant_ents_and_relations(ents, qst, filters, idxnms, kb_ids, emb_mdl, ent_sim_threshold, rel_sim_threshold)
+        timings["entities_relations"] = timer() - stage_start
         nhop_pathes = defaultdict(dict)
         for _, ent in ents_from_query.items():
             nhops = ent.get("n_hop_ents", [])
@@ -185,6 +276,15 @@ class KGSearch(Dealer):
                         nhop_pathes[(f, t)]["sim"] = ent["sim"] / (2 + i)
                     nhop_pathes[(f, t)]["pagerank"] = max(nhop_pathes[(f, t)].get("pagerank", 0), wts[i])
 
+        # Entity types only re-weight the candidates found above, so check those
+        # names instead of pulling every entity of the types.
+        stage_start = timer()
+        candidates = set(ents_from_query.keys())
+        for pair in list(rels_from_txt.keys()) + list(nhop_pathes.keys()):
+            candidates.update(pair)
+        ents_from_types = await self.get_relevant_ents_by_types(ty_kwds, filters, idxnms, kb_ids, entities=candidates)
+        timings["entity_types"] = timer() - stage_start
+
         logging.info("Retrieved entities: {}".format(list(ents_from_query.keys())))
         logging.info("Retrieved relations: {}".format(list(rels_from_txt.keys())))
         logging.info("Retrieved entities from types({}): {}".format(ty_kwds, list(ents_from_types.keys())))
@@ -220,6 +320,13 @@ class KGSearch(Dealer):
         ents_from_query = sorted(ents_from_query.items(), key=lambda x: x[1]["sim"] * x[1]["pagerank"], reverse=True)[:ent_topn]
         rels_from_txt = sorted(rels_from_txt.items(), key=lambda x: x[1]["sim"] * x[1]["pagerank"], reverse=True)[:rel_topn]
 
+        stage_start = timer()
+        ranked_ents = [n for n, _ in ents_from_query]
+        rel_descriptions, community = await self.get_relation_descriptions_and_communities(
+            [p for p, rel in rels_from_txt if not rel.get("description")], ranked_ents, filters, idxnms, kb_ids, comm_topn, max_token
+        )
+        timings["relations_communities"] = timer() - stage_start
+
         ents = []
         relas = []
         for n, ent in ents_from_query:
@@ -231,13 +338,9 @@ class KGSearch(Dealer):
 
         for (f, t), rel in rels_from_txt:
             if not rel.get("description"):
-                for tid in tenant_ids:
-                    rela = await get_relation(tid, kb_ids, f, t)
-                    if rela:
-                        break
-                else:
+                if tuple(sorted([f, t])) not in rel_descriptions:
                     continue
-                rel["description"] = rela["description"]
+                rel["description"] = rel_descriptions[tuple(sorted([f, t]))]
             desc = rel["description"]
             try:
                 desc = json.loads(desc).get("description", "")
@@ -258,10 +361,11 @@ class KGSearch(Dealer):
         else:
             relas = ""
 
+        logging.info("KG retrieval stage timings: " + ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items()))
         return {
             "chunk_id": get_uuid(),
             "content_ltks": "",
-            "content_with_weight": ents + relas + self._community_retrieval_([n for n, _ in ents_from_query], filters, kb_ids, idxnms, comm_topn, max_token),
+            "content_with_weight": ents + relas + community,
             "doc_id": "",
             "docnm_kwd": "Related content in Knowledge Graph",
             "kb_id": kb_ids,
@@ -274,16 +378,18 @@ class KGSearch(Dealer):
             "positions": [],
         }
 
-    def _community_retrieval_(self, entities, condition, kb_ids, idxnms, topn, max_token):
-        ## Community retrieval
-        fields = ["docnm_kwd", "content_with_weight"]
+    _COMMUNITY_FIELDS = ["docnm_kwd", "content_with_weight"]
+
+    def _community_request(self, entities, condition, kb_ids, idxnms, topn):
         odr = OrderByExpr()
         odr.desc("weight_flt")
         fltr = deepcopy(condition)
         fltr["knowledge_graph_kwd"] = "community_report"
         fltr["entities_kwd"] = entities
-        comm_res = self.dataStore.search(fields, [], fltr, [], odr, 0, topn, idxnms, kb_ids)
-        comm_res_fields = self.dataStore.get_fields(comm_res, fields)
+        return SearchRequest(self._COMMUNITY_FIELDS, [], fltr, [], odr, 0, topn, idxnms, kb_ids)
+
+    def _community_from_(self, comm_res, max_token):
+        comm_res_fields = self.dataStore.get_fields(comm_res, self._COMMUNITY_FIELDS)
         txts = []
         for ii, (_, row) in enumerate(comm_res_fields.items()):
             obj = json.loads(row["content_with_weight"])
@@ -294,6 +400,11 @@ class KGSearch(Dealer):
             return ""
         return "\n---- Community Report ----\n" + "\n".join(txts)
 
+    async def _community_retrieval_(self, entities, condition, kb_ids, idxnms, topn, max_token):
+        ## Community retrieval
+        comm_res = await self.dataStore.search_async(*self._community_request(entities, condition, kb_ids, idxnms, topn).args())
+        return self._community_from_(comm_res, max_token)
+
 
 if __name__ == "__main__":
     import argparse
@@ -11,6 +11,7 @@ Reference:
 
 import asyncio
 import dataclasses
+import heapq
 import html
 import json
 import logging
@@ -18,7 +19,6 @@ import os
 import re
 import time
 from collections import defaultdict
-from copy import deepcopy
 from hashlib import md5
 from typing import Any, Callable, Set, Tuple
 
@@ -30,6 +30,7 @@ from networkx.readwrite import json_graph
 from common.misc_utils import get_uuid
 from common.connection_utils import timeout
 from common.asyncio_utils import LoopLocalSemaphore
+from rag.graphrag.graph_engine import n_hop_neighbors
 from rag.nlp import rag_tokenizer, search
 from rag.utils.redis_conn import REDIS_CONN
 from common import settings
@@ -49,6 +50,18 @@ chat_limiter = LoopLocalSemaphore(int(os.environ.get("MAX_CONCURRENT_CHATS", 10)
 _INSERT_BULK_SIZE = max(1, int(os.environ.get("GRAPHRAG_INSERT_BULK_SIZE", 64)))
 _INSERT_CONCURRENCY = max(1, int(os.environ.get("GRAPHRAG_INSERT_CONCURRENCY", 4)))
 
+# The global graph is stored as a small ``knowledge_graph_kwd="graph"`` manifest
+# (graph attributes, a top-PageRank preview for display and the shard count) plus
+# ``graph_shard`` chunks holding the nodes hashed to each shard and the edges owned
+# by their lesser endpoint.  set_graph rewrites only the shards and per-source
+# subgraphs a change touches.  Shards hold about GRAPHRAG_GRAPH_SHARD_NODES nodes;
+# the count doubles, with a full rewrite, when the graph outgrows it.
+GRAPH_STORAGE_SHARDED = "sharded"
+_GRAPH_SHARD_NODES = max(1, int(os.environ.get("GRAPHRAG_GRAPH_SHARD_NODES", 512)))
+_GRAPH_PREVIEW_NODES = 256
+_GRAPH_PREVIEW_EDGES = 128
+_DELETE_BULK_SIZE = 1000
+
 
 async def insert_chunks_bounded(chunks, tenant_id, kb_id, *, callback=None, label="Insert chunks"):
     """Insert ``chunks`` into the doc store in batches with bounded concurrency and retries.
@@ -167,12 +180,15 @@ def dict_has_keys_with_types(data: dict, expected_fields: list[tuple[str, type]]
     return True
 
 
-def get_llm_cache(llmnm, txt, history, genconf):
-    """Return a cached LLM completion for the given model/text/history/config, or None on miss."""
+def _llm_cache_key(llmnm, txt, history, genconf):
     hasher = xxhash.xxh64()
     hasher.update((str(llmnm) + str(txt) + str(history) + str(genconf)).encode("utf-8"))
+    return hasher.hexdigest()
 
-    k = hasher.hexdigest()
+
+def get_llm_cache(llmnm, txt, history, genconf):
+    """Return a cached LLM completion for the given model/text/history/config, or None on miss."""
+    k = _llm_cache_key(llmnm, txt, history, genconf)
     bin = REDIS_CONN.get(k)
     if not bin:
         return None
@@ -181,20 +197,37 @@ def get_llm_cache(llmnm, txt, history, genconf):
 
 def set_llm_cache(llmnm, txt, v, history, genconf):
     """Store an LLM completion *v* in Redis keyed by a hash of model/text/history/config."""
-    hasher = xxhash.xxh64()
-    hasher.update((str(llmnm) + str(txt) + str(history) + str(genconf)).encode("utf-8"))
-    k = hasher.hexdigest()
+    k = _llm_cache_key(llmnm, txt, history, genconf)
     REDIS_CONN.set(k, v.encode("utf-8"), 24 * 3600)
 
 
-def get_embed_cache(llmnm, txt):
-    """Return a cached embedding vector (numpy array) for *llmnm*/*txt*, or None on miss."""
+def get_llm_cache_batch(llmnm, items):
+    """Look up many ``(txt, history, genconf)`` entries with one MGET; misses come back as None.
+
+    Keys are the same as ``get_llm_cache``'s, so both share one cache.
+    """
+    if not items:
+        return []
+    values = REDIS_CONN.mget([_llm_cache_key(llmnm, txt, history, genconf) for txt, history, genconf in items])
+    return [v if v else None for v in values]
+
+
+def set_llm_cache_batch(llmnm, items):
+    """Store many ``(txt, v, history, genconf)`` completions in one round trip."""
+    mapping = {_llm_cache_key(llmnm, txt, history, genconf): v.encode("utf-8") for txt, v, history, genconf in items if v}
+    REDIS_CONN.mset(mapping, 24 * 3600)
+
+
+def _embed_cache_key(llmnm, txt):
     hasher = xxhash.xxh64()
     hasher.update(str(llmnm).encode("utf-8"))
     hasher.update(str(txt).encode("utf-8"))
+    return hasher.hexdigest()
 
-    k = hasher.hexdigest()
-    bin = REDIS_CONN.get(k)
+
+def get_embed_cache(llmnm, txt):
+    """Return a cached embedding vector (numpy array) for *llmnm*/*txt*, or None on miss."""
+    bin = REDIS_CONN.get(_embed_cache_key(llmnm, txt))
     if not bin:
         return
     return np.array(json.loads(bin))
@@ -202,13 +235,22 @@ def get_embed_cache(llmnm, txt):
 
 def set_embed_cache(llmnm, txt, arr):
     """Store embedding *arr* in Redis for the given model name and input text."""
-    hasher = xxhash.xxh64()
-    hasher.update(str(llmnm).encode("utf-8"))
-    hasher.update(str(txt).encode("utf-8"))
-
-    k = hasher.hexdigest()
     arr = json.dumps(arr.tolist() if isinstance(arr, np.ndarray) else arr)
-    REDIS_CONN.set(k, arr.encode("utf-8"), 24 * 3600)
+    REDIS_CONN.set(_embed_cache_key(llmnm, txt), arr.encode("utf-8"), 24 * 3600)
+
+
+def get_embed_cache_batch(llmnm, txts):
+    """Look up the cached embeddings of many texts with one MGET; misses come back as None."""
+    if not txts:
+        return []
+    values = REDIS_CONN.mget([_embed_cache_key(llmnm, txt) for txt in txts])
+    return [np.array(json.loads(v)) if v else None for v in values]
+
+
+def set_embed_cache_batch(llmnm, txts, arrs):
+    """Store the embeddings of many texts in one round trip."""
+    if txts:
+        _write_embed_cache_batch(llmnm, txts, arrs)
 
 
 def _batch_embed_cache_misses(llmnm: str, keys: list) -> "list[bool]":
@@ -219,23 +261,19 @@ def _batch_embed_cache_misses(llmnm: str, keys: list) -> "list[bool]":
     """
     if not keys:
         return []
-    hashes = []
-    for key in keys:
-        h = xxhash.xxh64()
-        h.update(str(llmnm).encode("utf-8"))
-        h.update(str(key).encode("utf-8"))
-        hashes.append(h.hexdigest())
-    return [v is None for v in REDIS_CONN.mget(hashes)]
+    return [v is None for v in REDIS_CONN.mget([_embed_cache_key(llmnm, key) for key in keys])]
 
 
 def _write_embed_cache_batch(llmnm: str, keys: list, embeddings) -> None:
-    """Write a batch of embeddings to the Redis embed cache synchronously.
+    """Write a batch of embeddings to the Redis embed cache in one pipelined round trip.
 
-    Intended for use with thread_pool_exec so that the synchronous Redis SET
-    calls do not block the event loop.
+    Intended for use with thread_pool_exec so that the synchronous Redis call
+    does not block the event loop.
     """
+    mapping = {}
     for key, ebd in zip(keys, embeddings):
-        set_embed_cache(llmnm, key, ebd)
+        mapping[_embed_cache_key(llmnm, key)] = json.dumps(ebd.tolist() if isinstance(ebd, np.ndarray) else ebd).encode("utf-8")
+    REDIS_CONN.mset(mapping, 24 * 3600)
 
 
 def get_tags_from_cache(kb_ids):
@@ -527,55 +565,203 @@ async def get_graph_doc_ids(tenant_id, kb_id) -> list[str]:
     return doc_ids
 
 
-async def get_graph(tenant_id, kb_id, exclude_rebuild=None):
-    """Load the knowledge-graph for *kb_id* from the document store, rebuilding if marked removed."""
+async def _get_graph_manifest(tenant_id, kb_id):
+    """Return the stored ``graph`` chunk as ``{"id", "removed_kwd", "source_id", "content"}``, or None."""
     conds = {"fields": ["content_with_weight", "removed_kwd", "source_id"], "size": 1, "knowledge_graph_kwd": ["graph"]}
     res = await settings.retriever.search(conds, search.index_name(tenant_id), [kb_id])
-    if not res.total == 0:
-        for id in res.ids:
-            try:
-                if res.field[id]["removed_kwd"] == "N":
-                    g = json_graph.node_link_graph(json.loads(res.field[id]["content_with_weight"]), edges="edges")
-                    if "source_id" not in g.graph:
-                        g.graph["source_id"] = res.field[id]["source_id"]
-                else:
-                    g = await rebuild_graph(tenant_id, kb_id, exclude_rebuild)
-                return g
-            except Exception:
-                continue
-    result = None
-    return result
+    for id in res.ids:
+        try:
+            content = json.loads(res.field[id]["content_with_weight"])
+        except Exception:
+            continue
+        return {"id": id, "removed_kwd": res.field[id]["removed_kwd"], "source_id": res.field[id]["source_id"], "content": content}
+    return None
 
 
-async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, change: GraphChange, callback):
-    """Persist a knowledge-graph snapshot to the document store.
+def _graph_shard_count(node_count: int) -> int:
+    count = 1
+    while count * _GRAPH_SHARD_NODES < node_count:
+        count *= 2
+    return count
 
-    Converts *graph* nodes and edges to embedding chunks, pre-warms the Redis
-    embed cache for all cache-miss entities/relations in bulk before spawning
-    per-item tasks, then atomically replaces the old graph chunks in the store.
-    """
-    global chat_limiter
-    start = asyncio.get_running_loop().time()
 
-    # Build all new chunks first (graph, subgraphs, node/edge embeddings) before
-    # deleting anything.  This ensures that if embedding generation or any other
-    # step crashes, the old graph and per-doc subgraph checkpoints remain intact
-    # so the pipeline can resume without re-running earlier phases.
-    chunks = [
+def _graph_shard_of(node, shard_count: int) -> int:
+    return xxhash.xxh64(str(node).encode("utf-8")).intdigest() % shard_count
+
+
+def _graph_storage_chunk_id(kb_id, *parts) -> str:
+    return xxhash.xxh64(":".join([kb_id, *map(str, parts)]).encode("utf-8")).hexdigest()
+
+
+def _graph_manifest_chunk(kb_id, graph: nx.Graph, shard_count: int) -> dict:
+    """Build the ``graph`` chunk: graph attributes, a node-link preview of the top nodes and the storage layout."""
+    top = heapq.nlargest(_GRAPH_PREVIEW_NODES, graph.nodes, key=lambda n: graph.nodes[n].get("pagerank", 0))
+    manifest = nx.node_link_data(graph.subgraph(top), edges="edges")
+    manifest["edges"] = heapq.nlargest(_GRAPH_PREVIEW_EDGES, [e for e in manifest["edges"] if e["source"] != e["target"]], key=lambda e: e.get("weight", 0))
+    manifest["storage"] = {"format": GRAPH_STORAGE_SHARDED, "shards": shard_count, "nodes": graph.number_of_nodes(), "edges": graph.number_of_edges()}
+    return {
+        "id": _graph_storage_chunk_id(kb_id, "graph"),
+        "content_with_weight": json.dumps(manifest, ensure_ascii=False),
+        "knowledge_graph_kwd": "graph",
+        "kb_id": kb_id,
+        "source_id": graph.graph.get("source_id", []),
+        "available_int": 0,
+        "removed_kwd": "N",
+    }
+
+
+def _graph_shard_chunks(kb_id, graph: nx.Graph, shard_count: int, shards=None) -> list[dict]:
+    """Build ``graph_shard`` chunks for *shards* (all when None), including emptied ones."""
+    nodes = defaultdict(list)
+    edges = defaultdict(list)
+    for n, attrs in graph.nodes(data=True):
+        k = _graph_shard_of(n, shard_count)
+        if shards is None or k in shards:
+            nodes[k].append({**attrs, "id": n})
+    for f, t, attrs in graph.edges(data=True):
+        k = _graph_shard_of(min(f, t), shard_count)
+        if shards is None or k in shards:
+            edges[k].append({**attrs, "source": f, "target": t})
+    return [
         {
-            "id": get_uuid(),
-            "content_with_weight": json.dumps(nx.node_link_data(graph, edges="edges"), ensure_ascii=False),
-            "knowledge_graph_kwd": "graph",
+            "id": _graph_storage_chunk_id(kb_id, "graph_shard", shard_count, k),
+            "content_with_weight": json.dumps({"nodes": nodes[k], "edges": edges[k]}, ensure_ascii=False),
+            "knowledge_graph_kwd": "graph_shard",
             "kb_id": kb_id,
-            "source_id": graph.graph.get("source_id", []),
             "available_int": 0,
             "removed_kwd": "N",
         }
+        for k in (range(shard_count) if shards is None else sorted(shards))
     ]
 
-    # generate updated subgraphs
-    for source in graph.graph["source_id"]:
-        subgraph = graph.subgraph([n for n in graph.nodes if source in graph.nodes[n]["source_id"]]).copy()
+
+def _graph_from_shards(manifest: dict, shard_contents) -> nx.Graph:
+    graph = nx.Graph()
+    graph.graph.update(manifest.get("graph", {}))
+    edges = []
+    for content in shard_contents:
+        shard = json.loads(content)
+        for node in shard.get("nodes", []):
+            attrs = dict(node)
+            graph.add_node(attrs.pop("id"), **attrs)
+        for edge in shard.get("edges", []):
+            attrs = dict(edge)
+            edges.append((attrs.pop("source"), attrs.pop("target"), attrs))
+    graph.add_edges_from(edges)
+    # Shards are only rewritten when touched, so derive degree ranks afresh.
+    for node, degree in graph.degree:
+        graph.nodes[node]["rank"] = int(degree)
+    return graph
+
+
+async def _load_graph_shards(tenant_id, kb_id, manifest: dict) -> nx.Graph:
+    """Fetch every shard listed by *manifest* by its id; raise if the result does not match the manifest."""
+    storage = manifest["storage"]
+    fields = ["content_with_weight"]
+    ids = [_graph_storage_chunk_id(kb_id, "graph_shard", storage["shards"], k) for k in range(storage["shards"])]
+    rows = {}
+    page = 32
+    for i in range(0, len(ids), page):
+        batch = ids[i : i + page]
+        res = await thread_pool_exec(settings.docStoreConn.search, fields, [], {"id": batch}, [], OrderByExpr(), 0, len(batch), search.index_name(tenant_id), [kb_id])
+        rows.update(settings.docStoreConn.get_fields(res, fields))
+    contents = [rows[id]["content_with_weight"] for id in ids if id in rows]
+    graph = await thread_pool_exec(_graph_from_shards, manifest, contents)
+    if len(contents) != len(ids) or graph.number_of_nodes() != storage["nodes"]:
+        # Never hand back a partial graph: the next full rewrite would store it for good.
+        raise Exception(f"Graph of kb {kb_id} is incomplete: loaded {graph.number_of_nodes()} nodes from {len(contents)}/{len(ids)} shards, manifest expects {storage['nodes']} nodes.")
+    return graph
+
+
+async def get_graph(tenant_id, kb_id, exclude_rebuild=None):
+    """Load the knowledge-graph for *kb_id* from the document store, rebuilding if marked removed.
+
+    Reads the sharded format as well as the legacy single node-link blob.
+    """
+    stored = await _get_graph_manifest(tenant_id, kb_id)
+    if stored is None:
+        return None
+    if stored["removed_kwd"] != "N":
+        return await rebuild_graph(tenant_id, kb_id, exclude_rebuild)
+    content = stored["content"]
+    if content.get("storage", {}).get("format") == GRAPH_STORAGE_SHARDED:
+        g = await _load_graph_shards(tenant_id, kb_id, content)
+    else:
+        g = json_graph.node_link_graph(content, edges="edges")
+    if "source_id" not in g.graph:
+        g.graph["source_id"] = stored["source_id"]
+    return g
+
+
+async def _entity_sources(tenant_id, kb_id, names) -> set:
+    """Return the source documents recorded on the entity chunks of *names*."""
+    sources = set()
+    names = sorted(names)
+    fields = ["source_id"]
+    for i in range(0, len(names), _DELETE_BULK_SIZE):
+        batch = names[i : i + _DELETE_BULK_SIZE]
+        res = await thread_pool_exec(
+            settings.docStoreConn.search, fields, [], {"knowledge_graph_kwd": ["entity"], "entity_kwd": batch}, [], OrderByExpr(), 0, 10 * len(batch), search.index_name(tenant_id), [kb_id]
+        )
+        for row in settings.docStoreConn.get_fields(res, fields).values():
+            source_id = row.get("source_id") or []
+            sources.update([source_id] if isinstance(source_id, str) else source_id)
+    return sources
+
+
+async def _delete_with_retry(condition, tenant_id, kb_id):
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            return await thread_pool_exec(settings.docStoreConn.delete, condition, search.index_name(tenant_id), kb_id)
+        except Exception as e:
+            if attempt < max_retries - 1:
+                wait = 2**attempt
+                logging.warning(f"Deleting {condition.get('knowledge_graph_kwd')} chunks attempt {attempt + 1} failed: {e}, retrying in {wait}s")
+                await asyncio.sleep(wait)
+            else:
+                raise
+
+
+async def delete_relations(tenant_id, kb_id, edges) -> int:
+    """Delete the relation chunks of *edges* in bulk.
+
+    Candidate chunks are found with one search over the edge endpoints, narrowed
+    to the exact pairs, and deleted by id in batches of ``_DELETE_BULK_SIZE``.
+    """
+    wanted = {get_from_to(f, t) for f, t in edges}
+    if not wanted:
+        return 0
+    names = sorted({n for pair in wanted for n in pair})
+    fields = ["from_entity_kwd", "to_entity_kwd"]
+    condition = {"knowledge_graph_kwd": ["relation"], "from_entity_kwd": names, "to_entity_kwd": names}
+    ids = []
+    page = 1024
+    offset = 0
+    while True:
+        res = await thread_pool_exec(settings.docStoreConn.search, fields, [], condition, [], OrderByExpr(), offset, page, search.index_name(tenant_id), [kb_id])
+        rows = settings.docStoreConn.get_fields(res, fields)
+        ids.extend(cid for cid, row in rows.items() if get_from_to(row.get("from_entity_kwd"), row.get("to_entity_kwd")) in wanted)
+        if len(rows) < page:
+            break
+        offset += page
+    for i in range(0, len(ids), _DELETE_BULK_SIZE):
+        await _delete_with_retry({"knowledge_graph_kwd": ["relation"], "id": ids[i : i + _DELETE_BULK_SIZE]}, tenant_id, kb_id)
+    return len(ids)
+
+
+def _subgraph_chunks(kb_id, graph: nx.Graph, sources) -> list[dict]:
+    """Build per-source ``subgraph`` chunks for *sources* with one pass over the nodes."""
+    sources = set(sources)
+    source_nodes = defaultdict(list)
+    for n, attrs in graph.nodes(data=True):
+        for source in set(attrs.get("source_id", [])) & sources:
+            source_nodes[source].append(n)
+    chunks = []
+    for source in graph.graph.get("source_id", []):
+        if source not in sources:
+            continue
+        subgraph = graph.subgraph(source_nodes[source]).copy()
         subgraph.graph["source_id"] = [source]
         for n in subgraph.nodes:
             subgraph.nodes[n]["source_id"] = [source]
@@ -590,6 +776,48 @@ async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, chang
                 "removed_kwd": "N",
             }
         )
+    return chunks
+
+
+async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, change: GraphChange, callback):
+    """Persist a knowledge-graph change to the document store.
+
+    Writes the graph shards and per-source subgraphs touched by *change* (all of
+    them for a new graph, a legacy single-blob graph, a graph marked removed, or
+    when the shard count grows), converts changed nodes and edges to embedding
+    chunks, pre-warming the Redis embed cache in bulk, then replaces the old
+    chunks in the store and writes the ``graph`` manifest last.
+    """
+    global chat_limiter
+    start = asyncio.get_running_loop().time()
+
+    stored = await _get_graph_manifest(tenant_id, kb_id)
+    stored_storage = stored["content"].get("storage", {}) if stored and stored["removed_kwd"] == "N" else {}
+    stored_shards = stored_storage.get("shards", 0) if stored_storage.get("format") == GRAPH_STORAGE_SHARDED else 0
+    shard_count = _graph_shard_count(graph.number_of_nodes())
+    full_rewrite = shard_count > stored_shards
+    if full_rewrite:
+        dirty_shards = None
+        affected_sources = set(graph.graph.get("source_id", []))
+    else:
+        shard_count = stored_shards
+        changed_edges = change.added_updated_edges | change.removed_edges
+        dirty_shards = {_graph_shard_of(n, shard_count) for n in change.added_updated_nodes | change.removed_nodes}
+        dirty_shards.update(_graph_shard_of(min(f, t), shard_count) for f, t in changed_edges)
+        affected_sources = set()
+        for n in change.added_updated_nodes.union(*changed_edges):
+            if graph.has_node(n):
+                affected_sources.update(graph.nodes[n].get("source_id", []))
+        affected_sources.update(await _entity_sources(tenant_id, kb_id, change.removed_nodes))
+
+    # Build all new chunks first (shards, subgraphs, node/edge embeddings) before
+    # deleting anything.  This ensures that if embedding generation or any other
+    # step crashes, the old graph and per-doc subgraph checkpoints remain intact
+    # so the pipeline can resume without re-running earlier phases.
+    chunks = _graph_shard_chunks(kb_id, graph, shard_count, dirty_shards)
+    chunks.extend(_subgraph_chunks(kb_id, graph, affected_sources))
+    if callback:
+        callback(msg=f"set_graph writes {len(chunks)} graph shard and subgraph chunks ({'full rewrite' if full_rewrite else f'{len(dirty_shards)}/{shard_count} shards'}).")
 
     # ── batch pre-warm entity embeddings ───────────────────────────────────────
     # Without this, set_graph spawns one asyncio task per entity, each calling
@@ -624,11 +852,11 @@ async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, chang
             callback(msg=f"Batch-embedded {len(_uncached_node_names)} entity names ({(len(_uncached_node_names) + _INSERT_BULK_SIZE - 1) // _INSERT_BULK_SIZE} batches of {_INSERT_BULK_SIZE}).")
     # ── end batch pre-warm ──────────────────────────────────────────────────────
 
+    nhop_neighbors = await thread_pool_exec(n_hop_neighbors, graph, list(change.added_updated_nodes))
     tasks = []
     for ii, node in enumerate(change.added_updated_nodes):
         node_attrs = graph.nodes[node]
-        nhop_neighbors = n_neighbor(graph, node)
-        tasks.append(asyncio.create_task(graph_node_to_chunk(kb_id, embd_mdl, node, node_attrs, chunks, nhop_neighbors)))
+        tasks.append(asyncio.create_task(graph_node_to_chunk(kb_id, embd_mdl, node, node_attrs, chunks, nhop_neighbors[node])))
         if ii % 100 == 9 and callback:
             callback(msg=f"Get embedding of nodes: {ii}/{len(change.added_updated_nodes)}")
     try:
@@ -703,7 +931,13 @@ async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, chang
     # All new chunks are ready.  Now delete old data and insert the new data.
     # Deleting only after chunks are built ensures that a crash during embedding
     # generation above does not destroy the old graph/subgraph checkpoints.
-    await thread_pool_exec(settings.docStoreConn.delete, {"knowledge_graph_kwd": ["graph", "subgraph"]}, search.index_name(tenant_id), kb_id)
+    if full_rewrite:
+        await thread_pool_exec(settings.docStoreConn.delete, {"knowledge_graph_kwd": ["graph", "subgraph", "graph_shard"]}, search.index_name(tenant_id), kb_id)
+    else:
+        # Shards and the manifest have stable ids and are overwritten in place.
+        sources = sorted(affected_sources)
+        for i in range(0, len(sources), _DELETE_BULK_SIZE):
+            await _delete_with_retry({"knowledge_graph_kwd": ["subgraph"], "source_id": sources[i : i + _DELETE_BULK_SIZE]}, tenant_id, kb_id)
 
     if change.removed_nodes:
         BATCH_SIZE = 100
@@ -713,36 +947,7 @@ async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, chang
             await thread_pool_exec(settings.docStoreConn.delete, {"knowledge_graph_kwd": ["entity"], "entity_kwd": batch}, search.index_name(tenant_id), kb_id)
 
     if change.removed_edges:
-
-        async def del_edges(from_node, to_node):
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    async with chat_limiter:
-                        await thread_pool_exec(
-                            settings.docStoreConn.delete, {"knowledge_graph_kwd": ["relation"], "from_entity_kwd": from_node, "to_entity_kwd": to_node}, search.index_name(tenant_id), kb_id
-                        )
-                    return
-                except Exception as e:
-                    if attempt < max_retries - 1:
-                        wait = 2**attempt
-                        logging.warning(f"del_edges({from_node}, {to_node}) attempt {attempt + 1} failed: {e}, retrying in {wait}s")
-                        await asyncio.sleep(wait)
-                    else:
-                        raise
-
-        tasks = []
-        for from_node, to_node in change.removed_edges:
-            tasks.append(asyncio.create_task(del_edges(from_node, to_node)))
-
-        try:
-            await asyncio.gather(*tasks, return_exceptions=False)
-        except Exception as e:
-            logging.error(f"Error while deleting edges: {e}")
-            for t in tasks:
-                t.cancel()
-            await asyncio.gather(*tasks, return_exceptions=True)
-            raise
+        await delete_relations(tenant_id, kb_id, change.removed_edges)
 
     del_now = asyncio.get_running_loop().time()
     if callback:
@@ -750,6 +955,8 @@ async def set_graph(tenant_id: str, kb_id: str, embd_mdl, graph: nx.Graph, chang
     start = del_now
 
     await insert_chunks_bounded(chunks, tenant_id, kb_id, callback=callback, label="Insert chunks")
+    # The manifest goes last so readers never see it ahead of its shards.
+    await insert_chunks_bounded([_graph_manifest_chunk(kb_id, graph, shard_count)], tenant_id, kb_id)
     now = asyncio.get_running_loop().time()
     if callback:
         callback(msg=f"set_graph added/updated {len(change.added_updated_nodes)} nodes and {len(change.added_updated_edges)} edges from index in {now - start:.2f}s.")
@@ -808,31 +1015,11 @@ def n_neighbor(graph: nx.Graph, node, n_hop: int = 2):
     dicts (``len(weights) == len(path) - 1``).  This is the structure consumed
     by :class:`rag.graphrag.search.KGSearch` for n-hop relation enrichment and
     is stored per entity chunk as ``n_hop_with_weight``.
+
+    Use :func:`rag.graphrag.graph_engine.n_hop_neighbors` for many nodes of
+    the same graph.
     """
-    source_edge = list(graph.edges(node))
-    if not source_edge:
-        return []
-    count = 1
-    while count < n_hop:
-        count += 1
-        sc_edge = deepcopy(source_edge)
-        source_edge = []
-        for pair in sc_edge:
-            append_edge = list(graph.edges(pair[-1]))
-            for tuples in merge_tuples([pair], append_edge):
-                source_edge.append(tuples)
-    wts = nx.get_edge_attributes(graph, "weight")
-    nbrs = []
-    for path in source_edge:
-        nbr = {"path": path, "weights": []}
-        for i in range(len(path) - 1):
-            f, t = path[i], path[i + 1]
-            w = wts.get((f, t))
-            if w is None:
-                w = wts.get((t, f), 0)
-            nbr["weights"].append(w)
-        nbrs.append(nbr)
-    return nbrs
+    return n_hop_neighbors(graph, [node], n_hop)[node]
 
 
 async def get_entity_type2samples(idxnms, kb_ids: list):
@@ -80,7 +80,7 @@ class Dealer:
         def _load():
             from api.db.services.document_service import DocumentService
 
-            return {row["id"] for row in DocumentService.get_by_ids(unique_doc_ids).dicts()}
+            return DocumentService.get_existing_ids(unique_doc_ids)
 
         return await thread_pool_exec(_load)
 
@@ -190,7 +190,7 @@ class Dealer:
                 orderBy.asc("page_num_int")
                 orderBy.asc("top_int")
                 orderBy.desc("create_timestamp_flt")
-            res = self.dataStore.search(src, [], filters, [], orderBy, offset, limit, idx_names, kb_ids)
+            res = await self.dataStore.search_async(src, [], filters, [], orderBy, offset, limit, idx_names, kb_ids)
             total = self.dataStore.get_total(res)
             logging.debug("Dealer.search TOTAL: {}".format(total))
         else:
@@ -202,7 +202,7 @@ class Dealer:
             matchText, keywords = self.qryr.question(qst, min_match=(0.3 if min_match else 0))
             if emb_mdl is None:
                 matchExprs = [matchText] if matchText else []
-                res = await thread_pool_exec(self.dataStore.search, src, highlightFields, filters, matchExprs, orderBy, offset, limit, idx_names, kb_ids, rank_feature=rank_feature)
+                res = await self.dataStore.search_async(src, highlightFields, filters, matchExprs, orderBy, offset, limit, idx_names, kb_ids, rank_feature=rank_feature)
                 total = self.dataStore.get_total(res)
                 logging.debug("Dealer.search TOTAL: {}".format(total))
             else:
@@ -232,20 +232,19 @@ class Dealer:
                     fusionExpr = FusionExpr("weighted_sum", topk, {"weights": "0.001,1"})
                 matchExprs = [matchText, matchDense, fusionExpr] if matchText else [matchDense]
 
-                res = await thread_pool_exec(self.dataStore.search, src, highlightFields, filters, matchExprs, orderBy, offset, limit, idx_names, kb_ids, rank_feature=rank_feature)
+                res = await self.dataStore.search_async(src, highlightFields, filters, matchExprs, orderBy, offset, limit, idx_names, kb_ids, rank_feature=rank_feature)
                 total = self.dataStore.get_total(res)
                 logging.debug("Dealer.search TOTAL: {}".format(total))
 
                 # If result is empty, try again with lower min_match
                 if total == 0:
                     if filters.get("doc_id"):
-                        res = await thread_pool_exec(self.dataStore.search, src, [], filters, [], orderBy, offset, limit, idx_names, kb_ids)
+                        res = await self.dataStore.search_async(src, [], filters, [], orderBy, offset, limit, idx_names, kb_ids)
                         total = self.dataStore.get_total(res)
                     else:
                         matchText, _ = self.qryr.question(qst, min_match=(0.1 if min_match else 0))
                         matchDense.extra_options["similarity"] = 0.17
-                        res = await thread_pool_exec(
-                            self.dataStore.search,
+                        res = await self.dataStore.search_async(
                             src,
                             highlightFields,
                             filters,
@@ -410,8 +409,7 @@ class Dealer:
             {"similarity": 0.0},
         )
         condition = {"id": list(sres.ids)}
-        res = await thread_pool_exec(
-            self.dataStore.search,
+        res = await self.dataStore.search_async(
             [],  # no _source fields needed; we only want _id and _score
             [],
             condition,
@@ -438,8 +436,7 @@ class Dealer:
         else:
             idx_names = [index_name(tid) for tid in tenant_ids]
         vec_field = f"q_{dim}_vec"
-        res = await thread_pool_exec(
-            self.dataStore.search,
+        res = await self.dataStore.search_async(
             [vec_field],
             [],
             {"id": list(chunk_ids)},
@@ -193,6 +193,7 @@ CROSS_LANGUAGES_SYS_PROMPT_TEMPLATE = load_prompt("cross_languages_sys_prompt")
 CROSS_LANGUAGES_USER_PROMPT_TEMPLATE = load_prompt("cross_languages_user_prompt")
 FULL_QUESTION_PROMPT_TEMPLATE = load_prompt("full_question_prompt")
 KEYWORD_PROMPT_TEMPLATE = load_prompt("keyword_prompt")
+PACKED_ENRICHMENT_PROMPT_TEMPLATE = load_prompt("packed_enrichment_prompt")
 QUESTION_PROMPT_TEMPLATE = load_prompt("question_prompt")
 VISION_LLM_DESCRIBE_PROMPT = load_prompt("vision_llm_describe_prompt")
 VISION_LLM_FIGURE_DESCRIBE_PROMPT = load_prompt("vision_llm_figure_describe_prompt")
@@ -354,6 +355,117 @@ async def content_tagging(chat_mdl, content, all_tags, examples, topn=3):
     return res
 
 
+def pack_by_token_budget(contents: list[str], max_tokens: int, max_items: int) -> list[list[int]]:
+    """Group content indexes, in order, into packs of at most ``max_items`` whose token total stays within ``max_tokens``.
+
+    A content larger than the budget gets a pack of its own.
+    """
+    packs, pack, pack_tokens = [], [], 0
+    for i, content in enumerate(contents):
+        tokens = num_tokens_from_string(content)
+        if pack and (pack_tokens + tokens > max_tokens or len(pack) >= max_items):
+            packs.append(pack)
+            pack, pack_tokens = [], 0
+        pack.append(i)
+        pack_tokens += tokens
+    if pack:
+        packs.append(pack)
+    return packs
+
+
+def _packed_str_list(value) -> list[str]:
+    if isinstance(value, str):
+        value = re.split(r"[\r\n]+", value)
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip() for v in value if isinstance(v, (str, int, float)) and str(v).strip()]
+
+
+def parse_packed_enrichment(ans: str, count: int, keywords_topn=0, questions_topn=0, metadata_schema=None, all_tags=None) -> list[dict]:
+    """Validate a packed enrichment answer piece by piece.
+
+    Returns ``count`` dicts holding only the task results that passed validation, as the
+    strings the single-chunk tasks keep in the LLM cache: keywords comma-separated,
+    questions one per line, metadata and tags as JSON.
+    """
+    results = [{} for _ in range(count)]
+    try:
+        obj = json_repair.loads(ans)
+    except Exception as e:
+        logging.warning(f"packed_enrichment: unparsable answer: {e}")
+        return results
+    if isinstance(obj, dict):
+        obj = next((v for v in obj.values() if isinstance(v, list)), [obj])
+    if not isinstance(obj, list):
+        return results
+
+    properties = (metadata_schema or {}).get("properties", {})
+    tag_set = set(all_tags or [])
+    seen = set()
+    for item in obj:
+        if not isinstance(item, dict):
+            continue
+        try:
+            idx = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if idx < 0 or idx >= count or idx in seen:
+            continue
+        seen.add(idx)
+        res = results[idx]
+        if keywords_topn:
+            keywords = _packed_str_list(item.get("keywords"))
+            if keywords:
+                res["keywords"] = ",".join(keywords)
+        if questions_topn:
+            questions = _packed_str_list(item.get("questions"))
+            if questions:
+                res["questions"] = "\n".join(questions)
+        if metadata_schema and isinstance(item.get("metadata"), dict):
+            res["metadata"] = json.dumps({k: v for k, v in item["metadata"].items() if k in properties}, ensure_ascii=False)
+        if tag_set and isinstance(item.get("tags"), dict):
+            tags = {}
+            for k, v in item["tags"].items():
+                try:
+                    if str(k) in tag_set and int(v) > 0:
+                        tags[str(k)] = int(v)
+                except (TypeError, ValueError):
+                    pass
+            res["tags"] = json.dumps(tags)
+    return results
+
+
+async def packed_enrichment(chat_mdl, contents: list[str], keywords_topn=0, questions_topn=0, metadata_schema=None, all_tags=None, tag_examples=None, tags_topn=3) -> list[dict]:
+    """Run keyword, question, metadata and tag generation for several chunks in one LLM call.
+
+    Only the tasks whose argument is set are requested. See ``parse_packed_enrichment`` for the result.
+    """
+    template = PROMPT_JINJA_ENV.from_string(PACKED_ENRICHMENT_PROMPT_TEMPLATE)
+    tag_examples = tag_examples or []
+    for ex in tag_examples:
+        ex["tags_json"] = json.dumps(ex[TAG_FLD], ensure_ascii=False)
+    rendered_prompt = template.render(
+        chunks=contents,
+        keywords_topn=keywords_topn,
+        questions_topn=questions_topn,
+        metadata_schema=json.dumps(metadata_schema, ensure_ascii=False, indent=2) if metadata_schema else "",
+        all_tags=list(all_tags or []),
+        tag_examples=tag_examples,
+        tags_topn=tags_topn,
+    )
+
+    msg = [{"role": "system", "content": rendered_prompt}, {"role": "user", "content": "Output: "}]
+    _, msg = message_fit_in(msg, chat_mdl.max_length)
+    ans = await chat_mdl.async_chat(msg[0]["content"], msg[1:], {"temperature": 0.2})
+    if isinstance(ans, tuple):
+        ans = ans[0]
+    ans = re.sub(r"^.*</think>", "", ans, flags=re.DOTALL)
+    if ans.find("**ERROR**") >= 0:
+        logging.warning(f"packed_enrichment: LLM error: {ans}")
+        return [{} for _ in contents]
+    return parse_packed_enrichment(ans, len(contents), keywords_topn, questions_topn, metadata_schema, all_tags)
+
+
 def vision_llm_describe_prompt(page=None) -> str:
     template = PROMPT_JINJA_ENV.from_string(VISION_LLM_DESCRIBE_PROMPT)
 
@@ -55,7 +55,7 @@ from rag.utils.raptor_utils import (
 )
 from common.log_utils import init_root_logger
 from common.config_utils import show_configs
-from rag.graphrag.utils import get_llm_cache, set_llm_cache, get_tags_from_cache, set_tags_to_cache
+from rag.graphrag.utils import get_llm_cache_batch, set_llm_cache_batch, get_tags_from_cache, set_tags_to_cache
 from rag.prompts.generator import keyword_extraction, question_proposal, content_tagging, run_toc_from_text, gen_metadata
 import logging
 import os
@@ -76,7 +76,7 @@ from common.constants import LLMType, ParserType, PipelineTaskType
 from api.db.services.document_service import DocumentService
 from api.db.services.doc_metadata_service import DocMetadataService
 from api.db.services.llm_service import LLMBundle
-from api.db.services.task_service import TaskService, has_canceled, CANVAS_DEBUG_DOC_ID, GRAPH_RAPTOR_FAKE_DOC_ID
+from api.db.services.task_service import TaskService, has_canceled, CANCEL_CHECK_INTERVAL, CANVAS_DEBUG_DOC_ID, GRAPH_RAPTOR_FAKE_DOC_ID
 from api.db.services.file2document_service import File2DocumentService
 from api.db.joint_services.tenant_model_service import get_tenant_default_model_by_type, resolve_model_config, get_model_config_by_id
 from common.versions import get_ragflow_version
@@ -85,6 +85,7 @@ from rag.app import laws, paper, presentation, manual, qa, table, book, resume,
 from rag.nlp import search, rag_tokenizer, add_positions
 
 from common.token_utils import num_tokens_from_string, truncate
+from common.vector_quantization import QUANTIZATION_DOC_ENGINES, move_to_quantized_fields, quantization_method
 from rag.utils.redis_conn import REDIS_CONN, RedisDistributedLock
 from rag.graphrag.utils import chat_limiter
 from common.signal_utils import start_tracemalloc_and_snapshot, stop_tracemalloc
@@ -449,23 +450,26 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
         chat_model_config = resolve_model_config(task["tenant_id"], LLMType.CHAT, task["llm_id"])
         chat_mdl = LLMBundle(task["tenant_id"], chat_model_config, lang=task["language"])
 
-        async def doc_keyword_extraction(chat_mdl, d, topn):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], "keywords", {"topn": topn})
+        topn = task["parser_config"]["auto_keywords"]
+        cached_keywords = await thread_pool_exec(get_llm_cache_batch, chat_mdl.llm_name, [(d["content_with_weight"], "keywords", {"topn": topn}) for d in docs])
+        to_cache = []
+
+        async def doc_keyword_extraction(chat_mdl, d, topn, cached):
             if not cached:
-                if has_canceled(task["id"]):
+                if has_canceled(task["id"], CANCEL_CHECK_INTERVAL):
                     progress_callback(-1, msg="Task has been canceled.")
                     return
                 async with chat_limiter:
                     cached = await keyword_extraction(chat_mdl, d["content_with_weight"], topn)
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, "keywords", {"topn": topn})
+                to_cache.append((d["content_with_weight"], cached, "keywords", {"topn": topn}))
             if cached:
                 d["important_kwd"] = [k for k in re.split(r"[,，;；、\r\n]+", cached) if k.strip()]
                 d["important_tks"] = rag_tokenizer.tokenize(" ".join(d["important_kwd"]))
             return
 
         tasks = []
-        for d in docs:
-            tasks.append(asyncio.create_task(doc_keyword_extraction(chat_mdl, d, task["parser_config"]["auto_keywords"])))
+        for d, cached in zip(docs, cached_keywords):
+            tasks.append(asyncio.create_task(doc_keyword_extraction(chat_mdl, d, topn, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -474,6 +478,8 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_mdl.llm_name, to_cache)
         progress_callback(msg="Keywords generation {} chunks completed in {:.2f}s".format(len(docs), timer() - st))
 
     # Record keywords extraction count
@@ -486,22 +492,25 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
         chat_model_config = resolve_model_config(task["tenant_id"], LLMType.CHAT, task["llm_id"])
         chat_mdl = LLMBundle(task["tenant_id"], chat_model_config, lang=task["language"])
 
-        async def doc_question_proposal(chat_mdl, d, topn):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], "question", {"topn": topn})
+        topn = task["parser_config"]["auto_questions"]
+        cached_questions = await thread_pool_exec(get_llm_cache_batch, chat_mdl.llm_name, [(d["content_with_weight"], "question", {"topn": topn}) for d in docs])
+        to_cache = []
+
+        async def doc_question_proposal(chat_mdl, d, topn, cached):
             if not cached:
-                if has_canceled(task["id"]):
+                if has_canceled(task["id"], CANCEL_CHECK_INTERVAL):
                     progress_callback(-1, msg="Task has been canceled.")
                     return
                 async with chat_limiter:
                     cached = await question_proposal(chat_mdl, d["content_with_weight"], topn)
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, "question", {"topn": topn})
+                to_cache.append((d["content_with_weight"], cached, "question", {"topn": topn}))
             if cached:
                 d["question_kwd"] = cached.split("\n")
                 d["question_tks"] = rag_tokenizer.tokenize("\n".join(d["question_kwd"]))
 
         tasks = []
-        for d in docs:
-            tasks.append(asyncio.create_task(doc_question_proposal(chat_mdl, d, task["parser_config"]["auto_questions"])))
+        for d, cached in zip(docs, cached_questions):
+            tasks.append(asyncio.create_task(doc_question_proposal(chat_mdl, d, topn, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -510,6 +519,8 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_mdl.llm_name, to_cache)
         progress_callback(msg="Question generation {} chunks completed in {:.2f}s".format(len(docs), timer() - st))
 
     # Record question generation
@@ -522,38 +533,41 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
         chat_model_config = resolve_model_config(task["tenant_id"], LLMType.CHAT, task["llm_id"])
         chat_mdl = LLMBundle(task["tenant_id"], chat_model_config, lang=task["language"])
 
-        async def gen_metadata_task(chat_mdl, d):
-            metadata_conf = task["parser_config"].get("metadata", [])
-            built_in_metadata = list(task["parser_config"].get("built_in_metadata") or [])
-            if isinstance(metadata_conf, dict):
-                if not isinstance(metadata_conf.get("properties"), dict):
-                    metadata_conf = {"type": "object", "properties": {}}
-                if built_in_metadata:
-                    metadata_conf = {
-                        **metadata_conf,
-                        "properties": {
-                            **metadata_conf.get("properties", {}),
-                            **turn2jsonschema(built_in_metadata).get("properties", {}),
-                        },
-                    }
-            elif isinstance(metadata_conf, list):
-                metadata_conf = metadata_conf + built_in_metadata
-            else:
-                metadata_conf = built_in_metadata
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], "metadata", metadata_conf)
+        metadata_conf = task["parser_config"].get("metadata", [])
+        built_in_metadata = list(task["parser_config"].get("built_in_metadata") or [])
+        if isinstance(metadata_conf, dict):
+            if not isinstance(metadata_conf.get("properties"), dict):
+                metadata_conf = {"type": "object", "properties": {}}
+            if built_in_metadata:
+                metadata_conf = {
+                    **metadata_conf,
+                    "properties": {
+                        **metadata_conf.get("properties", {}),
+                        **turn2jsonschema(built_in_metadata).get("properties", {}),
+                    },
+                }
+        elif isinstance(metadata_conf, list):
+            metadata_conf = metadata_conf + built_in_metadata
+        else:
+            metadata_conf = built_in_metadata
+        cached_metadata = await thread_pool_exec(get_llm_cache_batch, chat_mdl.llm_name, [(d["content_with_weight"], "metadata", metadata_conf) for d in docs])
+        to_cache = []
+
+        async def gen_metadata_task(chat_mdl, d, cached):
             if not cached:
-                if has_canceled(task["id"]):
+                if has_canceled(task["id"], CANCEL_CHECK_INTERVAL):
                     progress_callback(-1, msg="Task has been canceled.")
                     return
                 async with chat_limiter:
-                    cached = await gen_metadata(chat_mdl, turn2jsonschema(metadata_conf), d["content_with_weight"])
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, "metadata", metadata_conf)
+                    # gen_metadata edits the schema in place; keep metadata_conf, the cache key, intact.
+                    cached = await gen_metadata(chat_mdl, turn2jsonschema(copy.deepcopy(metadata_conf)), d["content_with_weight"])
+                to_cache.append((d["content_with_weight"], cached, "metadata", metadata_conf))
             if cached:
                 d["metadata_obj"] = cached
 
         tasks = []
-        for d in docs:
-            tasks.append(asyncio.create_task(gen_metadata_task(chat_mdl, d)))
+        for d, cached in zip(docs, cached_metadata):
+            tasks.append(asyncio.create_task(gen_metadata_task(chat_mdl, d, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -562,6 +576,8 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_mdl.llm_name, to_cache)
         metadata = {}
         for doc in docs:
             metadata = update_metadata_to(metadata, doc["metadata_obj"])
@@ -597,7 +613,7 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
 
         docs_to_tag = []
         for d in docs:
-            task_canceled = has_canceled(task["id"])
+            task_canceled = has_canceled(task["id"], CANCEL_CHECK_INTERVAL)
             if task_canceled:
                 progress_callback(-1, msg="Task has been canceled.")
                 return None
@@ -606,10 +622,12 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
             else:
                 docs_to_tag.append(d)
 
-        async def doc_content_tagging(chat_mdl, d, topn_tags):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], all_tags, {"topn": topn_tags})
+        cached_tags = await thread_pool_exec(get_llm_cache_batch, chat_mdl.llm_name, [(d["content_with_weight"], all_tags, {"topn": topn_tags}) for d in docs_to_tag])
+        to_cache = []
+
+        async def doc_content_tagging(chat_mdl, d, topn_tags, cached):
             if not cached:
-                if has_canceled(task["id"]):
+                if has_canceled(task["id"], CANCEL_CHECK_INTERVAL):
                     progress_callback(-1, msg="Task has been canceled.")
                     return
                 picked_examples = random.choices(examples, k=2) if len(examples) > 2 else examples
@@ -625,13 +643,13 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
                     )
                 if cached:
                     cached = json.dumps(cached)
+                    to_cache.append((d["content_with_weight"], cached, all_tags, {"topn": topn_tags}))
             if cached:
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, all_tags, {"topn": topn_tags})
                 d[TAG_FLD] = json.loads(cached)
 
         tasks = []
-        for d in docs_to_tag:
-            tasks.append(asyncio.create_task(doc_content_tagging(chat_mdl, d, topn_tags)))
+        for d, cached in zip(docs_to_tag, cached_tags):
+            tasks.append(asyncio.create_task(doc_content_tagging(chat_mdl, d, topn_tags, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -640,6 +658,8 @@ async def build_chunks(task, progress_callback, on_chunking_start=None):
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_mdl.llm_name, to_cache)
         progress_callback(msg="Tagging {} chunks completed in {:.2f}s".format(len(docs), timer() - st))
 
     # Record tags applied
@@ -838,7 +858,7 @@ async def run_dataflow(task: dict):
     if not any([re.match(r"q_[0-9]+_vec", k) for k in keys]):
         try:
             set_progress(task_id, prog=0.82, msg="\n-------------------------------------\nStart to embedding...")
-            e, kb = KnowledgebaseService.get_by_id(task["kb_id"])
+            kb = KnowledgebaseService.get_configs_by_ids([task["kb_id"]])[0]
             embedding_id = kb.embd_id
             if kb.tenant_embd_id:
                 try:
@@ -1300,6 +1320,11 @@ async def insert_chunks(task_id, task_tenant_id, task_dataset_id, chunks, progre
         chunks: List of chunk dictionaries to insert
         progress_callback: Callback function for progress updates
     """
+    if settings.DOC_ENGINE.lower() in QUANTIZATION_DOC_ENGINES:
+        # Knowledge bases with vector quantization index the chunk vectors in a quantized field
+        ok, kb = KnowledgebaseService.get_by_id(task_dataset_id)
+        move_to_quantized_fields(chunks, quantization_method(kb.parser_config if ok else None, settings.DOC_ENGINE))
+
     mothers = []
     mother_ids = set([])
     for ck in chunks:
@@ -1329,7 +1354,7 @@ async def insert_chunks(task_id, task_tenant_id, task_dataset_id, chunks, progre
             task_dataset_id,
         )
         get_recording_context().save_func_return_value("docStoreConn.insert", ret)
-        task_canceled = has_canceled(task_id)
+        task_canceled = has_canceled(task_id, CANCEL_CHECK_INTERVAL)
         if task_canceled:
             progress_callback(-1, msg="Task has been canceled.")
             return False
@@ -1342,7 +1367,7 @@ async def insert_chunks(task_id, task_tenant_id, task_dataset_id, chunks, progre
             task_dataset_id,
         )
         get_recording_context().save_func_return_value("docStoreConn.insert", doc_store_result)
-        task_canceled = has_canceled(task_id)
+        task_canceled = has_canceled(task_id, CANCEL_CHECK_INTERVAL)
         if task_canceled:
             # Roll back partial RAPTOR summary inserts so the next run is not
             # mistaken for a completed checkpoint by get_raptor_chunk_methods.
@@ -1947,6 +1972,7 @@ async def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
+    await settings.docStoreConn.open_async()
     report_task = asyncio.create_task(report_status())
     tasks = []
 
@@ -1962,6 +1988,7 @@ async def main():
         await asyncio.gather(*tasks, return_exceptions=True)
         report_task.cancel()
         await asyncio.gather(report_task, return_exceptions=True)
+        await settings.docStoreConn.close_async()
     logging.error("BUG!!! You should not reach here!!!")
 
 
@@ -26,6 +26,7 @@ Provides post-processing functions for chunks:
 import asyncio
 import json
 import logging
+import os
 import random
 import re
 from datetime import datetime
@@ -37,11 +38,15 @@ from api.db.services.llm_service import LLMBundle
 from common import settings
 from common.constants import TAG_FLD, LLMType
 from common.metadata_utils import turn2jsonschema, update_metadata_to
-from rag.graphrag.utils import get_llm_cache, get_tags_from_cache, set_llm_cache, set_tags_to_cache
+from rag.graphrag.utils import get_llm_cache_batch, get_tags_from_cache, set_llm_cache_batch, set_tags_to_cache
 from rag.nlp import rag_tokenizer
 from rag.prompts.generator import content_tagging, gen_metadata, keyword_extraction, question_proposal
+from rag.svr.task_executor_refactor.packed_enrichment import KEYWORDS, METADATA, QUESTIONS, TAGS, PackedEnricher
 from rag.svr.task_executor_refactor.task_context import TaskContext
 
+# Run keywords/questions/metadata/tags for several chunks per LLM call (see packed_enrichment).
+PACKED_ENRICHMENT = int(os.environ.get("PACKED_ENRICHMENT", "0"))
+
 
 async def extract_keywords(docs: list[dict], ctx: TaskContext) -> None:
     """Extract keywords for chunks.
@@ -56,24 +61,25 @@ async def extract_keywords(docs: list[dict], ctx: TaskContext) -> None:
     ctx.progress_cb(msg="Start to generate keywords for every chunk ...")
     chat_model_config = resolve_model_config(ctx.tenant_id, LLMType.CHAT, ctx.llm_id)
     with LLMBundle(ctx.tenant_id, chat_model_config, lang=ctx.language) as chat_model:
+        topn = ctx.parser_config["auto_keywords"]
+        cached_keywords = await thread_pool_exec(get_llm_cache_batch, chat_model.llm_name, [(d["content_with_weight"], "keywords", {"topn": topn}) for d in docs])
+        to_cache = []
 
-        async def doc_keyword_extraction(chat_mdl, d, topn):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], "keywords", {"topn": topn})
+        async def doc_keyword_extraction(chat_mdl, d, topn, cached):
             if not cached:
                 if ctx.has_canceled_func(ctx.id):
                     ctx.progress_cb(-1, msg="Task has been canceled.")
                     return
                 async with chat_limiter:
                     cached = await keyword_extraction(chat_mdl, d["content_with_weight"], topn)
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, "keywords", {"topn": topn})
+                to_cache.append((d["content_with_weight"], cached, "keywords", {"topn": topn}))
             if cached:
-                d["important_kwd"] = [k for k in re.split(r"[,，;；、\r\n]+", cached) if k.strip()]
-                d["important_tks"] = rag_tokenizer.tokenize(" ".join(d["important_kwd"]))
+                _apply_keywords(d, cached)
             return
 
         tasks = []
-        for doc in docs:
-            tasks.append(asyncio.create_task(doc_keyword_extraction(chat_model, doc, ctx.parser_config["auto_keywords"])))
+        for doc, cached in zip(docs, cached_keywords):
+            tasks.append(asyncio.create_task(doc_keyword_extraction(chat_model, doc, topn, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -82,9 +88,21 @@ async def extract_keywords(docs: list[dict], ctx: TaskContext) -> None:
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_model.llm_name, to_cache)
         ctx.progress_cb(msg=f"Keywords generation {len(docs)} chunks completed in {timer() - st:.2f}s")
 
 
+def _apply_keywords(d: dict, cached: str) -> None:
+    d["important_kwd"] = [k for k in re.split(r"[,，;；、\r\n]+", cached) if k.strip()]
+    d["important_tks"] = rag_tokenizer.tokenize(" ".join(d["important_kwd"]))
+
+
+def _apply_questions(d: dict, cached: str) -> None:
+    d["question_kwd"] = cached.split("\n")
+    d["question_tks"] = rag_tokenizer.tokenize("\n".join(d["question_kwd"]))
+
+
 async def generate_questions(docs: list[dict], ctx: TaskContext) -> None:
     """Generate questions for chunks.
 
@@ -98,23 +116,24 @@ async def generate_questions(docs: list[dict], ctx: TaskContext) -> None:
     ctx.progress_cb(msg="Start to generate questions for every chunk ...")
     chat_model_config = resolve_model_config(ctx.tenant_id, LLMType.CHAT, ctx.llm_id)
     with LLMBundle(ctx.tenant_id, chat_model_config, lang=ctx.language) as chat_model:
+        topn = ctx.parser_config["auto_questions"]
+        cached_questions = await thread_pool_exec(get_llm_cache_batch, chat_model.llm_name, [(d["content_with_weight"], "question", {"topn": topn}) for d in docs])
+        to_cache = []
 
-        async def doc_question_proposal(chat_mdl, d, topn):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], "question", {"topn": topn})
+        async def doc_question_proposal(chat_mdl, d, topn, cached):
             if not cached:
                 if ctx.has_canceled_func(ctx.id):
                     ctx.progress_cb(-1, msg="Task has been canceled.")
                     return
                 async with chat_limiter:
                     cached = await question_proposal(chat_mdl, d["content_with_weight"], topn)
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, "question", {"topn": topn})
+                to_cache.append((d["content_with_weight"], cached, "question", {"topn": topn}))
             if cached:
-                d["question_kwd"] = cached.split("\n")
-                d["question_tks"] = rag_tokenizer.tokenize("\n".join(d["question_kwd"]))
+                _apply_questions(d, cached)
 
         tasks = []
-        for doc in docs:
-            tasks.append(asyncio.create_task(doc_question_proposal(chat_model, doc, ctx.parser_config["auto_questions"])))
+        for doc, cached in zip(docs, cached_questions):
+            tasks.append(asyncio.create_task(doc_question_proposal(chat_model, doc, topn, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -123,6 +142,8 @@ async def generate_questions(docs: list[dict], ctx: TaskContext) -> None:
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_model.llm_name, to_cache)
         ctx.progress_cb(msg=f"Question generation {len(docs)} chunks completed in {timer() - st:.2f}s")
 
 
@@ -180,21 +201,23 @@ async def generate_metadata(docs: list[dict], ctx: TaskContext) -> None:
     with LLMBundle(ctx.tenant_id, chat_model_config, lang=ctx.language) as chat_model:
         metadata_conf = build_metadata_config(ctx.parser_config)
 
-        async def gen_metadata_task(chat_mdl, d):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], "metadata", metadata_conf)
+        cached_metadata = await thread_pool_exec(get_llm_cache_batch, chat_model.llm_name, [(d["content_with_weight"], "metadata", metadata_conf) for d in docs])
+        to_cache = []
+
+        async def gen_metadata_task(chat_mdl, d, cached):
             if not cached:
                 if ctx.has_canceled_func(ctx.id):
                     ctx.progress_cb(-1, msg="Task has been canceled.")
                     return
                 async with chat_limiter:
                     cached = await gen_metadata(chat_mdl, turn2jsonschema(metadata_conf), d["content_with_weight"])
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, "metadata", metadata_conf)
+                to_cache.append((d["content_with_weight"], cached, "metadata", metadata_conf))
             if cached:
                 d["metadata_obj"] = cached
 
         tasks = []
-        for doc in docs:
-            tasks.append(asyncio.create_task(gen_metadata_task(chat_model, doc)))
+        for doc, cached in zip(docs, cached_metadata):
+            tasks.append(asyncio.create_task(gen_metadata_task(chat_model, doc, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -203,23 +226,30 @@ async def generate_metadata(docs: list[dict], ctx: TaskContext) -> None:
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_model.llm_name, to_cache)
 
-        metadata = {}
-        for doc in docs:
-            if "metadata_obj" in doc:
-                metadata = update_metadata_to(metadata, doc["metadata_obj"])
-                del doc["metadata_obj"]
-        if metadata:
-            existing_meta = DocMetadataService.get_document_metadata(ctx.doc_id)
-            existing_meta = existing_meta if isinstance(existing_meta, dict) else {}
-            metadata = update_metadata_to(metadata, existing_meta)
-            if ctx.write_interceptor:
-                ctx.write_interceptor.intercept("DocMetadataService.update_document_metadata")
-            else:
-                DocMetadataService.update_document_metadata(ctx.doc_id, metadata)
+        save_chunk_metadata(docs, ctx)
         ctx.progress_cb(msg=f"Metadata generation {len(docs)} chunks completed in {timer() - st:.2f}s")
 
 
+def save_chunk_metadata(docs: list[dict], ctx: TaskContext) -> None:
+    """Merge the chunks' ``metadata_obj`` into the document metadata and drop it from the chunks."""
+    metadata = {}
+    for doc in docs:
+        if "metadata_obj" in doc:
+            metadata = update_metadata_to(metadata, doc["metadata_obj"])
+            del doc["metadata_obj"]
+    if metadata:
+        existing_meta = DocMetadataService.get_document_metadata(ctx.doc_id)
+        existing_meta = existing_meta if isinstance(existing_meta, dict) else {}
+        metadata = update_metadata_to(metadata, existing_meta)
+        if ctx.write_interceptor:
+            ctx.write_interceptor.intercept("DocMetadataService.update_document_metadata")
+        else:
+            DocMetadataService.update_document_metadata(ctx.doc_id, metadata)
+
+
 def apply_built_in_metadata(ctx: TaskContext) -> None:
     built_in_meta_config = ctx.parser_config.get("built_in_metadata", [])
     if not built_in_meta_config:
@@ -242,6 +272,16 @@ def apply_built_in_metadata(ctx: TaskContext) -> None:
             DocMetadataService.update_document_metadata(ctx.doc_id, existing_meta)
 
 
+def _load_all_tags(tenant_id: str, kb_ids: list[str], S: int) -> dict:
+    all_tags = get_tags_from_cache(kb_ids)
+    if not all_tags:
+        all_tags = settings.retriever.all_tags_in_portion(tenant_id, kb_ids, S)
+        set_tags_to_cache(kb_ids, all_tags)
+    else:
+        all_tags = json.loads(all_tags)
+    return all_tags
+
+
 async def apply_tags(docs: list[dict], ctx: TaskContext) -> None:
     """Apply tags to chunks.
 
@@ -258,12 +298,7 @@ async def apply_tags(docs: list[dict], ctx: TaskContext) -> None:
     S = 1000
     st = timer()
     examples = []
-    all_tags = get_tags_from_cache(kb_ids)
-    if not all_tags:
-        all_tags = settings.retriever.all_tags_in_portion(tenant_id, kb_ids, S)
-        set_tags_to_cache(kb_ids, all_tags)
-    else:
-        all_tags = json.loads(all_tags)
+    all_tags = _load_all_tags(tenant_id, kb_ids, S)
     chat_model_config = resolve_model_config(tenant_id, LLMType.CHAT, ctx.llm_id)
     with LLMBundle(ctx.tenant_id, chat_model_config, lang=ctx.language) as chat_model:
         docs_to_tag = []
@@ -276,8 +311,10 @@ async def apply_tags(docs: list[dict], ctx: TaskContext) -> None:
             else:
                 docs_to_tag.append(doc)
 
-        async def doc_content_tagging(chat_mdl, d, topn_tags):
-            cached = get_llm_cache(chat_mdl.llm_name, d["content_with_weight"], all_tags, {"topn": topn_tags})
+        cached_tags = await thread_pool_exec(get_llm_cache_batch, chat_model.llm_name, [(d["content_with_weight"], all_tags, {"topn": topn_tags}) for d in docs_to_tag])
+        to_cache = []
+
+        async def doc_content_tagging(chat_mdl, d, topn_tags, cached):
             if not cached:
                 if ctx.has_canceled_func(ctx.id):
                     ctx.progress_cb(-1, msg="Task has been canceled.")
@@ -295,13 +332,13 @@ async def apply_tags(docs: list[dict], ctx: TaskContext) -> None:
                     )
                 if cached:
                     cached = json.dumps(cached)
+                    to_cache.append((d["content_with_weight"], cached, all_tags, {"topn": topn_tags}))
             if cached:
-                set_llm_cache(chat_mdl.llm_name, d["content_with_weight"], cached, all_tags, {"topn": topn_tags})
                 d[TAG_FLD] = json.loads(cached)
 
         tasks = []
-        for doc in docs_to_tag:
-            tasks.append(asyncio.create_task(doc_content_tagging(chat_model, doc, topn_tags)))
+        for doc, cached in zip(docs_to_tag, cached_tags):
+            tasks.append(asyncio.create_task(doc_content_tagging(chat_model, doc, topn_tags, cached)))
         try:
             await asyncio.gather(*tasks, return_exceptions=False)
         except Exception as e:
@@ -310,9 +347,130 @@ async def apply_tags(docs: list[dict], ctx: TaskContext) -> None:
                 t.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
+        finally:
+            await thread_pool_exec(set_llm_cache_batch, chat_model.llm_name, to_cache)
         ctx.progress_cb(msg=f"Tagging {len(docs)} chunks completed in {timer() - st:.2f}s")
 
 
+def _empty_tags(task, value) -> bool:
+    # A packed answer may tag a chunk with nothing; like apply_tags, keep that out of the LLM cache.
+    return task == TAGS and value == "{}"
+
+
+async def enrich_chunks_packed(docs: list[dict], ctx: TaskContext) -> None:
+    """Run every enabled enrichment task (keywords, questions, metadata, tags) in packed LLM calls.
+
+    Produces the same chunk fields and LLM cache entries as ``extract_keywords``,
+    ``generate_questions``, ``generate_metadata`` and ``apply_tags``, but asks for
+    all tasks of several chunks in one request. Cache lookups and writes go to
+    Redis in one batch each.
+    """
+    chat_limiter = ctx.chat_limiter
+    parser_config = ctx.parser_config
+    keywords_topn = parser_config.get("auto_keywords", 0)
+    questions_topn = parser_config.get("auto_questions", 0)
+    metadata_conf = None
+    if parser_config.get("enable_metadata", False) and (parser_config.get("metadata") or parser_config.get("built_in_metadata")):
+        metadata_conf = build_metadata_config(parser_config)
+    kb_ids = ctx.kb_parser_config.get("tag_kb_ids", [])
+    topn_tags = ctx.kb_parser_config.get("topn_tags", 3)
+    S = 1000
+    all_tags = _load_all_tags(ctx.tenant_id, kb_ids, S) if kb_ids else None
+
+    # (task, cache history, cache genconf), matching the single-task functions' cache keys.
+    cache_specs = []
+    if keywords_topn:
+        cache_specs.append((KEYWORDS, "keywords", {"topn": keywords_topn}))
+    if questions_topn:
+        cache_specs.append((QUESTIONS, "question", {"topn": questions_topn}))
+    if metadata_conf:
+        cache_specs.append((METADATA, "metadata", metadata_conf))
+    if all_tags:
+        cache_specs.append((TAGS, all_tags, {"topn": topn_tags}))
+    if not cache_specs and not kb_ids:
+        return
+
+    st = timer()
+    ctx.progress_cb(msg="Start to enrich every chunk with packed LLM calls ...")
+    chat_model_config = resolve_model_config(ctx.tenant_id, LLMType.CHAT, ctx.llm_id)
+    with LLMBundle(ctx.tenant_id, chat_model_config, lang=ctx.language) as chat_model:
+        llm_name = chat_model.llm_name
+        lookups = [(d["content_with_weight"], history, genconf) for d in docs for _, history, genconf in cache_specs]
+        cached = await thread_pool_exec(get_llm_cache_batch, llm_name, lookups)
+        values = [{} for _ in docs]
+        for n, value in enumerate(cached):
+            task = cache_specs[n % len(cache_specs)][0]
+            if value and not _empty_tags(task, value):
+                values[n // len(cache_specs)][task] = value
+
+        specs = {task: (history, genconf) for task, history, genconf in cache_specs}
+        enricher = PackedEnricher(
+            chat_model,
+            chat_limiter,
+            keywords_topn=keywords_topn,
+            questions_topn=questions_topn,
+            metadata_conf=metadata_conf,
+            all_tags=all_tags,
+            tags_topn=topn_tags,
+            is_canceled=lambda: ctx.has_canceled_func(ctx.id),
+        )
+        to_cache = []
+
+        async def enrich(tasks):
+            generated = await enricher.run([d["content_with_weight"] for d in docs], tasks)
+            for i, d in enumerate(docs):
+                for task, value in generated[i].items():
+                    values[i][task] = value
+                    if not _empty_tags(task, value):
+                        to_cache.append((d["content_with_weight"], value, *specs[task]))
+
+        # tag_content retrieves tags with the chunk's keywords, so chunks without cached
+        # keywords generate them, together with their other tasks but the tags, first.
+        pending = [{task for task, _, _ in cache_specs if task not in values[i]} for i in range(len(docs))]
+        await enrich([needed - {TAGS} if KEYWORDS in needed else set() for needed in pending])
+        if ctx.has_canceled_func(ctx.id):
+            ctx.progress_cb(-1, msg="Task has been canceled.")
+            return
+
+        # Chunks the tag knowledge base already covers take their tags from retrieval and
+        # serve as tagging examples.
+        examples = []
+        needs_llm_tags = [bool(all_tags) for _ in docs]
+        for i, d in enumerate(docs):
+            if KEYWORDS in values[i]:
+                _apply_keywords(d, values[i][KEYWORDS])
+            if not kb_ids:
+                continue
+            if ctx.has_canceled_func(ctx.id):
+                ctx.progress_cb(-1, msg="Task has been canceled.")
+                return
+            if settings.retriever.tag_content(ctx.tenant_id, kb_ids, d, all_tags, topn_tags=topn_tags, S=S) and len(d.get(TAG_FLD, [])) > 0:
+                examples.append({"content": d["content_with_weight"], TAG_FLD: d[TAG_FLD]})
+                needs_llm_tags[i] = False
+        tag_examples = random.choices(examples, k=2) if len(examples) > 2 else examples
+        if not tag_examples:
+            tag_examples = [{"content": "This is an example", TAG_FLD: {"example": 1}}]
+        enricher.tag_examples = tag_examples
+
+        await enrich([{task for task in pending[i] if task not in values[i] and (task != TAGS or needs_llm_tags[i])} for i in range(len(docs))])
+        if ctx.has_canceled_func(ctx.id):
+            ctx.progress_cb(-1, msg="Task has been canceled.")
+            return
+        await thread_pool_exec(set_llm_cache_batch, llm_name, to_cache)
+
+        for i, d in enumerate(docs):
+            value = values[i]
+            if QUESTIONS in value:
+                _apply_questions(d, value[QUESTIONS])
+            if METADATA in value:
+                d["metadata_obj"] = value[METADATA]
+            if TAGS in value and needs_llm_tags[i] and not _empty_tags(TAGS, value[TAGS]):
+                d[TAG_FLD] = json.loads(value[TAGS])
+        if metadata_conf:
+            save_chunk_metadata(docs, ctx)
+    ctx.progress_cb(msg=f"Packed enrichment of {len(docs)} chunks completed in {timer() - st:.2f}s ({enricher.llm_calls} packed and {enricher.fallback_calls} single-chunk LLM calls)")
+
+
 def count_with_key(docs: list[dict], key: str) -> int:
     """Count docs that have a specific key.
 
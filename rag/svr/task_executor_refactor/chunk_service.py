@@ -38,6 +38,7 @@ from common.connection_utils import timeout
 from common.constants import PAGERANK_FLD, TAG_FLD
 from common.misc_utils import thread_pool_exec
 from common.float_utils import normalize_overlapped_percent
+from common.vector_quantization import move_to_quantized_fields, quantization_method
 from rag.nlp import search
 from rag.svr.task_executor_refactor.task_context import TaskContext
 from rag.utils.base64_image import image2id
@@ -57,6 +58,8 @@ from rag.svr.task_executor_refactor.chunk_post_processor import (
     generate_metadata,
     apply_built_in_metadata,
     apply_tags,
+    enrich_chunks_packed,
+    PACKED_ENRICHMENT,
 )
 
 
@@ -149,23 +152,29 @@ class ChunkService:
         self._task_context.recording_context.record("docs_after_prep", docs)
 
         # Post-processing (delegated to chunk_post_processor)
-        if ctx.parser_config.get("auto_keywords", 0):
+        enable_metadata = ctx.parser_config.get("enable_metadata", False) and (ctx.parser_config.get("metadata") or ctx.parser_config.get("built_in_metadata"))
+        if PACKED_ENRICHMENT:
+            await enrich_chunks_packed(docs, ctx)
+            if enable_metadata:
+                apply_built_in_metadata(ctx)
+
+        if ctx.parser_config.get("auto_keywords", 0) and not PACKED_ENRICHMENT:
             await extract_keywords(docs, ctx)
         keywords = [d for d in docs if d.get("important_kwd")]
         self._task_context.recording_context.record("keywords_extracted", keywords)
 
-        if ctx.parser_config.get("auto_questions", 0):
+        if ctx.parser_config.get("auto_questions", 0) and not PACKED_ENRICHMENT:
             await generate_questions(docs, ctx)
         questions = [d for d in docs if d.get("question_kwd")]
         self._task_context.recording_context.record("questions_generated", questions)
 
-        if ctx.parser_config.get("enable_metadata", False) and (ctx.parser_config.get("metadata") or ctx.parser_config.get("built_in_metadata")):
+        if enable_metadata and not PACKED_ENRICHMENT:
             await generate_metadata(docs, ctx)
             apply_built_in_metadata(ctx)
         metadata_list = [d for d in docs if d.get("metadata_obj")]
         self._task_context.recording_context.record("metadata_list_generated", metadata_list)
 
-        if ctx.kb_parser_config.get("tag_kb_ids", []):
+        if ctx.kb_parser_config.get("tag_kb_ids", []) and not PACKED_ENRICHMENT:
             await apply_tags(docs, ctx)
         tags_applied = [d for d in docs if d.get(TAG_FLD)]
         self._task_context.recording_context.record("tags_applied", tags_applied)
@@ -259,6 +268,9 @@ class ChunkService:
         """
         doc_bulk_size = doc_bulk_size or settings.DOC_BULK_SIZE
 
+        # Knowledge bases with vector quantization index the chunk vectors in a quantized field
+        move_to_quantized_fields(chunks, quantization_method(self._task_context.kb_parser_config, settings.DOC_ENGINE))
+
         # Create mother chunks (summary chunks)
         mothers = self._create_mother_chunks(chunks)
 
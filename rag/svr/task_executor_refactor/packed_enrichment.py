@@ -0,0 +1,154 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Packed Chunk Enrichment.
+
+Runs keyword, question, metadata and tag generation for several chunks in one
+LLM call instead of one call per chunk per task. Chunks are packed in order up
+to a token budget; every chunk's answer is validated on its own and a chunk
+whose packed answer is missing or invalid for a task falls back to the
+single-chunk prompt for that task only.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from copy import deepcopy
+
+from common.metadata_utils import turn2jsonschema
+from rag.prompts.generator import (
+    content_tagging,
+    gen_metadata,
+    keyword_extraction,
+    pack_by_token_budget,
+    packed_enrichment,
+    question_proposal,
+)
+
+KEYWORDS = "keywords"
+QUESTIONS = "questions"
+METADATA = "metadata"
+TAGS = "tags"
+
+PACKED_ENRICHMENT_MAX_TOKENS = int(os.environ.get("PACKED_ENRICHMENT_MAX_TOKENS", "4096"))
+PACKED_ENRICHMENT_MAX_CHUNKS = int(os.environ.get("PACKED_ENRICHMENT_MAX_CHUNKS", "8"))
+
+
+class PackedEnricher:
+    """Enrich chunk contents with packed LLM calls.
+
+    Only the tasks configured here are ever requested: ``keywords_topn`` and
+    ``questions_topn`` enable keywords and questions, ``metadata_conf`` enables
+    metadata and ``all_tags`` enables tagging. ``llm_calls`` and
+    ``fallback_calls`` count the chat requests made.
+    """
+
+    def __init__(
+        self,
+        chat_mdl,
+        chat_limiter,
+        keywords_topn=0,
+        questions_topn=0,
+        metadata_conf=None,
+        all_tags=None,
+        tag_examples=None,
+        tags_topn=3,
+        is_canceled=None,
+        max_tokens=PACKED_ENRICHMENT_MAX_TOKENS,
+        max_chunks=PACKED_ENRICHMENT_MAX_CHUNKS,
+    ):
+        self.chat_mdl = chat_mdl
+        self.chat_limiter = chat_limiter
+        self.keywords_topn = keywords_topn
+        self.questions_topn = questions_topn
+        self.metadata_conf = metadata_conf
+        self.metadata_schema = turn2jsonschema(metadata_conf) if metadata_conf else None
+        self.all_tags = all_tags
+        self.tag_examples = tag_examples or []
+        self.tags_topn = tags_topn
+        self.is_canceled = is_canceled or (lambda: False)
+        self.max_tokens = max_tokens
+        self.max_chunks = max_chunks
+        self.llm_calls = 0
+        self.fallback_calls = 0
+
+    async def run(self, contents: list[str], tasks: list[set[str]]) -> list[dict]:
+        """Return, for each content, a dict from task name to its cache value.
+
+        ``tasks[i]`` names the tasks still needed for ``contents[i]``; chunks
+        needing the same tasks share packs.
+        """
+        results = [{} for _ in contents]
+        groups = {}
+        for i, needed in enumerate(tasks):
+            if needed:
+                groups.setdefault(frozenset(needed), []).append(i)
+
+        packs = []
+        for needed, indexes in groups.items():
+            for pack in pack_by_token_budget([contents[i] for i in indexes], self.max_tokens, self.max_chunks):
+                packs.append((needed, [indexes[j] for j in pack]))
+
+        await asyncio.gather(*[self._run_pack(needed, indexes, contents, results) for needed, indexes in packs])
+        return results
+
+    async def _run_pack(self, needed, indexes, contents, results):
+        if self.is_canceled():
+            return
+        answers = [{} for _ in indexes]
+        if len(indexes) > 1:
+            try:
+                async with self.chat_limiter:
+                    self.llm_calls += 1
+                    answers = await packed_enrichment(
+                        self.chat_mdl,
+                        [contents[i] for i in indexes],
+                        keywords_topn=self.keywords_topn if KEYWORDS in needed else 0,
+                        questions_topn=self.questions_topn if QUESTIONS in needed else 0,
+                        metadata_schema=self.metadata_schema if METADATA in needed else None,
+                        all_tags=self.all_tags if TAGS in needed else None,
+                        tag_examples=deepcopy(self.tag_examples),
+                        tags_topn=self.tags_topn,
+                    )
+            except Exception as e:
+                logging.warning(f"Packed enrichment of {len(indexes)} chunks failed, falling back to single-chunk calls: {e}")
+
+        fallbacks = []
+        for i, answer in zip(indexes, answers):
+            for task in needed:
+                if task in answer:
+                    results[i][task] = answer[task]
+                else:
+                    fallbacks.append(self._run_single(task, i, contents[i], results))
+        await asyncio.gather(*fallbacks)
+
+    async def _run_single(self, task, i, content, results):
+        if self.is_canceled():
+            return
+        async with self.chat_limiter:
+            self.fallback_calls += 1
+            if task == KEYWORDS:
+                value = await keyword_extraction(self.chat_mdl, content, self.keywords_topn)
+            elif task == QUESTIONS:
+                value = await question_proposal(self.chat_mdl, content, self.questions_topn)
+            elif task == METADATA:
+                value = await gen_metadata(self.chat_mdl, deepcopy(self.metadata_schema), content)
+            else:
+                value = await content_tagging(self.chat_mdl, content, self.all_tags, deepcopy(self.tag_examples), self.tags_topn)
+                value = json.dumps(value) if value else ""
+        if value:
+            results[i][task] = value
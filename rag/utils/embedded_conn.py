@@ -0,0 +1,720 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Embedded DocStoreConnection: an in-process store for single-box installs and CI.
+
+Selected with ``DOC_ENGINE=embedded``. Each index is a directory under the
+configured ``embedded.path``:
+
+  docs.db           SQLite (WAL) with the rows as JSON plus the BM25 postings.
+  q_<dim>_vec/      one memory-mapped HNSW graph per vector column.
+  .lock             file lock serializing writers across processes.
+
+Search results are shaped like Elasticsearch responses and scored the way
+``rag/utils/es_conn.py`` asks Elasticsearch to score them: the full-text
+clause weighs ``1 - vector_similarity_weight``, the KNN clause is restricted
+to the filter and the text matches and adds ``(1 + cosine) / 2``, and rank
+features add ``value * boost``. ``rag/nlp/search.py`` therefore takes its
+Elasticsearch path unchanged.
+
+Known differences from Elasticsearch:
+  - phrase and proximity queries score their terms independently;
+  - sorting on a list field uses its first element;
+  - the ``sql`` passthrough is not supported.
+"""
+
+import copy
+import functools
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from filelock import FileLock
+
+from common.config_utils import get_base_config
+from common.doc_store.doc_store_base import DocStoreConnection, FusionExpr, MatchDenseExpr, MatchTextExpr, OrderByExpr
+from common.doc_store.embedded_index import HNSWIndex, InvertedIndex, parse_field_boosts, parse_query_string
+from common.file_utils import get_project_base_directory
+from common.float_utils import get_float
+
+logger = logging.getLogger("ragflow.embedded_conn")
+
+PAGERANK_FLD = "pagerank_fea"
+TAG_FLD = "tag_feas"
+VECTOR_FIELD = re.compile(r"q_(\d+)_vec$")
+TEXT_FIELD = re.compile(r".+_(tks|ltks)$")
+# Keyword fields that rag/nlp/query.py matches whole-value in its query_string.
+KEYWORD_MATCH_FIELDS = {"important_kwd"}
+MAX_KNN_TOPN = 10000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS docs (slot INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, kb_id TEXT, doc_id TEXT, body TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS docs_kb_id ON docs(kb_id)",
+    "CREATE INDEX IF NOT EXISTS docs_doc_id ON docs(doc_id)",
+    *InvertedIndex.SCHEMA,
+)
+
+
+def _json_path(field: str) -> str:
+    return "$" + "".join('."%s"' % part.replace('"', '\\"') for part in field.split("."))
+
+
+def _indexed_fields(doc: dict) -> dict:
+    return {k: v for k, v in doc.items() if TEXT_FIELD.match(k) or k in KEYWORD_MATCH_FIELDS}
+
+
+def _compare(a, b) -> int:
+    # SQLite's ordering: NULL, numbers, then text; None is moved last by the caller.
+    def rank(v):
+        return 0 if isinstance(v, (int, float)) else 1
+
+    if rank(a) != rank(b):
+        return rank(a) - rank(b)
+    return (a > b) - (a < b)
+
+
+class _Table:
+    """One index directory: its SQLite database and its HNSW graphs."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._file_lock = FileLock(os.path.join(path, ".lock"))
+        self._vectors: dict[str, HNSWIndex] = {}
+        self._vectors_lock = threading.Lock()
+        with self.write() as db:
+            for stmt in _SCHEMA:
+                db.execute(stmt)
+
+    def db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(os.path.join(self.path, "docs.db"), isolation_level=None, timeout=60)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def write(self, vector_ops: list | None = None):
+        """One SQLite write transaction; ``vector_ops`` queued in it are applied to the graphs after the commit."""
+        with self._write_lock, self._file_lock:
+            db = self.db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            # Still under both locks: HNSWIndex writers must be serialized across threads and processes.
+            if vector_ops:
+                self._apply_vector_ops(vector_ops)
+
+    def _apply_vector_ops(self, vector_ops: list):
+        # Applied after the SQLite commit: slots are never reused, so a crash in between only leaves orphaned nodes.
+        touched = set()
+        for op, field, slot, vec in vector_ops:
+            for f in [field] if field else self.vector_fields():
+                vectors = self.vectors(f, create=op == "add")
+                if op == "add":
+                    vectors.add(slot, vec)
+                else:
+                    vectors.remove(slot)
+                touched.add(f)
+        for f in touched:
+            self.vectors(f).flush()
+
+    def vectors(self, field: str, create: bool = False) -> HNSWIndex | None:
+        with self._vectors_lock:
+            if field not in self._vectors:
+                path = os.path.join(self.path, field)
+                if not create and not os.path.exists(os.path.join(path, "header.i64")):
+                    return None
+                self._vectors[field] = HNSWIndex(path, int(VECTOR_FIELD.match(field).group(1)))
+            return self._vectors[field]
+
+    def vector_fields(self) -> list[str]:
+        return [f for f in os.listdir(self.path) if VECTOR_FIELD.match(f) and self.vectors(f) is not None]
+
+    def slots(self, where: str, params: list) -> np.ndarray:
+        rows = self.db().execute(f"SELECT slot FROM docs WHERE {where}", params).fetchall()
+        return np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+
+
+class EmbeddedConnection(DocStoreConnection):
+    def __init__(self, path: str | None = None):
+        cfg = get_base_config("embedded", {}) or {}
+        self.path = path or os.environ.get("EMBEDDED_DOC_STORE_PATH") or cfg.get("path") or os.path.join(get_project_base_directory(), "data", "embedded_doc_store")
+        os.makedirs(self.path, exist_ok=True)
+        self._tables: dict[str, _Table] = {}
+        self._tables_lock = threading.Lock()
+        self._inverted = InvertedIndex()
+        logger.info(f"Embedded doc store at {self.path}")
+
+    def _table(self, index_name: str, create: bool = False) -> _Table | None:
+        with self._tables_lock:
+            table = self._tables.get(index_name)
+            if table is not None:
+                return table
+            path = os.path.join(self.path, index_name)
+            if not create and not os.path.exists(os.path.join(path, "docs.db")):
+                return None
+            os.makedirs(path, exist_ok=True)
+            table = self._tables[index_name] = _Table(path)
+            return table
+
+    """
+    Database operations
+    """
+
+    def db_type(self) -> str:
+        return "embedded"
+
+    def health(self) -> dict:
+        return {"type": "embedded", "status": "green", "path": self.path}
+
+    """
+    Table operations
+    """
+
+    def create_idx(self, index_name: str, dataset_id: str, vector_size: int, parser_id: str = None):
+        self._table(index_name, create=True)
+        return True
+
+    def create_doc_meta_idx(self, index_name: str):
+        self._table(index_name, create=True)
+        return True
+
+    def delete_idx(self, index_name: str, dataset_id: str):
+        if len(dataset_id) > 0:
+            # Same as Elasticsearch: all datasets of a tenant share one index, which stays alive.
+            return
+        with self._tables_lock:
+            self._tables.pop(index_name, None)
+            shutil.rmtree(os.path.join(self.path, index_name), ignore_errors=True)
+
+    def index_exist(self, index_name: str, dataset_id: str = None) -> bool:
+        return self._table(index_name) is not None
+
+    def refresh_idx(self, index_name: str) -> bool:
+        # Writes are visible as soon as they commit.
+        return self._table(index_name) is not None
+
+    def count_idx(self, index_name: str) -> int:
+        table = self._table(index_name)
+        if table is None:
+            return 0
+        return table.db().execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    """
+    Filters
+    """
+
+    def _where(self, condition: dict, skip_empty: bool = True) -> tuple[str, list]:
+        """Translate an Elasticsearch-style condition to a SQL predicate over ``docs``."""
+        clauses, params = [], []
+
+        def exists(field):
+            path = _json_path(field)
+            params.extend([path, path, path])
+            return "(COALESCE(json_type(body, ?), 'null') != 'null' AND NOT (json_type(body, ?) = 'array' AND json_array_length(body, ?) = 0))"
+
+        for k, v in condition.items():
+            if k == "available_int":
+                params.append(_json_path(k))
+                clauses.append("json_extract(body, ?) < 1" if v == 0 else "NOT COALESCE(json_extract(body, ?) < 1, 0)")
+                continue
+            if k == "exists":
+                clauses.append(exists(v))
+                continue
+            if k == "must_not":
+                if isinstance(v, dict) and "exists" in v:
+                    clauses.append(f"NOT {exists(v['exists'])}")
+                continue
+            if v is None or (skip_empty and not v) or (k == "id" and not v):
+                continue
+            if not isinstance(v, (list, str, int)):
+                raise Exception(f"Condition `{k!s}={v!s}` value type is {type(v)!s}, expected to be int, str or list.")
+            values = json.dumps(v if isinstance(v, list) else [v], ensure_ascii=False)
+            if k in ("id", "kb_id", "doc_id"):
+                clauses.append(f"{k} IN (SELECT value FROM json_each(?))")
+                params.append(values)
+            else:
+                clauses.append("EXISTS (SELECT 1 FROM json_each(docs.body, ?) AS j WHERE j.value IN (SELECT value FROM json_each(?)))")
+                params.extend([_json_path(k), values])
+        return " AND ".join(clauses) or "1", params
+
+    """
+    Search
+    """
+
+    def search(
+        self,
+        select_fields: list[str],
+        highlight_fields: list[str],
+        condition: dict,
+        match_expressions: list,
+        order_by: OrderByExpr,
+        offset: int,
+        limit: int,
+        index_names: str | list[str],
+        knowledgebase_ids: list[str],
+        agg_fields: list[str] | None = None,
+        rank_feature: dict | None = None,
+    ):
+        if isinstance(index_names, str):
+            index_names = index_names.split(",")
+        condition = dict(condition)
+        assert "_id" not in condition
+        condition["kb_id"] = knowledgebase_ids
+        where, params = self._where(condition)
+
+        text, dense, vector_similarity_weight = None, None, 0.5
+        for m in match_expressions:
+            if isinstance(m, MatchTextExpr):
+                text = m
+            elif isinstance(m, MatchDenseExpr):
+                dense = m
+            elif isinstance(m, FusionExpr) and m.method == "weighted_sum" and "weights" in m.fusion_params:
+                vector_similarity_weight = get_float(m.fusion_params["weights"].split(",")[1])
+        clauses = parse_query_string(text.matching_text) if text else []
+        fields = parse_field_boosts(text.fields) if text else []
+        minimum_should_match = (text.extra_options or {}).get("minimum_should_match", 0) if text else 0
+
+        tables = [(name, t) for name in index_names if (t := self._table(name)) is not None]
+        scored, rest, agg_scopes, total = {}, [], [], 0
+        knn_hits = []
+        for ti, (_, table) in enumerate(tables):
+            db = table.db()
+            if not text and not dense:
+                total += db.execute(f"SELECT COUNT(*) FROM docs WHERE {where}", params).fetchone()[0]
+                agg_scopes.append((table, where, params))
+                continue
+            allowed = table.slots(where, params) if where != "1" else None
+            candidates = allowed
+            if text:
+                candidates, text_scores = self._inverted.score(db, clauses, fields, minimum_should_match, allowed)
+                for slot, s in zip(candidates.tolist(), text_scores.tolist()):
+                    scored[(ti, slot)] = s * (1.0 - vector_similarity_weight)
+            if dense:
+                vectors = table.vectors(dense.vector_column_name)
+                similarity = float((dense.extra_options or {}).get("similarity", 0.0))
+                if vectors is not None and (candidates is None or len(candidates)):
+                    for slot, cos in vectors.search(dense.embedding_data, min(dense.topn, MAX_KNN_TOPN), allowed=candidates):
+                        if cos >= similarity:
+                            knn_hits.append(((1.0 + cos) / 2, ti, slot))
+            if text:
+                scope = "slot IN (SELECT value FROM json_each(?))"
+                agg_scopes.append((table, scope, [json.dumps(candidates.tolist())]))
+            else:
+                # A KNN-only query still matches every filtered row, as the Elasticsearch bool query does.
+                rest.append((ti, where, params))
+                agg_scopes.append((table, where, params))
+        knn_hits.sort(key=lambda h: -h[0])
+        for s, ti, slot in knn_hits[: min(dense.topn, MAX_KNN_TOPN)] if dense else []:
+            scored[(ti, slot)] = scored.get((ti, slot), 0.0) + s
+        if rank_feature and (text or dense):
+            self._add_rank_features(tables, scored, rank_feature, rest)
+
+        if not text and not dense:
+            page = self._filtered_page(tables, where, params, order_by, offset, limit)
+        else:
+            if text:
+                total = len(scored)
+            else:
+                total = sum(tables[ti][1].db().execute(f"SELECT COUNT(*) FROM docs WHERE {w}", p).fetchone()[0] for ti, w, p in rest)
+            page = self._scored_page(tables, scored, rest, order_by, offset, limit)
+
+        res = {
+            "timed_out": False,
+            "hits": {"total": {"value": total, "relation": "eq"}, "hits": self._hits(tables, page, select_fields, highlight_fields, clauses)},
+        }
+        if agg_fields:
+            res["aggregations"] = {f"aggs_{fld}": {"buckets": self._aggregate(agg_scopes, fld)} for fld in agg_fields}
+        return res
+
+    def _add_rank_features(self, tables, scored: dict, rank_feature: dict, rest: list):
+        features = [(PAGERANK_FLD if fld == PAGERANK_FLD else f"{TAG_FLD}.{fld}", float(boost)) for fld, boost in rank_feature.items()]
+        for ti, (_, table) in enumerate(tables):
+            db = table.db()
+            for fld, boost in features:
+                path = _json_path(fld)
+                slots = [slot for t, slot in scored if t == ti]
+                scopes = [("slot IN (SELECT value FROM json_each(?))", [json.dumps(slots)])]
+                scopes += [(w, p) for t, w, p in rest if t == ti]
+                seen = set()
+                for scope, scope_params in scopes:
+                    rows = db.execute(f"SELECT slot, json_extract(body, ?) FROM docs WHERE json_extract(body, ?) > 0 AND {scope}", [path, path, *scope_params]).fetchall()
+                    for slot, value in rows:
+                        if slot not in seen:
+                            seen.add(slot)
+                            scored[(ti, slot)] = scored.get((ti, slot), 0.0) + float(value) * boost
+
+    def _order_sql(self, order_by: OrderByExpr) -> tuple[list[str], list, list[int]]:
+        exprs, params, orders = [], [], []
+        for field, order in order_by.fields if order_by else []:
+            if field == "id":
+                continue
+            path = _json_path(field)
+            exprs.append("CASE json_type(body, ?) WHEN 'array' THEN json_extract(body, ? || '[0]') ELSE json_extract(body, ?) END")
+            params.extend([path, path, path])
+            orders.append(order)
+        return exprs, params, orders
+
+    @staticmethod
+    def _sort(rows: list, orders: list[int]) -> list:
+        """Sort ``(key, sort values...)`` rows with missing values last, as Elasticsearch does."""
+
+        def cmp(a, b):
+            for i, order in enumerate(orders, start=1):
+                x, y = a[i], b[i]
+                if x is None or y is None:
+                    c = (x is None) - (y is None)
+                else:
+                    c = _compare(x, y) * (1 if order == 0 else -1)
+                if c:
+                    return c
+            return 0
+
+        return sorted(rows, key=functools.cmp_to_key(cmp))
+
+    def _filtered_page(self, tables, where: str, params: list, order_by: OrderByExpr, offset: int, limit: int) -> list:
+        if limit <= 0:
+            return []
+        exprs, order_params, orders = self._order_sql(order_by)
+        select = ", ".join(["slot", *[f"{e} AS s{i}" for i, e in enumerate(exprs)]])
+        sql_order = ", ".join([f"s{i} IS NULL, s{i} {'ASC' if o == 0 else 'DESC'}" for i, o in enumerate(orders)] + ["slot"])
+        rows = []
+        for ti, (_, table) in enumerate(tables):
+            fetched = table.db().execute(f"SELECT {select} FROM docs WHERE {where} ORDER BY {sql_order} LIMIT ?", [*order_params, *params, offset + limit]).fetchall()
+            rows += [((ti, r[0]), *r[1:]) for r in fetched]
+        if len(tables) > 1:
+            rows = self._sort(rows, orders)
+        return [(key, 0.0) for key, *_ in rows[offset : offset + limit]]
+
+    def _scored_page(self, tables, scored: dict, rest: list, order_by: OrderByExpr, offset: int, limit: int) -> list:
+        if limit <= 0:
+            return []
+        exprs, order_params, orders = self._order_sql(order_by)
+        if exprs:
+            rows = []
+            for ti, (_, table) in enumerate(tables):
+                scopes = [("slot IN (SELECT value FROM json_each(?))", [json.dumps([slot for t, slot in scored if t == ti])])]
+                scopes += [(w, p) for t, w, p in rest if t == ti]
+                for scope, scope_params in scopes:
+                    fetched = table.db().execute(f"SELECT slot, {', '.join(exprs)} FROM docs WHERE {scope}", [*order_params, *scope_params]).fetchall()
+                    rows += [((ti, r[0]), *r[1:]) for r in fetched]
+            unique = list({r[0]: r for r in rows}.values())
+            unique.sort(key=lambda r: r[0])
+            return [(r[0], scored.get(r[0], 0.0)) for r in self._sort(unique, orders)[offset : offset + limit]]
+
+        page = sorted(scored.items(), key=lambda kv: (-kv[1], kv[0]))[: offset + limit]
+        need = offset + limit - len(page)
+        for ti, w, p in rest:
+            if need <= 0:
+                break
+            for (slot,) in tables[ti][1].db().execute(f"SELECT slot FROM docs WHERE {w} ORDER BY slot", p):
+                if (ti, slot) in scored:
+                    continue
+                page.append(((ti, slot), 0.0))
+                need -= 1
+                if need <= 0:
+                    break
+        return page[offset : offset + limit]
+
+    def _hits(self, tables, page: list, select_fields: list[str], highlight_fields: list[str], clauses: list[dict]) -> list[dict]:
+        if not page:
+            return []
+        select_fields = select_fields or []
+        all_fields = not select_fields or "*" in select_fields
+        vector_fields = [f for f in select_fields if VECTOR_FIELD.match(f)]
+        docs = {}
+        for ti, (_, table) in enumerate(tables):
+            slots = [slot for (t, slot), _ in page if t == ti]
+            if not slots:
+                continue
+            for slot, body in table.db().execute("SELECT slot, body FROM docs WHERE slot IN (SELECT value FROM json_each(?))", [json.dumps(slots)]):
+                docs[(ti, slot)] = json.loads(body)
+        terms = {t for c in clauses for t in c}
+        hits = []
+        for key, score in page:
+            doc = docs.get(key)
+            if doc is None:
+                continue
+            ti, slot = key
+            source = dict(doc) if all_fields else {f: doc[f] for f in select_fields if f in doc}
+            for f in vector_fields:
+                vectors = tables[ti][1].vectors(f)
+                vec = vectors.vector(slot) if vectors is not None else None
+                if vec is not None:
+                    source[f] = vec
+            hit = {"_index": tables[ti][0], "_id": doc["id"], "_score": score, "_source": source}
+            highlight = {f: frags for f in highlight_fields or [] if (frags := self._fragments(doc.get(f), terms))}
+            if highlight:
+                hit["highlight"] = highlight
+            hits.append(hit)
+        return hits
+
+    @staticmethod
+    def _fragments(value, terms: set[str], size: int = 5, max_fragments: int = 5) -> list[str]:
+        if not isinstance(value, str) or not terms:
+            return []
+        tokens = value.split()
+        marked = [i for i, t in enumerate(tokens) if t.lower() in terms]
+        frags, last_end = [], -1
+        for i in marked:
+            if len(frags) >= max_fragments:
+                break
+            if i < last_end:
+                continue
+            start, last_end = max(0, i - size), i + size + 1
+            frags.append(" ".join(f"<em>{t}</em>" if t.lower() in terms else t for t in tokens[start:last_end]))
+        return frags
+
+    def _aggregate(self, scopes: list, field: str) -> list[dict]:
+        counts = {}
+        for table, where, params in scopes:
+            rows = (
+                table.db()
+                .execute(
+                    f"SELECT j.value, COUNT(DISTINCT docs.slot) FROM docs, json_each(docs.body, ?) AS j WHERE j.type IN ('text', 'integer', 'real') AND {where} GROUP BY j.value",
+                    [_json_path(field), *params],
+                )
+                .fetchall()
+            )
+            for value, n in rows:
+                counts[value] = counts.get(value, 0) + n
+        return [{"key": k, "doc_count": n} for k, n in sorted(counts.items(), key=lambda kv: -kv[1])]
+
+    """
+    CRUD operations
+    """
+
+    def get(self, doc_id: str, index_name: str, dataset_ids: list[str]) -> dict | None:
+        table = self._table(index_name)
+        if table is None:
+            return None
+        row = table.db().execute("SELECT slot, body FROM docs WHERE id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return None
+        doc = json.loads(row[1])
+        for f in table.vector_fields():
+            vec = table.vectors(f).vector(row[0])
+            if vec is not None:
+                doc[f] = vec
+        doc["id"] = doc_id
+        return doc
+
+    def _delete_slot(self, db, slot: int, vector_ops: list):
+        self._inverted.remove(db, slot)
+        db.execute("DELETE FROM docs WHERE slot = ?", (slot,))
+        vector_ops.append(("remove", None, slot, None))
+
+    def _insert_doc(self, db, doc: dict, vectors: dict, vector_ops: list):
+        cur = db.execute(
+            "INSERT INTO docs (id, kb_id, doc_id, body) VALUES (?, ?, ?, ?)",
+            (doc["id"], doc.get("kb_id"), doc.get("doc_id"), json.dumps(doc, ensure_ascii=False)),
+        )
+        slot = cur.lastrowid
+        self._inverted.add(db, slot, _indexed_fields(doc))
+        for f, vec in vectors.items():
+            vector_ops.append(("add", f, slot, vec))
+
+    def insert(self, documents: list[dict], index_name: str, knowledgebase_id: str = None) -> list[str]:
+        table = self._table(index_name, create=True)
+        vector_ops = []
+        try:
+            with table.write(vector_ops) as db:
+                for d in documents:
+                    assert "_id" not in d
+                    assert "id" in d
+                    doc = copy.deepcopy(d)
+                    doc["kb_id"] = knowledgebase_id
+                    vectors = {k: doc.pop(k) for k in list(doc) if VECTOR_FIELD.match(k)}
+                    old = db.execute("SELECT slot FROM docs WHERE id = ?", (doc["id"],)).fetchone()
+                    if old:
+                        self._delete_slot(db, old[0], vector_ops)
+                    self._insert_doc(db, doc, vectors, vector_ops)
+        except Exception as e:
+            logger.warning("EmbeddedConnection.insert got exception: " + str(e))
+            return [str(e)]
+        return []
+
+    @staticmethod
+    def _merge(dst: dict, src: dict):
+        for k, v in src.items():
+            if isinstance(v, dict) and isinstance(dst.get(k), dict):
+                EmbeddedConnection._merge(dst[k], v)
+            else:
+                dst[k] = copy.deepcopy(v)
+
+    @staticmethod
+    def _apply_update(doc: dict, new_value: dict, single: bool):
+        """Apply ``new_value`` with the semantics of ESConnection.update."""
+        for k, v in new_value.items():
+            if k == "id":
+                continue
+            if k == "remove":
+                if isinstance(v, str):
+                    doc.pop(v, None)
+                elif isinstance(v, dict):
+                    for kk, vv in v.items():
+                        if isinstance(doc.get(kk), list) and vv in doc[kk]:
+                            doc[kk].remove(vv)
+                continue
+            if k == "add":
+                if isinstance(v, dict):
+                    for kk, vv in v.items():
+                        doc.setdefault(kk, []).append(vv.strip() if isinstance(vv, str) else vv)
+                continue
+            if not single and not v and k != "available_int":
+                continue
+            if k.split("_")[-1] == "feas" or not single or not isinstance(v, dict):
+                doc[k] = copy.deepcopy(v)
+            else:
+                EmbeddedConnection._merge(doc.setdefault(k, {}), v)
+
+    def update(self, condition: dict, new_value: dict, index_name: str, knowledgebase_id: str) -> bool:
+        table = self._table(index_name)
+        if table is None:
+            return False
+        condition = dict(condition)
+        condition["kb_id"] = knowledgebase_id
+        single = isinstance(condition.get("id"), str)
+        new_vectors = {k: v for k, v in new_value.items() if VECTOR_FIELD.match(k)}
+        new_value = {k: v for k, v in new_value.items() if k not in new_vectors}
+        vector_ops = []
+        try:
+            where, params = self._where(condition)
+            with table.write(vector_ops) as db:
+                rows = db.execute(f"SELECT slot, body FROM docs WHERE {where}", params).fetchall()
+                for slot, body in rows:
+                    doc = json.loads(body)
+                    old_indexed = _indexed_fields(doc)
+                    self._apply_update(doc, new_value, single)
+                    if new_vectors:
+                        # A new vector means a new graph node, hence a new slot.
+                        vectors = {f: table.vectors(f).vector(slot) for f in table.vector_fields()}
+                        vectors = {f: v for f, v in vectors.items() if v is not None}
+                        vectors.update(new_vectors)
+                        self._delete_slot(db, slot, vector_ops)
+                        self._insert_doc(db, doc, vectors, vector_ops)
+                        continue
+                    db.execute(
+                        "UPDATE docs SET kb_id = ?, doc_id = ?, body = ? WHERE slot = ?",
+                        (doc.get("kb_id"), doc.get("doc_id"), json.dumps(doc, ensure_ascii=False), slot),
+                    )
+                    if _indexed_fields(doc) != old_indexed:
+                        self._inverted.remove(db, slot)
+                        self._inverted.add(db, slot, _indexed_fields(doc))
+            return bool(rows) if single else True
+        except Exception as e:
+            logger.exception(f"EmbeddedConnection.update({index_name}, {condition}) got exception: {e}")
+            return False
+
+    def replace_meta_fields(self, index_name: str, doc_id: str, meta_fields: dict) -> bool:
+        table = self._table(index_name)
+        if table is None:
+            return False
+        with table.write() as db:
+            row = db.execute("SELECT slot, body FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            if row is None:
+                return False
+            doc = json.loads(row[1])
+            doc["meta_fields"] = meta_fields
+            db.execute("UPDATE docs SET body = ? WHERE slot = ?", (json.dumps(doc, ensure_ascii=False), row[0]))
+        return True
+
+    def delete(self, condition: dict, index_name: str, knowledgebase_id: str) -> int:
+        table = self._table(index_name)
+        if table is None:
+            return 0
+        condition = dict(condition)
+        assert "_id" not in condition
+        condition["kb_id"] = knowledgebase_id
+        where, params = self._where(condition, skip_empty=False)
+        vector_ops = []
+        with table.write(vector_ops) as db:
+            slots = [r[0] for r in db.execute(f"SELECT slot FROM docs WHERE {where}", params).fetchall()]
+            for slot in slots:
+                self._delete_slot(db, slot, vector_ops)
+        return len(slots)
+
+    """
+    Helper functions for search result
+    """
+
+    def get_total(self, res):
+        return res["hits"]["total"]["value"]
+
+    def get_doc_ids(self, res):
+        return [d["_id"] for d in res["hits"]["hits"]]
+
+    def get_scores(self, res) -> dict[str, float]:
+        return {d["_id"]: float(d["_score"] or 0.0) for d in res["hits"]["hits"]}
+
+    def get_fields(self, res, fields: list[str]) -> dict[str, dict]:
+        # Same value conversion as ESConnection.get_fields.
+        res_fields = {}
+        if not fields:
+            return {}
+        for hit in res["hits"]["hits"]:
+            m = {n: hit["_source"][n] for n in fields if hit["_source"].get(n) is not None}
+            for n, v in m.items():
+                if isinstance(v, list) or (n == "available_int" and isinstance(v, (int, float))):
+                    continue
+                if not isinstance(v, str):
+                    m[n] = str(v)
+            if m:
+                res_fields[hit["_id"]] = m
+        return res_fields
+
+    def get_highlight(self, res, keywords: list[str], field_name: str):
+        ans = {}
+        for d in res["hits"]["hits"]:
+            highlights = d.get("highlight")
+            if not highlights:
+                continue
+            txt = re.sub(r"[\r\n]", " ", d["_source"].get(field_name) or "")
+            txt_list = []
+            for t in re.split(r"[.?!;\n]", txt):
+                for w in keywords:
+                    t = re.sub(r"(^|[ .?/'\"\(\)!,:;-])(%s)([ .?/'\"\(\)!,:;-])" % re.escape(w), r"\1<em>\2</em>\3", t, flags=re.IGNORECASE | re.MULTILINE)
+                if re.search(r"<em>[^<>]+</em>", t, flags=re.IGNORECASE | re.MULTILINE):
+                    txt_list.append(t)
+            ans[d["_id"]] = "...".join(txt_list) if txt_list else "...".join(list(highlights.values())[0])
+        return ans
+
+    def get_aggregation(self, res, field_name: str):
+        agg_field = "aggs_" + field_name
+        if agg_field not in res.get("aggregations", {}):
+            return list()
+        return [(b["key"], b["doc_count"]) for b in res["aggregations"][agg_field]["buckets"]]
+
+    """
+    SQL
+    """
+
+    def sql(self, sql: str, fetch_size: int, format: str):
+        logger.error("EmbeddedConnection.sql is not supported")
+        return None
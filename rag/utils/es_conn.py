@@ -14,6 +14,7 @@
 #  limitations under the License.
 #
 
+import asyncio
 import copy
 import json
 import re
@@ -24,9 +25,11 @@ from elasticsearch_dsl import Q, Search, UpdateByQuery
 
 from common.constants import PAGERANK_FLD, TAG_FLD
 from common.decorator import singleton
-from common.doc_store.doc_store_base import FusionExpr, MatchDenseExpr, MatchExpr, MatchTextExpr, OrderByExpr
+from common.doc_store.doc_store_base import FusionExpr, MatchDenseExpr, MatchExpr, MatchTextExpr, OrderByExpr, SearchRequest
 from common.doc_store.es_conn_base import ESConnectionBase
 from common.float_utils import get_float
+from common.misc_utils import thread_pool_exec
+from common.vector_quantization import QUANTIZATION_OVERSAMPLE, float_vector_field, quantized_vector_fields, vector_field_variants
 
 ATTEMPT_TIME = 2
 MAX_RESULT_WINDOW = 10000
@@ -176,7 +179,7 @@ class ESConnection(ESConnectionBase):
         template_res["hits"]["hits"] = collected_hits
         return template_res
 
-    def search(
+    def _build_search(
         self,
         select_fields: list[str],
         highlight_fields: list[str],
@@ -191,6 +194,8 @@ class ESConnection(ESConnectionBase):
         rank_feature: dict | None = None,
     ):
         """
+        Translate the search arguments to the index names, the query body and
+        whether the page lies past MAX_RESULT_WINDOW and needs search_after.
         Refers to https://www.elastic.co/guide/en/elasticsearch/reference/current/query-dsl.html
         """
         if isinstance(index_names, str):
@@ -256,14 +261,16 @@ class ESConnection(ESConnectionBase):
                 if "similarity" in m.extra_options:
                     similarity = m.extra_options["similarity"]
                 k = min(m.topn, 10000)
-                s = s.knn(
-                    m.vector_column_name,
-                    k,
-                    min(k * 2, 10000),
-                    query_vector=list(m.embedding_data),
-                    filter=bool_query.to_dict(),  # filter=_build_knn_filter_query(bool_query, vector_similarity_weight),
-                    similarity=similarity,
-                )
+                # Chunks of knowledge bases with vector quantization keep their vector in a quantized field of the same size.
+                for field in [m.vector_column_name] + quantized_vector_fields(m.vector_column_name, self.quantization_methods):
+                    s = s.knn(
+                        field,
+                        k,
+                        min(k * 2, 10000),
+                        query_vector=list(m.embedding_data),
+                        filter=bool_query.to_dict(),  # filter=_build_knn_filter_query(bool_query, vector_similarity_weight),
+                        similarity=similarity,
+                    )
 
         if bool_query and rank_feature:
             for fld, sc in rank_feature.items():
@@ -304,8 +311,14 @@ class ESConnection(ESConnectionBase):
         # fields to "fields" param so they appear in hit.fields when ES 9.x
         # exclude_source_vectors is enabled (dense_vector not in _source).
         if select_fields:
+            select_fields = select_fields + [f for n in select_fields for f in quantized_vector_fields(n, self.quantization_methods)]
             s = s.source(select_fields)
         q = s.to_dict()
+        if self.rescore_vector:
+            # Rescore the oversampled candidates of a quantized field with its float vectors.
+            for knn in q.get("knn", []) if isinstance(q.get("knn"), list) else [q.get("knn", {})]:
+                if float_vector_field(knn.get("field", "")):
+                    knn["rescore_vector"] = {"oversample": QUANTIZATION_OVERSAMPLE}
         # ES 9.x: dense_vector fields excluded from _source; request them via fields.
         # Note: knn does NOT have a "fields" parameter - adding it inside the knn
         # object causes BadRequestError on ES 9.x. We add "fields" at top level.
@@ -313,14 +326,22 @@ class ESConnection(ESConnectionBase):
         if vector_fields:
             q["fields"] = vector_fields
         self.logger.debug(f"ESConnection.search {index_names!s} query: " + json.dumps(q))
+        return index_names, q, use_search_after
 
+    def _log_search_error(self, index_names: list[str], query: dict, e: Exception):
+        # Only log debug for NotFoundError(accepted when metadata index doesn't exist)
+        if "NotFound" in str(e):
+            self.logger.debug(f"ESConnection.search {index_names!s} query: " + str(query) + " - " + str(e))
+        else:
+            self.logger.exception(f"ESConnection.search {index_names!s} query: " + str(query) + str(e))
+
+    def _run_search(self, index_names: list[str], query: dict, offset: int, limit: int, use_search_after: bool):
         for i in range(ATTEMPT_TIME):
             try:
                 if use_search_after:
-                    res = self._search_with_search_after(index_names, q, offset, limit)
+                    res = self._search_with_search_after(index_names, query, offset, limit)
                 else:
-                    # print(json.dumps(q, ensure_ascii=False))
-                    res = self._es_search_once(index_names, q, track_total_hits=True)
+                    res = self._es_search_once(index_names, query, track_total_hits=True)
                 if str(res.get("timed_out", "")).lower() == "true":
                     raise Exception("Es Timeout.")
                 self.logger.debug(f"ESConnection.search {index_names!s} res: " + str(res))
@@ -330,23 +351,169 @@ class ESConnection(ESConnectionBase):
                 self._connect()
                 continue
             except Exception as e:
-                # Only log debug for NotFoundError(accepted when metadata index doesn't exist)
-                if "NotFound" in str(e):
-                    self.logger.debug(f"ESConnection.search {index_names!s} query: " + str(q) + " - " + str(e))
-                else:
-                    self.logger.exception(f"ESConnection.search {index_names!s} query: " + str(q) + str(e))
+                self._log_search_error(index_names, query, e)
                 raise e
 
         self.logger.error(f"ESConnection.search timeout for {ATTEMPT_TIME} times!")
         raise Exception("ESConnection.search timeout.")
 
+    def search(
+        self,
+        select_fields: list[str],
+        highlight_fields: list[str],
+        condition: dict,
+        match_expressions: list[MatchExpr],
+        order_by: OrderByExpr,
+        offset: int,
+        limit: int,
+        index_names: str | list[str],
+        knowledgebase_ids: list[str],
+        agg_fields: list[str] | None = None,
+        rank_feature: dict | None = None,
+    ):
+        index_names, q, use_search_after = self._build_search(
+            select_fields, highlight_fields, condition, match_expressions, order_by, offset, limit, index_names, knowledgebase_ids, agg_fields, rank_feature
+        )
+        return self._run_search(index_names, q, offset, limit, use_search_after)
+
+    @staticmethod
+    def _msearch_body(searches: list[tuple[list[str], dict]]) -> list[dict]:
+        body = []
+        for index_names, q in searches:
+            body.append({"index": index_names})
+            body.append({**q, "timeout": "600s", "track_total_hits": True})
+        return body
+
+    def _msearch_results(self, searches: list[tuple[list[str], dict]], res) -> list:
+        results = []
+        for (index_names, q), r in zip(searches, res["responses"]):
+            if "error" in r:
+                e = Exception(f"ESConnection.multi_search {index_names!s}: {r['error']}")
+                self._log_search_error(index_names, q, e)
+                raise e
+            if str(r.get("timed_out", "")).lower() == "true":
+                raise Exception("Es Timeout.")
+            results.append(r)
+        return results
+
+    def _split_multi_search(self, requests: list[SearchRequest]):
+        """
+        Build every request and split them into the ones that fit in one
+        `_msearch` and the deep pages, which need their own search_after calls.
+        """
+        batch, deep = [], []
+        for i, req in enumerate(requests):
+            index_names, q, use_search_after = self._build_search(*req.args())
+            if use_search_after:
+                deep.append((i, (index_names, q, req.offset, req.limit, True)))
+            else:
+                batch.append((i, (index_names, q)))
+        return batch, deep
+
+    def _msearch(self, searches: list[tuple[list[str], dict]]) -> list:
+        body = self._msearch_body(searches)
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = self.es.msearch(searches=body)
+            except ConnectionTimeout:
+                self.logger.exception("ES request timeout")
+                self._connect()
+                continue
+            return self._msearch_results(searches, res)
+
+        self.logger.error(f"ESConnection.multi_search timeout for {ATTEMPT_TIME} times!")
+        raise Exception("ESConnection.multi_search timeout.")
+
+    def multi_search(self, requests: list[SearchRequest]) -> list:
+        """
+        Send the searches in one `_msearch` round trip.
+        Refers to https://www.elastic.co/guide/en/elasticsearch/reference/current/search-multi-search.html
+        """
+        results = [None] * len(requests)
+        batch, deep = self._split_multi_search(requests)
+        for i, args in deep:
+            results[i] = self._run_search(*args)
+        if batch:
+            for (i, _), res in zip(batch, self._msearch([search for _, search in batch])):
+                results[i] = res
+        return results
+
+    async def search_async(
+        self,
+        select_fields: list[str],
+        highlight_fields: list[str],
+        condition: dict,
+        match_expressions: list[MatchExpr],
+        order_by: OrderByExpr,
+        offset: int,
+        limit: int,
+        index_names: str | list[str],
+        knowledgebase_ids: list[str],
+        agg_fields: list[str] | None = None,
+        rank_feature: dict | None = None,
+    ):
+        index_names, q, use_search_after = self._build_search(
+            select_fields, highlight_fields, condition, match_expressions, order_by, offset, limit, index_names, knowledgebase_ids, agg_fields, rank_feature
+        )
+        es = self._async_conn()
+        if es is None or use_search_after:
+            return await thread_pool_exec(self._run_search, index_names, q, offset, limit, use_search_after)
+
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = await es.search(index=index_names, body=q, timeout="600s", track_total_hits=True)
+                if str(res.get("timed_out", "")).lower() == "true":
+                    raise Exception("Es Timeout.")
+                self.logger.debug(f"ESConnection.search {index_names!s} res: " + str(res))
+                return res
+            except ConnectionTimeout:
+                self.logger.exception("ES request timeout")
+                continue
+            except Exception as e:
+                self._log_search_error(index_names, q, e)
+                raise e
+
+        self.logger.error(f"ESConnection.search timeout for {ATTEMPT_TIME} times!")
+        raise Exception("ESConnection.search timeout.")
+
+    async def _msearch_async(self, es, searches: list[tuple[list[str], dict]]) -> list:
+        body = self._msearch_body(searches)
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = await es.msearch(searches=body)
+            except ConnectionTimeout:
+                self.logger.exception("ES request timeout")
+                continue
+            return self._msearch_results(searches, res)
+
+        self.logger.error(f"ESConnection.multi_search timeout for {ATTEMPT_TIME} times!")
+        raise Exception("ESConnection.multi_search timeout.")
+
+    async def multi_search_async(self, requests: list[SearchRequest]) -> list:
+        es = self._async_conn()
+        if es is None:
+            return await thread_pool_exec(self.multi_search, requests)
+
+        results = [None] * len(requests)
+        batch, deep = self._split_multi_search(requests)
+        pending = [thread_pool_exec(self._run_search, *args) for _, args in deep]
+        if batch:
+            pending.append(self._msearch_async(es, [search for _, search in batch]))
+        done = await asyncio.gather(*pending)
+        for (i, _), res in zip(deep, done):
+            results[i] = res
+        if batch:
+            for (i, _), res in zip(batch, done[-1]):
+                results[i] = res
+        return results
+
     def insert(self, documents: list[dict], index_name: str, knowledgebase_id: str = None, refresh: str | bool = "wait_for") -> list[str]:
         # Refers to https://www.elastic.co/guide/en/elasticsearch/reference/current/docs-bulk.html
         operations = []
         for d in documents:
             assert "_id" not in d
             assert "id" in d
-            d_copy = copy.deepcopy(d)
+            d_copy = self._unquantize_unsupported(copy.deepcopy(d))
             d_copy["kb_id"] = knowledgebase_id
             # Use id as _id for uniqueness, also keep "id" as a regular field for sorting
             meta_id = d_copy.get("id", "")
@@ -378,7 +545,7 @@ class ESConnection(ESConnectionBase):
         return res
 
     def update(self, condition: dict, new_value: dict, index_name: str, knowledgebase_id: str) -> bool:
-        doc = copy.deepcopy(new_value)
+        doc = self._unquantize_unsupported(copy.deepcopy(new_value))
         doc.pop("id", None)
         condition["kb_id"] = knowledgebase_id
         if "id" in condition and isinstance(condition["id"], str):
@@ -396,6 +563,13 @@ class ESConnection(ESConnectionBase):
                         self.es.update(index=index_name, id=chunk_id, script=f'ctx._source.remove("{k}");')
                     except Exception:
                         self.logger.exception(f"ESConnection.update(index={index_name}, id={chunk_id}, doc={json.dumps(condition, ensure_ascii=False)}) got exception")
+                stale_vectors = [f for k in doc_part for f in vector_field_variants(k) if f not in doc_part]
+                if stale_vectors and self.quantization_methods:
+                    # A chunk re-embedded after its knowledge base changed vector quantization drops the vector it had.
+                    try:
+                        self.es.update(index=index_name, id=chunk_id, script="".join(f"ctx._source.remove('{f}');" for f in stale_vectors))
+                    except Exception:
+                        self.logger.exception(f"ESConnection.update(index={index_name}, id={chunk_id}, doc={json.dumps(condition, ensure_ascii=False)}) got exception")
                 try:
                     if remove_field is not None:
                         self.es.update(
@@ -623,16 +797,21 @@ class ESConnection(ESConnectionBase):
             hit_fields = hit.get("fields", {})
             m = {}
             for n in fields:
-                # First check _source
-                if d.get(n) is not None:
-                    m[n] = d.get(n)
-                # Then check fields (ES 9.x stores dense_vector here, not in _source)
-                elif n in hit_fields:
-                    vals = hit_fields[n]
-                    # ES fields response wraps dense_vector in 2 levels: [[v1,v2,...]] -> [v1,v2,...]
-                    if isinstance(vals, list) and len(vals) == 1:
-                        vals = vals[0]
-                    m[n] = vals
+                # A q_<dim>_vec of a knowledge base with vector quantization is stored in its quantized field.
+                for name in [n] + quantized_vector_fields(n, self.quantization_methods):
+                    # First check _source
+                    if d.get(name) is not None:
+                        m[n] = d.get(name)
+                    # Then check fields (ES 9.x stores dense_vector here, not in _source)
+                    elif name in hit_fields:
+                        vals = hit_fields[name]
+                        # ES fields response wraps dense_vector in 2 levels: [[v1,v2,...]] -> [v1,v2,...]
+                        if isinstance(vals, list) and len(vals) == 1:
+                            vals = vals[0]
+                        m[n] = vals
+                    else:
+                        continue
+                    break
             for n, v in m.items():
                 if isinstance(v, list):
                     m[n] = v
@@ -21,6 +21,8 @@ from infinity.common import InfinityException, SortType
 from infinity.errors import ErrorCode
 from common.decorator import singleton
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from common.constants import PAGERANK_FLD, TAG_FLD
 from common.doc_store.doc_store_base import MatchExpr, MatchTextExpr, MatchDenseExpr, FusionExpr, OrderByExpr
 from common.doc_store.infinity_conn_base import InfinityConnectionBase
@@ -41,6 +43,33 @@ _JSON_LIST_FIELDS = frozenset(
         "rechunked_from_chunk_ids",
     )
 )
+# Stored columns that back several logical fields; get_fields serves the aliases and drops the raw column.
+_COLUMN_ALIASES = {
+    "docnm": ("docnm_kwd", "title_tks", "title_sm_tks"),
+    "content": ("content_with_weight", "content_ltks", "content_sm_ltks"),
+    "authors": ("authors_tks", "authors_sm_tks"),
+}
+_RAW_COLUMNS = frozenset(("docnm", "important_keywords", "questions", "content", "authors"))
+
+
+def _parse_json_list(value):
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+        return parsed if isinstance(parsed, list) else [parsed]
+    except (TypeError, json.JSONDecodeError):
+        # Read rows written by the previous varchar encoding.
+        return [item for item in str(value).split("###") if item]
+
+
+def _to_position_int(v):
+    if not v:
+        return []
+    arr = [int(hex_val, 16) for hex_val in v.split("_")]
+    return [arr[i : i + 5] for i in range(0, len(arr), 5)]
 
 
 def _vector_similarity_weight(match_expressions: list[MatchExpr]) -> float:
@@ -144,8 +173,9 @@ class InfinityConnection(InfinityConnectionBase):
         knowledgebase_ids: list[str],
         agg_fields: list[str] | None = None,
         rank_feature: dict | None = None,
-    ) -> tuple[pd.DataFrame, int]:
+    ) -> tuple[pa.Table, int]:
         """
+        Returns the hits as an Arrow table; use the get_* helpers to read it.
         BUG: Infinity returns empty for a highlight field if the query string doesn't use that field.
         """
         if isinstance(index_names, str):
@@ -154,7 +184,7 @@ class InfinityConnection(InfinityConnectionBase):
         inf_conn = self.connPool.get_conn()
         try:
             db_instance = inf_conn.get_database(self.dbName)
-            df_list = list()
+            table_results = list()
             table_list = list()
             output = select_fields.copy()
             output = self.convert_select_fields(output)
@@ -315,16 +345,16 @@ class InfinityConnection(InfinityConnectionBase):
                     if order_by.fields:
                         builder.sort(order_by_expr_list)
                     builder.offset(offset).limit(limit)
-                    kb_res, extra_result = builder.option({"total_hits_count": True}).to_df()
+                    kb_res, extra_result = self.query_to_arrow(builder.option({"total_hits_count": True}))
                     if extra_result:
                         total_hits_count += int(extra_result["total_hits_count"])
                     self.logger.debug(f"INFINITY search table: {str(table_name)}, result: {str(kb_res)}")
-                    df_list.append(kb_res)
-            res = self.concat_dataframes(df_list, output)
+                    table_results.append(kb_res)
+            res = self.concat_tables(table_results, output)
             if match_expressions and score_column:
-                res["_score"] = res[score_column] + res[PAGERANK_FLD]
-                res = res.sort_values(by="_score", ascending=False).reset_index(drop=True)
-                res = res.head(limit)
+                score = pc.add(res.column(score_column).cast(pa.float64()), pc.fill_null(res.column(PAGERANK_FLD).cast(pa.float64()), 0.0))
+                res = res.append_column("_score", score)
+                res = res.sort_by([("_score", "descending")]).slice(0, limit)
             self.logger.debug(f"INFINITY search final result: {str(res)}")
             return res, total_hits_count
         finally:
@@ -355,7 +385,7 @@ class InfinityConnection(InfinityConnectionBase):
         inf_conn = self.connPool.get_conn()
         try:
             db_instance = inf_conn.get_database(self.dbName)
-            df_list = list()
+            table_results = list()
             assert isinstance(knowledgebase_ids, list)
             table_list = list()
             if is_meta_table:
@@ -369,13 +399,13 @@ class InfinityConnection(InfinityConnectionBase):
                 except Exception:
                     self.logger.warning(f"Table not found: {table_name}, this dataset isn't created in Infinity. Maybe it is created in other document engine.")
                     continue
-                kb_res, _ = table_instance.output(["*"]).filter(f"id = '{chunk_id}'").to_df()
+                kb_res, _ = self.query_to_arrow(table_instance.output(["*"]).filter(f"id = '{chunk_id}'"))
                 self.logger.debug(f"INFINITY get table: {str(table_list)}, result: {str(kb_res)}")
-                df_list.append(kb_res)
+                table_results.append(kb_res)
         finally:
             self.connPool.release_conn(inf_conn)
-        res = self.concat_dataframes(df_list, ["id"])
-        fields = set(res.columns.tolist())
+        res = self.concat_tables(table_results, ["id"])
+        fields = set(res.column_names)
         for field in [
             "docnm_kwd",
             "title_tks",
@@ -881,96 +911,79 @@ class InfinityConnection(InfinityConnectionBase):
     Helper functions for search result
     """
 
-    def get_fields(self, res: tuple[pd.DataFrame, int] | pd.DataFrame, fields: list[str]) -> dict[str, dict]:
-        if isinstance(res, tuple):
-            res = res[0]
+    def get_fields(self, res: tuple[pa.Table, int] | pa.Table | pd.DataFrame, fields: list[str]) -> dict[str, dict]:
         if not fields:
             return {}
+        res = self.result_table(res)
         fields_all = fields.copy()
         fields_all.append("id")
         fields_all = set(fields_all)
-        if "docnm" in res.columns:
-            for field in ["docnm_kwd", "title_tks", "title_sm_tks"]:
-                if field in fields_all:
-                    res[field] = res["docnm"]
-        if "important_keywords" in res.columns:
+        # Columns are referenced, not copied; each one is turned into Python values once, below.
+        columns = {name: res.column(name) for name in res.column_names}
+        for source, aliases in _COLUMN_ALIASES.items():
+            if source in columns:
+                for field in aliases:
+                    if field in fields_all:
+                        columns[field] = columns[source]
+        if "important_keywords" in columns:
             if "important_kwd" in fields_all:
-                if "important_kwd_empty_count" in res.columns:
-                    base = res["important_keywords"].apply(lambda raw: raw.split(",") if raw else [])
-                    counts = res["important_kwd_empty_count"].fillna(0).astype(int)
-                    res["important_kwd"] = [tokens + [""] * empty_count for tokens, empty_count in zip(base.tolist(), counts.tolist())]
-                else:
-                    res["important_kwd"] = res["important_keywords"].apply(lambda v: v.split(",") if v else [])
+                keywords = [raw.split(",") if raw else [] for raw in columns["important_keywords"].to_pylist()]
+                if "important_kwd_empty_count" in columns:
+                    counts = columns["important_kwd_empty_count"].to_pylist()
+                    keywords = [tokens + [""] * int(empty_count or 0) for tokens, empty_count in zip(keywords, counts)]
+                columns["important_kwd"] = keywords
             if "important_tks" in fields_all:
-                res["important_tks"] = res["important_keywords"]
-        if "questions" in res.columns:
+                columns["important_tks"] = columns["important_keywords"]
+        if "questions" in columns:
             if "question_kwd" in fields_all:
-                res["question_kwd"] = res["questions"].apply(lambda v: v.splitlines())
+                columns["question_kwd"] = [v.splitlines() if v else [] for v in columns["questions"].to_pylist()]
             if "question_tks" in fields_all:
-                res["question_tks"] = res["questions"]
-        if "content" in res.columns:
-            for field in ["content_with_weight", "content_ltks", "content_sm_ltks"]:
-                if field in fields_all:
-                    res[field] = res["content"]
-        if "authors" in res.columns:
-            for field in ["authors_tks", "authors_sm_tks"]:
-                if field in fields_all:
-                    res[field] = res["authors"]
-
-        column_map = {col.lower(): col for col in res.columns}
+                columns["question_tks"] = columns["questions"]
+
+        column_map = {col.lower(): col for col in columns}
         # row_id() is returned by infinity as "row_id", add mapping for lookup
         if "row_id()" in fields_all and "row_id" in column_map:
             column_map["row_id()"] = column_map["row_id"]
-        matched_columns = {column_map[col.lower()]: col for col in fields_all if col.lower() in column_map}
-        none_columns = [col for col in fields_all if col.lower() not in column_map]
-
-        res2 = res[matched_columns.keys()]
-        res2 = res2.rename(columns=matched_columns)
-        res2.drop_duplicates(subset=["id"], inplace=True)
-
-        for column in list(res2.columns):
-            k = column.lower()
-            if k in _JSON_LIST_FIELDS:
-
-                def parse_json_list(value):
-                    if isinstance(value, list):
-                        return value
-                    if not value:
-                        return []
-                    try:
-                        parsed = json.loads(value)
-                        return parsed if isinstance(parsed, list) else [parsed]
-                    except (TypeError, json.JSONDecodeError):
-                        # Read rows written by the previous varchar encoding.
-                        return [item for item in str(value).split("###") if item]
-
-                res2[column] = res2[column].apply(parse_json_list)
-            elif self.field_keyword(k):
-                res2[column] = res2[column].apply(lambda v: [kwd for kwd in v.split("###") if kwd])
-            elif re.search(r"_feas$", k):
-                res2[column] = res2[column].apply(lambda v: json.loads(v) if v else {})
-            elif k == "chunk_data":
-                # Parse JSON data back to dict for table parser fields
-                res2[column] = res2[column].apply(lambda v: json.loads(v) if v and isinstance(v, str) else v)
-            elif k == "position_int":
-
-                def to_position_int(v):
-                    if v:
-                        arr = [int(hex_val, 16) for hex_val in v.split("_")]
-                        v = [arr[i : i + 5] for i in range(0, len(arr), 5)]
-                    else:
-                        v = []
-                    return v
-
-                res2[column] = res2[column].apply(to_position_int)
-            elif k in ["page_num_int", "top_int"]:
-                res2[column] = res2[column].apply(lambda v: [int(hex_val, 16) for hex_val in v.split("_")] if v else [])
-            else:
-                pass
-        for column in ["docnm", "important_keywords", "questions", "content", "authors"]:
-            if column in res2:
-                del res2[column]
-        for column in none_columns:
-            res2[column] = None
-
-        return res2.set_index("id").to_dict(orient="index")
+        if "id" not in column_map:
+            return {}
+        values = {}
+        none_columns = []
+        for field in fields_all:
+            if field.lower() not in column_map:
+                none_columns.append(field)
+                continue
+            if field in _RAW_COLUMNS:
+                continue
+            column = columns[column_map[field.lower()]]
+            if not isinstance(column, list):
+                column = column.to_pylist()
+            converter = self._field_converter(field.lower())
+            values[field] = [converter(v) for v in column] if converter else column
+
+        ids = values.pop("id")
+        names = list(values.keys())
+        ans = {}
+        for id, row in zip(ids, zip(*values.values()) if names else [()] * len(ids)):
+            if id in ans:
+                continue
+            doc = dict(zip(names, row))
+            for column in none_columns:
+                doc[column] = None
+            ans[id] = doc
+        return ans
+
+    def _field_converter(self, k: str):
+        if k in _JSON_LIST_FIELDS:
+            return _parse_json_list
+        if self.field_keyword(k):
+            return lambda v: [kwd for kwd in v.split("###") if kwd] if v else []
+        if re.search(r"_feas$", k):
+            return lambda v: json.loads(v) if v else {}
+        if k == "chunk_data":
+            # Parse JSON data back to dict for table parser fields
+            return lambda v: json.loads(v) if v and isinstance(v, str) else v
+        if k == "position_int":
+            return _to_position_int
+        if k in ["page_num_int", "top_int"]:
+            return lambda v: [int(hex_val, 16) for hex_val in v.split("_")] if v else []
+        return None
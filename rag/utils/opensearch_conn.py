@@ -14,6 +14,7 @@
 #  limitations under the License.
 #
 
+import asyncio
 import logging
 import re
 import json
@@ -26,7 +27,8 @@ from opensearchpy import UpdateByQuery, Q, Search, Index
 from opensearchpy import ConnectionTimeout
 from common.decorator import singleton
 from common.file_utils import get_project_base_directory
-from common.doc_store.doc_store_base import DocStoreConnection, MatchExpr, OrderByExpr, MatchTextExpr, MatchDenseExpr, FusionExpr
+from common.doc_store.doc_store_base import DocStoreConnection, MatchExpr, OrderByExpr, MatchTextExpr, MatchDenseExpr, FusionExpr, SearchRequest
+from common.misc_utils import thread_pool_exec
 from rag.nlp import is_english, rag_tokenizer
 from common.constants import PAGERANK_FLD, TAG_FLD
 from common import settings
@@ -64,15 +66,13 @@ logger = logging.getLogger("ragflow.opensearch_conn")
 class OSConnection(DocStoreConnection):
     def __init__(self):
         self.info = {}
+        # One AsyncOpenSearch client, bound to the server's long-lived event loop by open_async().
+        self.async_client = None
+        self.async_loop = None
         logger.info(f"Use OpenSearch {settings.OS['hosts']} as the doc engine.")
         for _ in range(ATTEMPT_TIME):
             try:
-                self.os = OpenSearch(
-                    settings.OS["hosts"].split(","),
-                    http_auth=(settings.OS["username"], settings.OS["password"]) if "username" in settings.OS and "password" in settings.OS else None,
-                    verify_certs=False,
-                    timeout=600,
-                )
+                self.os = OpenSearch(**self._client_kwargs())
                 if self.os:
                     self.info = self.os.info()
                     break
@@ -99,6 +99,15 @@ class OSConnection(DocStoreConnection):
         logger.info(f"OpenSearch {settings.OS['hosts']} is healthy.")
         self._init_hybrid_search()
 
+    @staticmethod
+    def _client_kwargs():
+        return {
+            "hosts": settings.OS["hosts"].split(","),
+            "http_auth": (settings.OS["username"], settings.OS["password"]) if "username" in settings.OS and "password" in settings.OS else None,
+            "verify_certs": False,
+            "timeout": 600,
+        }
+
     # normalization-processor (needed to merge the BM25 and KNN scores) only
     # exists on OpenSearch 2.10+.
     HYBRID_MIN_VERSION = (2, 10)
@@ -311,7 +320,7 @@ class OSConnection(DocStoreConnection):
     CRUD operations
     """
 
-    def search(
+    def _build_search(
         self,
         select_fields: list[str],
         highlight_fields: list[str],
@@ -322,10 +331,12 @@ class OSConnection(DocStoreConnection):
         limit: int,
         index_names: str | list[str],
         knowledgebase_ids: list[str],
-        agg_fields: list[str] = [],
+        agg_fields: list[str] | None = None,
         rank_feature: dict | None = None,
     ):
         """
+        Translate the search arguments to the index names, the query body and
+        the extra client arguments (the hybrid search pipeline).
         Refers to https://github.com/opensearch-project/opensearch-py/blob/main/guides/dsl.md
         """
         use_knn = False
@@ -436,7 +447,7 @@ class OSConnection(DocStoreConnection):
                 orders.append({field: order_info})
             s = s.sort(*orders)
 
-        for fld in agg_fields:
+        for fld in agg_fields or []:
             s.aggs.bucket(f"aggs_{fld}", "terms", field=fld, size=1000000)
 
         if limit > 0:
@@ -460,7 +471,9 @@ class OSConnection(DocStoreConnection):
         search_kwargs = {}
         if hybrid_search:
             search_kwargs["params"] = {"search_pipeline": self._hybrid_pipeline}
+        return index_names, q, search_kwargs
 
+    def _run_search(self, index_names: list[str], q: dict, search_kwargs: dict):
         for i in range(ATTEMPT_TIME):
             try:
                 res = self.os.search(
@@ -484,6 +497,183 @@ class OSConnection(DocStoreConnection):
         logger.error(f"OSConnection.search timeout for {ATTEMPT_TIME} times!")
         raise Exception("OSConnection.search timeout.")
 
+    def search(
+        self,
+        select_fields: list[str],
+        highlight_fields: list[str],
+        condition: dict,
+        match_expressions: list[MatchExpr],
+        order_by: OrderByExpr,
+        offset: int,
+        limit: int,
+        index_names: str | list[str],
+        knowledgebase_ids: list[str],
+        agg_fields: list[str] | None = None,
+        rank_feature: dict | None = None,
+    ):
+        index_names, q, search_kwargs = self._build_search(
+            select_fields, highlight_fields, condition, match_expressions, order_by, offset, limit, index_names, knowledgebase_ids, agg_fields, rank_feature
+        )
+        return self._run_search(index_names, q, search_kwargs)
+
+    def _split_multi_search(self, requests: list[SearchRequest]):
+        """
+        Build every request and split them into the ones that fit in one
+        `_msearch` and the hybrid ones, which need the search pipeline
+        parameter of a single search.
+        """
+        batch, single = [], []
+        for i, req in enumerate(requests):
+            index_names, q, search_kwargs = self._build_search(*req.args())
+            if search_kwargs:
+                single.append((i, (index_names, q, search_kwargs)))
+            else:
+                batch.append((i, (index_names, q)))
+        return batch, single
+
+    @staticmethod
+    def _msearch_body(searches: list[tuple[list[str], dict]]) -> list[dict]:
+        body = []
+        for index_names, q in searches:
+            body.append({"index": index_names})
+            body.append({**q, "timeout": "600s", "track_total_hits": True})
+        return body
+
+    @staticmethod
+    def _msearch_results(searches: list[tuple[list[str], dict]], res) -> list:
+        results = []
+        for (index_names, q), r in zip(searches, res["responses"]):
+            if "error" in r:
+                logger.error(f"OSConnection.multi_search {str(index_names)} query: " + str(q))
+                raise Exception(f"OSConnection.multi_search {str(index_names)}: {r['error']}")
+            if str(r.get("timed_out", "")).lower() == "true":
+                raise Exception("OpenSearch Timeout.")
+            results.append(r)
+        return results
+
+    def _msearch(self, searches: list[tuple[list[str], dict]]) -> list:
+        body = self._msearch_body(searches)
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = self.os.msearch(body=body)
+            except ConnectionTimeout:
+                logger.exception("OpenSearch request timeout")
+                continue
+            return self._msearch_results(searches, res)
+        logger.error(f"OSConnection.multi_search timeout for {ATTEMPT_TIME} times!")
+        raise Exception("OSConnection.multi_search timeout.")
+
+    def multi_search(self, requests: list[SearchRequest]) -> list:
+        """
+        Send the searches in one `_msearch` round trip.
+        """
+        results = [None] * len(requests)
+        batch, single = self._split_multi_search(requests)
+        for i, args in single:
+            results[i] = self._run_search(*args)
+        if batch:
+            for (i, _), res in zip(batch, self._msearch([search for _, search in batch])):
+                results[i] = res
+        return results
+
+    async def open_async(self):
+        if self.async_client is not None:
+            return
+        try:
+            from opensearchpy import AsyncOpenSearch
+
+            self.async_client = AsyncOpenSearch(**self._client_kwargs())
+        except ImportError as e:
+            logger.warning(f"AsyncOpenSearch is unavailable, searching on the thread pool instead: {e}")
+            return
+        self.async_loop = asyncio.get_running_loop()
+
+    async def close_async(self):
+        client, self.async_client, self.async_loop = self.async_client, None, None
+        if client is not None:
+            await client.close()
+
+    def _async_conn(self):
+        """
+        AsyncOpenSearch client when running on the loop it was opened on, else None:
+        short-lived loops (asyncio.run) search on the thread pool.
+        """
+        if self.async_client is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return self.async_client if loop is self.async_loop else None
+
+    async def _run_search_async(self, client, index_names: list[str], q: dict, search_kwargs: dict):
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = await client.search(index=index_names, body=q, timeout=600, track_total_hits=True, _source=True, **search_kwargs)
+                if str(res.get("timed_out", "")).lower() == "true":
+                    raise Exception("OpenSearch Timeout.")
+                logger.debug(f"OSConnection.search {str(index_names)} res: " + str(res))
+                return res
+            except Exception as e:
+                logger.exception(f"OSConnection.search {str(index_names)} query: " + str(q))
+                if str(e).find("Timeout") > 0:
+                    continue
+                raise e
+        logger.error(f"OSConnection.search timeout for {ATTEMPT_TIME} times!")
+        raise Exception("OSConnection.search timeout.")
+
+    async def search_async(
+        self,
+        select_fields: list[str],
+        highlight_fields: list[str],
+        condition: dict,
+        match_expressions: list[MatchExpr],
+        order_by: OrderByExpr,
+        offset: int,
+        limit: int,
+        index_names: str | list[str],
+        knowledgebase_ids: list[str],
+        agg_fields: list[str] | None = None,
+        rank_feature: dict | None = None,
+    ):
+        index_names, q, search_kwargs = self._build_search(
+            select_fields, highlight_fields, condition, match_expressions, order_by, offset, limit, index_names, knowledgebase_ids, agg_fields, rank_feature
+        )
+        client = self._async_conn()
+        if client is None:
+            return await thread_pool_exec(self._run_search, index_names, q, search_kwargs)
+        return await self._run_search_async(client, index_names, q, search_kwargs)
+
+    async def _msearch_async(self, client, searches: list[tuple[list[str], dict]]) -> list:
+        body = self._msearch_body(searches)
+        for i in range(ATTEMPT_TIME):
+            try:
+                res = await client.msearch(body=body)
+            except ConnectionTimeout:
+                logger.exception("OpenSearch request timeout")
+                continue
+            return self._msearch_results(searches, res)
+        logger.error(f"OSConnection.multi_search timeout for {ATTEMPT_TIME} times!")
+        raise Exception("OSConnection.multi_search timeout.")
+
+    async def multi_search_async(self, requests: list[SearchRequest]) -> list:
+        client = self._async_conn()
+        if client is None:
+            return await thread_pool_exec(self.multi_search, requests)
+
+        results = [None] * len(requests)
+        batch, single = self._split_multi_search(requests)
+        pending = [self._run_search_async(client, *args) for _, args in single]
+        if batch:
+            pending.append(self._msearch_async(client, [search for _, search in batch]))
+        done = await asyncio.gather(*pending)
+        for (i, _), res in zip(single, done):
+            results[i] = res
+        if batch:
+            for (i, _), res in zip(batch, done[-1]):
+                results[i] = res
+        return results
+
     def get(self, chunkId: str, indexName: str, knowledgebaseIds: list[str]) -> dict | None:
         for i in range(ATTEMPT_TIME):
             try:
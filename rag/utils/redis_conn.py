@@ -18,6 +18,7 @@ import asyncio
 import logging
 import json
 import uuid
+from contextlib import contextmanager
 
 import valkey as redis
 from common.decorator import singleton
@@ -57,6 +58,32 @@ class RedisMsg:
         return self.__msg_id
 
 
+class RedisPipeline:
+    """Commands queued inside ``with REDIS_CONN.pipeline() as pipe:``.
+
+    Any client command can be queued, e.g. ``pipe.set(k, v, 60)`` or ``pipe.xadd(queue, fields)``.
+    They are sent in one round trip when the block exits. ``results`` then holds their
+    replies in order, or None if Redis could not be reached.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.results = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def __len__(self):
+        return len(self.commands)
+
+
 @singleton
 class RedisDB:
     lua_delete_if_equal = None
@@ -198,6 +225,44 @@ class RedisDB:
             self.__open__()
         return [None] * len(keys)
 
+    def mset(self, mapping, exp=3600):
+        return self.execute_pipeline([("set", (k, v, exp), {}) for k, v in mapping.items()]) is not None
+
+    def exist_many(self, keys) -> list[bool]:
+        results = self.execute_pipeline([("exists", (k,), {}) for k in keys])
+        if results is None:
+            return [False] * len(keys)
+        return [bool(r) for r in results]
+
+    def execute_pipeline(self, commands, transaction=False, retries=1) -> list | None:
+        """Send ``(command, args, kwargs)`` triples in one round trip and return their replies.
+
+        Failures reconnect like the single-key methods and are retried up to ``retries``
+        times in all. Returns None if no attempt succeeded.
+        """
+        if not commands:
+            return []
+        for _ in range(retries):
+            try:
+                pipe = self.REDIS.pipeline(transaction=transaction)
+                for name, args, kwargs in commands:
+                    getattr(pipe, name)(*args, **kwargs)
+                return pipe.execute()
+            except Exception as e:
+                logging.warning("RedisDB.execute_pipeline got exception: %s", str(e))
+                self.__open__()
+        return None
+
+    @contextmanager
+    def pipeline(self, transaction=False, retries=1):
+        """Queue commands on a :class:`RedisPipeline` and send them together when the block exits.
+
+        Nothing is sent if the block raises.
+        """
+        pipe = RedisPipeline()
+        yield pipe
+        pipe.results = self.execute_pipeline(pipe.commands, transaction, retries)
+
     def set_obj(self, k, obj, exp=3600):
         try:
             self.REDIS.set(k, json.dumps(obj, ensure_ascii=False), exp)
@@ -412,6 +477,12 @@ class RedisDB:
                 self.__open__()
         return False
 
+    def queue_product_many(self, queue_messages: dict) -> bool:
+        """Append the messages of each queue in ``{queue: [message, ...]}`` with one pipeline."""
+        commands = [("xadd", (queue, {"message": json.dumps(message)}), {}) for queue, messages in queue_messages.items() for message in messages]
+        # MULTI/EXEC: a failed attempt adds none of the messages, so retrying cannot queue a task twice.
+        return self.execute_pipeline(commands, transaction=True, retries=3) is not None
+
     def queue_consumer(self, queue_name, group_name, consumer_name, msg_id=b">") -> RedisMsg:
         """https://redis.io/docs/latest/commands/xreadgroup/"""
         for _ in range(3):
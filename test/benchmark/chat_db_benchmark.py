@@ -0,0 +1,80 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""Database round trips of the configuration lookups behind a chat request.
+
+Repeats the lookups a chat turn makes for an existing dialog (``get_models``,
+the tenant's Langfuse keys and the dataset field map) against the configured
+database. The first run has the configuration caches disabled, as before they
+existed; the second has them enabled. Prints round trips and wall time per
+request, e.g.:
+
+    python test/benchmark/chat_db_benchmark.py --dialog-id <dialog id> --requests 50
+"""
+
+import argparse
+import json
+import os
+import sys
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from common import settings  # noqa: E402
+from api.db.db_models import DB_QUERY_STATS  # noqa: E402
+from api.db.services.config_cache import CONFIG_CACHE_TTL, CONFIG_CACHES  # noqa: E402
+from api.db.services.dialog_service import DialogService, get_models  # noqa: E402
+from api.db.services.knowledgebase_service import KnowledgebaseService  # noqa: E402
+from api.db.services.langfuse_service import TenantLangfuseService  # noqa: E402
+
+
+def chat_lookups(dialog):
+    get_models(dialog)
+    TenantLangfuseService.filter_by_tenant(tenant_id=dialog.tenant_id)
+    KnowledgebaseService.get_field_map(dialog.kb_ids)
+
+
+def run(dialog, requests, ttl):
+    for cache in CONFIG_CACHES:
+        cache.ttl = ttl
+        cache.clear()
+    DB_QUERY_STATS.reset()
+    start = timer()
+    for _ in range(requests):
+        chat_lookups(dialog)
+    elapsed = timer() - start
+    return DB_QUERY_STATS.round_trips() / requests, elapsed / requests, DB_QUERY_STATS.snapshot()
+
+
+def main(args):
+    settings.init_settings()
+    exist, dialog = DialogService.get_by_id(args.dialog_id)
+    if not exist:
+        sys.exit(f"Dialog {args.dialog_id} not found.")
+    for label, ttl in (("without config cache", 0), ("with config cache", args.ttl)):
+        round_trips, latency, snapshot = run(dialog, args.requests, ttl)
+        print(f"{label}: {round_trips:.1f} round trips, {latency * 1000:.1f}ms per request")
+        if args.verbose:
+            print(json.dumps(snapshot, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database round trips of the configuration lookups of a chat request.")
+    parser.add_argument("--dialog-id", required=True, help="Dialog to replay the lookups of")
+    parser.add_argument("--requests", type=int, default=50, help="Requests to replay per run (default: 50)")
+    parser.add_argument("--ttl", type=float, default=CONFIG_CACHE_TTL, help=f"Config cache TTL of the cached run (default: {CONFIG_CACHE_TTL})")
+    parser.add_argument("--verbose", action="store_true", help="Print the latency histograms")
+    main(parser.parse_args())
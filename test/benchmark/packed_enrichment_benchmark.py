@@ -0,0 +1,95 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Fake-LLM benchmark of per-chunk vs packed chunk enrichment.
+
+Every chat call sleeps for a fixed latency, so the numbers show LLM round trips
+and wall time only, e.g.:
+
+    python test/benchmark/packed_enrichment_benchmark.py --chunks 2000 --latency 0.2 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from common.constants import TAG_FLD  # noqa: E402
+from rag.prompts.generator import content_tagging, gen_metadata, keyword_extraction, question_proposal  # noqa: E402
+from rag.svr.task_executor_refactor.packed_enrichment import KEYWORDS, METADATA, QUESTIONS, TAGS, PackedEnricher  # noqa: E402
+
+METADATA_CONF = [{"key": "author", "description": "Author of the text", "enum": []}]
+ALL_TAGS = {"finance": 10, "sports": 10, "science": 10}
+
+
+class FakeChatModel:
+    llm_name = "fake"
+    max_length = 32768
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    async def async_chat(self, system, history, gen_conf=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        pieces = len(re.findall(r"^### Piece \d+$", system, flags=re.MULTILINE))
+        if pieces:
+            return json.dumps([{"id": i, "keywords": ["alpha", "beta"], "questions": ["What is alpha?"], "metadata": {"author": "x"}, "tags": {"science": 5}} for i in range(pieces)])
+        # Valid enough for every single-chunk prompt, including content_tagging's JSON parsing.
+        return '{"science": 5}'
+
+
+async def per_chunk(chat_mdl, contents, limiter, metadata_schema):
+    async def one(content):
+        async with limiter:
+            await keyword_extraction(chat_mdl, content, 3)
+        async with limiter:
+            await question_proposal(chat_mdl, content, 1)
+        async with limiter:
+            await gen_metadata(chat_mdl, json.loads(json.dumps(metadata_schema)), content)
+        async with limiter:
+            await content_tagging(chat_mdl, content, ALL_TAGS, [{"content": "example", TAG_FLD: {"science": 1}}], 3)
+
+    await asyncio.gather(*[one(c) for c in contents])
+
+
+async def main(args):
+    contents = [f"Chunk {i}: " + "lorem ipsum dolor sit amet " * args.chunk_words for i in range(args.chunks)]
+
+    chat_mdl = FakeChatModel(args.latency)
+    enricher = PackedEnricher(chat_mdl, asyncio.Semaphore(args.concurrency), 3, 1, METADATA_CONF, ALL_TAGS, [{"content": "example", TAG_FLD: {"science": 1}}], 3)
+    start = timer()
+    await per_chunk(chat_mdl, contents, asyncio.Semaphore(args.concurrency), enricher.metadata_schema)
+    print(f"per-chunk: {chat_mdl.calls} LLM calls in {timer() - start:.2f}s")
+
+    chat_mdl.calls = 0
+    start = timer()
+    await enricher.run(contents, [{KEYWORDS, QUESTIONS, METADATA, TAGS} for _ in contents])
+    print(f"packed:    {chat_mdl.calls} LLM calls ({enricher.llm_calls} packed, {enricher.fallback_calls} single-chunk) in {timer() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM calls and wall time of per-chunk vs packed chunk enrichment with a fake LLM.")
+    parser.add_argument("--chunks", type=int, default=2000, help="Number of chunks (default: 2000)")
+    parser.add_argument("--chunk-words", type=int, default=40, help="Repetitions of a 5-word phrase per chunk (default: 40)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake LLM call (default: 0.2)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent LLM calls (default: 10)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,171 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""Round trips of the Redis hot paths with single-key calls and with pipelines.
+
+Replays the Redis traffic of parsing one document against an in-memory Redis
+stand-in that sleeps ``--latency`` per round trip: LLM cache lookups and writes
+for every chunk, embedding cache writes, queueing the parse tasks and a
+dataflow's log callbacks. Each is run the old way, one call per key, and
+through the batched ``RedisDB`` API, e.g.:
+
+    python test/benchmark/redis_benchmark.py --chunks 2000 --latency 0.0005
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from rag.utils.redis_conn import REDIS_CONN  # noqa: E402
+
+
+class LocalRedis:
+    """Redis stand-in keeping data in dicts; every call and every pipeline execute is one round trip."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.round_trips = 0
+        self.values = {}
+        self.streams = {}
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _get(self, k):
+        return self.values.get(k)
+
+    def _set(self, k, v, ex=None):
+        self.values[k] = v.decode("utf-8") if isinstance(v, bytes) else v
+        return True
+
+    def _exists(self, k):
+        return int(k in self.values)
+
+    def _xadd(self, queue, fields):
+        self.streams.setdefault(queue, []).append(fields)
+        return f"{len(self.streams[queue])}-0"
+
+    def get(self, k):
+        self._round_trip()
+        return self._get(k)
+
+    def set(self, k, v, ex=None):
+        self._round_trip()
+        return self._set(k, v, ex)
+
+    def exists(self, k):
+        self._round_trip()
+        return self._exists(k)
+
+    def xadd(self, queue, fields):
+        self._round_trip()
+        return self._xadd(queue, fields)
+
+    def mget(self, keys):
+        self._round_trip()
+        return [self._get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        return LocalPipeline(self)
+
+
+class LocalPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.redis, "_" + name), args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        self.redis._round_trip()
+        return [call(*args, **kwargs) for call, args, kwargs in self.calls]
+
+
+def llm_cache(chunks, batched):
+    keys = [f"llm-cache-{i}" for i in range(chunks)]
+    if batched:
+        hits = REDIS_CONN.mget(keys)
+        REDIS_CONN.mset({k: "keywords" for k, hit in zip(keys, hits) if not hit}, 24 * 3600)
+        return
+    for k in keys:
+        if not REDIS_CONN.get(k):
+            REDIS_CONN.set(k, "keywords", 24 * 3600)
+
+
+def embed_cache(chunks, batched):
+    vectors = {f"embed-cache-{i}": json.dumps([0.1] * 8) for i in range(chunks)}
+    if batched:
+        REDIS_CONN.mset(vectors, 24 * 3600)
+        return
+    for k, v in vectors.items():
+        REDIS_CONN.set(k, v, 24 * 3600)
+
+
+def queue_tasks(chunks, batched):
+    tasks = [{"id": f"task-{i}", "doc_id": "doc", "from_page": i * 12, "to_page": (i + 1) * 12} for i in range(max(chunks // 50, 1))]
+    if batched:
+        REDIS_CONN.queue_product_many({"rag_flow_svr_queue": tasks})
+        return
+    for task in tasks:
+        REDIS_CONN.queue_product("rag_flow_svr_queue", task)
+
+
+def log_callbacks(chunks, batched):
+    log_key, cancel_key = "flow-task-logs", "task-cancel"
+    for i in range(max(chunks // 20, 1)):
+        if batched:
+            _, logs = REDIS_CONN.mget([cancel_key, log_key])
+            logs = json.loads(logs) if logs else []
+            logs.append({"message": f"step {i}"})
+            with REDIS_CONN.pipeline() as pipe:
+                pipe.set(log_key, json.dumps(logs), 60 * 30)
+                pipe.get(cancel_key)
+        else:
+            REDIS_CONN.get(cancel_key)
+            logs = REDIS_CONN.get(log_key)
+            logs = json.loads(logs) if logs else []
+            logs.append({"message": f"step {i}"})
+            REDIS_CONN.set_obj(log_key, logs, 60 * 30)
+            REDIS_CONN.get(cancel_key)
+
+
+def main(args):
+    for name, workload in (("LLM cache", llm_cache), ("embedding cache", embed_cache), ("task queueing", queue_tasks), ("dataflow logs", log_callbacks)):
+        for label, batched in (("single-key", False), ("pipelined", True)):
+            REDIS_CONN.REDIS = LocalRedis(args.latency)
+            start = timer()
+            workload(args.chunks, batched)
+            elapsed = timer() - start
+            print(f"{name} ({label}): {REDIS_CONN.REDIS.round_trips} round trips, {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round trips of the Redis hot paths with single-key calls and with pipelines.")
+    parser.add_argument("--chunks", type=int, default=2000, help="Chunks of the simulated document (default: 2000)")
+    parser.add_argument("--latency", type=float, default=0.0005, help="Seconds per round trip (default: 0.0005)")
+    main(parser.parse_args())
@@ -0,0 +1,126 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""Ingestion time of many small files through the per-file and the batched upload paths.
+
+Uploads ``--files`` generated text files into an existing dataset, first through
+``FileService.upload_document`` as the classic upload endpoint does, then through
+``FileService.upload_document_batch`` in batches of ``--batch-size`` as the bulk
+endpoint does. Objects go to an in-memory stand-in for MinIO, so the numbers
+reflect the database and service work. Parsing is not started and the rows
+created are deleted after each run, e.g.:
+
+    python test/benchmark/upload_benchmark.py --dataset-id <dataset id> --files 10000
+"""
+
+import argparse
+import os
+import sys
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../")))
+
+from common import settings  # noqa: E402
+from api.db.db_models import DB, DB_QUERY_STATS, Document, File, File2Document  # noqa: E402
+from api.db.services.file_service import FileService  # noqa: E402
+from api.db.services.knowledgebase_service import KnowledgebaseService  # noqa: E402
+
+
+class MemoryStorage:
+    """Stand-in for the MinIO connector that keeps objects in a dict."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put(self, bucket, fnm, binary, tenant_id=None):
+        self.objects[(bucket, fnm)] = binary
+
+    def get(self, bucket, fnm, tenant_id=None):
+        return self.objects.get((bucket, fnm))
+
+    def obj_exist(self, bucket, fnm, tenant_id=None):
+        return (bucket, fnm) in self.objects
+
+    def rm(self, bucket, fnm, tenant_id=None):
+        self.objects.pop((bucket, fnm), None)
+
+
+class GeneratedFile:
+    def __init__(self, filename, blob):
+        self.filename = filename
+        self._blob = blob
+
+    def read(self):
+        return self._blob
+
+
+def generate_files(count, size):
+    return [GeneratedFile(f"upload_benchmark_{i:06d}.txt", (f"file {i} " * size)[:size].encode()) for i in range(count)]
+
+
+@DB.connection_context()
+def delete_documents(kb, doc_ids):
+    for i in range(0, len(doc_ids), 1000):
+        ids = doc_ids[i : i + 1000]
+        file_ids = [f2d.file_id for f2d in File2Document.select(File2Document.file_id).where(File2Document.document_id.in_(ids))]
+        File.delete().where(File.id.in_(file_ids)).execute()
+        File2Document.delete().where(File2Document.document_id.in_(ids)).execute()
+        Document.delete().where(Document.id.in_(ids)).execute()
+    KnowledgebaseService.atomic_increase_doc_num_by_id(kb.id, -len(doc_ids))
+
+
+def per_file(kb, files, user_id, _batch_size):
+    err, uploaded = FileService.upload_document(kb, files, user_id)
+    return [doc["id"] for doc, _ in uploaded], len(err)
+
+
+def batched(kb, files, user_id, batch_size):
+    kb_folder = FileService.prepare_kb_folder(kb, user_id)
+    doc_ids, failed, taken_names = [], 0, set()
+    for i in range(0, len(files), batch_size):
+        for result in FileService.upload_document_batch(kb, kb_folder["id"], files[i : i + batch_size], user_id, taken_names=taken_names):
+            if result["status"] == "failed":
+                failed += 1
+            else:
+                doc_ids.append(result["doc"]["id"])
+    return doc_ids, failed
+
+
+def main(args):
+    settings.init_settings()
+    settings.STORAGE_IMPL = MemoryStorage()
+    exist, kb = KnowledgebaseService.get_by_id(args.dataset_id)
+    if not exist:
+        sys.exit(f"Dataset {args.dataset_id} not found.")
+    files = generate_files(args.files, args.size)
+    for label, upload in (("per file", per_file), (f"batches of {args.batch_size}", batched)):
+        DB_QUERY_STATS.reset()
+        start = timer()
+        doc_ids, failed = upload(kb, files, kb.tenant_id, args.batch_size)
+        elapsed = timer() - start
+        round_trips = DB_QUERY_STATS.round_trips()
+        delete_documents(kb, doc_ids)
+        settings.STORAGE_IMPL.objects.clear()
+        print(f"{label}: {len(doc_ids)} files in {elapsed:.1f}s ({len(doc_ids) / elapsed:.0f} files/s), {round_trips / max(len(files), 1):.1f} round trips per file, {failed} failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion time of many small files through the per-file and the batched upload paths.")
+    parser.add_argument("--dataset-id", required=True, help="Dataset to upload into; the documents created are deleted again")
+    parser.add_argument("--files", type=int, default=10000, help="Files to upload per run (default: 10000)")
+    parser.add_argument("--size", type=int, default=2048, help="Size of each file in bytes (default: 2048)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Files per batch of the batched run (default: 64)")
+    main(parser.parse_args())
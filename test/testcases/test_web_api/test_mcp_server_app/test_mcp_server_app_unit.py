@@ -199,6 +199,7 @@ def _load_mcp_api(monkeypatch):
     mcp_conn_mod = ModuleType("common.mcp_tool_call_conn")
     mcp_conn_mod.MCPToolCallSession = _DummyMCPToolCallSession
     mcp_conn_mod.close_multiple_mcp_toolcall_sessions = lambda _sessions: None
+    mcp_conn_mod.MCP_SESSION_POOL = SimpleNamespace(invalidate=lambda _mcp_id: None)
     monkeypatch.setitem(sys.modules, "common.mcp_tool_call_conn", mcp_conn_mod)
 
     api_utils_mod = ModuleType("api.utils.api_utils")
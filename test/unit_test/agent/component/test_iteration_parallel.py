@@ -0,0 +1,135 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Parallel mode of the Iteration component.
+
+`agent.canvas` is loaded with its service-layer imports stubbed; the
+components themselves (`ComponentBase`, `Iteration`, `IterationItem`) are
+the real ones.
+"""
+
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent.component.base import ComponentBase, ComponentParamBase
+
+
+def _stub_module(monkeypatch, name, **attrs):
+    mod = ModuleType(name)
+    for k, v in attrs.items():
+        setattr(mod, k, v)
+    monkeypatch.setitem(sys.modules, name, mod)
+    return mod
+
+
+@pytest.fixture
+def modules(monkeypatch):
+    _stub_module(monkeypatch, "api.db.joint_services.tenant_model_service", get_tenant_default_model_by_type=MagicMock())
+    _stub_module(monkeypatch, "api.db.services.file_service", FileService=MagicMock())
+    _stub_module(monkeypatch, "api.db.services.llm_service", LLMBundle=MagicMock())
+    _stub_module(monkeypatch, "api.db.services.task_service", has_canceled=lambda task_id: False)
+    _stub_module(monkeypatch, "rag.prompts.generator", chunks_format=MagicMock())
+    _stub_module(monkeypatch, "rag.utils.redis_conn", REDIS_CONN=MagicMock())
+    _stub_module(monkeypatch, "rag.utils.tts_cache", synthesize_with_cache=MagicMock())
+    repo_root = Path(__file__).resolve().parents[4]
+    loaded = {}
+    for name, path in (("agent.canvas", "agent/canvas.py"), ("agent.component.iteration", "agent/component/iteration.py"), ("agent.component.iterationitem", "agent/component/iterationitem.py")):
+        spec = importlib.util.spec_from_file_location(name, repo_root / path)
+        mod = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, name, mod)
+        spec.loader.exec_module(mod)
+        loaded[name.rsplit(".", 1)[-1]] = mod
+    return loaded
+
+
+class _EchoParam(ComponentParamBase):
+    def check(self):
+        return True
+
+
+class _Echo(ComponentBase):
+    """Upper-cases the current item after a short await, tracking how many items run at once."""
+
+    component_name = "Echo"
+    running = 0
+    peak = 0
+    started = []
+
+    async def _invoke_async(self, **kwargs):
+        item = self._canvas.get_variable_value("item_0@item")
+        cls = type(self)
+        cls.started.append(item)
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        try:
+            await asyncio.sleep(0.01)
+            if item == "boom":
+                raise ValueError("cannot echo boom")
+            self.set_output("text", item.upper())
+        finally:
+            cls.running -= 1
+
+
+def _canvas(modules, items, max_concurrency):
+    canvas = modules["canvas"].Canvas.__new__(modules["canvas"].Canvas)
+    canvas.globals = {"sys.items": items}
+    canvas.task_id = "task"
+    canvas.dsl = {}
+    canvas.components = {}
+    param = modules["iteration"].IterationParam()
+    param.items_ref = "sys.items"
+    param.parallel = True
+    param.max_concurrency = max_concurrency
+    param.outputs = {"texts": {"ref": "echo_0@text", "value": None}}
+    canvas.components["iteration_0"] = {"downstream": ["after_0"], "upstream": [], "parent_id": None}
+    canvas.components["iteration_0"]["obj"] = modules["iteration"].Iteration(canvas, "iteration_0", param)
+    canvas.components["item_0"] = {"downstream": ["echo_0"], "upstream": [], "parent_id": "iteration_0"}
+    canvas.components["item_0"]["obj"] = modules["iterationitem"].IterationItem(canvas, "item_0", modules["iterationitem"].IterationItemParam())
+    canvas.components["echo_0"] = {"downstream": [], "upstream": ["item_0"], "parent_id": "iteration_0"}
+    canvas.components["echo_0"]["obj"] = _Echo(canvas, "echo_0", _EchoParam())
+    _Echo.running, _Echo.peak, _Echo.started = 0, 0, []
+    return canvas
+
+
+@pytest.mark.p2
+@pytest.mark.asyncio
+async def test_items_run_concurrently_and_merge_in_order(modules):
+    canvas = _canvas(modules, ["a", "b", "c", "d", "e", "f"], max_concurrency=2)
+    iteration = canvas.get_component_obj("iteration_0")
+    await iteration.invoke_async()
+    assert iteration.error() is None
+    assert iteration.output("texts") == ["A", "B", "C", "D", "E", "F"]
+    assert _Echo.peak == 2
+    assert iteration.end()
+    # Each item ran on its own copy of the body.
+    assert canvas.get_component_obj("echo_0").output("text") == ""
+
+
+@pytest.mark.p2
+@pytest.mark.asyncio
+async def test_first_error_stops_the_remaining_items(modules):
+    canvas = _canvas(modules, ["a", "boom", "c", "d"], max_concurrency=1)
+    iteration = canvas.get_component_obj("iteration_0")
+    await iteration.invoke_async()
+    assert iteration.error() == "Item 1: echo_0: cannot echo boom"
+    assert _Echo.started == ["a", "boom"]
+    # The canvas handles the error; it must not run the items again one by one.
+    assert iteration.end()
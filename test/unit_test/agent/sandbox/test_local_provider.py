@@ -1,5 +1,6 @@
 import base64
 import sys
+import time
 
 import pytest
 
@@ -87,3 +88,75 @@ def test_local_provider_times_out(tmp_path):
             )
     finally:
         provider.destroy_instance(instance.instance_id)
+
+
+def test_local_provider_warm_runs_start_from_the_preloaded_state(tmp_path):
+    provider = _make_provider(tmp_path, preload_modules="colorsys", warm_workers=1)
+    instance = provider.create_instance("python")
+    code = (
+        "import sys\n"
+        "def main() -> dict:\n"
+        "    colorsys = sys.modules.get('colorsys')\n"
+        "    seen = getattr(colorsys, 'touched', False)\n"
+        "    if colorsys is not None:\n"
+        "        colorsys.touched = True\n"
+        "    return {'preloaded': colorsys is not None, 'seen': seen}\n"
+    )
+
+    try:
+        results = [provider.execute_code(instance.instance_id, code, "python", timeout=5) for _ in range(2)]
+    finally:
+        provider.destroy_instance(instance.instance_id)
+
+    for result in results:
+        assert result.metadata["warm_start"] is True
+        assert result.metadata["result_value"] == {"preloaded": True, "seen": False}
+
+
+def test_local_provider_runs_concurrent_executions_side_by_side(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    provider = _make_provider(tmp_path, warm_workers=1)
+    instances = [provider.create_instance("python") for _ in range(3)]
+    code = "import time\n\ndef main() -> dict:\n    time.sleep(1)\n    return {'ok': True}\n"
+
+    try:
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(lambda instance: provider.execute_code(instance.instance_id, code, "python", timeout=5), instances))
+        elapsed = time.monotonic() - start
+    finally:
+        for instance in instances:
+            provider.destroy_instance(instance.instance_id)
+
+    assert [result.metadata["result_value"] for result in results] == [{"ok": True}] * 3
+    assert elapsed < 2.5
+
+
+def test_local_provider_without_prewarm_starts_a_process_per_run(tmp_path):
+    provider = _make_provider(tmp_path, prewarm=False)
+    instance = provider.create_instance("python")
+
+    try:
+        result = provider.execute_code(instance.instance_id, "def main() -> dict:\n    return {'ok': True}\n", "python", timeout=5)
+    finally:
+        provider.destroy_instance(instance.instance_id)
+
+    assert result.metadata["warm_start"] is False
+    assert result.metadata["result_value"] == {"ok": True}
+
+
+def test_local_provider_preloaded_modules_do_not_count_toward_max_memory(tmp_path):
+    pytest.importorskip("numpy")
+    code = "import numpy as np\n\ndef main() -> dict:\n    return {'ok': float(np.ones(286 * 1024 * 1024 // 8).sum()) > 0}\n"
+    results = {}
+    for prewarm in (False, True):
+        provider = _make_provider(tmp_path, prewarm=prewarm, preload_modules="numpy", warm_workers=1, timeout=30)
+        instance = provider.create_instance("python")
+        try:
+            results[prewarm] = provider.execute_code(instance.instance_id, code, "python", timeout=30)
+        finally:
+            provider.destroy_instance(instance.instance_id)
+
+    assert results[True].metadata["warm_start"] is True
+    assert results[False].metadata["result_value"] == results[True].metadata["result_value"] == {"ok": True}
@@ -0,0 +1,183 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for the NDJSON response of `POST /api/v1/datasets/<dataset_id>/documents/bulk`."""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+BOUNDARY = "bulkboundary"
+
+
+class _PassthroughManager:
+    def route(self, *_args, **_kwargs):
+        return lambda func: func
+
+
+class _LenientModule(ModuleType):
+    """Stub module: every name document_api.py imports resolves to a placeholder."""
+
+    def __getattr__(self, _name):
+        return lambda *_a, **_k: None
+
+
+class _Response:
+    def __init__(self, body, mimetype=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = SimpleNamespace(add_header=lambda *_a: None)
+
+
+def _identity(func=None, **_kwargs):
+    return (lambda f: f) if func is None else func
+
+
+def _load_document_api(monkeypatch):
+    stubbed = [
+        "quart",
+        "peewee",
+        "api.apps",
+        "api.apps.services.document_api_service",
+        "api.db",
+        "api.db.db_models",
+        "api.db.services",
+        "api.db.services.doc_metadata_service",
+        "api.db.services.document_counter_service",
+        "api.db.services.document_service",
+        "api.db.services.file2document_service",
+        "api.db.services.file_service",
+        "api.db.services.knowledgebase_service",
+        "api.db.services.canvas_service",
+        "api.common.check_team_permission",
+        "api.db.services.task_service",
+        "api.utils.api_utils",
+        "api.utils.pagination_utils",
+        "api.utils.validation_utils",
+        "api.utils.file_utils",
+        "api.utils.file_response",
+        "api.utils.web_utils",
+        "common.settings",
+        "common.metadata_utils",
+        "common.misc_utils",
+        "common.ssrf_guard",
+        "rag.nlp",
+    ]
+    for name in stubbed:
+        monkeypatch.setitem(sys.modules, name, _LenientModule(name))
+    # Module-level decorators must keep the functions they wrap.
+    sys.modules["api.apps"].login_required = _identity
+    sys.modules["api.utils.api_utils"].add_tenant_id_to_kwargs = _identity
+    sys.modules["api.db.db_models"].DB = SimpleNamespace(connection_context=lambda: _identity)
+
+    # parents[5] = repo root from test/unit_test/api/apps/restful_apis/<file>
+    module_path = Path(__file__).resolve().parents[5] / "api" / "apps" / "restful_apis" / "document_api.py"
+    spec = importlib.util.spec_from_file_location("test_document_api_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    module.manager = _PassthroughManager()
+    monkeypatch.setitem(sys.modules, "test_document_api_module", module)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def document_api(monkeypatch):
+    module = _load_document_api(monkeypatch)
+    state = SimpleNamespace(batches=[], taken_names=[])
+
+    def upload_document_batch(kb, kb_folder_id, files, user_id, parent_path=None, parser_config=None, parse=False, taken_names=None):
+        state.batches.append(([(f.filename, f.read()) for f in files], parse))
+        state.taken_names.append(taken_names)
+        results = []
+        for f in files:
+            if f.filename.endswith(".exe"):
+                results.append({"name": f.filename, "status": "failed", "error": "This type of file has not been supported yet!"})
+            else:
+                results.append({"name": f.filename, "status": "queued" if parse else "uploaded", "doc": {"id": f"id-{f.filename}", "run": "1" if parse else "0"}})
+        return results
+
+    async def thread_pool_exec(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def request(parts):
+        async def body():
+            data = _multipart(parts)
+            # Small chunks, so parts span several reads.
+            for i in range(0, len(data), 7):
+                yield data[i : i + 7]
+
+        return SimpleNamespace(mimetype="multipart/form-data", mimetype_params={"boundary": BOUNDARY}, body=body())
+
+    module.KnowledgebaseService = SimpleNamespace(get_by_id=lambda _id: (True, SimpleNamespace(id="kb-1", parser_config={})))
+    module.check_kb_team_permission = lambda *_a: True
+    module.FileService = SimpleNamespace(prepare_kb_folder=lambda kb, tenant_id: {"id": "folder"}, upload_document_batch=upload_document_batch)
+    module.thread_pool_exec = thread_pool_exec
+    module.map_doc_keys_with_run_status = lambda doc, run_status: {"id": doc["id"], "run": run_status}
+    module.Response = _Response
+    state.module = module
+    state.request = request
+    return state
+
+
+def _multipart(parts):
+    out = b""
+    for name, value in parts:
+        if isinstance(value, tuple):
+            filename, content = value
+            out += f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode() + content + b"\r\n"
+        else:
+            out += f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+    return out + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def _lines(document_api, parts):
+    document_api.module.request = document_api.request(parts)
+    resp = await document_api.module.bulk_upload_documents("kb-1", tenant_id="tenant-1")
+    assert resp.mimetype == "application/x-ndjson"
+    return [json.loads(line) async for line in resp.body]
+
+
+@pytest.mark.p2
+@pytest.mark.asyncio
+async def test_one_line_per_file_then_a_summary(document_api, monkeypatch):
+    monkeypatch.setattr(document_api.module, "BULK_UPLOAD_BATCH_SIZE", 2)
+    parts = [("parse", "true"), ("file", ("a.txt", b"alpha")), ("file", ("b.exe", b"beta")), ("file", ("c.txt", b"gamma"))]
+    lines = await _lines(document_api, parts)
+
+    assert lines == [
+        {"name": "a.txt", "status": "queued", "document": {"id": "id-a.txt", "run": "1"}},
+        {"name": "b.exe", "status": "failed", "error": "This type of file has not been supported yet!"},
+        {"name": "c.txt", "status": "queued", "document": {"id": "id-c.txt", "run": "1"}},
+        {"summary": {"uploaded": 0, "queued": 2, "failed": 1}},
+    ]
+    # Files are sent on in batches of BULK_UPLOAD_BATCH_SIZE, which share the names already taken.
+    assert document_api.batches == [([("a.txt", b"alpha"), ("b.exe", b"beta")], True), ([("c.txt", b"gamma")], True)]
+    assert document_api.taken_names[0] is document_api.taken_names[1]
+
+
+@pytest.mark.p2
+@pytest.mark.asyncio
+async def test_a_broken_batch_is_reported_and_the_summary_still_sent(document_api):
+    def fail(*_args, **_kwargs):
+        raise RuntimeError("storage is down")
+
+    document_api.module.FileService.upload_document_batch = fail
+    lines = await _lines(document_api, [("file", ("a.txt", b"alpha"))])
+
+    assert lines == [{"status": "failed", "error": "storage is down"}, {"summary": {"uploaded": 0, "queued": 0, "failed": 0}}]
@@ -122,12 +122,18 @@ def _load_system_module(monkeypatch, *, apps_module=None, manager=None):
     kb_service_mod.KnowledgebaseService = SimpleNamespace(get_by_id=lambda _kb_id: True)
     monkeypatch.setitem(sys.modules, "api.db.services.knowledgebase_service", kb_service_mod)
 
+    config_cache_mod = ModuleType("api.db.services.config_cache")
+    config_cache_mod.config_cache_stats = lambda: {}
+    monkeypatch.setitem(sys.modules, "api.db.services.config_cache", config_cache_mod)
+
     user_service_mod = ModuleType("api.db.services.user_service")
     user_service_mod.UserTenantService = SimpleNamespace(query=lambda **_kwargs: [SimpleNamespace(role="owner", tenant_id="tenant-1")])
     monkeypatch.setitem(sys.modules, "api.db.services.user_service", user_service_mod)
 
     db_models_mod = ModuleType("api.db.db_models")
     db_models_mod.APIToken = _DummyAPITokenModel
+    db_models_mod.DB = SimpleNamespace(replica=None, pool_status=lambda: {})
+    db_models_mod.DB_QUERY_STATS = SimpleNamespace(snapshot=lambda: {})
     monkeypatch.setitem(sys.modules, "api.db.db_models", db_models_mod)
 
     rag_pkg = ModuleType("rag")
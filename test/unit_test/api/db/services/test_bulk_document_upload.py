@@ -0,0 +1,238 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for the bulk document upload path (file, document and task services), with storage, rows and Redis replaced by fakes."""
+
+import contextlib
+import importlib.util
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+
+def _install_cv2_stub_if_unavailable():
+    try:
+        importlib.import_module("cv2")
+        return
+    except Exception:
+        pass
+
+    stub = types.ModuleType("cv2")
+    stub.INTER_LINEAR = 1
+    stub.INTER_CUBIC = 2
+    stub.BORDER_CONSTANT = 0
+    stub.BORDER_REPLICATE = 1
+
+    def _missing(*_args, **_kwargs):
+        raise RuntimeError("cv2 runtime call is unavailable in this test environment")
+
+    def _module_getattr(name):
+        if name.isupper():
+            return 0
+        return _missing
+
+    stub.__getattr__ = _module_getattr
+    sys.modules["cv2"] = stub
+
+
+def _install_xgboost_stub_if_unavailable():
+    if "xgboost" in sys.modules:
+        return
+    if importlib.util.find_spec("xgboost") is not None:
+        return
+    sys.modules["xgboost"] = types.ModuleType("xgboost")
+
+
+_install_cv2_stub_if_unavailable()
+_install_xgboost_stub_if_unavailable()
+
+from api.db.services import document_service as document_service_module  # noqa: E402
+from api.db.services import file_service as file_service_module  # noqa: E402
+from api.db.services import task_service as task_service_module  # noqa: E402
+from api.db.services.document_service import DocumentService  # noqa: E402
+from api.db.services.file_service import FileService  # noqa: E402
+from common.constants import TaskStatus  # noqa: E402
+
+
+class _Upload:
+    def __init__(self, filename, data=b"content"):
+        self.filename = filename
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+class _Storage:
+    def __init__(self):
+        self.objects = {}
+
+    def obj_exist(self, bucket, name):
+        return (bucket, name) in self.objects
+
+    def put(self, bucket, name, blob):
+        self.objects[(bucket, name)] = blob
+
+    def rm(self, bucket, name):
+        self.objects.pop((bucket, name), None)
+
+
+KB = SimpleNamespace(id="kb-1", tenant_id="tenant-1", parser_id="naive", pipeline_id=None, parser_config={})
+
+
+@pytest.fixture
+def state(monkeypatch):
+    state = SimpleNamespace(storage=_Storage(), existing={"report.txt"}, inserted=[], queued=[], insert_error=None, queue_error=None)
+
+    def insert_batch(docs):
+        if state.insert_error:
+            raise state.insert_error
+        state.inserted.append([doc["name"] for doc in docs])
+
+    def queue_tasks_many(docs, priority=0):
+        if state.queue_error:
+            raise state.queue_error
+        state.queued.append(docs)
+
+    monkeypatch.delenv("MAX_FILE_NUM_PER_USER", raising=False)
+    monkeypatch.setattr(file_service_module, "settings", SimpleNamespace(STORAGE_IMPL=state.storage))
+    monkeypatch.setattr(file_service_module, "DB", SimpleNamespace(atomic=contextlib.nullcontext))
+    monkeypatch.setattr(file_service_module, "thumbnail_img", lambda *_args: None)
+    monkeypatch.setattr(file_service_module, "read_potential_broken_pdf", lambda blob: blob)
+    monkeypatch.setattr(file_service_module.DocumentService, "get_existing_names", lambda _kb_id, names: set(names) & state.existing)
+    monkeypatch.setattr(file_service_module.DocumentService, "query", lambda name, kb_id: [name] if name in state.existing else [])
+    monkeypatch.setattr(file_service_module.DocumentService, "insert_batch", insert_batch)
+    monkeypatch.setattr(FileService, "add_files_from_kb", classmethod(lambda cls, docs, kb_folder_id, tenant_id: None))
+    monkeypatch.setattr(task_service_module, "queue_tasks_many", queue_tasks_many)
+    return state
+
+
+def _upload(files, **kwargs):
+    # Skip @DB.connection_context(); the rows are written through the fakes above.
+    return FileService.upload_document_batch.__func__.__wrapped__(FileService, KB, "kb-folder", files, "user-1", **kwargs)
+
+
+@pytest.mark.p2
+def test_failed_files_do_not_stop_the_batch(state):
+    results = _upload([_Upload("a.txt"), _Upload("b.exe"), _Upload("x" * 300 + ".txt"), _Upload("c.txt")])
+
+    assert [r["status"] for r in results] == ["uploaded", "failed", "failed", "uploaded"]
+    assert "not been supported" in results[1]["error"] and "length of file name" in results[2]["error"]
+    assert state.inserted == [["a.txt", "c.txt"]]
+    assert set(state.storage.objects) == {("kb-1", "a.txt"), ("kb-1", "c.txt")}
+
+
+@pytest.mark.p2
+def test_duplicate_names_are_renamed(state):
+    results = _upload([_Upload("report.txt"), _Upload("notes.txt"), _Upload("notes.txt")])
+
+    # report.txt is already in the dataset; the second notes.txt collides within the batch.
+    assert [r["doc"]["name"] for r in results] == ["report(1).txt", "notes.txt", "notes(1).txt"]
+
+
+@pytest.mark.p2
+def test_names_stay_unique_across_batches(state):
+    taken_names = set()
+    first = _upload([_Upload("a.txt")], taken_names=taken_names)
+    second = _upload([_Upload("a.txt")], taken_names=taken_names)
+
+    assert first[0]["doc"]["name"] == "a.txt" and second[0]["doc"]["name"] == "a(1).txt"
+    assert state.inserted == [["a.txt"], ["a(1).txt"]]
+
+
+@pytest.mark.p2
+def test_database_failure_removes_the_stored_objects(state):
+    state.insert_error = RuntimeError("deadlock")
+    results = _upload([_Upload("a.txt"), _Upload("b.txt")])
+
+    assert [(r["status"], r["error"]) for r in results] == [("failed", "Database error: deadlock")] * 2
+    assert state.storage.objects == {}
+
+
+@pytest.mark.p2
+def test_parse_queues_the_batch_from_the_stored_objects(state):
+    results = _upload([_Upload("a.pdf"), _Upload("b.txt")], parse=True)
+
+    assert [r["status"] for r in results] == ["queued", "queued"]
+    assert results[0]["doc"]["run"] == TaskStatus.RUNNING.value
+    # One call for the batch; pages are counted from storage, so no file content is passed along.
+    assert [[(doc["name"], bucket, name) for doc, bucket, name in call] for call in state.queued] == [[("a.pdf", "kb-1", "a.pdf"), ("b.txt", "kb-1", "b.txt")]]
+
+    state.queue_error = RuntimeError("Can't access Redis.")
+    results = _upload([_Upload("c.txt")], parse=True)
+    assert results[0]["status"] == "uploaded"
+    assert results[0]["error"] == "Uploaded, but failed to start parsing: Can't access Redis."
+
+
+@pytest.mark.p2
+def test_insert_batch_updates_each_dataset_count_once(monkeypatch):
+    inserted, increments = [], []
+    monkeypatch.setattr(document_service_module, "DB", SimpleNamespace(atomic=contextlib.nullcontext))
+    monkeypatch.setattr(DocumentService, "insert_many", classmethod(lambda cls, docs: inserted.append(docs)))
+    monkeypatch.setattr(document_service_module.KnowledgebaseService, "atomic_increase_doc_num_by_id", lambda kb_id, count: increments.append((kb_id, count)) or True)
+    insert_batch = DocumentService.insert_batch.__func__.__wrapped__
+
+    docs = [{"id": "d1", "kb_id": "kb-1"}, {"id": "d2", "kb_id": "kb-2"}, {"id": "d3", "kb_id": "kb-1"}]
+    insert_batch(DocumentService, docs)
+    assert inserted == [docs]
+    assert increments == [("kb-1", 2), ("kb-2", 1)]
+
+    # A failed count update raises, so DB.atomic() rolls the rows back.
+    monkeypatch.setattr(document_service_module.KnowledgebaseService, "atomic_increase_doc_num_by_id", lambda kb_id, count: 0)
+    with pytest.raises(RuntimeError, match="Knowledgebase"):
+        insert_batch(DocumentService, docs)
+
+
+@pytest.fixture
+def queueing(monkeypatch):
+    state = SimpleNamespace(inserted=[], messages=[], aborted=[], redis_ok=True)
+
+    def plan(doc, bucket, name, priority):
+        # Finished tasks (reused chunks) are inserted but not queued.
+        tasks = [{"id": f"{doc['id']}-{i}", "doc_id": doc["id"], "progress": progress} for i, progress in enumerate(doc["progress"])]
+        return tasks, doc["queue"]
+
+    def queue_product_many(messages):
+        state.messages.append(messages)
+        return state.redis_ok
+
+    monkeypatch.setattr(task_service_module, "_plan_parse_tasks", plan)
+    monkeypatch.setattr(task_service_module, "bulk_insert_into_db", lambda model, tasks, replace: state.inserted.append([t["id"] for t in tasks]))
+    monkeypatch.setattr(task_service_module.DocumentService, "begin2parse", lambda doc_id: None)
+    monkeypatch.setattr(task_service_module, "seed_doc_chunking_counter", lambda doc_id, count: True)
+    monkeypatch.setattr(task_service_module, "abort_doc_chunking_counter", state.aborted.append)
+    monkeypatch.setattr(task_service_module, "REDIS_CONN", SimpleNamespace(queue_product_many=queue_product_many))
+    return state
+
+
+@pytest.mark.p2
+def test_queue_tasks_many_inserts_and_queues_once(queueing):
+    docs = [{"id": "d1", "progress": [0.0, 1.0], "queue": "q0"}, {"id": "d2", "progress": [0.0], "queue": "q1"}, {"id": "d3", "progress": [0.0], "queue": "q0"}]
+    task_service_module.queue_tasks_many([(doc, "kb-1", doc["id"]) for doc in docs])
+
+    assert queueing.inserted == [["d1-0", "d1-1", "d2-0", "d3-0"]]
+    assert [{queue: [t["id"] for t in tasks] for queue, tasks in messages.items()} for messages in queueing.messages] == [{"q0": ["d1-0", "d3-0"], "q1": ["d2-0"]}]
+    assert queueing.aborted == []
+
+
+@pytest.mark.p2
+def test_queue_tasks_many_aborts_every_document_when_redis_fails(queueing):
+    queueing.redis_ok = False
+    docs = [{"id": "d1", "progress": [0.0], "queue": "q0"}, {"id": "d2", "progress": [0.0], "queue": "q0"}]
+    with pytest.raises(RuntimeError, match="Redis"):
+        task_service_module.queue_tasks_many([(doc, "kb-1", doc["id"]) for doc in docs])
+    assert queueing.aborted == ["d1", "d2"]
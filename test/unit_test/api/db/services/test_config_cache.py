@@ -0,0 +1,190 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from peewee import CharField, DateTimeField, Model
+
+
+def _load_config_cache():
+    # Load the module by path: importing api.db.services pulls in the database models.
+    module_path = Path(__file__).resolve().parents[5] / "api" / "db" / "services" / "config_cache.py"
+    spec = importlib.util.spec_from_file_location("test_config_cache_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+config_cache = _load_config_cache()
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, k):
+        return self.values.get(k)
+
+    def set(self, k, v, exp=3600):
+        self.values[k] = v
+        return True
+
+    def incrby(self, k, increment):
+        self.values[k] = str(int(self.values.get(k) or 0) + increment)
+        return int(self.values[k])
+
+
+class _Row(Model):
+    name = CharField()
+    create_date = DateTimeField()
+
+
+@pytest.fixture(autouse=True)
+def no_shared_redis(monkeypatch):
+    monkeypatch.setattr(config_cache, "_shared_redis", lambda: None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(config_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_values_expire_after_ttl(clock):
+    cache = config_cache.ConfigCache("test", ("t",), ttl=10)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"v": len(loads)}
+
+    assert cache.get("k", loader) == {"v": 1}
+    clock[0] += 9
+    assert cache.get("k", loader) == {"v": 1}
+    clock[0] += 2
+    assert cache.get("k", loader) == {"v": 2}
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["redis_hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0, 2, 0.3333)
+
+
+def test_callers_get_independent_copies():
+    cache = config_cache.ConfigCache("test", ("t",), ttl=10)
+    first = cache.get("k", lambda: {"parser_config": {"a": 1}})
+    first["parser_config"]["a"] = 2
+    assert cache.get("k", lambda: None) == {"parser_config": {"a": 1}}
+
+
+def test_clear_during_load_discards_the_loaded_value():
+    cache = config_cache.ConfigCache("test", ("t",), ttl=10)
+
+    def loader():
+        cache.clear()
+        return "old"
+
+    assert cache.get("k", loader) == "old"
+    assert cache.get("k", lambda: "new") == "new"
+
+
+def test_cacheable_and_disabled_cache():
+    cache = config_cache.ConfigCache("test", ("t",), ttl=10)
+    assert cache.get("k", lambda: (False, None), cacheable=lambda res: res[0]) == (False, None)
+    assert cache.get("k", lambda: (True, "row"), cacheable=lambda res: res[0]) == (True, "row")
+    assert cache.get("k", lambda: (True, "other")) == (True, "row")
+
+    disabled = config_cache.ConfigCache("off", ("t",), ttl=0)
+    disabled.get("k", lambda: 1)
+    assert disabled.get("k", lambda: 2) == 2
+
+
+def test_lru_eviction():
+    cache = config_cache.ConfigCache("test", ("t",), ttl=10, maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: None)
+    cache.get("c", lambda: 3)
+    assert cache.get("a", lambda: "reloaded") == 1
+    assert cache.get("b", lambda: "reloaded") == "reloaded"
+
+
+def test_cached_config_keys_on_class_and_arguments():
+    cache = config_cache.ConfigCache("test", ("t",), ttl=10)
+    calls = []
+
+    class Service:
+        @classmethod
+        @config_cache.cached_config(cache)
+        def lookup(cls, tenant_id, ids):
+            calls.append((tenant_id, ids))
+            return f"{tenant_id}:{len(ids)}"
+
+    assert Service.lookup("t1", ["a", "b"]) == "t1:2"
+    assert Service.lookup("t1", ["a", "b"]) == "t1:2"
+    assert Service.lookup("t2", ["a"]) == "t2:1"
+    assert calls == [("t1", ["a", "b"]), ("t2", ["a"])]
+
+
+def test_bind_config_caches_clears_on_table_writes():
+    listeners = {}
+
+    class _DB:
+        def on_table_write(self, table, callback, ignore_columns=()):
+            listeners.setdefault(table, []).append(callback)
+            ignored[table] = set(ignore_columns)
+
+    ignored = {}
+    config_cache.bind_config_caches(_DB())
+    assert {"doc_num", "chunk_num", "token_num"} <= ignored["knowledgebase"]
+    assert ignored["tenant_model"] == set()
+    config_cache.MODEL_CONFIG_CACHE.get("k", lambda: "row")
+    for callback in listeners["tenant_model"]:
+        callback()
+    assert config_cache.MODEL_CONFIG_CACHE.get("k", lambda: "fresh") == "fresh"
+    assert set(config_cache.config_cache_stats()) == {"tenant", "knowledgebase", "dialog", "model"}
+
+
+def test_other_processes_read_rows_from_redis(clock):
+    redis = _FakeRedis()
+    first = config_cache.ConfigCache("shared", ("t",), ttl=10)
+    second = config_cache.ConfigCache("shared", ("t",), ttl=10)
+    first.redis = second.redis = redis
+    row = _Row(name="kb", create_date=datetime(2025, 1, 2, 3, 4, 5))
+    row.similarity = 0.5
+
+    first.get("k", lambda: (True, row))
+    exist, cached = second.get("k", lambda: pytest.fail("loaded from the database"))
+    assert exist is True
+    assert isinstance(cached, _Row)
+    assert (cached.name, cached.create_date, cached.similarity) == ("kb", datetime(2025, 1, 2, 3, 4, 5), 0.5)
+    assert not cached.is_dirty()
+    assert second.stats()["redis_hits"] == 1
+
+
+def test_invalidate_retires_entries_of_all_processes(clock):
+    redis = _FakeRedis()
+    writer = config_cache.ConfigCache("shared", ("t",), ttl=10)
+    reader = config_cache.ConfigCache("shared", ("t",), ttl=10)
+    writer.redis = reader.redis = redis
+
+    assert reader.get("k", lambda: "old") == "old"
+    writer.invalidate()
+    assert reader.get("k", lambda: "new") == "old"
+    clock[0] += config_cache.CONFIG_CACHE_VERSION_CHECK
+    assert reader.get("k", lambda: "new") == "new"
+    assert writer.get("k", lambda: "newer") == "new"
@@ -0,0 +1,133 @@
+"""
+Tests for the pooled database mixin: query statistics, read-replica routing
+and table write notifications.
+"""
+
+import pytest
+from playhouse.pool import PooledSqliteDatabase
+
+from api.db.db_models import PooledConnectionMixin, QueryStats
+
+
+class _PooledSqlite(PooledConnectionMixin, PooledSqliteDatabase):
+    pass
+
+
+def _database(path, value):
+    db = _PooledSqlite(str(path), max_connections=4)
+    db.execute_sql("CREATE TABLE item (v TEXT)")
+    db.execute_sql("INSERT INTO item (v) VALUES (?)", (value,))
+    db.close()
+    return db
+
+
+def _read(db):
+    return db.execute_sql("SELECT v FROM item").fetchone()[0]
+
+
+@pytest.fixture
+def primary(tmp_path):
+    db = _database(tmp_path / "primary.db", "primary")
+    replica = _database(tmp_path / "replica.db", "replica")
+    replica.stats_target = "replica"
+    db.replica = replica
+    db.replica_lag = 0
+    yield db
+    db.close_all()
+    replica.close_all()
+
+
+class TestQueryStats:
+    def test_histogram_buckets_and_snapshot(self):
+        stats = QueryStats(buckets_ms=(1, 10))
+        stats.record("primary", "select", 0.0005)
+        stats.record("primary", "select", 0.005)
+        stats.record("primary", "select", 0.05)
+        stats.record("replica", "select", 0.002)
+
+        snapshot = stats.snapshot()
+        assert snapshot["primary"]["select"]["count"] == 3
+        assert snapshot["primary"]["select"]["histogram"] == {"<=1ms": 1, "<=10ms": 1, ">10ms": 1}
+        assert snapshot["primary"]["select"]["max_ms"] == pytest.approx(50)
+        assert stats.round_trips() == 4
+        assert stats.round_trips("replica") == 1
+
+        stats.reset()
+        assert stats.snapshot() == {}
+
+
+class TestReplicaRouting:
+    def test_selects_go_to_replica_only_inside_context(self, primary):
+        assert _read(primary) == "primary"
+        with primary.read_replica():
+            assert _read(primary) == "replica"
+        assert primary.replica.is_closed()
+
+    def test_decorator_routes_reads(self, primary):
+        @primary.read_replica()
+        def load():
+            return _read(primary)
+
+        assert load() == "replica"
+
+    def test_transactions_and_recent_writes_stay_on_primary(self, primary):
+        with primary.read_replica():
+            with primary.atomic():
+                assert _read(primary) == "primary"
+            primary.replica_lag = 60
+            primary.execute_sql("UPDATE item SET v = ?", ("written",))
+            assert _read(primary) == "written"
+        primary.close()
+
+    def test_without_replica_reads_use_primary(self, tmp_path):
+        db = _database(tmp_path / "only.db", "primary")
+        with db.read_replica():
+            assert _read(db) == "primary"
+        db.close_all()
+
+
+class TestWriteListeners:
+    def test_listeners_run_for_writes_to_their_table(self, primary):
+        calls = []
+        primary.on_table_write("item", lambda: calls.append("item"))
+        primary.on_table_write("other", lambda: calls.append("other"))
+
+        _read(primary)
+        assert calls == []
+        primary.execute_sql('INSERT INTO "item" (v) VALUES (?)', ("new",))
+        primary.execute_sql("DELETE FROM item WHERE v = ?", ("new",))
+        assert calls == ["item", "item"]
+        primary.close()
+
+    def test_listeners_run_again_when_the_transaction_ends(self, primary):
+        calls = []
+        primary.on_table_write("item", lambda: calls.append("item"))
+
+        with primary.atomic():
+            primary.execute_sql("UPDATE item SET v = ?", ("written",))
+            primary.execute_sql("UPDATE item SET v = ?", ("again",))
+            assert calls == ["item", "item"]
+        assert calls == ["item", "item", "item"]
+        primary.close()
+
+    def test_updates_of_ignored_columns_skip_the_listener(self, primary):
+        primary.execute_sql("ALTER TABLE item ADD COLUMN n INTEGER DEFAULT 0")
+        calls = []
+        primary.on_table_write("item", lambda: calls.append("config"), ignore_columns=("n",))
+        primary.on_table_write("item", lambda: calls.append("all"))
+
+        with primary.atomic():
+            primary.execute_sql('UPDATE "item" SET "n" = ("item"."n" + ?) WHERE ("item"."v" = ?)', (1, "primary"))
+        assert calls == ["all", "all"]
+        calls.clear()
+        primary.execute_sql('UPDATE "item" SET "n" = ?, "v" = ? WHERE ("item"."v" = ?)', (0, "renamed", "primary"))
+        primary.execute_sql("INSERT INTO item (n) VALUES (?)", (1,))
+        primary.execute_sql("UPDATE item SET n = (SELECT count(*) FROM item)")
+        assert calls == ["config", "all"] * 3
+        primary.close()
+
+    def test_pool_status(self, primary):
+        _read(primary)
+        assert primary.pool_status() == {"max_connections": 4, "in_use": 1, "idle": 0}
+        primary.close()
+        assert primary.pool_status() == {"max_connections": 4, "in_use": 0, "idle": 1}
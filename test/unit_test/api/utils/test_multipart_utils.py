@@ -0,0 +1,53 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+
+import pytest
+
+from api.utils.multipart_utils import SpooledUpload, iter_multipart
+
+BOUNDARY = b"----ragflowboundary"
+
+
+def _body(parts):
+    body = b""
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += b"--" + BOUNDARY + b"\r\n" + f"Content-Disposition: {disposition}\r\n\r\n".encode() + content + b"\r\n"
+    return body + b"--" + BOUNDARY + b"--\r\n"
+
+
+async def _chunks(body, size):
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+async def _collect(body, chunk_size, **kwargs):
+    parts = []
+    async for name, value in iter_multipart(_chunks(body, chunk_size), BOUNDARY, **kwargs):
+        if isinstance(value, SpooledUpload):
+            parts.append((name, value.filename, value.read(), value.size))
+            value.close()
+        else:
+            parts.append((name, value))
+    return parts
+
+
+@pytest.mark.p2
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+async def test_parts_are_yielded_in_order_whatever_the_chunking(chunk_size):
+    body = _body([("parse", None, b"true"), ("file", "a.txt", b"alpha" * 100), ("file", "b.txt", b"beta")])
+    assert await _collect(body, chunk_size, spool_size=16) == [
+        ("parse", "true"),
+        ("file", "a.txt", b"alpha" * 100, 500),
+        ("file", "b.txt", b"beta", 4),
+    ]
+
+
+@pytest.mark.p2
+@pytest.mark.asyncio
+async def test_oversized_fields_are_rejected():
+    body = _body([("parser_config", None, b"x" * 100)])
+    with pytest.raises(ValueError):
+        await _collect(body, 32, max_field_size=50)
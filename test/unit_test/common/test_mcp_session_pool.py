@@ -0,0 +1,142 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import asyncio
+import importlib.util
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import pytest
+from mcp.types import TextContent
+
+from common.constants import MCPServerType
+
+
+class _FakeClientSession:
+    """In-process MCP client session: tool calls echo their arguments after a short await."""
+
+    running = 0
+    peak = 0
+    list_calls = 0
+
+    def __init__(self, *streams):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def initialize(self):
+        return None
+
+    async def list_tools(self):
+        type(self).list_calls += 1
+        return SimpleNamespace(tools=["search"])
+
+    async def call_tool(self, name, arguments):
+        cls = type(self)
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            cls.running -= 1
+        return SimpleNamespace(content=[TextContent(type="text", text=f"{name}:{arguments['q']}")], isError=False)
+
+    async def send_ping(self):
+        return None
+
+
+@asynccontextmanager
+async def _fake_sse_client(url, headers):
+    yield None, None
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    # The installed mcp release may not ship the streamable HTTP client the module imports; the tests use SSE.
+    streamable_http = ModuleType("mcp.client.streamable_http")
+    streamable_http.streamablehttp_client = _fake_sse_client
+    monkeypatch.setitem(sys.modules, "mcp.client.streamable_http", streamable_http)
+    module_path = Path(__file__).resolve().parents[3] / "common" / "mcp_tool_call_conn.py"
+    spec = importlib.util.spec_from_file_location("test_mcp_tool_call_conn_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "sse_client", _fake_sse_client)
+    monkeypatch.setattr(module, "ClientSession", _FakeClientSession)
+    _FakeClientSession.running, _FakeClientSession.peak, _FakeClientSession.list_calls = 0, 0, 0
+    return module
+
+
+def _server(server_id="srv", url="http://mcp.example.com/sse"):
+    return SimpleNamespace(id=server_id, url=url, server_type=MCPServerType.SSE, headers={"Authorization": "Bearer $token"})
+
+
+def test_session_runs_calls_concurrently_up_to_its_cap(conn):
+    session = conn.MCPToolCallSession(_server(), {"token": "t"}, max_concurrency=2)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: session.tool_call("search", {"q": i}, timeout=5), range(4)))
+    finally:
+        session.close_sync()
+
+    assert results == ["search:0", "search:1", "search:2", "search:3"]
+    assert _FakeClientSession.peak == 2
+
+
+def test_pool_reuses_sessions_and_caches_tool_lists(conn):
+    pool = conn.MCPSessionPool(idle_ttl=60, tools_ttl=60)
+    try:
+        first = pool.get(_server(), {"token": "t", "tools": {"search": {}}})
+        assert pool.get(_server(), {"token": "t"}) is first
+        assert pool.get(_server(), {"token": "t"}, custom_header={"X-User": "u"}) is not first
+
+        assert pool.list_tools(_server(), {"token": "t"}) == ["search"]
+        assert pool.list_tools(_server(), {"token": "t"}) == ["search"]
+        assert _FakeClientSession.list_calls == 1
+
+        handle = pool.session(_server(), {"token": "t"})
+        assert handle.tool_call("search", {"q": "ragflow"}, timeout=5) == "search:ragflow"
+
+        pool.invalidate("srv")
+        replacement = pool.get(_server(), {"token": "t"})
+        assert replacement is not first
+        assert handle.tool_call("search", {"q": "again"}, timeout=5) == "search:again"
+    finally:
+        pool.shutdown()
+
+
+def test_pool_replaces_unhealthy_and_evicts_idle_sessions(conn):
+    pool = conn.MCPSessionPool(idle_ttl=0.05, tools_ttl=60)
+    try:
+        broken = pool.get(_server())
+        broken._error = "Connection failed"
+        healthy = pool.get(_server())
+        assert healthy is not broken and healthy.healthy()
+        assert not broken.healthy()
+
+        time.sleep(0.1)
+        assert pool.evict_idle() == 1
+        assert not healthy.healthy()
+        assert pool.get(_server()) is not healthy
+    finally:
+        pool.shutdown()
@@ -0,0 +1,78 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import numpy as np
+
+from common.vector_quantization import (
+    es_version,
+    fold_quantized_vectors,
+    move_to_quantized_fields,
+    quantization_method,
+    quantize_vectors,
+    quantized_dynamic_templates,
+    quantized_recall,
+    supported_quantization_methods,
+)
+
+
+def test_quantization_method_needs_a_supporting_engine():
+    assert quantization_method({"vector_quantization": "int8"}, "elasticsearch") == "int8"
+    assert quantization_method({"vector_quantization": "binary"}, "Elasticsearch") == "binary"
+    assert quantization_method({"vector_quantization": "int8"}, "infinity") is None
+    assert quantization_method({"vector_quantization": "fp16"}, "elasticsearch") is None
+    assert quantization_method(None, "elasticsearch") is None
+
+
+def test_quantize_vectors():
+    codes = quantize_vectors([[3.0, -4.0, 0.0], [0.0, 0.0, 0.0]], "int8")
+    assert codes.dtype == np.int8
+    assert codes.tolist() == [[76, -102, 0], [0, 0, 0]]
+    assert quantize_vectors([0.5, -0.1, 0.0], "binary").tolist() == [[1, -1, 1]]
+
+
+def test_supported_methods_follow_the_es_version():
+    assert es_version("8.11.3") == (8, 11) and es_version("") == (0, 0)
+    assert supported_quantization_methods(es_version("8.11.3")) == ()
+    assert supported_quantization_methods(es_version("8.15.0")) == ("int8",)
+    assert supported_quantization_methods(es_version("9.0.1")) == ("int8", "binary")
+
+    templates = quantized_dynamic_templates(("binary",))
+    assert templates[0]["dense_vector"]["match"] == "*_512_bbq_vec"
+    assert templates[0]["dense_vector"]["mapping"]["index_options"] == {"type": "bbq_hnsw"}
+    assert "element_type" not in templates[0]["dense_vector"]["mapping"]
+
+
+def test_move_to_quantized_fields_keeps_a_single_float_vector():
+    docs = [{"id": "a", "q_2_vec": [1.0, 0.0]}, {"id": "mom"}]
+    move_to_quantized_fields(docs, None)
+    assert docs[0] == {"id": "a", "q_2_vec": [1.0, 0.0]}
+
+    move_to_quantized_fields(docs, "int8")
+    assert docs == [{"id": "a", "q_2_int8_vec": [1.0, 0.0]}, {"id": "mom"}]
+    assert fold_quantized_vectors(docs[0]) == {"id": "a", "q_2_vec": [1.0, 0.0]}
+
+
+def test_rescoring_recovers_recall():
+    rng = np.random.default_rng(7)
+    # Clustered vectors, like embeddings of related chunks.
+    centers = rng.normal(size=(20, 64))
+    vectors = centers[rng.integers(0, 20, 2000)] + rng.normal(scale=0.6, size=(2000, 64))
+    queries = vectors[:40] + rng.normal(scale=0.2, size=(40, 64))
+
+    assert quantized_recall(vectors, queries, "int8", k=10, oversample=1) > 0.8
+    assert quantized_recall(vectors, queries, "int8", k=10, oversample=4) > 0.98
+    assert quantized_recall(vectors, queries, "binary", k=10, oversample=8) > quantized_recall(vectors, queries, "binary", k=10, oversample=1)
+    assert quantized_recall(vectors, queries[:0], "int8") == 1.0
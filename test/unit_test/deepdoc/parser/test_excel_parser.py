@@ -121,3 +121,79 @@ def test_call_skips_truly_empty_cells():
     lines = RAGFlowExcelParser()(_make_xlsx_with_values(["name", "note"], ["widget", None]))
     joined = " ".join(lines)
     assert "note" not in joined, lines
+
+
+def _make_merged_xlsx(n_data_rows):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Region", "Sales", None])
+    ws.append([None, "Q1", "Q2"])
+    ws.merge_cells("A1:A2")
+    ws.merge_cells("B1:C1")
+    for i in range(n_data_rows):
+        ws.append([f"r{i}", i, i * 2])
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.p2
+def test_small_workbook_is_not_streamed():
+    assert RAGFlowExcelParser._load_streaming_workbook(BytesIO(_make_xlsx(5)), min_rows=100) is None
+
+
+@pytest.mark.p2
+def test_large_workbook_is_streamed():
+    wb = RAGFlowExcelParser._load_streaming_workbook(BytesIO(_make_xlsx(20)), min_rows=10)
+    assert wb is not None and wb.read_only
+    wb.close()
+
+
+@pytest.mark.p2
+def test_csv_is_never_streamed():
+    assert RAGFlowExcelParser._load_streaming_workbook(BytesIO(b"a,b\n1,2\n"), min_rows=0) is None
+
+
+@pytest.mark.p2
+def test_streaming_sheet_reads_merged_ranges_and_anchor_values():
+    wb = RAGFlowExcelParser._load_streaming_workbook(BytesIO(_make_merged_xlsx(3)), min_rows=0)
+    ws = _mod.StreamingSheet(wb.worksheets[0])
+    assert sorted(str(r) for r in ws.merged_cells.ranges) == ["A1:A2", "B1:C1"]
+
+    rows = list(ws.iter_rows(keep_rows=2))
+    assert len(rows) == 5
+    assert ws.cell(2, 2).value == "Q1"
+    assert ws.merged_value(2, 1) == "Region"
+    assert ws.merged_value(1, 3) == "Sales"
+    assert ws.merged_value(4, 1) is None
+    wb.close()
+
+
+@pytest.mark.p2
+def test_streaming_sheet_merged_lookup_matches_a_range_scan():
+    from openpyxl.worksheet.cell_range import CellRange
+
+    # Non-overlapping ranges: tall column merges, short row merges and single-row blocks.
+    ranges = [CellRange(min_col=1, min_row=1, max_col=1, max_row=40), CellRange(min_col=3, min_row=5, max_col=6, max_row=5)]
+    ranges += [CellRange(min_col=2 + (r % 3) * 3, min_row=r, max_col=3 + (r % 3) * 3, max_row=r + 1) for r in range(8, 40, 3)]
+    ws = _mod.StreamingSheet.__new__(_mod.StreamingSheet)
+    ws.merged_cells = _mod._MergedCells(ranges)
+    ws._anchors = {(rng.min_row, rng.min_col): str(rng) for rng in ranges}
+    ws._band_rows, ws._bands = ws._row_bands(ranges)
+
+    for row in range(0, 45):
+        for col in range(0, 12):
+            covering = [str(rng) for rng in ranges if rng.min_row <= row <= rng.max_row and rng.min_col <= col <= rng.max_col]
+            assert ws.merged_value(row, col) == (covering[0] if covering else None), (row, col)
+
+
+@pytest.mark.p2
+def test_row_number_streams_large_workbooks(monkeypatch):
+    monkeypatch.setattr(_mod, "EXCEL_STREAMING_MIN_ROWS", 10)
+    binary = _make_xlsx(30)
+    # Header row + 30 data rows, same count as the in-memory path.
+    assert RAGFlowExcelParser.row_number("big.xlsx", binary) == 31
+    monkeypatch.setattr(_mod, "EXCEL_STREAMING_MIN_ROWS", 1000)
+    assert RAGFlowExcelParser.row_number("big.xlsx", binary) == 31
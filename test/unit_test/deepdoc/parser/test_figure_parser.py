@@ -19,7 +19,10 @@ from pathlib import Path
 from types import ModuleType, SimpleNamespace
 from unittest.mock import Mock
 
+import numpy as np
+import PIL
 import pytest
+from PIL import Image as RealImage
 
 
 def _package(monkeypatch, name):
@@ -98,6 +101,11 @@ def _load_figure_parser(monkeypatch):
         "rag.nlp",
         append_context2table_image4pdf=Mock(return_value=[]),
     )
+    _module(
+        monkeypatch,
+        "rag.utils.redis_conn",
+        REDIS_CONN=Mock(get=Mock(return_value=None)),
+    )
     _module(
         monkeypatch,
         "rag.utils.lazy_image",
@@ -297,3 +305,79 @@ def test_figure_wrappers_pass_dataset_language_to_model_and_parser(
     )
     assert module.VisionFigureParser.call_args.kwargs["lang"] == expected_language
     parser_instance.assert_called_once()
+
+
+def _load_figure_parser_with_real_images(monkeypatch):
+    module, fake_image = _load_figure_parser(monkeypatch)
+    # The parser module keeps its stubbed ``Image``; real images need the real PIL back.
+    monkeypatch.setitem(sys.modules, "PIL", PIL)
+    monkeypatch.setitem(sys.modules, "PIL.Image", RealImage)
+    module.Image = RealImage
+    return module, fake_image
+
+
+def _pattern_image(seed, size=(128, 96)):
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (6, 8), dtype=np.uint8)
+    return RealImage.fromarray(blocks).resize(size, RealImage.NEAREST).convert("RGB")
+
+
+@pytest.mark.p2
+def test_figure_signature_matches_rescaled_copies_and_skips_blank_images(monkeypatch):
+    module, _ = _load_figure_parser_with_real_images(monkeypatch)
+
+    phash, worth_describing = module.figure_signature(_pattern_image(1))
+    assert worth_describing
+    assert module.figure_signature(_pattern_image(1, size=(256, 192)))[0] == phash
+    assert module.figure_signature(_pattern_image(2))[0] != phash
+
+    assert module.figure_signature(RealImage.new("RGB", (200, 200), "white")) == (None, False)
+    assert module.figure_signature(_pattern_image(1, size=(16, 16))) == (None, False)
+
+
+@pytest.mark.p2
+def test_vision_figure_parser_describes_duplicate_figures_once(monkeypatch):
+    module, _ = _load_figure_parser_with_real_images(monkeypatch)
+    module.picture_vision_llm_chunk = Mock(side_effect=lambda binary, **_kwargs: f"size={binary.size}")
+    callback = Mock()
+
+    parser = module.VisionFigureParser(
+        vision_model=object(),
+        figures_data=[
+            (_pattern_image(1), ["a"]),
+            (_pattern_image(2), ["b"]),
+            (_pattern_image(1), ["c"]),
+            (RealImage.new("RGB", (200, 200), "white"), ["d"]),
+        ],
+    )
+    assembled = parser(callback=callback)
+
+    assert module.picture_vision_llm_chunk.call_count == 2
+    assert assembled[0][0][1] == "size=(128, 96)a"
+    assert assembled[2][0][1] == "size=(128, 96)c"
+    assert assembled[3][0][1] == ["d"]
+    assert _stats_message(callback).startswith("Figure descriptions: 2 vision calls for 4 figures, 1 duplicates, 0 cache hits")
+
+
+@pytest.mark.p2
+def test_vision_figure_parser_uses_tenant_description_cache(monkeypatch):
+    module, _ = _load_figure_parser_with_real_images(monkeypatch)
+    module.picture_vision_llm_chunk = Mock(return_value="fresh")
+    cache = {}
+    module.REDIS_CONN = Mock(get=Mock(side_effect=cache.get), set=Mock(side_effect=lambda k, v, _exp: cache.__setitem__(k, v)))
+
+    def run(tenant_id):
+        parser = module.VisionFigureParser(vision_model=object(), figures_data=[(_pattern_image(1), [""])], tenant_id=tenant_id)
+        return parser(callback=Mock())[0][0][1]
+
+    assert run("tenant-a") == "fresh"
+    assert run("tenant-a") == "fresh"
+    assert module.picture_vision_llm_chunk.call_count == 1
+    assert len(cache) == 1
+
+    run("tenant-b")
+    assert module.picture_vision_llm_chunk.call_count == 2
+
+
+def _stats_message(callback):
+    return [c.args[1] for c in callback.call_args_list if c.args and c.args[0] is None][-1]
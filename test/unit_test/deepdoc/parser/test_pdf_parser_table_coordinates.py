@@ -35,6 +35,7 @@ def _load_pdf_parser(monkeypatch):
         OCR=object,
         AscendLayoutRecognizer=object,
         LayoutRecognizer=object,
+        RecognitionScheduler=object,
         Recognizer=_FakeRecognizer,
         TableStructureRecognizer=object,
     )
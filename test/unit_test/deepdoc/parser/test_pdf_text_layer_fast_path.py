@@ -0,0 +1,159 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+"""Unit tests for the PDF text-layer fast path.
+
+Tests cover:
+- RAGFlowPdfParser._is_trustworthy_text_layer: which pages may skip OCR
+- RAGFlowPdfParser._text_layer_lines: building line boxes from chars
+"""
+
+import importlib.util
+import os
+import sys
+from unittest import mock
+
+# Load pdf_parser.py by file path with its heavy dependencies mocked, as in
+# test_pdf_garbled_detection.py; the helpers under test are pure Python.
+_MOCK_MODULES = [
+    "numpy",
+    "np",
+    "pdfplumber",
+    "xgboost",
+    "xgb",
+    "huggingface_hub",
+    "PIL",
+    "PIL.Image",
+    "pypdf",
+    "sklearn",
+    "sklearn.cluster",
+    "sklearn.metrics",
+    "common",
+    "common.file_utils",
+    "common.misc_utils",
+    "common.settings",
+    "common.token_utils",
+    "deepdoc",
+    "deepdoc.vision",
+    "deepdoc.parser",
+    "rag",
+    "rag.nlp",
+    "rag.prompts",
+    "rag.prompts.generator",
+]
+for _m in _MOCK_MODULES:
+    if _m not in sys.modules:
+        sys.modules[_m] = mock.MagicMock()
+
+
+def _find_project_root(marker="pyproject.toml"):
+    """Walk up from this file until a directory containing *marker* is found."""
+    cur = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        if os.path.exists(os.path.join(cur, marker)):
+            return cur
+        parent = os.path.dirname(cur)
+        if parent == cur:
+            raise FileNotFoundError(f"Could not locate project root (missing {marker})")
+        cur = parent
+
+
+_MODULE_PATH = os.path.join(_find_project_root(), "deepdoc", "parser", "pdf_parser.py")
+_spec = importlib.util.spec_from_file_location("pdf_parser_text_layer", _MODULE_PATH)
+_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_mod)
+
+_Parser = _mod.RAGFlowPdfParser
+is_trustworthy_text_layer = _Parser._is_trustworthy_text_layer
+text_layer_lines = _Parser._text_layer_lines
+
+
+def _line_chars(text, x0=10.0, top=10.0, width=5.0, height=10.0, fontname="Arial"):
+    """Lay out *text* as one line of fixed-width pdfplumber-like chars."""
+    return [{"text": t, "fontname": fontname, "x0": x0 + i * width, "x1": x0 + (i + 1) * width, "top": top, "bottom": top + height} for i, t in enumerate(text)]
+
+
+class TestIsTrustworthyTextLayer:
+    """Tests for the page-level fast-path decision."""
+
+    def test_clean_born_digital_page(self):
+        chars = _line_chars("The quick brown fox jumps over the lazy dog. " * 3)
+        assert is_trustworthy_text_layer(chars, 600, 800) is True
+
+    def test_empty_page_uses_ocr(self):
+        assert is_trustworthy_text_layer([], 600, 800) is False
+
+    def test_sparse_page_uses_ocr(self):
+        """A scanned page with only a header in its text layer must be OCRed."""
+        chars = _line_chars("Page 1 of 10")
+        assert is_trustworthy_text_layer(chars, 600, 800) is False
+
+    def test_garbled_chars_use_ocr(self):
+        chars = _line_chars("Normal text with garbage \ue000\ue001 inside it, more text here to pass the count.")
+        assert is_trustworthy_text_layer(chars, 600, 800) is False
+
+    def test_cid_placeholders_use_ocr(self):
+        chars = _line_chars("(cid:12)(cid:13) some words that are long enough to pass the minimum count")
+        assert is_trustworthy_text_layer(chars, 600, 800) is False
+
+    def test_image_heavy_page_uses_ocr(self):
+        chars = _line_chars("The quick brown fox jumps over the lazy dog. " * 3)
+        assert is_trustworthy_text_layer(chars, 600, 800, image_area=600 * 800 * 0.5) is False
+
+    def test_small_images_keep_fast_path(self):
+        chars = _line_chars("The quick brown fox jumps over the lazy dog. " * 3)
+        assert is_trustworthy_text_layer(chars, 600, 800, image_area=50 * 50) is True
+
+    def test_degenerate_page_size(self):
+        chars = _line_chars("The quick brown fox jumps over the lazy dog. " * 3)
+        assert is_trustworthy_text_layer(chars, 0, 0) is False
+
+
+class TestTextLayerLines:
+    """Tests for grouping chars into OCR-like line boxes."""
+
+    def test_single_line(self):
+        boxes = text_layer_lines(_line_chars("Hello world"))
+        assert len(boxes) == 1
+        assert boxes[0]["text"] == "Hello world"
+        assert boxes[0]["x0"] == 10.0
+        assert boxes[0]["top"] == 10.0
+        assert boxes[0]["bottom"] == 20.0
+
+    def test_lines_split_by_vertical_position(self):
+        chars = _line_chars("first", top=10.0) + _line_chars("second", top=30.0)
+        boxes = text_layer_lines(chars)
+        assert [b["text"] for b in boxes] == ["first", "second"]
+
+    def test_chars_out_of_stream_order(self):
+        chars = _line_chars("second", top=30.0) + list(reversed(_line_chars("first", top=10.0)))
+        boxes = text_layer_lines(chars)
+        assert [b["text"] for b in boxes] == ["first", "second"]
+
+    def test_slightly_misaligned_baseline_stays_on_line(self):
+        chars = _line_chars("ab", top=10.0) + _line_chars("cd", x0=20.0, top=11.5)
+        boxes = text_layer_lines(chars)
+        assert [b["text"] for b in boxes] == ["abcd"]
+
+    def test_wide_gap_splits_columns(self):
+        chars = _line_chars("left", x0=10.0) + _line_chars("right", x0=300.0)
+        boxes = text_layer_lines(chars)
+        assert [b["text"] for b in boxes] == ["left", "right"]
+        assert boxes[1]["x0"] == 300.0
+
+    def test_whitespace_only_chars_ignored(self):
+        chars = _line_chars("   ")
+        assert text_layer_lines(chars) == []
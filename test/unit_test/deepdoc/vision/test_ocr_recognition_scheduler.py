@@ -0,0 +1,174 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for ``RecognitionScheduler`` in ``deepdoc/vision/ocr.py``.
+
+The scheduler pools text-line crops from every page of a document so OCR
+recognition runs in full cross-page batches. These tests check that crops are
+held until every page has finished detection (or the flush size is reached),
+that each page gets back exactly its own texts, and that a recognition failure
+reaches every waiting page instead of hanging it.
+
+``ocr.py`` is loaded from source with its heavy runtime dependencies stubbed;
+the scheduler only needs an object with ``recognize_batch``.
+"""
+
+import asyncio
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+import pytest
+
+_STUB_MODULE_NAMES = (
+    "cv2",
+    "onnxruntime",
+    "huggingface_hub",
+    "common",
+    "common.file_utils",
+    "common.misc_utils",
+    "common.settings",
+    "deepdoc",
+    "deepdoc.vision",
+    "deepdoc.vision.operators",
+    "deepdoc.vision.postprocess",
+)
+
+
+@pytest.fixture
+def ocr_module():
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+
+    snapshot = {name: sys.modules.get(name) for name in _STUB_MODULE_NAMES}
+
+    def _stub(name, **attrs):
+        module = ModuleType(name)
+        for key, value in attrs.items():
+            setattr(module, key, value)
+        sys.modules[name] = module
+        return module
+
+    async def _thread_pool_exec(func, *args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    _stub("cv2")
+    _stub("onnxruntime")
+    _stub("huggingface_hub", snapshot_download=lambda *a, **k: None)
+    common = _stub("common")
+    common.__path__ = [os.path.join(project_root, "common")]
+    _stub("common.file_utils", get_project_base_directory=lambda *a: project_root)
+    _stub("common.misc_utils", pip_install_torch=lambda: None, thread_pool_exec=_thread_pool_exec)
+    common.settings = _stub("common.settings", PARALLEL_DEVICES=0)
+    deepdoc = _stub("deepdoc")
+    deepdoc.__path__ = [os.path.join(project_root, "deepdoc")]
+    vision = _stub("deepdoc.vision")
+    vision.__path__ = [os.path.join(project_root, "deepdoc", "vision")]
+    vision.operators = _stub("deepdoc.vision.operators")
+    _stub("deepdoc.vision.postprocess", build_post_process=lambda *a, **k: None)
+
+    ocr_path = os.path.join(project_root, "deepdoc", "vision", "ocr.py")
+    spec = importlib.util.spec_from_file_location("deepdoc.vision.ocr", ocr_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["deepdoc.vision.ocr"] = module
+    spec.loader.exec_module(module)
+
+    try:
+        yield module
+    finally:
+        sys.modules.pop("deepdoc.vision.ocr", None)
+        for name in _STUB_MODULE_NAMES:
+            if snapshot[name] is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = snapshot[name]
+
+
+class _FakeOCR:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def recognize_batch(self, img_list, device_id=None):
+        self.calls.append((list(img_list), device_id))
+        if self.fail:
+            raise RuntimeError("recognizer crashed")
+        return [f"text-{img}" for img in img_list]
+
+
+def test_crops_from_all_pages_share_one_batch(ocr_module):
+    ocr = _FakeOCR()
+    scheduler = ocr_module.RecognitionScheduler(ocr, pages=3, flush_size=100)
+
+    async def run():
+        return await asyncio.gather(
+            scheduler.recognize(["p1a", "p1b"]),
+            scheduler.recognize([]),
+            scheduler.recognize(["p3a"]),
+        )
+
+    results = asyncio.run(run())
+
+    assert results == [["text-p1a", "text-p1b"], [], ["text-p3a"]]
+    assert len(ocr.calls) == 1
+    assert sorted(ocr.calls[0][0]) == ["p1a", "p1b", "p3a"]
+    assert scheduler.batches == 1
+    assert scheduler.crops == 3
+
+
+def test_flush_size_triggers_early_batch(ocr_module):
+    ocr = _FakeOCR()
+    scheduler = ocr_module.RecognitionScheduler(ocr, pages=3, flush_size=2)
+
+    async def run():
+        return await asyncio.gather(
+            scheduler.recognize(["a", "b"]),
+            scheduler.recognize(["c"]),
+            scheduler.recognize(["d"]),
+        )
+
+    results = asyncio.run(run())
+
+    assert results == [["text-a", "text-b"], ["text-c"], ["text-d"]]
+    assert [sorted(crops) for crops, _ in ocr.calls] == [["a", "b"], ["c", "d"]]
+
+
+def test_crops_are_pooled_per_device(ocr_module):
+    ocr = _FakeOCR()
+    scheduler = ocr_module.RecognitionScheduler(ocr, pages=4, flush_size=100)
+
+    async def run():
+        return await asyncio.gather(
+            scheduler.recognize(["a"], 0),
+            scheduler.recognize(["b"], 1),
+            scheduler.recognize(["c"], 0),
+            scheduler.recognize(["d"], 1),
+        )
+
+    results = asyncio.run(run())
+
+    assert results == [["text-a"], ["text-b"], ["text-c"], ["text-d"]]
+    assert sorted((sorted(crops), device) for crops, device in ocr.calls) == [(["a", "c"], 0), (["b", "d"], 1)]
+
+
+def test_recognition_failure_reaches_every_page(ocr_module):
+    scheduler = ocr_module.RecognitionScheduler(_FakeOCR(fail=True), pages=2, flush_size=100)
+
+    async def run():
+        return await asyncio.gather(scheduler.recognize(["a"]), scheduler.recognize(["b"]), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
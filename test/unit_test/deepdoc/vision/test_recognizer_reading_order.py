@@ -0,0 +1,286 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Checks the NumPy sorting and overlap helpers of ``Recognizer`` against the
+loop implementations they replaced, on generated page box sets: multi-column
+text, table cells on a grid and pages of small characters.
+"""
+
+import importlib.util
+import os
+import random
+import sys
+from functools import cmp_to_key
+from types import ModuleType
+
+import pytest
+
+_STUB_MODULE_NAMES = (
+    "cv2",
+    "common",
+    "common.file_utils",
+    "deepdoc",
+    "deepdoc.vision",
+    "deepdoc.vision.operators",
+    "deepdoc.vision.ocr",
+)
+
+
+@pytest.fixture(scope="module")
+def Recognizer():
+    # Same stubbing as test_recognizer_column_fit: the sorting helpers need none of these modules.
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+    snapshot = {name: sys.modules.get(name) for name in _STUB_MODULE_NAMES}
+
+    def _stub(name, **attrs):
+        module = ModuleType(name)
+        for key, value in attrs.items():
+            setattr(module, key, value)
+        sys.modules[name] = module
+        return module
+
+    _stub("cv2")
+    _stub("common").__path__ = [os.path.join(project_root, "common")]
+    _stub("common.file_utils", get_project_base_directory=lambda: project_root)
+    _stub("deepdoc").__path__ = [os.path.join(project_root, "deepdoc")]
+    _stub("deepdoc.vision").__path__ = [os.path.join(project_root, "deepdoc", "vision")]
+    _stub("deepdoc.vision.operators", preprocess=lambda *a, **k: None)
+    _stub("deepdoc.vision.ocr", load_model=lambda *a, **k: None)
+
+    spec = importlib.util.spec_from_file_location("deepdoc.vision.recognizer", os.path.join(project_root, "deepdoc", "vision", "recognizer.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["deepdoc.vision.recognizer"] = module
+    spec.loader.exec_module(module)
+    try:
+        yield module.Recognizer
+    finally:
+        sys.modules.pop("deepdoc.vision.recognizer", None)
+        for name in _STUB_MODULE_NAMES:
+            if snapshot[name] is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = snapshot[name]
+
+
+# The previous implementations, kept verbatim as the reference.
+def _old_sort_Y_firstly(arr, threshold):
+    def cmp(c1, c2):
+        diff = c1["top"] - c2["top"]
+        if abs(diff) < threshold:
+            diff = c1["x0"] - c2["x0"]
+        return diff
+
+    return sorted(arr, key=cmp_to_key(cmp))
+
+
+def _old_sort_X_firstly(arr, threshold):
+    def cmp(c1, c2):
+        diff = c1["x0"] - c2["x0"]
+        if abs(diff) < threshold:
+            diff = c1["top"] - c2["top"]
+        return diff
+
+    return sorted(arr, key=cmp_to_key(cmp))
+
+
+def _old_sort_firstly(arr, key, tiebreak):
+    for i in range(len(arr) - 1):
+        for j in range(i, -1, -1):
+            if key not in arr[j] or key not in arr[j + 1]:
+                continue
+            if arr[j + 1][key] < arr[j][key] or (arr[j + 1][key] == arr[j][key] and arr[j + 1][tiebreak] < arr[j][tiebreak]):
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+    return arr
+
+
+def _old_find_overlapped(Recognizer, box, bxs, naive=False):
+    if not bxs:
+        return
+    s, e, ii = 0, len(bxs), 0
+    while s < e and not naive:
+        ii = (e + s) // 2
+        pv = bxs[ii]
+        if box["bottom"] < pv["top"]:
+            e = ii
+            continue
+        if box["top"] > pv["bottom"]:
+            s = ii + 1
+            continue
+        break
+    while s < ii:
+        if box["top"] > bxs[s]["bottom"]:
+            s += 1
+        break
+    while e - 1 > ii:
+        if box["bottom"] < bxs[e - 1]["top"]:
+            e -= 1
+        break
+    max_overlapped_i, max_overlapped = None, 0
+    for i in range(s, e):
+        ov = Recognizer.overlapped_area(bxs[i], box)
+        if ov <= max_overlapped:
+            continue
+        max_overlapped_i = i
+        max_overlapped = ov
+    return max_overlapped_i
+
+
+def _old_find_overlapped_with_threshold(Recognizer, box, boxes, thr=0.3):
+    if not boxes:
+        return
+    max_overlapped_i, max_overlapped, _max_overlapped = None, thr, 0
+    for i in range(len(boxes)):
+        ov = Recognizer.overlapped_area(box, boxes[i])
+        _ov = Recognizer.overlapped_area(boxes[i], box)
+        if (ov, _ov) < (max_overlapped, _max_overlapped):
+            continue
+        max_overlapped_i = i
+        max_overlapped = ov
+        _max_overlapped = _ov
+    return max_overlapped_i
+
+
+def _old_layouts_cleanup(Recognizer, boxes, layouts, far=2, thr=0.7):
+    def not_overlapped(a, b):
+        return any([a["x1"] < b["x0"], a["x0"] > b["x1"], a["bottom"] < b["top"], a["top"] > b["bottom"]])
+
+    i = 0
+    while i + 1 < len(layouts):
+        j = i + 1
+        while j < min(i + far, len(layouts)) and (layouts[i].get("type", "") != layouts[j].get("type", "") or not_overlapped(layouts[i], layouts[j])):
+            j += 1
+        if j >= min(i + far, len(layouts)):
+            i += 1
+            continue
+        if Recognizer.overlapped_area(layouts[i], layouts[j]) < thr and Recognizer.overlapped_area(layouts[j], layouts[i]) < thr:
+            i += 1
+            continue
+        if layouts[i].get("score") and layouts[j].get("score"):
+            if layouts[i]["score"] > layouts[j]["score"]:
+                layouts.pop(j)
+            else:
+                layouts.pop(i)
+            continue
+        area_i, area_i_1 = 0, 0
+        for b in boxes:
+            if not not_overlapped(b, layouts[i]):
+                area_i += Recognizer.overlapped_area(b, layouts[i], False)
+            if not not_overlapped(b, layouts[j]):
+                area_i_1 += Recognizer.overlapped_area(b, layouts[j], False)
+        if area_i > area_i_1:
+            layouts.pop(j)
+        else:
+            layouts.pop(i)
+    return layouts
+
+
+def _box(rng, x0, top, w, h, **extra):
+    # Snap to a coarse grid so that ties and touching edges actually occur.
+    x0, top = round(x0, 1), round(top, 1)
+    return {"x0": x0, "x1": round(x0 + w, 1), "top": top, "bottom": round(top + h, 1), "id": rng.random(), **extra}
+
+
+def _columns_page(rng):
+    boxes = []
+    ncol = rng.choice([1, 2, 3])
+    for c in range(ncol):
+        top = rng.uniform(20, 60)
+        while top < 800:
+            h = rng.choice([8.0, 10.0, 12.0, 30.0])
+            boxes.append(_box(rng, 40 + c * 520 / ncol + rng.uniform(-3, 3), top, 520 / ncol - rng.uniform(5, 40), h))
+            top += h + rng.uniform(-2, 8)
+    rng.shuffle(boxes)
+    return boxes
+
+
+def _table_page(rng):
+    boxes = []
+    ncol, nrow = rng.randint(2, 8), rng.randint(2, 25)
+    for r in range(nrow):
+        for c in range(ncol):
+            if rng.random() < 0.15:
+                continue
+            extra = {}
+            if rng.random() < 0.85:
+                extra["R"] = r + rng.choice([0, 0, 0, 1])
+            if rng.random() < 0.85:
+                extra["C"] = c + rng.choice([0, 0, 0, -1])
+            boxes.append(_box(rng, 50 + c * 60 + rng.uniform(-4, 4), 100 + r * 14 + rng.uniform(-3, 3), rng.uniform(20, 58), rng.uniform(6, 13), **extra))
+    rng.shuffle(boxes)
+    return boxes
+
+
+def _chars(rng, boxes, n):
+    chars = []
+    for _ in range(n):
+        if boxes and rng.random() < 0.8:
+            b = rng.choice(boxes)
+            x0, top = rng.uniform(b["x0"] - 2, b["x1"]), rng.uniform(b["top"] - 2, b["bottom"])
+        else:
+            x0, top = rng.uniform(0, 600), rng.uniform(0, 850)
+        chars.append(_box(rng, x0, top, rng.choice([0.0, 3.0, 5.0]), rng.choice([0.0, 6.0, 9.0])))
+    return chars
+
+
+def _pages(n=60):
+    rng = random.Random(48)
+    for _ in range(n):
+        yield rng, (_columns_page(rng) if rng.random() < 0.5 else _table_page(rng))
+
+
+def test_sorts_match_the_comparator_implementations(Recognizer):
+    for _, boxes in _pages():
+        for thr in (0, -1, float("nan"), 4.0):
+            assert Recognizer.sort_Y_firstly(boxes, thr) == _old_sort_Y_firstly(boxes, thr)
+            assert Recognizer.sort_X_firstly(boxes, thr) == _old_sort_X_firstly(boxes, thr)
+            assert Recognizer.sort_R_firstly(boxes, thr) == _old_sort_firstly(_old_sort_Y_firstly(boxes, thr), "R", "x0")
+            assert Recognizer.sort_C_firstly(boxes, thr) == _old_sort_firstly(_old_sort_X_firstly(boxes, thr), "C", "top")
+
+
+def test_find_overlapped_matches_the_scan(Recognizer):
+    for rng, boxes in _pages():
+        bxs = Recognizer.sort_Y_firstly(boxes, 3.0)
+        chars = _chars(rng, bxs, 300)
+        for naive in (False, True):
+            expected = [_old_find_overlapped(Recognizer, c, bxs, naive) for c in chars]
+            assert Recognizer.find_overlapped_many(chars, bxs, naive) == expected
+            assert [Recognizer.find_overlapped(c, bxs, naive) for c in chars[:20]] == expected[:20]
+    assert Recognizer.find_overlapped(chars[0], []) is None
+    assert Recognizer.find_overlapped_many([], bxs) == []
+
+
+def test_find_overlapped_with_threshold_matches_the_scan(Recognizer):
+    for rng, boxes in _pages():
+        rows = [_box(rng, 0, t, 600, rng.choice([10.0, 14.0, 20.0])) for t in range(90, 500, 14)]
+        rows += [dict(r) for r in rng.sample(rows, 3)]
+        for b in boxes:
+            for thr in (0.3, 0.0):
+                assert Recognizer.find_overlapped_with_threshold(b, rows, thr) == _old_find_overlapped_with_threshold(Recognizer, b, rows, thr)
+    assert Recognizer.find_overlapped_with_threshold(boxes[0], []) is None
+
+
+def test_layouts_cleanup_matches_the_scan(Recognizer):
+    for rng, boxes in _pages():
+        layouts = []
+        for b in rng.sample(boxes, min(len(boxes), 30)):
+            lt = _box(rng, b["x0"] - rng.uniform(0, 5), b["top"] - rng.uniform(0, 5), b["x1"] - b["x0"] + rng.uniform(0, 60), b["bottom"] - b["top"] + rng.uniform(0, 40))
+            lt["type"] = rng.choice(["text", "table"])
+            if rng.random() < 0.3:
+                lt["score"] = rng.choice([0.5, 0.9])
+            layouts.extend([lt, dict(lt, x1=lt["x1"] + 1)] if rng.random() < 0.3 else [lt])
+        layouts = Recognizer.sort_Y_firstly(layouts, 5.0)
+        for far, thr in ((2, 0.7), (5, 0.5)):
+            assert Recognizer.layouts_cleanup(boxes, list(layouts), far, thr) == _old_layouts_cleanup(Recognizer, boxes, list(layouts), far, thr)
+    assert Recognizer.layouts_cleanup([], list(layouts)) == _old_layouts_cleanup(Recognizer, [], list(layouts))
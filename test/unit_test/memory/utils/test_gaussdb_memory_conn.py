@@ -109,6 +109,50 @@ def test_merge_sql_uses_dual_and_resets_other_vector_dimensions():
     assert params[0][-1] == "[0.1,0.2,0.3]"
 
 
+def test_size_column_is_created_and_added_to_legacy_tables():
+    builder = GaussDBMemoryDDLBuilder(schema="public")
+
+    assert "size_long NUMBER(19)" in builder.build_memory_table_ddl("ragflow_mem_abc")
+    assert builder.build_size_column_ddl("ragflow_mem_abc") == 'ALTER TABLE "public"."ragflow_mem_abc" ADD COLUMN IF NOT EXISTS size_long NUMBER(19)'
+
+
+def test_message_size_sum_aggregates_in_sql_per_memory(monkeypatch):
+    conn = make_conn()
+    executed = []
+    fetched = []
+
+    def fake_fetch_all(sql, params):
+        fetched.append((sql, params))
+        return [{"memory_id": "mem1", "size_sum": Decimal("120")}, {"memory_id": "mem2", "size_sum": None}]
+
+    monkeypatch.setattr(conn, "_table_exists", lambda _table: True)
+    monkeypatch.setattr(conn, "_column_exists", lambda _table, _column: False)
+    monkeypatch.setattr(conn, "_execute_statements", lambda statements: executed.extend(statements))
+    monkeypatch.setattr(conn, "_fetch_all", fake_fetch_all)
+
+    assert conn.get_message_size_sum("memory_tenant", ["mem1", "mem2", ""]) == {"mem1": 120, "mem2": 0}
+    assert any("ADD COLUMN IF NOT EXISTS size_long" in statement for statement in executed if isinstance(statement, str))
+    sql, params = fetched[0]
+    assert "SUM(size_long)" in sql
+    assert "GROUP BY memory_id" in sql
+    assert "content" not in sql
+    assert params == ["mem1", "mem2"]
+
+    monkeypatch.setattr(conn, "_table_exists", lambda _table: False)
+    assert conn.get_message_size_sum("memory_tenant", ["mem1"]) == {}
+    assert conn.get_message_size_sum("memory_tenant", []) == {}
+
+
+def test_get_fields_returns_stored_message_size():
+    conn = make_conn()
+    result = SearchResult(total=2, messages=[{"id": "mem1_1", "message_id": 1, "size_long": 42}, {"id": "mem1_2", "message_id": 2, "size_long": None}])
+
+    fields = conn.get_fields(result, ["message_id", "size"])
+
+    assert fields == {"mem1_1": {"message_id": 1, "size": 42}, "mem1_2": {"message_id": 2, "size": None}}
+    assert conn.convert_field_name("size") == "size_long"
+
+
 def test_where_clause_skips_empty_string_filters_and_adds_memory_boundary():
     conn = make_conn()
 
@@ -0,0 +1,168 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for concurrent RAPTOR layer summarization, batched embedding and checkpoints."""
+
+import asyncio
+import importlib.util
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from common.asyncio_utils import LoopLocalSemaphore
+
+_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../../.."))
+
+
+class _Redis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, k):
+        return self.data.get(k)
+
+    def set(self, k, v, exp=3600):
+        self.data[k] = v
+        return True
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+
+@pytest.fixture
+def raptor_module(monkeypatch):
+    # The module is loaded by path with its service dependencies stubbed; the package conftest may have stubbed common.exceptions.
+    def _load(name, path):
+        spec = importlib.util.spec_from_file_location(name, os.path.join(_ROOT, path))
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, name, module)
+        spec.loader.exec_module(module)
+        return module
+
+    if not hasattr(sys.modules.get("common.exceptions"), "TaskCanceledException"):
+        _load("common.exceptions", "common/exceptions.py")
+    redis = _Redis()
+    stubs = {
+        "api.db.services.task_service": {"has_canceled": lambda task_id: False},
+        "common.settings": {"EMBEDDING_BATCH_SIZE": 4},
+        "rag.utils.redis_conn": {"REDIS_CONN": redis},
+        "rag.graphrag.utils": {
+            "chat_limiter": LoopLocalSemaphore(10),
+            "get_embed_cache": lambda *a: None,
+            "get_embed_cache_batch": lambda llmnm, txts: [None] * len(txts),
+            "get_llm_cache": lambda *a: None,
+            "set_embed_cache": lambda *a: None,
+            "set_embed_cache_batch": lambda *a: None,
+            "set_llm_cache": lambda *a: None,
+        },
+        "rag.advanced_rag.knowlege_compile._common": {"knowledge_compile_gen_conf": lambda mdl: {}},
+    }
+    for name, attrs in stubs.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        monkeypatch.setitem(sys.modules, name, module)
+    package = types.ModuleType("rag.advanced_rag.knowlege_compile")
+    package.__path__ = [os.path.join(_ROOT, "rag/advanced_rag/knowlege_compile")]
+    monkeypatch.setitem(sys.modules, "rag.advanced_rag.knowlege_compile", package)
+    module = _load("rag.advanced_rag.knowlege_compile.raptor", "rag/advanced_rag/knowlege_compile/raptor.py")
+    monkeypatch.setattr(module, "RAPTOR_TENANT_CONCURRENCY", 2)
+    module.redis = redis
+    return module
+
+
+class _Chat:
+    llm_name = "chat"
+    max_length = 8192
+    tenant_id = "t1"
+
+    def __init__(self, fail=()):
+        self.calls, self.running, self.peak, self.fail = [], 0, 0, fail
+
+    async def async_chat(self, system, history, gen_conf):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        content = system.split("\n\n")[-1].replace("\n", " ")
+        self.calls.append(content)
+        if any(f in content for f in self.fail):
+            return "**ERROR**: rate limited"
+        return f"Title {content}\nSummary of {content}"
+
+
+class _Embd:
+    llm_name = "embd"
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, txts):
+        self.batches.append(len(txts))
+        return np.array([[len(t), 1.0] for t in txts]), 0
+
+
+def _raptor(module, chat, embd=None, max_errors=3):
+    return module.RecursiveAbstractiveProcessing4TreeOrganizedRetrieval(4, chat, embd or _Embd(), "{cluster_content}", max_errors=max_errors)
+
+
+def test_layer_summarizes_concurrently_and_embeds_in_batches(raptor_module):
+    chat, embd = _Chat(), _Embd()
+    clusters = [[f"c{i}a", f"c{i}b"] for i in range(6)]
+    results, resumed = asyncio.run(_raptor(raptor_module, chat, embd)._summarize_layer(clusters))
+
+    assert resumed == 0 and len(chat.calls) == 6
+    assert chat.peak == 2
+    assert [r[0] for r in results] == [f"Title c{i}a c{i}b" for i in range(6)]
+    assert results[0][1] == "Title c0a c0b\nSummary of c0a c0b"
+    # Batches of EMBEDDING_BATCH_SIZE instead of one call per summary.
+    assert embd.batches == [4, 2]
+    assert results[5][2].tolist() == [len(results[5][1]), 1.0]
+
+
+def test_rerun_resumes_from_checkpoints(raptor_module, monkeypatch):
+    monkeypatch.setattr(asyncio, "sleep", _no_sleep(asyncio.sleep))
+    clusters = [[f"c{i}"] for i in range(5)]
+    first = _Chat(fail=("c3",))
+    results, _ = asyncio.run(_raptor(raptor_module, first)._summarize_layer(clusters))
+    assert results[3] is None and sum(r is not None for r in results) == 4
+
+    second = _Chat()
+    results, resumed = asyncio.run(_raptor(raptor_module, second)._summarize_layer(clusters))
+    assert resumed == 4 and second.calls == ["c3"]
+    assert [r[0] for r in results] == [f"Title c{i}" for i in range(5)]
+
+
+def test_summaries_follow_cluster_order(raptor_module):
+    chat = _Chat()
+    chunks = [(f"text {i}", np.array([1.0, i % 2 * 0.01]), [f"id{i}"]) for i in range(12)]
+    raptor = _raptor(raptor_module, chat)
+    raptor._small_layer_collapse = 2
+    out, layers = asyncio.run(raptor(chunks, 0))
+
+    assert layers[0] == (0, 12) and len(layers) >= 2
+    first_layer = out[layers[1][0] : layers[1][1]]
+    # Each summary carries its cluster's leaves; clusters are contiguous, so the ids come in order.
+    leaf_ids = [i for summary in first_layer for i in summary[2]]
+    assert leaf_ids == sorted(leaf_ids, key=lambda s: int(s[2:]))
+
+
+def _no_sleep(sleep):
+    async def _sleep(delay, *args, **kwargs):
+        return await sleep(0)
+
+    return _sleep
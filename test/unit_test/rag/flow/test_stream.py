@@ -0,0 +1,79 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+import asyncio
+from types import SimpleNamespace
+
+from rag.flow.base import ProcessBase, ProcessParamBase, run_stream
+
+
+class _Param(ProcessParamBase):
+    def check(self):
+        return True
+
+
+class _Stage(ProcessBase):
+    component_name = "Stage"
+
+    def __init__(self, id, log, delay=0.0, fail_at=None):
+        # ComponentBase.__init__ checks the canvas type against agent.canvas, which needs the full server settings.
+        self._canvas, self._id, self._param = SimpleNamespace(), id, _Param()
+        self.callback = lambda *args, **kwargs: None
+        self.log, self.delay, self.fail_at = log, delay, fail_at
+
+    async def _open_stream(self, upstream_id, total, **kwargs):
+        self.set_output("output_format", "chunks")
+        self.upstream_id, self.total = upstream_id, total
+
+    async def _invoke_batch(self, chunks):
+        self.log.append((self._id, "start", chunks[0]["i"]))
+        await asyncio.sleep(self.delay)
+        if chunks[0]["i"] == self.fail_at:
+            raise ValueError("bad batch")
+        self.log.append((self._id, "end", chunks[0]["i"]))
+        return [{**c, self._id: True} for c in chunks]
+
+
+def test_stages_overlap_and_keep_the_order():
+    async def run():
+        log = []
+        stages = [_Stage("a", log, 0.01), _Stage("b", log, 0.02)]
+        for stage in stages:
+            assert await stage.open_stream("up", 10, name="doc.pdf")
+        await run_stream([{"i": i} for i in range(10)], stages, batch_size=2, queue_size=1)
+        return stages, log
+
+    stages, log = asyncio.run(run())
+    assert stages[0].output("name") == "doc.pdf" and stages[0].total == 10
+    assert stages[1].output("chunks") == [{"i": i, "a": True, "b": True} for i in range(10)]
+    assert [c["i"] for c in stages[0].output("chunks")] == list(range(10))
+    # "b" starts on the first batch before "a" is through all of them.
+    assert log.index(("b", "start", 0)) < log.index(("a", "end", 8))
+
+
+def test_a_failing_stage_stops_the_stream():
+    async def run():
+        log = []
+        stages = [_Stage("a", log), _Stage("b", log, fail_at=4), _Stage("c", log)]
+        for stage in stages:
+            await stage.open_stream("up", 100)
+        await asyncio.wait_for(run_stream([{"i": i} for i in range(100)], stages, batch_size=2, queue_size=1), 5)
+        return stages, log
+
+    stages, log = asyncio.run(run())
+    assert stages[1].error() == "bad batch"
+    assert not stages[0].error() and not stages[0].output("chunks")
+    # With at most one batch queued per stage, "a" never gets far past the failure.
+    assert max(i for cpn, step, i in log if cpn == "a") < 20
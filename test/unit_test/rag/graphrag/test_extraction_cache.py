@@ -0,0 +1,109 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+from types import SimpleNamespace
+
+import pytest
+
+from rag.graphrag import extraction_cache
+from rag.graphrag.general.graph_extractor import GraphExtractor
+
+
+class _FakeStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def obj_exist(self, bucket, fnm):
+        return (bucket, fnm) in self.objects
+
+    def get(self, bucket, fnm):
+        return self.objects.get((bucket, fnm))
+
+    def put(self, bucket, fnm, binary):
+        self.objects[(bucket, fnm)] = binary
+
+
+RESPONSES = {
+    "alice": '("entity"<|>ALICE<|>PERSON<|>Alice is an engineer)##("entity"<|>BOB<|>PERSON<|>Bob is a manager)##("relationship"<|>ALICE<|>BOB<|>Alice reports to Bob<|>work<|>7)<|COMPLETE|>',
+    "carol": '("entity"<|>CAROL<|>PERSON<|>Carol is a designer)<|COMPLETE|>',
+}
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = _FakeStorage()
+    monkeypatch.setattr(extraction_cache.settings, "STORAGE_IMPL", storage, raising=False)
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_ENABLED", True)
+    monkeypatch.setattr("rag.graphrag.general.extractor.EXTRACTION_CACHE_ENABLED", True)
+    return storage
+
+
+def _extractor(monkeypatch, calls, entity_types=("person",), llm_name="test-llm"):
+    extractor = GraphExtractor(SimpleNamespace(llm_name=llm_name, max_length=4096), entity_types=list(entity_types), max_gleanings=0)
+
+    async def fake_async_chat(system, _history, _gen_conf=None, task_id=""):
+        calls.append(system)
+        return next(v for k, v in RESPONSES.items() if k in system)
+
+    monkeypatch.setattr(extractor, "_async_chat", fake_async_chat)
+    return extractor
+
+
+@pytest.mark.asyncio
+async def test_rebuild_reuses_cached_chunks(monkeypatch, storage):
+    calls, messages = [], []
+    chunks = ["alice works with bob", "carol draws"]
+    ents, rels = await _extractor(monkeypatch, calls)("doc-1", chunks, lambda *_a, msg="", **_kw: messages.append(msg), kb_id="kb")
+    assert len(calls) == 2
+    assert len(storage.objects) == 2
+    assert "Extraction cache: 0 hits, 2 misses of 2 chunks, 2 stored." in messages
+
+    calls.clear()
+    messages.clear()
+    cached_ents, cached_rels = await _extractor(monkeypatch, calls)("doc-1", chunks, lambda *_a, msg="", **_kw: messages.append(msg), kb_id="kb")
+    assert calls == []
+    assert "Extraction cache: 2 hits, 0 misses of 2 chunks, 0 stored." in messages
+    assert sorted(e["entity_name"] for e in cached_ents) == sorted(e["entity_name"] for e in ents) == ["ALICE", "BOB", "CAROL"]
+    assert [(r["src_id"], r["tgt_id"], r["weight"], r["description"]) for r in cached_rels] == [(r["src_id"], r["tgt_id"], r["weight"], r["description"]) for r in rels]
+
+
+@pytest.mark.asyncio
+async def test_cached_records_are_attributed_to_the_current_document(monkeypatch, storage):
+    calls = []
+    await _extractor(monkeypatch, calls)("doc-1", ["alice works with bob"], kb_id="kb")
+    ents, rels = await _extractor(monkeypatch, calls)("doc-2", ["alice works with bob"], kb_id="kb")
+    assert len(calls) == 1
+    assert {sid for e in ents for sid in e["source_id"]} == {"doc-2"}
+    assert {sid for r in rels for sid in r["source_id"]} == {"doc-2"}
+
+
+@pytest.mark.asyncio
+async def test_prompt_settings_and_llm_are_part_of_the_key(monkeypatch, storage):
+    calls = []
+    await _extractor(monkeypatch, calls)("doc-1", ["carol draws"], kb_id="kb")
+    await _extractor(monkeypatch, calls, entity_types=("person", "organization"))("doc-1", ["carol draws"], kb_id="kb")
+    await _extractor(monkeypatch, calls, llm_name="other-llm")("doc-1", ["carol draws"], kb_id="kb")
+    assert len(calls) == 3
+    assert len(storage.objects) == 3
+
+
+@pytest.mark.asyncio
+async def test_no_cache_without_kb_id(monkeypatch, storage):
+    calls = []
+    await _extractor(monkeypatch, calls)("doc-1", ["carol draws"])
+    await _extractor(monkeypatch, calls)("doc-1", ["carol draws"])
+    assert len(calls) == 2
+    assert storage.objects == {}
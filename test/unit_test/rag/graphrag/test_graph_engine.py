@@ -0,0 +1,128 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import importlib.util
+import random
+import sys
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+import networkx as nx
+import pytest
+
+from rag.graphrag import graph_engine
+from rag.graphrag.utils import merge_tuples, n_neighbor
+
+
+def _reference_n_neighbor(graph, node, n_hop=2):
+    """The per-node networkx enumeration n_neighbor used before the CSR engine."""
+    source_edge = list(graph.edges(node))
+    if not source_edge:
+        return []
+    for _ in range(n_hop - 1):
+        source_edge = [t for pair in source_edge for t in merge_tuples([pair], list(graph.edges(pair[-1])))]
+    wts = nx.get_edge_attributes(graph, "weight")
+    return [{"path": path, "weights": [wts.get((f, t), wts.get((t, f), 0)) for f, t in zip(path, path[1:])]} for path in source_edge]
+
+
+def _random_graph(seed):
+    rnd = random.Random(seed)
+    graph = nx.gnm_random_graph(rnd.randint(1, 30), rnd.randint(0, 60), seed=seed)
+    graph = nx.relabel_nodes(graph, {i: f"N{i}" for i in graph})
+    for node in list(graph)[:2]:
+        if rnd.random() < 0.5:
+            graph.add_edge(node, node)
+    for f, t in graph.edges:
+        if rnd.random() < 0.9:
+            graph[f][t]["weight"] = rnd.randint(1, 9)
+    return graph
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_pagerank_matches_networkx(seed):
+    graph = _random_graph(seed)
+    expected = nx.pagerank(graph)
+    result = graph_engine.pagerank(graph)
+    assert list(result) == list(expected)
+    assert result == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("n_hop", [1, 2, 3])
+def test_batched_n_hop_matches_per_node_enumeration(seed, n_hop):
+    graph = _random_graph(seed)
+    batched = graph_engine.n_hop_neighbors(graph, list(graph), n_hop)
+    for node in graph:
+        assert batched[node] == _reference_n_neighbor(graph, node, n_hop)
+        assert n_neighbor(graph, node, n_hop) == batched[node]
+
+
+def test_connected_components_follow_node_order():
+    graph = nx.Graph([("C", "D"), ("A", "B"), ("B", "E")])
+    graph.add_node("F")
+    assert graph_engine.connected_components(graph) == [["C", "D"], ["A", "B", "E"], ["F"]]
+    assert graph_engine.largest_connected_component(graph) == ["A", "B", "E"]
+    assert graph_engine.connected_components(nx.Graph()) == []
+
+
+def test_pagerank_of_empty_graph():
+    assert graph_engine.pagerank(nx.Graph()) == {}
+
+
+@pytest.fixture
+def leiden(monkeypatch):
+    calls = []
+
+    def hierarchical_leiden(graph, max_cluster_size, random_seed):
+        calls.append(sorted(graph.nodes))
+        return [SimpleNamespace(level=0, node=n, cluster=i % 2) for i, n in enumerate(sorted(graph.nodes))]
+
+    partition = ModuleType("graspologic.partition")
+    partition.hierarchical_leiden = hierarchical_leiden
+    monkeypatch.setitem(sys.modules, "graspologic", ModuleType("graspologic"))
+    monkeypatch.setitem(sys.modules, "graspologic.partition", partition)
+    module_path = Path(__file__).resolve().parents[4] / "rag" / "graphrag" / "general" / "leiden.py"
+    spec = importlib.util.spec_from_file_location("test_graph_engine_leiden", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, calls
+
+
+def test_leiden_reuses_unchanged_graph(leiden):
+    module, calls = leiden
+    graph = nx.Graph([("a", "b"), ("b", "c"), ("x", "y")])
+    first = module.run(graph, {})
+    assert calls == [["A", "B", "C"]]
+    assert module.run(graph.copy(), {}) == first
+    assert len(calls) == 1
+    graph.add_edge("c", "d")
+    module.run(graph, {})
+    assert calls[-1] == ["A", "B", "C", "D"]
+
+
+def test_leiden_without_lcc_reclusters_changed_components_only(leiden):
+    module, calls = leiden
+    graph = nx.Graph([("a", "b"), ("b", "c"), ("x", "y")])
+    graph.add_node("lonely")
+    result = module.run(graph, {"use_lcc": False})
+    assert calls == [["a", "b", "c"], ["x", "y"]]
+    clusters = {c for c in result[0]}
+    assert clusters == {"0", "1", "2", "3"}
+    assert sorted(result[0]["2"]["nodes"] + result[0]["3"]["nodes"]) == ["x", "y"]
+
+    graph.add_edge("x", "z")
+    module.run(graph, {"use_lcc": False})
+    assert calls[2:] == [["x", "y", "z"]]
@@ -0,0 +1,246 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import json
+from types import SimpleNamespace
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import rag.graphrag.utils as graphrag_utils
+from rag.graphrag.utils import GraphChange, get_from_to
+
+
+def _matches(chunk, condition):
+    for key, value in condition.items():
+        if key == "id":
+            if chunk["id"] not in value:
+                return False
+            continue
+        stored = chunk.get(key)
+        stored = stored if isinstance(stored, list) else [stored]
+        wanted = value if isinstance(value, list) else [value]
+        if not set(stored) & set(wanted):
+            return False
+    return True
+
+
+class _FakeDocStore:
+    """In-memory doc store keyed by chunk id, like the real upserting backends."""
+
+    def __init__(self):
+        self.chunks = {}
+        self.deletes = []
+        self.inserted_ids = []
+
+    def insert(self, chunks, index_name, kb_id):
+        for chunk in chunks:
+            self.chunks[chunk["id"]] = dict(chunk)
+            self.inserted_ids.append(chunk["id"])
+        return []
+
+    def delete(self, condition, index_name, kb_id):
+        self.deletes.append(condition)
+        ids = [cid for cid, chunk in self.chunks.items() if _matches(chunk, condition)]
+        for cid in ids:
+            del self.chunks[cid]
+        return len(ids)
+
+    def search(self, fields, highlight, condition, match, order, offset, limit, index_names, kb_ids):
+        rows = [chunk for chunk in self.chunks.values() if _matches(chunk, condition)]
+        return rows[offset : offset + limit]
+
+    def get_fields(self, res, fields):
+        return {chunk["id"]: {f: chunk.get(f) for f in fields} for chunk in res}
+
+
+class _FakeRetriever:
+    def __init__(self, store):
+        self.store = store
+
+    async def search(self, conds, index_name, kb_ids):
+        condition = {k: v for k, v in conds.items() if k not in ("fields", "size")}
+        rows = self.store.search(conds["fields"], [], condition, [], None, 0, conds["size"], index_name, kb_ids)
+        field = self.store.get_fields(rows, conds["fields"])
+        return SimpleNamespace(total=len(rows), ids=list(field), field=field)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = _FakeDocStore()
+    monkeypatch.setattr(graphrag_utils.settings, "docStoreConn", fake, raising=False)
+    monkeypatch.setattr(graphrag_utils.settings, "retriever", _FakeRetriever(fake), raising=False)
+    monkeypatch.setattr(graphrag_utils, "_batch_embed_cache_misses", lambda _llm, keys: [False] * len(keys))
+    monkeypatch.setattr(graphrag_utils, "get_embed_cache", lambda *_a, **_k: np.array([0.1, 0.2, 0.3]))
+    monkeypatch.setattr(graphrag_utils, "_GRAPH_SHARD_NODES", 4)
+    return fake
+
+
+def _graph(n, sources=("d1",)):
+    graph = nx.Graph()
+    graph.graph["source_id"] = list(sources)
+    for i in range(n):
+        graph.add_node(f"N{i}", entity_type="T", description=f"node {i}", source_id=[sources[i % len(sources)]], pagerank=1.0 / (i + 1))
+    for i in range(n - 1):
+        graph.add_edge(f"N{i}", f"N{i + 1}", description=f"edge {i}", keywords=[], weight=i, source_id=[sources[i % len(sources)]])
+    return graph
+
+
+def _embd():
+    return SimpleNamespace(llm_name="m", encode=lambda texts: (np.ones((len(texts), 3)), 0))
+
+
+def _kinds(store, kind):
+    return [c for c in store.chunks.values() if c["knowledge_graph_kwd"] == kind]
+
+
+class TestGraphShards:
+    def test_shard_count_doubles_with_node_count(self, monkeypatch):
+        monkeypatch.setattr(graphrag_utils, "_GRAPH_SHARD_NODES", 4)
+        assert graphrag_utils._graph_shard_count(0) == 1
+        assert graphrag_utils._graph_shard_count(4) == 1
+        assert graphrag_utils._graph_shard_count(5) == 2
+        assert graphrag_utils._graph_shard_count(17) == 8
+
+    def test_round_trip(self):
+        graph = _graph(20)
+        chunks = graphrag_utils._graph_shard_chunks("kb", graph, 4)
+        assert len(chunks) == 4
+        assert len({c["id"] for c in chunks}) == 4
+        manifest = json.loads(graphrag_utils._graph_manifest_chunk("kb", graph, 4)["content_with_weight"])
+        loaded = graphrag_utils._graph_from_shards(manifest, [c["content_with_weight"] for c in chunks])
+        assert set(loaded.nodes) == set(graph.nodes)
+        assert {get_from_to(f, t) for f, t in loaded.edges} == {get_from_to(f, t) for f, t in graph.edges}
+        assert loaded.nodes["N3"]["description"] == "node 3"
+        assert loaded.nodes["N3"]["rank"] == 2
+        assert loaded.edges["N3", "N4"]["weight"] == 3
+
+    def test_dirty_shards_only(self):
+        graph = _graph(20)
+        dirty = {graphrag_utils._graph_shard_of("N0", 4)}
+        chunks = graphrag_utils._graph_shard_chunks("kb", graph, 4, dirty)
+        assert len(chunks) == 1
+        full = {c["id"]: c for c in graphrag_utils._graph_shard_chunks("kb", graph, 4)}
+        assert full[chunks[0]["id"]] == chunks[0]
+
+    def test_manifest_preview_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(graphrag_utils, "_GRAPH_PREVIEW_NODES", 5)
+        monkeypatch.setattr(graphrag_utils, "_GRAPH_PREVIEW_EDGES", 2)
+        graph = _graph(20)
+        manifest = json.loads(graphrag_utils._graph_manifest_chunk("kb", graph, 8)["content_with_weight"])
+        assert {n["id"] for n in manifest["nodes"]} == {"N0", "N1", "N2", "N3", "N4"}
+        assert [e["weight"] for e in manifest["edges"]] == [3, 2]
+        assert manifest["storage"] == {"format": graphrag_utils.GRAPH_STORAGE_SHARDED, "shards": 8, "nodes": 20, "edges": 19}
+
+    def test_subgraph_chunks_for_affected_sources(self):
+        graph = _graph(6, sources=("d1", "d2", "d3"))
+        chunks = graphrag_utils._subgraph_chunks("kb", graph, {"d2"})
+        assert len(chunks) == 1
+        content = json.loads(chunks[0]["content_with_weight"])
+        assert chunks[0]["source_id"] == ["d2"]
+        assert {n["id"] for n in content["nodes"]} == {"N1", "N4"}
+
+
+class TestGraphPersistence:
+    @pytest.mark.asyncio
+    async def test_get_graph_reads_legacy_blob(self, store):
+        graph = _graph(3)
+        store.insert(
+            [{"id": "g", "knowledge_graph_kwd": "graph", "removed_kwd": "N", "source_id": ["d1"], "content_with_weight": json.dumps(nx.node_link_data(graph, edges="edges"))}],
+            "idx",
+            "kb",
+        )
+        loaded = await graphrag_utils.get_graph("t", "kb")
+        assert set(loaded.nodes) == set(graph.nodes)
+        assert loaded.graph["source_id"] == ["d1"]
+
+    @pytest.mark.asyncio
+    async def test_set_graph_migrates_legacy_blob(self, store):
+        graph = _graph(10)
+        store.insert(
+            [
+                {"id": "g", "knowledge_graph_kwd": "graph", "removed_kwd": "N", "source_id": ["d1"], "content_with_weight": json.dumps(nx.node_link_data(graph, edges="edges"))},
+                {"id": "s", "knowledge_graph_kwd": "subgraph", "removed_kwd": "N", "source_id": ["d1"], "content_with_weight": "{}"},
+            ],
+            "idx",
+            "kb",
+        )
+        await graphrag_utils.set_graph("t", "kb", _embd(), graph, GraphChange(), None)
+        assert "g" not in store.chunks and "s" not in store.chunks
+        assert len(_kinds(store, "graph_shard")) == 4
+        assert len(_kinds(store, "subgraph")) == 1
+        # The manifest is written after every shard.
+        assert store.chunks[store.inserted_ids[-1]]["knowledge_graph_kwd"] == "graph"
+        loaded = await graphrag_utils.get_graph("t", "kb")
+        assert set(loaded.nodes) == set(graph.nodes)
+        assert loaded.number_of_edges() == graph.number_of_edges()
+
+    @pytest.mark.asyncio
+    async def test_set_graph_rewrites_only_touched_parts(self, store):
+        graph = _graph(12, sources=("d1", "d2", "d3"))
+        await graphrag_utils.set_graph("t", "kb", _embd(), graph, GraphChange(added_updated_nodes=set(graph.nodes), added_updated_edges=set(graph.edges)), None)
+        assert len(_kinds(store, "graph_shard")) == 4
+        assert len(_kinds(store, "relation")) == 11
+
+        graph.nodes["N1"]["description"] = "changed"
+        graph.remove_edge("N4", "N5")
+        store.inserted_ids.clear()
+        store.deletes.clear()
+        change = GraphChange(added_updated_nodes={"N1"}, removed_edges={("N5", "N4")})
+        await graphrag_utils.set_graph("t", "kb", _embd(), graph, change, None)
+
+        dirty = {graphrag_utils._graph_shard_of(n, 4) for n in ("N1", "N4")}
+        inserted = [store.chunks[cid] for cid in store.inserted_ids]
+        assert len([c for c in inserted if c["knowledge_graph_kwd"] == "graph_shard"]) == len(dirty)
+        # N1 comes from d2 and the removed edge's endpoints from d2 and d3; d1 is untouched.
+        assert sorted(c["source_id"][0] for c in inserted if c["knowledge_graph_kwd"] == "subgraph") == ["d2", "d3"]
+        assert len(_kinds(store, "subgraph")) == 3
+        assert not any("graph" in d["knowledge_graph_kwd"] for d in store.deletes)
+        assert len(_kinds(store, "relation")) == 10
+
+        loaded = await graphrag_utils.get_graph("t", "kb")
+        assert loaded.nodes["N1"]["description"] == "changed"
+        assert not loaded.has_edge("N4", "N5")
+        assert loaded.number_of_edges() == 10
+
+    @pytest.mark.asyncio
+    async def test_get_graph_loads_the_manifest_shards_by_id(self, store):
+        graph = _graph(12)
+        await graphrag_utils.set_graph("t", "kb", _embd(), graph, GraphChange(), None)
+        # A shard left over from another shard count is not part of the graph.
+        store.insert([{"id": "stale", "knowledge_graph_kwd": "graph_shard", "content_with_weight": json.dumps({"nodes": [{"id": "X"}], "edges": []})}], "idx", "kb")
+        loaded = await graphrag_utils.get_graph("t", "kb")
+        assert set(loaded.nodes) == set(graph.nodes)
+
+        del store.chunks[graphrag_utils._graph_storage_chunk_id("kb", "graph_shard", 4, 2)]
+        with pytest.raises(Exception, match="incomplete"):
+            await graphrag_utils.get_graph("t", "kb")
+
+    @pytest.mark.asyncio
+    async def test_delete_relations_matches_exact_pairs(self, store):
+        store.insert(
+            [
+                {"id": "r1", "knowledge_graph_kwd": "relation", "from_entity_kwd": "A", "to_entity_kwd": "B"},
+                {"id": "r2", "knowledge_graph_kwd": "relation", "from_entity_kwd": "B", "to_entity_kwd": "C"},
+                {"id": "r3", "knowledge_graph_kwd": "relation", "from_entity_kwd": "A", "to_entity_kwd": "C"},
+            ],
+            "idx",
+            "kb",
+        )
+        assert await graphrag_utils.delete_relations("t", "kb", {("B", "A"), ("B", "C")}) == 2
+        assert set(store.chunks) == {"r3"}
+        assert await graphrag_utils.delete_relations("t", "kb", set()) == 0
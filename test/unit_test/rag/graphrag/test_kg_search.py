@@ -0,0 +1,191 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+
+class _Dealer:
+    def __init__(self, dataStore):
+        self.dataStore = dataStore
+
+    def get_filters(self, req):
+        return {"kb_id": req["kb_ids"]}
+
+    async def get_vector(self, txt, emb_mdl, topk=10, similarity=0.1):
+        return ("dense", txt)
+
+
+class _SearchRequest:
+    # The graphrag conftest mocks common.doc_store.doc_store_base; this mirrors its SearchRequest.
+    def __init__(self, *args):
+        self._args = args
+
+    def args(self):
+        return self._args
+
+
+def _load_search_module(monkeypatch):
+    nlp_search = ModuleType("rag.nlp.search")
+    nlp_search.Dealer = _Dealer
+    nlp_search.index_name = lambda uid: f"ragflow_{uid}"
+    monkeypatch.setitem(sys.modules, "rag.nlp.search", nlp_search)
+    module_path = Path(__file__).resolve().parents[4] / "rag" / "graphrag" / "search.py"
+    spec = importlib.util.spec_from_file_location("test_kg_search_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "SearchRequest", _SearchRequest)
+    return module
+
+
+def _matches(row, condition):
+    for key, value in condition.items():
+        stored = row.get(key)
+        stored = stored if isinstance(stored, list) else [stored]
+        wanted = value if isinstance(value, list) else [value]
+        if not set(stored) & set(wanted):
+            return False
+    return True
+
+
+class _FakeGraphStore:
+    def __init__(self, rows):
+        self.rows = rows
+        self.searches = []
+        self.round_trips = 0
+
+    def search(self, fields, highlight, condition, match, order, offset, limit, idxnms, kb_ids, agg_fields=None, rank_feature=None):
+        self.searches.append((dict(condition), limit, bool(match)))
+        rows = [dict(r) for r in self.rows if _matches(r, condition)]
+        if match:
+            rows = [r for r in rows if "_score" in r]
+        return rows[offset : offset + limit]
+
+    async def search_async(self, *args):
+        self.round_trips += 1
+        return self.search(*args)
+
+    async def multi_search_async(self, requests):
+        self.round_trips += 1
+        return [self.search(*req.args()) for req in requests]
+
+    def get_fields(self, res, fields):
+        return {r["id"]: {f: r.get(f) for f in fields + ["_score"] if f in r} for r in res}
+
+
+def _entity(name, entity_type, score=None, n_hop=None):
+    row = {
+        "id": f"e-{name}",
+        "kb_id": "kb",
+        "knowledge_graph_kwd": "entity",
+        "entity_kwd": name,
+        "entity_type_kwd": entity_type,
+        "rank_flt": 0.5,
+        "content_with_weight": json.dumps({"description": f"about {name}"}),
+        "n_hop_with_weight": json.dumps(n_hop or []),
+    }
+    if score is not None:
+        row["_score"] = score
+    return row
+
+
+def _relation(f, t, score=None):
+    row = {
+        "id": f"r-{f}-{t}",
+        "kb_id": "kb",
+        "knowledge_graph_kwd": "relation",
+        "from_entity_kwd": f,
+        "to_entity_kwd": t,
+        "weight_int": 2,
+        "content_with_weight": json.dumps({"description": f"{f} knows {t}"}),
+    }
+    if score is not None:
+        row["_score"] = score
+    return row
+
+
+@pytest.fixture
+def kg(monkeypatch):
+    module = _load_search_module(monkeypatch)
+    rows = [
+        _entity("ALICE", "PERSON", 0.9, n_hop=[{"path": ["ALICE", "BOB", "CAROL"], "weights": [3, 1]}]),
+        _entity("BOB", "PERSON"),
+        _entity("CAROL", "PERSON"),
+        _entity("ACME", "ORG"),
+        _relation("ALICE", "ACME", 0.8),
+        _relation("ALICE", "BOB"),
+        _relation("BOB", "CAROL"),
+        {
+            "id": "c1",
+            "kb_id": "kb",
+            "knowledge_graph_kwd": "community_report",
+            "entities_kwd": ["ALICE"],
+            "docnm_kwd": "Team",
+            "content_with_weight": json.dumps({"report": "A team", "evidences": "e"}),
+        },
+    ]
+    store = _FakeGraphStore(rows)
+    search = module.KGSearch(store)
+
+    async def _query_rewrite(*_args, **_kwargs):
+        return ["PERSON"], ["alice"]
+
+    monkeypatch.setattr(search, "query_rewrite", _query_rewrite)
+    return search, store
+
+
+@pytest.mark.asyncio
+async def test_retrieval_checks_types_of_candidates_only(kg):
+    search, store = kg
+    result = await search.retrieval("who is alice", ["t"], ["kb"], None, None)
+
+    type_searches = [(cond, limit) for cond, limit, _ in store.searches if "entity_type_kwd" in cond]
+    assert len(type_searches) == 1
+    cond, limit = type_searches[0]
+    assert set(cond["entity_kwd"]) == {"ALICE", "ACME", "BOB", "CAROL"}
+    assert limit == 4
+    content = result["content_with_weight"]
+    assert "ALICE" in content and "ACME" in content
+    assert "Community Report" in content
+
+
+@pytest.mark.asyncio
+async def test_retrieval_looks_up_nhop_relations_in_one_search(kg):
+    search, store = kg
+    result = await search.retrieval("who is alice", ["t"], ["kb"], None, None)
+
+    lookups = [cond for cond, _, match in store.searches if cond.get("knowledge_graph_kwd") == "relation" and not match]
+    assert len(lookups) == 1
+    assert set(lookups[0]["from_entity_kwd"]) == {"ALICE", "BOB", "CAROL"}
+    assert "ALICE knows BOB" in result["content_with_weight"]
+    assert "BOB knows CAROL" in result["content_with_weight"]
+    # Keyword entities, relations, types, relation lookup and communities.
+    assert len(store.searches) == 5
+    # Entities with relations, then types, then relation lookup with communities.
+    assert store.round_trips == 3
+
+
+@pytest.mark.asyncio
+async def test_relation_descriptions_match_exact_pairs(kg):
+    search, _ = kg
+    res = await search.get_relation_descriptions([("BOB", "ALICE")], {"kb_id": ["kb"]}, ["idx"], ["kb"])
+    assert res == {("ALICE", "BOB"): "ALICE knows BOB"}
+    assert await search.get_relation_descriptions([], {"kb_id": ["kb"]}, ["idx"], ["kb"]) == {}
@@ -184,6 +184,9 @@ class FakeGaussDBStore:
         self.last_search = (args, kwargs)
         return type("SearchResult", (), {"total": getattr(self, "total", 1), "chunks": []})()
 
+    async def search_async(self, *args, **kwargs):
+        return self.search(*args, **kwargs)
+
     def get_total(self, res):
         return res.total
 
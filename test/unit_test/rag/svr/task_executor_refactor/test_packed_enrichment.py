@@ -0,0 +1,153 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Unit tests for packed chunk enrichment.
+"""
+
+import asyncio
+import json
+import re
+
+from common.constants import TAG_FLD
+from rag.prompts.generator import pack_by_token_budget, parse_packed_enrichment
+from rag.svr.task_executor_refactor.packed_enrichment import KEYWORDS, METADATA, QUESTIONS, TAGS, PackedEnricher
+
+SCHEMA = {"type": "object", "properties": {"author": {"type": "string", "description": "Author"}}}
+ALL_TAGS = {"finance": 10, "science": 10}
+
+
+class FakeChatModel:
+    llm_name = "fake"
+    max_length = 32768
+
+    def __init__(self, packed_answer=None):
+        self.packed_answer = packed_answer
+        self.packed_calls = 0
+        self.single_calls = 0
+
+    async def async_chat(self, system, history, gen_conf=None, **kwargs):
+        pieces = len(re.findall(r"^### Piece \d+$", system, flags=re.MULTILINE))
+        if pieces:
+            self.packed_calls += 1
+            if self.packed_answer is not None:
+                return self.packed_answer(pieces)
+            return json.dumps([{"id": i, "keywords": [f"k{i}"], "questions": [f"q{i}?"], "metadata": {"author": "a"}, "tags": {"science": 7}} for i in range(pieces)])
+        self.single_calls += 1
+        return '{"finance": 3}'
+
+
+class TestPackByTokenBudget:
+    def test_respects_item_limit(self):
+        assert pack_by_token_budget(["a", "b", "c", "d", "e"], 10000, 2) == [[0, 1], [2, 3], [4]]
+
+    def test_respects_token_budget(self):
+        big = "word " * 100
+        assert pack_by_token_budget([big, big, "x"], 150, 10) == [[0], [1, 2]]
+
+    def test_oversized_content_gets_its_own_pack(self):
+        big = "word " * 500
+        assert pack_by_token_budget(["x", big, "y"], 100, 10) == [[0], [1], [2]]
+
+
+class TestParsePackedEnrichment:
+    def test_valid_answer(self):
+        ans = json.dumps(
+            [
+                {"id": 1, "keywords": ["b1", "b2"], "questions": ["Q1?", "Q2?"], "metadata": {"author": "x", "other": 1}, "tags": {"science": 5, "unknown": 9, "finance": 0}},
+                {"id": 0, "keywords": ["a"], "questions": ["Q?"], "metadata": {}, "tags": {}},
+            ]
+        )
+        res = parse_packed_enrichment(ans, 2, 3, 2, SCHEMA, ALL_TAGS)
+        assert res[0] == {"keywords": "a", "questions": "Q?", "metadata": "{}", "tags": "{}"}
+        assert res[1]["keywords"] == "b1,b2"
+        assert res[1]["questions"] == "Q1?\nQ2?"
+        assert json.loads(res[1]["metadata"]) == {"author": "x"}
+        assert json.loads(res[1]["tags"]) == {"science": 5}
+
+    def test_invalid_pieces_are_dropped(self):
+        ans = json.dumps([{"id": 0, "keywords": []}, {"id": 7, "keywords": ["x"]}, {"id": "bad"}, {"id": 1, "keywords": ["ok"], "metadata": "not a dict"}])
+        res = parse_packed_enrichment(ans, 2, 3, 0, SCHEMA, None)
+        assert res == [{}, {"keywords": "ok"}]
+
+    def test_wrapped_list_and_duplicates(self):
+        ans = json.dumps({"results": [{"id": 0, "keywords": ["first"]}, {"id": 0, "keywords": ["second"]}]})
+        assert parse_packed_enrichment(ans, 1, 3)[0] == {"keywords": "first"}
+
+    def test_unrequested_tasks_are_ignored(self):
+        ans = json.dumps([{"id": 0, "keywords": ["k"], "questions": ["q?"]}])
+        assert parse_packed_enrichment(ans, 1, keywords_topn=3) == [{"keywords": "k"}]
+
+    def test_garbage(self):
+        assert parse_packed_enrichment("no json here", 2, 3, 3) == [{}, {}]
+
+
+class TestPackedEnricher:
+    def _enricher(self, chat_mdl, **kwargs):
+        return PackedEnricher(
+            chat_mdl,
+            asyncio.Semaphore(4),
+            keywords_topn=3,
+            questions_topn=1,
+            metadata_conf=SCHEMA,
+            all_tags=ALL_TAGS,
+            tag_examples=[{"content": "example", TAG_FLD: {"science": 1}}],
+            **kwargs,
+        )
+
+    def test_one_call_per_pack(self):
+        chat_mdl = FakeChatModel()
+        enricher = self._enricher(chat_mdl, max_chunks=4)
+        contents = [f"chunk {i}" for i in range(10)]
+        res = asyncio.run(enricher.run(contents, [{KEYWORDS, QUESTIONS, METADATA, TAGS}] * 10))
+        assert chat_mdl.packed_calls == 3
+        assert chat_mdl.single_calls == 0
+        assert enricher.llm_calls == 3
+        assert res[5][KEYWORDS] == "k1"
+        assert json.loads(res[9][TAGS]) == {"science": 7}
+
+    def test_only_needed_tasks_are_returned(self):
+        chat_mdl = FakeChatModel()
+        enricher = self._enricher(chat_mdl)
+        res = asyncio.run(enricher.run(["a", "b", "c"], [{KEYWORDS}, {KEYWORDS}, set()]))
+        assert res == [{KEYWORDS: "k0"}, {KEYWORDS: "k1"}, {}]
+        assert chat_mdl.packed_calls == 1
+
+    def test_invalid_piece_falls_back_to_single_calls(self):
+        def answer(pieces):
+            return json.dumps([{"id": 0, "keywords": ["good"], "tags": {"science": 2}}])
+
+        chat_mdl = FakeChatModel(answer)
+        enricher = self._enricher(chat_mdl)
+        res = asyncio.run(enricher.run(["a", "b"], [{KEYWORDS, TAGS}] * 2))
+        assert res[0] == {KEYWORDS: "good", TAGS: json.dumps({"science": 2})}
+        assert chat_mdl.single_calls == 2
+        assert enricher.fallback_calls == 2
+        assert json.loads(res[1][TAGS]) == {"finance": 3}
+        assert res[1][KEYWORDS] == '{"finance": 3}'
+
+    def test_single_chunk_uses_single_prompts(self):
+        chat_mdl = FakeChatModel()
+        enricher = self._enricher(chat_mdl)
+        asyncio.run(enricher.run(["only"], [{KEYWORDS, QUESTIONS}]))
+        assert chat_mdl.packed_calls == 0
+        assert chat_mdl.single_calls == 2
+
+    def test_canceled(self):
+        chat_mdl = FakeChatModel()
+        enricher = self._enricher(chat_mdl, is_canceled=lambda: True)
+        res = asyncio.run(enricher.run(["a", "b"], [{KEYWORDS}] * 2))
+        assert res == [{}, {}]
+        assert chat_mdl.packed_calls == 0
@@ -91,6 +91,9 @@ class _CapturingDataStore:
             self.match_expressions = args[3]
         return object()
 
+    async def search_async(self, *args, **kwargs):
+        return self.search(*args, **kwargs)
+
     def get_total(self, result):
         return 1
 
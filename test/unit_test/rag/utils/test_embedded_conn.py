@@ -0,0 +1,194 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for the embedded doc store, run against a temporary directory."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from common.doc_store import embedded_index
+from common.doc_store.doc_store_base import FusionExpr, MatchDenseExpr, MatchTextExpr, OrderByExpr
+from common.doc_store.embedded_index import HNSWIndex, parse_query_string
+from rag.utils.embedded_conn import EmbeddedConnection
+
+INDEX = "ragflow_tenant"
+FIELDS = ["title_tks^10", "important_kwd^30", "content_ltks^2"]
+
+
+def _vec(*head):
+    return list(head) + [0.0] * (4 - len(head))
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = EmbeddedConnection(str(tmp_path))
+    conn.create_idx(INDEX, "kb1", 4)
+    docs = [
+        {"id": "c1", "doc_id": "d1", "title_tks": "apple", "content_ltks": "red fruit", "q_4_vec": _vec(1, 0), "chunk_order_int": 2, "docnm_kwd": "a.pdf", "available_int": 1},
+        {"id": "c2", "doc_id": "d1", "content_ltks": "apple pie recipe", "q_4_vec": _vec(0.9, 0.1), "chunk_order_int": 1, "docnm_kwd": "a.pdf", "tag_kwd": ["food"]},
+        {"id": "c3", "doc_id": "d2", "content_ltks": "green pear", "q_4_vec": _vec(0, 1), "chunk_order_int": 3, "docnm_kwd": "b.pdf", "available_int": 0},
+        {"id": "c4", "doc_id": "d2", "content_ltks": "apple banana pear", "important_kwd": ["Pear"], "q_4_vec": _vec(0, 0, 1), "docnm_kwd": "b.pdf", "tag_kwd": ["food", "fruit"]},
+    ]
+    assert conn.insert(docs, INDEX, "kb1") == []
+    assert conn.insert([{"id": "o1", "content_ltks": "apple", "q_4_vec": _vec(1, 0)}], INDEX, "kb2") == []
+    return conn
+
+
+def _search(conn, match=(), condition=None, order_by=None, offset=0, limit=10, select=("content_ltks",), **kwargs):
+    return conn.search(list(select), [], condition or {}, list(match), order_by or OrderByExpr(), offset, limit, INDEX, ["kb1"], **kwargs)
+
+
+def test_filters_and_ordering(conn):
+    res = _search(conn, condition={"available_int": 1}, order_by=OrderByExpr().desc("chunk_order_int"))
+    # available_int=1 also matches rows without the field; rows without a sort value come last.
+    assert conn.get_doc_ids(res) == ["c1", "c2", "c4"]
+    assert conn.get_total(res) == 3
+
+    res = _search(conn, condition={"doc_id": "d2", "must_not": {"exists": "important_kwd"}})
+    assert conn.get_doc_ids(res) == ["c3"]
+    res = _search(conn, condition={"tag_kwd": ["fruit"]}, select=["chunk_order_int", "tag_kwd"])
+    assert conn.get_fields(res, ["tag_kwd", "chunk_order_int"]) == {"c4": {"tag_kwd": ["food", "fruit"]}}
+    res = _search(conn, condition={"id": ["c1", "c3"]}, order_by=OrderByExpr().asc("chunk_order_int"), offset=1, limit=1)
+    assert conn.get_doc_ids(res) == ["c3"] and conn.get_total(res) == 2
+
+    res = _search(conn, limit=0, agg_fields=["docnm_kwd", "tag_kwd"])
+    assert conn.get_total(res) == 4
+    assert conn.get_aggregation(res, "docnm_kwd") == [("a.pdf", 2), ("b.pdf", 2)]
+    assert conn.get_aggregation(res, "tag_kwd") == [("food", 2), ("fruit", 1)]
+
+
+def test_bm25_uses_field_boosts_and_minimum_should_match(conn):
+    res = _search(conn, [MatchTextExpr(FIELDS, "apple", 100)])
+    assert conn.get_doc_ids(res)[0] == "c1"
+    assert set(conn.get_doc_ids(res)) == {"c1", "c2", "c4"}
+
+    res = _search(conn, [MatchTextExpr(FIELDS, "(apple)^2 OR (pear)", 100, {"minimum_should_match": 1.0})])
+    assert conn.get_doc_ids(res) == ["c4"]
+    res = _search(conn, [MatchTextExpr(FIELDS, "pear", 100)])
+    # important_kwd matches the whole keyword value, with its x30 boost.
+    assert conn.get_doc_ids(res) == ["c4", "c3"]
+
+
+def test_hybrid_search_scores_like_elasticsearch(conn):
+    fusion = FusionExpr("weighted_sum", 10, {"weights": "0.05,0.95"})
+    dense = MatchDenseExpr("q_4_vec", _vec(1, 0), "float", "cosine", 10, {"similarity": 0.5})
+    res = _search(conn, [MatchTextExpr(FIELDS, "apple", 100), dense, fusion], select=["q_4_vec"])
+    scores = conn.get_scores(res)
+    # c4 matches the text but is below the similarity threshold; KNN never reaches the text-less c3.
+    assert set(scores) == {"c1", "c2", "c4"}
+    assert scores["c1"] > scores["c2"] > scores["c4"]
+    assert conn.get_fields(res, ["q_4_vec"])["c1"]["q_4_vec"] == _vec(1, 0)
+
+    res = _search(conn, [dense], rank_feature={"pagerank_fea": 10})
+    # A KNN-only query keeps every filtered row, KNN hits first.
+    assert conn.get_doc_ids(res)[:2] == ["c1", "c2"]
+    assert conn.get_total(res) == 4
+
+
+def test_update_and_delete(conn):
+    assert conn.update({"id": "c2"}, {"content_ltks": "cherry", "add": {"tag_kwd": " sweet "}}, INDEX, "kb1")
+    chunk = conn.get("c2", INDEX, ["kb1"])
+    assert chunk["tag_kwd"] == ["food", "sweet"] and chunk["q_4_vec"] == pytest.approx(_vec(0.9, 0.1))
+    assert conn.get_doc_ids(_search(conn, [MatchTextExpr(FIELDS, "cherry", 100)])) == ["c2"]
+
+    assert conn.update({"doc_id": "d2"}, {"remove": {"tag_kwd": "food"}, "q_4_vec": _vec(1, 0)}, INDEX, "kb1")
+    assert conn.get("c4", INDEX, ["kb1"])["tag_kwd"] == ["fruit"]
+    dense = MatchDenseExpr("q_4_vec", _vec(1, 0), "float", "cosine", 10, {"similarity": 0.999})
+    assert set(conn.get_doc_ids(_search(conn, [dense]))[:3]) == {"c1", "c3", "c4"}
+
+    assert conn.delete({"doc_id": "d2"}, INDEX, "kb1") == 2
+    assert conn.count_idx(INDEX) == 3
+    assert conn.get_doc_ids(_search(conn, [MatchTextExpr(FIELDS, "pear", 100)])) == []
+    assert conn.get_scores(_search(conn, [dense])) == {"c1": pytest.approx(1.0), "c2": 0.0}
+
+    reopened = EmbeddedConnection(conn.path)
+    assert reopened.get_scores(_search(reopened, [dense])) == {"c1": pytest.approx(1.0), "c2": 0.0}
+
+
+def test_hnsw_graph_search_matches_brute_force(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedded_index, "BRUTE_FORCE_LIMIT", 0)
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(600, 8)).astype(np.float32)
+    index = HNSWIndex(str(tmp_path / "q_8_vec"), 8, seed=7)
+    for node, vec in enumerate(vectors, start=1):
+        index.add(node, vec)
+    index.remove(1)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    recall = 0
+    for query in rng.normal(size=(20, 8)):
+        exact = [n + 1 for n in np.argsort(-(normalized @ query)) if n != 0][:10]
+        recall += len(set(exact) & {n for n, _ in index.search(query, 10)})
+    assert recall / 200 > 0.9
+
+    allowed = np.arange(2, 601, 50)
+    hits = index.search(vectors[0], 3, allowed=allowed)
+    assert {n for n, _ in hits} <= set(allowed.tolist()) and len(hits) == 3
+
+
+def test_concurrent_writers_keep_the_graph_intact(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedded_index, "BRUTE_FORCE_LIMIT", 0)
+    rng = np.random.default_rng(11)
+    vectors = rng.normal(size=(400, 8)).astype(np.float32)
+    # Two connections over one directory stand in for two task executor processes.
+    conns = [EmbeddedConnection(str(tmp_path)) for _ in range(2)]
+    conns[0].create_idx(INDEX, "kb1", 8)
+    # peak records how many graph writes ever ran at once.
+    errors, active, peak = [], [0], [0]
+    counter = threading.Lock()
+    add = HNSWIndex.add
+
+    def tracked_add(self, node, vector):
+        with counter:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.001)
+        try:
+            add(self, node, vector)
+        finally:
+            with counter:
+                active[0] -= 1
+
+    monkeypatch.setattr(HNSWIndex, "add", tracked_add)
+
+    def write(conn, rows):
+        for start in range(0, len(rows), 10):
+            errors.extend(conn.insert([{"id": f"c{i}", "q_8_vec": vectors[i].tolist()} for i in rows[start : start + 10]], INDEX, "kb1"))
+
+    threads = [threading.Thread(target=write, args=(conn, list(range(i, 400, 2)))) for i, conn in enumerate(conns)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and peak[0] == 1
+
+    reopened = EmbeddedConnection(str(tmp_path))
+    assert reopened.count_idx(INDEX) == 400
+    assert len(reopened._table(INDEX).vectors("q_8_vec")) == 400
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    recall = 0
+    for query in rng.normal(size=(20, 8)):
+        exact = {f"c{n}" for n in np.argsort(-(normalized @ query))[:10]}
+        res = _search(reopened, [MatchDenseExpr("q_8_vec", query.tolist(), "float", "cosine", 10, {"similarity": -1.0})], limit=10)
+        recall += len(exact & set(reopened.get_doc_ids(res)))
+    assert recall / 200 > 0.9
+
+
+def test_parse_query_string():
+    query = '((apple)^0.5 ("red fruit"~2)^1.5)^5 OR (pie\\-crust)^0.7'
+    assert parse_query_string(query) == [{"apple": 2.5, "red": 7.5, "fruit": 7.5}, {"pie-crust": 0.7}]
@@ -0,0 +1,186 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""
+Tests for ESConnection.multi_search and the async search methods, with the
+sync and async Elasticsearch clients replaced by fakes.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from common.doc_store.doc_store_base import MatchDenseExpr, OrderByExpr, SearchRequest
+
+
+@pytest.fixture
+def es_conn(monkeypatch):
+    # Load the module by path with bare settings and rag.nlp modules: the real ones pull in every storage backend.
+    settings = types.SimpleNamespace(ES={"hosts": "stub"})
+    monkeypatch.setitem(sys.modules, "common.settings", settings)
+    monkeypatch.setattr(importlib.import_module("common"), "settings", settings, raising=False)
+    monkeypatch.setitem(sys.modules, "rag.nlp", types.SimpleNamespace(is_english=lambda *_args: False, rag_tokenizer=MagicMock()))
+    root = Path(__file__).resolve().parents[4]
+    for name, path in (("common.doc_store.es_conn_base", "common/doc_store/es_conn_base.py"), ("test_es_conn_module", "rag/utils/es_conn.py")):
+        spec = importlib.util.spec_from_file_location(name, root / path)
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, name, module)
+        spec.loader.exec_module(module)
+    # @singleton wraps the class in a closure; take the class out to skip the connecting __init__.
+    cls = next(cell.cell_contents for cell in module.ESConnection.__closure__ if isinstance(cell.cell_contents, type))
+    conn = cls.__new__(cls)
+    conn.logger = logging.getLogger("test.es_conn")
+    conn.es = _FakeES()
+    conn._connect = lambda: True
+    return conn
+
+
+def _hits(*ids):
+    return {"timed_out": False, "hits": {"total": {"value": len(ids)}, "hits": [{"_id": i, "_score": 1.0, "_source": {}} for i in ids]}}
+
+
+class _FakeES:
+    def __init__(self):
+        self.searches = []
+        self.msearches = []
+
+    def search(self, index, body, **kwargs):
+        self.searches.append((index, body))
+        return _hits("single")
+
+    def msearch(self, searches):
+        self.msearches.append(searches)
+        return {"responses": [_hits(f"hit-{i}") for i in range(len(searches) // 2)]}
+
+
+class _FakeAsyncES(_FakeES):
+    async def search(self, index, body, **kwargs):
+        return super().search(index, body, **kwargs)
+
+    async def msearch(self, searches):
+        return super().msearch(searches)
+
+
+def _request(kb, match=None, offset=0, limit=10, order_by=None):
+    return SearchRequest(["content_with_weight"], [], {"knowledge_graph_kwd": "entity"}, match or [], order_by or OrderByExpr(), offset, limit, "ragflow_t", [kb])
+
+
+def _dense():
+    return MatchDenseExpr("q_4_vec", [0.1, 0.2, 0.3, 0.4], "float", "cosine", 5, {"similarity": 0.2})
+
+
+def test_multi_search_sends_one_msearch(es_conn):
+    results = es_conn.multi_search([_request("kb1", [_dense()]), _request("kb2")])
+
+    assert len(es_conn.es.msearches) == 1 and es_conn.es.searches == []
+    header, body, header2, body2 = es_conn.es.msearches[0]
+    assert header == header2 == {"index": ["ragflow_t"]}
+    assert "knn" in body and "knn" not in body2
+    assert body["track_total_hits"] is True
+    assert body2["query"]["bool"]["filter"][1] == {"terms": {"kb_id": ["kb2"]}}
+    assert [es_conn.get_doc_ids(r) for r in results] == [["hit-0"], ["hit-1"]]
+
+
+def test_multi_search_runs_deep_pages_on_their_own(es_conn):
+    order_by = OrderByExpr().asc("chunk_order_int")
+    results = es_conn.multi_search([_request("kb1"), _request("kb2", offset=20000, limit=10, order_by=order_by)])
+
+    assert len(es_conn.es.msearches) == 1 and len(es_conn.es.msearches[0]) == 2
+    assert len(es_conn.es.searches) > 0
+    assert es_conn.get_doc_ids(results[0]) == ["hit-0"]
+
+
+def test_multi_search_raises_on_failed_search(es_conn):
+    es_conn.es.msearch = lambda searches: {"responses": [_hits("ok"), {"error": {"type": "index_not_found_exception"}, "status": 404}]}
+    with pytest.raises(Exception, match="index_not_found_exception"):
+        es_conn.multi_search([_request("kb1"), _request("kb2")])
+
+
+@pytest.mark.asyncio
+async def test_async_search_uses_the_async_client(es_conn, monkeypatch):
+    client = _FakeAsyncES()
+    monkeypatch.setattr(es_conn, "_async_conn", lambda: client)
+
+    res = await es_conn.search_async(*_request("kb1").args())
+    results = await es_conn.multi_search_async([_request("kb1"), _request("kb2")])
+
+    assert es_conn.get_doc_ids(res) == ["single"]
+    assert [es_conn.get_doc_ids(r) for r in results] == [["hit-0"], ["hit-1"]]
+    assert len(client.searches) == 1 and len(client.msearches) == 1
+    assert es_conn.es.searches == [] and es_conn.es.msearches == []
+
+
+@pytest.mark.asyncio
+async def test_async_search_falls_back_to_the_sync_client(es_conn, monkeypatch):
+    monkeypatch.setattr(es_conn, "_async_conn", lambda: None)
+
+    results = await es_conn.multi_search_async([_request("kb1"), _request("kb2")])
+
+    assert [es_conn.get_doc_ids(r) for r in results] == [["hit-0"], ["hit-1"]]
+    assert len(es_conn.es.msearches) == 1
+
+
+class _FakePoolClient:
+    def __init__(self, **kwargs):
+        self.closed = False
+
+    def info(self):
+        return {"version": {"number": "8.11.3"}}
+
+    def ping(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeAsyncPoolClient(_FakePoolClient):
+    async def close(self):
+        self.closed = True
+
+
+def test_async_client_serves_only_the_loop_it_was_opened_on(monkeypatch):
+    settings = types.SimpleNamespace(ES={"hosts": "stub"})
+    monkeypatch.setattr(importlib.import_module("common"), "settings", settings, raising=False)
+    monkeypatch.setitem(sys.modules, "elasticsearch", types.SimpleNamespace(Elasticsearch=_FakePoolClient, AsyncElasticsearch=_FakeAsyncPoolClient))
+    spec = importlib.util.spec_from_file_location("test_es_conn_pool_module", Path(__file__).resolve().parents[4] / "common/doc_store/es_conn_pool.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    pool = module.ES_CONN
+
+    async def current():
+        return pool.get_async_conn()
+
+    async def open_conn():
+        pool.open_async_conn()
+
+    server_loop = asyncio.new_event_loop()
+    try:
+        server_loop.run_until_complete(open_conn())
+        client = pool.async_conn
+        assert server_loop.run_until_complete(current()) is client
+        # Short-lived loops get no client and search on the thread pool instead.
+        assert asyncio.run(current()) is None
+        server_loop.run_until_complete(pool.close_async_conn())
+    finally:
+        server_loop.close()
+    assert client.closed and pool.get_async_conn() is None
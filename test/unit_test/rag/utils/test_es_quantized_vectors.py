@@ -0,0 +1,92 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for the quantized vector fields of ESConnection, with the Elasticsearch client replaced by a fake."""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from common.doc_store.doc_store_base import MatchDenseExpr, OrderByExpr
+
+
+class _FakeES:
+    def __init__(self):
+        self.updates = []
+        self.bulks = []
+
+    def update(self, index, id, **kwargs):
+        self.updates.append(kwargs)
+
+    def bulk(self, index, operations, **kwargs):
+        self.bulks.append(operations)
+        return {"errors": False, "items": []}
+
+
+@pytest.fixture
+def es_conn(monkeypatch):
+    # Load the module by path with bare settings and rag.nlp modules: the real ones pull in every storage backend.
+    settings = types.SimpleNamespace(ES={"hosts": "stub"})
+    monkeypatch.setitem(sys.modules, "common.settings", settings)
+    monkeypatch.setattr(importlib.import_module("common"), "settings", settings, raising=False)
+    monkeypatch.setitem(sys.modules, "rag.nlp", types.SimpleNamespace(is_english=lambda *_args: False, rag_tokenizer=MagicMock()))
+    root = Path(__file__).resolve().parents[4]
+    for name, path in (("common.doc_store.es_conn_base", "common/doc_store/es_conn_base.py"), ("test_es_conn_module", "rag/utils/es_conn.py")):
+        spec = importlib.util.spec_from_file_location(name, root / path)
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, name, module)
+        spec.loader.exec_module(module)
+    # @singleton wraps the class in a closure; take the class out to skip the connecting __init__.
+    cls = next(cell.cell_contents for cell in module.ESConnection.__closure__ if isinstance(cell.cell_contents, type))
+    conn = cls.__new__(cls)
+    conn.logger = logging.getLogger("test.es_conn")
+    conn.es = _FakeES()
+    conn.quantization_methods = ("int8", "binary")
+    conn.rescore_vector = True
+    return conn
+
+
+def test_search_covers_the_quantized_fields(es_conn):
+    dense = MatchDenseExpr("q_4_vec", [0.1, 0.2, 0.3, 0.4], "float", "cosine", 5, {"similarity": 0.2})
+    _, q, _ = es_conn._build_search(["q_4_vec"], [], {}, [dense], OrderByExpr(), 0, 10, "ragflow_t", ["kb1"])
+
+    assert [knn["field"] for knn in q["knn"]] == ["q_4_vec", "q_4_int8_vec", "q_4_bbq_vec"]
+    assert "rescore_vector" not in q["knn"][0] and q["knn"][2]["rescore_vector"] == {"oversample": 4}
+    assert q["_source"] == q["fields"] == ["q_4_vec", "q_4_int8_vec", "q_4_bbq_vec"]
+
+    es_conn.quantization_methods, es_conn.rescore_vector = (), False
+    _, q, _ = es_conn._build_search(["q_4_vec"], [], {}, [dense], OrderByExpr(), 0, 10, "ragflow_t", ["kb1"])
+    assert q["knn"]["field"] == "q_4_vec" and "rescore_vector" not in q["knn"]
+
+
+def test_quantized_fields_read_back_as_the_float_field(es_conn):
+    res = {"hits": {"hits": [{"_id": "c1", "_source": {"q_4_int8_vec": [1.0, 0.0, 0.0, 0.0]}}, {"_id": "c2", "fields": {"q_4_bbq_vec": [[0.0, 1.0, 0.0, 0.0]]}}]}}
+    assert es_conn.get_fields(res, ["q_4_vec"]) == {"c1": {"q_4_vec": [1.0, 0.0, 0.0, 0.0]}, "c2": {"q_4_vec": [0.0, 1.0, 0.0, 0.0]}}
+
+
+def test_writes_keep_one_vector_field(es_conn):
+    assert es_conn.update({"id": "c1"}, {"q_4_int8_vec": [1.0, 0.0, 0.0, 0.0]}, "ragflow_t", "kb1")
+    assert es_conn.es.updates == [{"script": "ctx._source.remove('q_4_vec');ctx._source.remove('q_4_bbq_vec');"}, {"doc": {"q_4_int8_vec": [1.0, 0.0, 0.0, 0.0]}}]
+
+    # A quantization the cluster cannot index falls back to the float field.
+    es_conn.quantization_methods = ("int8",)
+    assert es_conn.insert([{"id": "c2", "q_4_bbq_vec": [0.0, 1.0, 0.0, 0.0]}], "ragflow_t", "kb1") == []
+    assert es_conn.es.bulks[0][1] == {"id": "c2", "q_4_vec": [0.0, 1.0, 0.0, 0.0], "kb_id": "kb1"}
@@ -0,0 +1,126 @@
+#
+#  Copyright 2026 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+"""Tests for the Arrow result helpers of the Infinity connector, on hand-built tables."""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import types
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from infinity.remote_thrift.infinity_thrift_rpc.ttypes import DataType, LogicType
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    # Load the modules by path with bare settings and rag.nlp modules: the real ones pull in every storage backend.
+    settings = types.SimpleNamespace(INFINITY={"uri": "stub"})
+    monkeypatch.setitem(sys.modules, "common.settings", settings)
+    monkeypatch.setattr(importlib.import_module("common"), "settings", settings, raising=False)
+    monkeypatch.setitem(sys.modules, "rag.nlp", types.SimpleNamespace(is_english=lambda texts: all(t.isascii() for t in texts)))
+    root = Path(__file__).resolve().parents[4]
+    for name, path in (("common.doc_store.infinity_conn_base", "common/doc_store/infinity_conn_base.py"), ("test_infinity_conn_module", "rag/utils/infinity_conn.py")):
+        spec = importlib.util.spec_from_file_location(name, root / path)
+        module = importlib.util.module_from_spec(spec)
+        monkeypatch.setitem(sys.modules, name, module)
+        spec.loader.exec_module(module)
+    # @singleton wraps the class in a closure; take the class out to skip the connecting __init__.
+    cls = next(cell.cell_contents for cell in module.InfinityConnection.__closure__ if isinstance(cell.cell_contents, type))
+    conn = cls.__new__(cls)
+    conn.logger = logging.getLogger("test.infinity_conn")
+    return conn
+
+
+class _FakeBuilder:
+    def __init__(self, data, logic_types, extra_result=None):
+        self.result = data, {name: DataType(logic_type=t) for name, t in logic_types.items()}, extra_result
+
+    def to_result(self):
+        return self.result
+
+
+def _chunks():
+    return pa.table(
+        {
+            "id": ["c1", "c2", "c1"],
+            "docnm": ["a.pdf", "b.pdf", "a.pdf"],
+            "content": ["Apple pie. Pear tart", "苹果派", "dup"],
+            "important_keywords": ["x,y", "", "x,y"],
+            "important_kwd_empty_count": [1, None, 1],
+            "tag_kwd": ["food###fruit", "food", None],
+            "position_int": ["1_2_3_4_5", "", ""],
+            "pagerank_fea": [0, 3, 0],
+        }
+    )
+
+
+def test_query_to_arrow_keeps_types_and_nulls(conn):
+    builder = _FakeBuilder(
+        {"id": ["c1", "c2"], "pagerank_fea": [1, pd.NA], "SCORE": [0.5, 0.25], "q_2_vec": [[0.1, 0.2], [0.3, 0.4]]},
+        {"id": LogicType.Varchar, "pagerank_fea": LogicType.Integer, "SCORE": LogicType.Float, "q_2_vec": LogicType.Embedding},
+        {"total_hits_count": 2},
+    )
+    table, extra = conn.query_to_arrow(builder)
+
+    assert extra == {"total_hits_count": 2}
+    assert table.schema.field("pagerank_fea").type == pa.int32() and table.column("pagerank_fea").null_count == 1
+    assert table.schema.field("SCORE").type == pa.float32()
+    assert table.column("q_2_vec").to_pylist()[1] == pytest.approx([0.3, 0.4])
+
+    empty = conn.concat_tables([table.slice(0, 0)], ["id", "score()", "row_id()"])
+    assert empty.column_names == ["id", "SCORE", "row_id"] and empty.num_rows == 0
+    assert conn.concat_tables([table, table], ["id"]).num_rows == 4
+
+
+def test_get_fields_aliases_and_converts_columns(conn):
+    res = (_chunks(), 3)
+    fields = conn.get_fields(res, ["docnm_kwd", "content_with_weight", "important_kwd", "tag_kwd", "position_int", "pagerank_fea", "missing_int"])
+
+    assert list(fields) == ["c1", "c2"]
+    assert fields["c1"] == {
+        "docnm_kwd": "a.pdf",
+        "content_with_weight": "Apple pie. Pear tart",
+        "important_kwd": ["x", "y", ""],
+        "tag_kwd": ["food", "fruit"],
+        "position_int": [[1, 2, 3, 4, 5]],
+        "pagerank_fea": 0,
+        "missing_int": None,
+    }
+    assert fields["c2"]["important_kwd"] == [] and fields["c2"]["position_int"] == []
+    # The raw columns behind the aliases are never returned.
+    assert "content" not in conn.get_fields(res, ["content", "docnm"])["c1"]
+    assert conn.get_fields(res, []) == {}
+
+
+def test_result_helpers_read_arrow_and_dataframe_results(conn):
+    res = (_chunks(), 3)
+    assert conn.get_total(res) == 3
+    assert conn.get_doc_ids(res) == ["c1", "c2", "c1"]
+    assert conn.get_doc_ids((_chunks().slice(0, 0), 0)) == []
+    assert conn.get_aggregation(res, "tag_kwd") == [["food", 2], ["fruit", 1]]
+    assert conn.get_aggregation(pa.table({"id": ["a", "b"], "tag_kwd": [["t1", " t2 "], ["t2"]]}), "tag_kwd") == [["t2", 2], ["t1", 1]]
+    assert conn.get_aggregation(res, "pagerank_fea") == []
+
+    highlight = conn.get_highlight(_chunks().slice(0, 2), ["pear", "苹果"], "content")
+    assert highlight == {"c1": " <em>Pear</em> tart", "c2": "<em>苹果</em>派"}
+
+    legacy = (_chunks().to_pandas(), 3)
+    assert conn.get_doc_ids(legacy) == ["c1", "c2", "c1"]
+    assert conn.get_aggregation(legacy, "tag_kwd") == [["food", 2], ["fruit", 1]]
@@ -82,10 +82,8 @@ class TestGetHandlesDocMetaIndex:
         inf_conn = MagicMock()
         db = MagicMock()
         table = MagicMock()
-        empty_df = MagicMock()
-        empty_df.empty = True
-        empty_df.columns.tolist.return_value = ["id"]
-        table.output.return_value.filter.return_value.to_df.return_value = (empty_df, 0)
+        # No rows: ``to_result`` returns empty data and type dicts.
+        table.output.return_value.filter.return_value.to_result.return_value = ({}, {}, None)
         db.get_table.return_value = table
         inf_conn.get_database.return_value = db
 
@@ -113,10 +111,8 @@ class TestGetHandlesDocMetaIndex:
         inf_conn = MagicMock()
         db = MagicMock()
         table = MagicMock()
-        empty_df = MagicMock()
-        empty_df.empty = True
-        empty_df.columns.tolist.return_value = ["id"]
-        table.output.return_value.filter.return_value.to_df.return_value = (empty_df, 0)
+        # No rows: ``to_result`` returns empty data and type dicts.
+        table.output.return_value.filter.return_value.to_result.return_value = ({}, {}, None)
         db.get_table.return_value = table
         inf_conn.get_database.return_value = db
 
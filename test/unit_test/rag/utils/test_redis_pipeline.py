@@ -0,0 +1,110 @@
+#
+#  Copyright 2025 The InfiniFlow Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import importlib
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def redis_conn(monkeypatch):
+    # Load the module by path with a bare settings module: the real one pulls in every storage backend.
+    settings = types.SimpleNamespace(decrypt_database_config=lambda name: {}, get_base_config=lambda name, default: default)
+    monkeypatch.setitem(sys.modules, "common.settings", settings)
+    monkeypatch.setattr(importlib.import_module("common"), "settings", settings, raising=False)
+    module_path = Path(__file__).resolve().parents[4] / "rag" / "utils" / "redis_conn.py"
+    spec = importlib.util.spec_from_file_location("test_redis_conn_module", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+
+        return queue
+
+    def execute(self):
+        self.client.round_trips += 1
+        if self.client.failures:
+            self.client.failures -= 1
+            raise ConnectionError("connection reset")
+        self.client.executed.append(self.calls)
+        return [self.client.values.get(args[0]) if name == "get" else True for name, args in self.calls]
+
+
+class _FakeClient:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.round_trips = 0
+        self.executed = []
+        self.transactions = []
+        self.values = {"cancel": "x"}
+
+    def pipeline(self, transaction=False):
+        self.transactions.append(transaction)
+        return _FakePipeline(self)
+
+
+def _db(redis_conn, client, monkeypatch):
+    db = redis_conn.REDIS_CONN
+    db.REDIS = client
+    reopened = []
+    monkeypatch.setattr(db, "__open__", lambda: reopened.append(1))
+    return db, reopened
+
+
+def test_pipeline_sends_queued_commands_in_one_round_trip(redis_conn, monkeypatch):
+    db, _ = _db(redis_conn, _FakeClient(), monkeypatch)
+    with db.pipeline() as pipe:
+        pipe.set("log", "[]", 60)
+        pipe.get("cancel")
+    assert db.REDIS.round_trips == 1
+    assert db.REDIS.executed == [[("set", ("log", "[]", 60)), ("get", ("cancel",))]]
+    assert pipe.results == [True, "x"]
+
+
+def test_pipeline_is_not_sent_when_the_block_raises(redis_conn, monkeypatch):
+    db, _ = _db(redis_conn, _FakeClient(), monkeypatch)
+    with pytest.raises(ValueError):
+        with db.pipeline() as pipe:
+            pipe.set("k", "v", 60)
+            raise ValueError("abort")
+    assert db.REDIS.round_trips == 0
+
+
+def test_failures_reconnect_and_retry(redis_conn, monkeypatch):
+    db, reopened = _db(redis_conn, _FakeClient(failures=2), monkeypatch)
+    assert db.queue_product_many({"queue": [{"id": "t1"}, {"id": "t2"}]}) is True
+    assert (db.REDIS.round_trips, len(reopened)) == (3, 2)
+    assert [name for name, _ in db.REDIS.executed[0]] == ["xadd", "xadd"]
+    # Queue messages go out in a transaction, so a retry never repeats part of them.
+    assert db.REDIS.transactions == [True, True, True]
+
+    db.REDIS.failures = 1
+    assert db.mset({"a": "1", "b": "2"}, 60) is False
+    assert db.execute_pipeline([]) == []